@@ -12,6 +12,7 @@ import time
 import schedule
 import logging
 import subprocess
+import threading
 import psutil
 from datetime import datetime
 from typing import Dict, List, Optional
@@ -43,6 +44,12 @@ except Exception as e:
     logger.error(f"Erreur de connexion Redis: {e}")
     redis_client = None
 
+# Durée de validité (secondes) de l'instantané des statistiques de trafic
+STATS_SNAPSHOT_TTL = float(os.getenv('TC_STATS_SNAPSHOT_TTL', '5'))
+
+# Compteurs tc exposés pour chaque interface
+TC_COUNTERS = ('bytes', 'packets', 'drops', 'overlimits', 'requeues', 'backlog', 'qlen')
+
 class TrafficControlManager:
     """Gestionnaire principal du contrôle de trafic"""
     
@@ -50,6 +57,11 @@ class TrafficControlManager:
         self.config_file = '/etc/tc/rules.yaml'
         self.rules = self.load_rules()
         
+        # Instantané des statistiques de toutes les interfaces
+        self._stats_snapshot = None
+        self._stats_snapshot_time = 0.0
+        self._stats_lock = threading.Lock()
+        
     def load_rules(self) -> Dict:
         """Charge les règles de traffic control depuis le fichier de configuration"""
         try:
@@ -114,6 +126,7 @@ class TrafficControlManager:
                 
                 if result.returncode == 0:
                     logger.info(f"Règle TC appliquée sur {interface}: {bandwidth}")
+                    self.invalidate_stats_snapshot()
                     return True
             
             logger.error(f"Erreur lors de l'application de la règle TC: {result.stderr}")
@@ -130,6 +143,7 @@ class TrafficControlManager:
                                  capture_output=True, text=True)
             if result.returncode == 0 or 'RTNETLINK answers: No such file or directory' in result.stderr:
                 logger.info(f"Règles TC supprimées de {interface}")
+                self.invalidate_stats_snapshot()
                 return True
             else:
                 logger.error(f"Erreur lors de la suppression des règles TC: {result.stderr}")
@@ -140,6 +154,89 @@ class TrafficControlManager:
     
     def get_traffic_stats(self, interface: str) -> Dict:
         """Récupère les statistiques de trafic d'une interface"""
+        stats = self.get_all_traffic_stats().get(interface)
+        if stats is None:
+            # Interface absente de l'instantané (loopback, interface récente)
+            stats = self._read_interface_stats_text(interface)
+        return stats
+    
+    def get_all_traffic_stats(self) -> Dict[str, Dict]:
+        """
+        Récupère les statistiques de toutes les interfaces.
+        
+        Les statistiques sont lues en un seul appel `tc -s -j qdisc show` et
+        servies depuis un instantané en mémoire pendant STATS_SNAPSHOT_TTL secondes.
+        """
+        with self._stats_lock:
+            now = time.monotonic()
+            if self._stats_snapshot is None or now - self._stats_snapshot_time > STATS_SNAPSHOT_TTL:
+                self._stats_snapshot = self._collect_all_stats()
+                self._stats_snapshot_time = now
+            return self._stats_snapshot
+    
+    def invalidate_stats_snapshot(self):
+        """Force la relecture des statistiques au prochain accès"""
+        with self._stats_lock:
+            self._stats_snapshot = None
+    
+    def _collect_all_stats(self) -> Dict[str, Dict]:
+        """Lit les compteurs tc et réseau de toutes les interfaces"""
+        interfaces = self.get_network_interfaces()
+        timestamp = datetime.now().isoformat()
+        
+        qdiscs = self._read_qdiscs_json()
+        if qdiscs is None:
+            # tc sans sortie JSON : lecture texte interface par interface
+            return {interface: self._read_interface_stats_text(interface) for interface in interfaces}
+        
+        try:
+            io_counters = psutil.net_io_counters(pernic=True)
+        except Exception as e:
+            logger.error(f"Erreur lors de la lecture des compteurs réseau: {e}")
+            io_counters = {}
+        
+        all_stats = {}
+        for interface in interfaces:
+            interface_qdiscs = qdiscs.get(interface, [])
+            # Les compteurs du qdisc racine incluent ceux des qdiscs enfants
+            counted = [q for q in interface_qdiscs if q.get('root')] or interface_qdiscs
+            counters = {name: sum(q.get(name, 0) for q in counted) for name in TC_COUNTERS}
+            
+            stats = {
+                'interface': interface,
+                'timestamp': timestamp,
+                'qdiscs': interface_qdiscs,
+                **counters,
+                'traffic_info': (
+                    f"Sent {counters['bytes']} bytes {counters['packets']} pkt "
+                    f"(dropped {counters['drops']}, overlimits {counters['overlimits']} "
+                    f"requeues {counters['requeues']})"
+                )
+            }
+            nic = io_counters.get(interface)
+            if nic is not None:
+                stats['io_counters'] = nic._asdict()
+            all_stats[interface] = stats
+        
+        return all_stats
+    
+    def _read_qdiscs_json(self) -> Optional[Dict[str, List[Dict]]]:
+        """Qdiscs de toutes les interfaces via `tc -s -j`, ou None si indisponible"""
+        try:
+            result = subprocess.run(['tc', '-s', '-j', 'qdisc', 'show'],
+                                 capture_output=True, text=True)
+            if result.returncode != 0:
+                return None
+            qdiscs = {}
+            for qdisc in json.loads(result.stdout or '[]'):
+                qdiscs.setdefault(qdisc.get('dev'), []).append(qdisc)
+            return qdiscs
+        except (OSError, ValueError) as e:
+            logger.warning(f"Sortie JSON de tc indisponible: {e}")
+            return None
+    
+    def _read_interface_stats_text(self, interface: str) -> Dict:
+        """Statistiques d'une interface depuis la sortie texte de tc"""
         try:
             result = subprocess.run(['tc', '-s', 'qdisc', 'show', 'dev', interface], 
                                  capture_output=True, text=True)
@@ -176,15 +273,21 @@ class TrafficStatsResource(Resource):
     """API pour les statistiques de trafic"""
     
     def get(self, interface=None):
-        """Récupère les statistiques de trafic"""
+        """
+        Récupère les statistiques de trafic.
+        
+        Sans interface, retourne toutes les interfaces en une réponse
+        (filtrables par `?interfaces=eth0,eth1`).
+        """
         if interface:
             stats = tc_manager.get_traffic_stats(interface)
             return stats
         else:
-            interfaces = tc_manager.get_network_interfaces()
-            all_stats = {}
-            for iface in interfaces:
-                all_stats[iface] = tc_manager.get_traffic_stats(iface)
+            all_stats = tc_manager.get_all_traffic_stats()
+            selected = request.args.get('interfaces')
+            if selected:
+                names = [name for name in selected.split(',') if name]
+                return {name: all_stats.get(name) or tc_manager.get_traffic_stats(name) for name in names}
             return all_stats
 
 class QoSPolicyResource(Resource):
@@ -291,18 +394,13 @@ def index():
 def periodic_stats_collection():
     """Collecte périodique des statistiques"""
     try:
-        interfaces = tc_manager.get_network_interfaces()
-        stats_data = {}
-        
-        for interface in interfaces:
-            stats = tc_manager.get_traffic_stats(interface)
-            stats_data[interface] = stats
+        stats_data = tc_manager.get_all_traffic_stats()
         
         # Publier les stats via Redis
         if redis_client:
             redis_client.publish('tc_stats_update', json.dumps(stats_data))
         
-        logger.info(f"Statistiques collectées pour {len(interfaces)} interfaces")
+        logger.info(f"Statistiques collectées pour {len(stats_data)} interfaces")
         
     except Exception as e:
         logger.error(f"Erreur lors de la collecte des statistiques: {e}")
@@ -329,7 +427,6 @@ if __name__ == '__main__':
         logger.info("Configuration par défaut créée")
     
     # Démarrer le planificateur en arrière-plan
-    import threading
     scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
     scheduler_thread.start()
     
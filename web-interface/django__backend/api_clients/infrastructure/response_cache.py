@@ -3,14 +3,28 @@ Cache de réponses avec TTL et stratégies d'éviction pour les clients API.
 
 Ce module fournit une implémentation robuste du cache avec TTL (Time To Live)
 et éviction LRU pour améliorer les performances des clients API.
+
+Toutes les opérations sont en O(1) (O(log n) pour l'expiration) :
+- chaque stratégie d'éviction tient un index de ses candidats (liste
+  ordonnée pour LRU et TTL, seaux de fréquence pour LFU) au lieu de
+  parcourir toutes les entrées à chaque éviction ;
+- les échéances sont rangées dans un tas : les entrées expirées sont
+  purgées au fil des écritures (expiration amortie), sans thread de
+  nettoyage ;
+- la taille des entrées est comptée en octets, avec un budget mémoire
+  optionnel et la compression zlib des corps volumineux.
 """
 
+import heapq
+import pickle
+import sys
 import time
 import threading
 import hashlib
 import json
 import logging
-from typing import Any, Optional, Dict, Union, Callable
+import zlib
+from typing import Any, Optional, Dict, Union, Callable, List, Tuple
 from abc import ABC, abstractmethod
 from collections import OrderedDict
 from dataclasses import dataclass
@@ -27,6 +41,15 @@ class CacheEntry:
     last_accessed: float
     access_count: int
     ttl: Optional[float] = None
+    size: int = 0
+    compressed: Optional[str] = None  # Type d'origine ('bytes' ou 'str') si compressée
+    
+    @property
+    def expires_at(self) -> Optional[float]:
+        """Date d'expiration, ou None si l'entrée n'expire pas."""
+        if self.ttl is None:
+            return None
+        return self.created_at + self.ttl
     
     @property
     def is_expired(self) -> bool:
@@ -45,6 +68,120 @@ class CacheEntry:
         self.last_accessed = time.time()
         self.access_count += 1
 
+class EvictionIndex:
+    """
+    Index des candidats à l'éviction tenu à jour par le cache.
+    
+    Cette implémentation par défaut délègue à `select_for_eviction` de la
+    stratégie (parcours complet) ; les stratégies fournies la remplacent
+    par un index en O(1).
+    """
+    
+    def __init__(self, strategy: 'EvictionStrategy'):
+        self.strategy = strategy
+    
+    def add(self, key: str, entry: CacheEntry) -> None:
+        """Enregistre une nouvelle entrée."""
+    
+    def access(self, key: str, entry: CacheEntry) -> None:
+        """Enregistre un accès à une entrée."""
+    
+    def remove(self, key: str) -> None:
+        """Retire une entrée de l'index."""
+    
+    def clear(self) -> None:
+        """Vide l'index."""
+    
+    def victim(self, entries: Dict[str, CacheEntry]) -> str:
+        """Retourne la clé à évincer."""
+        return self.strategy.select_for_eviction(entries)
+
+class OrderedEvictionIndex(EvictionIndex):
+    """Index ordonné : la première clé est évincée (accès déplacés en fin si `move_on_access`)."""
+    
+    def __init__(self, strategy: 'EvictionStrategy', move_on_access: bool):
+        super().__init__(strategy)
+        self.move_on_access = move_on_access
+        self._order: 'OrderedDict[str, None]' = OrderedDict()
+    
+    def add(self, key: str, entry: CacheEntry) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+    
+    def access(self, key: str, entry: CacheEntry) -> None:
+        if self.move_on_access:
+            self._order.move_to_end(key)
+    
+    def remove(self, key: str) -> None:
+        self._order.pop(key, None)
+    
+    def clear(self) -> None:
+        self._order.clear()
+    
+    def victim(self, entries: Dict[str, CacheEntry]) -> str:
+        if not self._order:
+            raise CacheException("Aucune entrée à évincer")
+        return next(iter(self._order))
+
+class FrequencyEvictionIndex(EvictionIndex):
+    """
+    Index LFU en seaux de fréquence.
+    
+    Chaque seau regroupe les clés d'une même fréquence d'accès, de la moins
+    à la plus récemment utilisée ; un accès déplace la clé dans le seau
+    suivant. La plus petite fréquence est suivie pour évincer en O(1).
+    """
+    
+    def __init__(self, strategy: 'EvictionStrategy'):
+        super().__init__(strategy)
+        self._frequencies: Dict[str, int] = {}
+        self._buckets: Dict[int, 'OrderedDict[str, None]'] = {}
+        self._min_frequency = 0
+    
+    def _unlink(self, key: str) -> Optional[int]:
+        frequency = self._frequencies.pop(key, None)
+        if frequency is None:
+            return None
+        bucket = self._buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[frequency]
+        return frequency
+    
+    def _link(self, key: str, frequency: int) -> None:
+        self._frequencies[key] = frequency
+        self._buckets.setdefault(frequency, OrderedDict())[key] = None
+    
+    def add(self, key: str, entry: CacheEntry) -> None:
+        self._unlink(key)
+        self._link(key, entry.access_count)
+        if not self._min_frequency or entry.access_count < self._min_frequency:
+            self._min_frequency = entry.access_count
+    
+    def access(self, key: str, entry: CacheEntry) -> None:
+        frequency = self._unlink(key)
+        if frequency is None:
+            return
+        if frequency == self._min_frequency and frequency not in self._buckets:
+            self._min_frequency = frequency + 1
+        self._link(key, frequency + 1)
+    
+    def remove(self, key: str) -> None:
+        self._unlink(key)
+    
+    def clear(self) -> None:
+        self._frequencies.clear()
+        self._buckets.clear()
+        self._min_frequency = 0
+    
+    def victim(self, entries: Dict[str, CacheEntry]) -> str:
+        if not self._buckets:
+            raise CacheException("Aucune entrée à évincer")
+        if self._min_frequency not in self._buckets:
+            # Seau vidé par une suppression ou une expiration : recalculer le minimum
+            self._min_frequency = min(self._buckets)
+        return next(iter(self._buckets[self._min_frequency]))
+
 class EvictionStrategy(ABC):
     """Interface abstraite pour les stratégies d'éviction."""
     
@@ -75,6 +212,14 @@ class EvictionStrategy(ABC):
             Clé de l'entrée à évincer
         """
         pass
+    
+    def create_index(self) -> EvictionIndex:
+        """
+        Crée l'index tenu à jour par le cache pour cette stratégie.
+        
+        Par défaut, l'index délègue à `select_for_eviction`.
+        """
+        return EvictionIndex(self)
 
 class LRUEvictionStrategy(EvictionStrategy):
     """Stratégie d'éviction LRU (Least Recently Used)."""
@@ -91,6 +236,10 @@ class LRUEvictionStrategy(EvictionStrategy):
         oldest_key = min(entries.keys(), 
                         key=lambda k: entries[k].last_accessed)
         return oldest_key
+    
+    def create_index(self) -> EvictionIndex:
+        """Liste ordonnée par dernier accès."""
+        return OrderedEvictionIndex(self, move_on_access=True)
 
 class LFUEvictionStrategy(EvictionStrategy):
     """Stratégie d'éviction LFU (Least Frequently Used)."""
@@ -107,6 +256,10 @@ class LFUEvictionStrategy(EvictionStrategy):
         least_used_key = min(entries.keys(), 
                            key=lambda k: entries[k].access_count)
         return least_used_key
+    
+    def create_index(self) -> EvictionIndex:
+        """Seaux de fréquence."""
+        return FrequencyEvictionIndex(self)
 
 class TTLEvictionStrategy(EvictionStrategy):
     """Stratégie d'éviction basée sur TTL."""
@@ -132,6 +285,15 @@ class TTLEvictionStrategy(EvictionStrategy):
         oldest_key = min(entries.keys(),
                         key=lambda k: entries[k].created_at)
         return oldest_key
+    
+    def create_index(self) -> EvictionIndex:
+        """
+        Liste ordonnée par date de création.
+        
+        Le cache purge les entrées expirées avant toute éviction : il ne
+        reste qu'à évincer la plus ancienne.
+        """
+        return OrderedEvictionIndex(self, move_on_access=False)
 
 class CacheConfig:
     """Configuration pour le cache de réponses."""
@@ -142,7 +304,10 @@ class CacheConfig:
         default_ttl: Optional[float] = 300.0,  # 5 minutes
         eviction_strategy: Optional[EvictionStrategy] = None,
         cleanup_interval: float = 60.0,  # 1 minute
-        enable_stats: bool = True
+        enable_stats: bool = True,
+        max_memory_bytes: Optional[int] = None,
+        compress_threshold: Optional[int] = None,
+        compression_level: int = 6
     ):
         """
         Initialise la configuration du cache.
@@ -151,14 +316,22 @@ class CacheConfig:
             max_size: Taille maximum du cache (nombre d'entrées)
             default_ttl: TTL par défaut en secondes (None = pas d'expiration)
             eviction_strategy: Stratégie d'éviction à utiliser
-            cleanup_interval: Intervalle de nettoyage automatique (secondes)
+            cleanup_interval: Intervalle maximal entre deux purges des entrées
+                expirées lors des lectures (secondes, 0 = purge uniquement à l'écriture)
             enable_stats: Activer la collecte de statistiques
+            max_memory_bytes: Budget mémoire en octets (None = illimité)
+            compress_threshold: Taille à partir de laquelle les corps bytes/str
+                sont compressés avec zlib (None = pas de compression)
+            compression_level: Niveau de compression zlib
         """
         self.max_size = max_size
         self.default_ttl = default_ttl
         self.eviction_strategy = eviction_strategy or LRUEvictionStrategy()
         self.cleanup_interval = cleanup_interval
         self.enable_stats = enable_stats
+        self.max_memory_bytes = max_memory_bytes
+        self.compress_threshold = compress_threshold
+        self.compression_level = compression_level
 
 class CacheStats:
     """Statistiques thread-safe pour le cache."""
@@ -170,6 +343,7 @@ class CacheStats:
         self.evictions = 0
         self.expired_entries = 0
         self.total_requests = 0
+        self.compressed_entries = 0
     
     def record_hit(self):
         """Enregistre un cache hit."""
@@ -193,6 +367,11 @@ class CacheStats:
         with self._lock:
             self.expired_entries += 1
     
+    def record_compression(self):
+        """Enregistre une entrée compressée."""
+        with self._lock:
+            self.compressed_entries += 1
+    
     @property
     def hit_rate(self) -> float:
         """Calcule le taux de cache hit."""
@@ -214,17 +393,35 @@ class CacheStats:
                 'misses': self.misses,
                 'evictions': self.evictions,
                 'expired_entries': self.expired_entries,
+                'compressed_entries': self.compressed_entries,
                 'total_requests': self.total_requests,
                 'hit_rate': self.hit_rate,
                 'miss_rate': self.miss_rate
             }
 
+def estimate_size(value: Any) -> int:
+    """
+    Estime la taille d'une valeur en octets.
+    
+    Exacte pour bytes et str (UTF-8) ; taille sérialisée (pickle) pour les
+    autres valeurs, ou taille de l'objet Python si elles ne sont pas
+    sérialisables.
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    try:
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
 class ResponseCache:
     """
     Cache de réponses avec TTL et éviction thread-safe.
     
     Cette classe implémente un cache haute performance avec TTL,
-    éviction LRU/LFU et nettoyage automatique des entrées expirées.
+    éviction LRU/LFU et expiration amortie des entrées expirées.
     """
     
     def __init__(self, config: Optional[CacheConfig] = None):
@@ -237,13 +434,15 @@ class ResponseCache:
         self.config = config or CacheConfig()
         self._cache: Dict[str, CacheEntry] = {}
         self._lock = threading.RLock()
-        self._cleanup_timer: Optional[threading.Timer] = None
+        self._index = self.config.eviction_strategy.create_index()
+        # Tas des échéances (expiration, entrée) ; les enregistrements d'entrées
+        # remplacées ou supprimées sont ignorés lorsqu'ils remontent
+        self._expiry_heap: List[Tuple[float, int, str, CacheEntry]] = []
+        self._heap_counter = 0
+        self._memory_bytes = 0
+        self._next_sweep = time.time() + self.config.cleanup_interval
         self.stats = CacheStats() if self.config.enable_stats else None
         
-        # Démarrer le nettoyage automatique si configuré
-        if self.config.cleanup_interval > 0:
-            self._schedule_cleanup()
-        
         logger.debug(f"Cache initialisé avec configuration: "
                     f"max_size={self.config.max_size}, "
                     f"default_ttl={self.config.default_ttl}s, "
@@ -260,6 +459,9 @@ class ResponseCache:
             Valeur stockée ou None si non trouvée/expirée
         """
         with self._lock:
+            if self.config.cleanup_interval > 0 and time.time() >= self._next_sweep:
+                self._expire_due()
+            
             entry = self._cache.get(key)
             
             if entry is None:
@@ -276,9 +478,16 @@ class ResponseCache:
             
             # Mettre à jour les métadonnées d'accès
             entry.touch()
+            self._index.access(key, entry)
             self._record_hit()
             
-            return entry.value
+            value = entry.value
+        
+        if entry.compressed is not None:
+            value = zlib.decompress(value)
+            if entry.compressed == 'str':
+                value = value.decode('utf-8')
+        return value
     
     def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
         """
@@ -289,6 +498,9 @@ class ResponseCache:
             value: Valeur à stocker
             ttl: TTL spécifique (utilise default_ttl si None)
         """
+        # Mesure et compression hors du verrou
+        stored, size, compressed = self._prepare(value)
+        
         with self._lock:
             # Utiliser le TTL par défaut si aucun spécifié
             effective_ttl = ttl if ttl is not None else self.config.default_ttl
@@ -296,20 +508,34 @@ class ResponseCache:
             # Créer la nouvelle entrée
             now = time.time()
             entry = CacheEntry(
-                value=value,
+                value=stored,
                 created_at=now,
                 last_accessed=now,
                 access_count=1,
-                ttl=effective_ttl
+                ttl=effective_ttl,
+                size=size,
+                compressed=compressed
             )
             
-            # Vérifier si l'éviction est nécessaire
-            if (len(self._cache) >= self.config.max_size and 
-                key not in self._cache):
-                self._evict_entries()
+            if key in self._cache:
+                self._remove_entry(key)
+            
+            max_memory = self.config.max_memory_bytes
+            if max_memory is not None and size > max_memory:
+                logger.debug(f"Entrée {key} trop volumineuse pour le cache ({size} octets)")
+                return
+            
+            # Purger les entrées expirées, puis évincer si nécessaire
+            self._expire_due(now)
+            self._evict_entries(size)
             
             # Stocker l'entrée
             self._cache[key] = entry
+            self._memory_bytes += size
+            self._index.add(key, entry)
+            if entry.expires_at is not None:
+                self._heap_counter += 1
+                heapq.heappush(self._expiry_heap, (entry.expires_at, self._heap_counter, key, entry))
     
     def delete(self, key: str) -> bool:
         """
@@ -331,6 +557,9 @@ class ResponseCache:
         """Vide complètement le cache."""
         with self._lock:
             self._cache.clear()
+            self._index.clear()
+            self._expiry_heap.clear()
+            self._memory_bytes = 0
             logger.debug("Cache vidé")
     
     def cleanup_expired(self) -> int:
@@ -341,28 +570,65 @@ class ResponseCache:
             Nombre d'entrées supprimées
         """
         with self._lock:
-            expired_keys = [
-                key for key, entry in self._cache.items()
-                if entry.is_expired
-            ]
+            removed = self._expire_due()
             
-            for key in expired_keys:
+            if removed:
+                logger.debug(f"Nettoyage: {removed} entrées expirées supprimées")
+            
+            return removed
+    
+    def _prepare(self, value: Any) -> Tuple[Any, int, Optional[str]]:
+        """Retourne la valeur à stocker, sa taille et son type d'origine si compressée."""
+        accounted = self.config.max_memory_bytes is not None or self.config.compress_threshold is not None
+        if not accounted and not isinstance(value, (bytes, bytearray, str)):
+            return value, sys.getsizeof(value), None
+        
+        size = estimate_size(value)
+        threshold = self.config.compress_threshold
+        if threshold is not None and size >= threshold and isinstance(value, (bytes, str)):
+            raw = value.encode('utf-8') if isinstance(value, str) else value
+            packed = zlib.compress(raw, self.config.compression_level)
+            if len(packed) < size:
+                if self.stats:
+                    self.stats.record_compression()
+                return packed, len(packed), 'str' if isinstance(value, str) else 'bytes'
+        return value, size, None
+    
+    def _expire_due(self, now: Optional[float] = None) -> int:
+        """
+        Supprime les entrées dont l'échéance est passée, depuis le haut du tas.
+        
+        Chaque échéance n'est dépilée qu'une fois : le coût est amorti sur
+        les écritures (O(log n) par entrée).
+        """
+        now = time.time() if now is None else now
+        heap = self._expiry_heap
+        removed = 0
+        while heap and heap[0][0] < now:
+            _, _, key, entry = heapq.heappop(heap)
+            if self._cache.get(key) is entry:
                 self._remove_entry(key)
+                removed += 1
                 if self.stats:
                     self.stats.record_expiration()
-            
-            if expired_keys:
-                logger.debug(f"Nettoyage: {len(expired_keys)} entrées expirées supprimées")
-            
-            return len(expired_keys)
+        
+        # Enregistrements orphelins (entrées remplacées ou supprimées)
+        if len(heap) > 2 * len(self._cache) + 64:
+            self._expiry_heap = [record for record in heap if self._cache.get(record[2]) is record[3]]
+            heapq.heapify(self._expiry_heap)
+        
+        self._next_sweep = now + self.config.cleanup_interval
+        return removed
     
-    def _evict_entries(self) -> None:
+    def _evict_entries(self, incoming_size: int = 0) -> None:
         """Évince les entrées selon la stratégie configurée."""
-        while len(self._cache) >= self.config.max_size:
+        max_memory = self.config.max_memory_bytes
+        while self._cache and (
+            len(self._cache) >= self.config.max_size or
+            (max_memory is not None and self._memory_bytes + incoming_size > max_memory)
+        ):
             try:
-                key_to_evict = self.config.eviction_strategy.select_for_eviction(
-                    self._cache
-                )
+                key_to_evict = self._index.victim(self._cache)
                 self._remove_entry(key_to_evict)
                 if self.stats:
                     self.stats.record_eviction()
@@ -374,7 +640,10 @@ class ResponseCache:
     
     def _remove_entry(self, key: str) -> None:
         """Supprime une entrée du cache."""
-        self._cache.pop(key, None)
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry.size
+            self._index.remove(key)
     
     def _record_hit(self) -> None:
         """Enregistre un cache hit."""
@@ -386,29 +655,6 @@ class ResponseCache:
         if self.stats:
             self.stats.record_miss()
     
-    def _schedule_cleanup(self) -> None:
-        """Programme le prochain nettoyage automatique."""
-        if self._cleanup_timer:
-            self._cleanup_timer.cancel()
-        
-        self._cleanup_timer = threading.Timer(
-            self.config.cleanup_interval,
-            self._periodic_cleanup
-        )
-        self._cleanup_timer.daemon = True
-        self._cleanup_timer.start()
-    
-    def _periodic_cleanup(self) -> None:
-        """Nettoyage périodique des entrées expirées."""
-        try:
-            self.cleanup_expired()
-        except Exception as e:
-            logger.error(f"Erreur lors du nettoyage périodique: {e}")
-        finally:
-            # Programmer le prochain nettoyage
-            if self.config.cleanup_interval > 0:
-                self._schedule_cleanup()
-    
     def get_info(self) -> Dict[str, Any]:
         """
         Retourne les informations sur l'état du cache.
@@ -420,10 +666,13 @@ class ResponseCache:
             info = {
                 'size': len(self._cache),
                 'max_size': self.config.max_size,
+                'memory_bytes': self._memory_bytes,
+                'max_memory_bytes': self.config.max_memory_bytes,
                 'config': {
                     'default_ttl': self.config.default_ttl,
                     'cleanup_interval': self.config.cleanup_interval,
-                    'eviction_strategy': type(self.config.eviction_strategy).__name__
+                    'eviction_strategy': type(self.config.eviction_strategy).__name__,
+                    'compress_threshold': self.config.compress_threshold
                 }
             }
             
@@ -431,11 +680,6 @@ class ResponseCache:
                 info['stats'] = self.stats.to_dict()
             
             return info
-    
-    def __del__(self):
-        """Nettoyage lors de la destruction."""
-        if self._cleanup_timer:
-            self._cleanup_timer.cancel()
 
 def generate_cache_key(*args, **kwargs) -> str:
     """
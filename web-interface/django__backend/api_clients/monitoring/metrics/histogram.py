@@ -0,0 +1,122 @@
+"""
+Histogramme à seaux logarithmiques pour les quantiles en flux.
+
+Chaque valeur est rangée dans le seau k tel que gamma^(k-1) < v <= gamma^k,
+avec gamma = (1 + e) / (1 - e) : tout quantile est estimé avec une erreur
+relative d'au plus e (1 % par défaut), comme un histogramme HDR. Le nombre
+de seaux ne dépend que de la plage des valeurs, pas du nombre d'échantillons,
+et deux histogrammes de même précision se fusionnent en additionnant leurs
+seaux.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional
+
+
+class LogHistogram:
+    """Histogramme logarithmique fusionnable (erreur relative bornée)."""
+
+    __slots__ = ('relative_error', 'min_value', '_gamma', '_log_gamma', 'buckets', 'zero_count',
+                 'count', 'sum', 'min', 'max')
+
+    def __init__(self, relative_error: float = 0.01, min_value: float = 1e-6):
+        """
+        Initialise l'histogramme.
+
+        Args:
+            relative_error: Erreur relative maximale des quantiles
+            min_value: Valeurs inférieures ou égales comptées dans le seau zéro
+        """
+        self.relative_error = relative_error
+        self.min_value = min_value
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        """Ajoute une valeur."""
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= self.min_value:
+            self.zero_count += 1
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other: 'LogHistogram') -> 'LogHistogram':
+        """Ajoute les valeurs d'un autre histogramme de même précision."""
+        if other.relative_error != self.relative_error or other.min_value != self.min_value:
+            raise ValueError("Histogrammes de précisions différentes")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @classmethod
+    def merged(cls, histograms: Iterable['LogHistogram'], relative_error: float = 0.01,
+               min_value: float = 1e-6) -> 'LogHistogram':
+        """Nouvel histogramme fusionnant plusieurs histogrammes."""
+        result = cls(relative_error, min_value)
+        for histogram in histograms:
+            result.merge(histogram)
+        return result
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimation du quantile q (0 <= q <= 1), None si l'histogramme est vide."""
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs: List[float]) -> List[Optional[float]]:
+        """
+        Estime plusieurs quantiles en un seul parcours des seaux.
+
+        Args:
+            qs: Quantiles demandés (0 <= q <= 1)
+
+        Returns:
+            Estimations dans l'ordre de `qs`
+        """
+        if not self.count:
+            return [None] * len(qs)
+
+        ranks = sorted((q * (self.count - 1), position) for position, q in enumerate(qs))
+        results: List[Optional[float]] = [None] * len(qs)
+        pending = iter(ranks)
+        rank, position = next(pending)
+
+        cumulative = self.zero_count
+        while rank < cumulative:
+            results[position] = self.min
+            rank, position = next(pending, (None, None))
+            if rank is None:
+                return results
+
+        for index in sorted(self.buckets):
+            cumulative += self.buckets[index]
+            while rank < cumulative:
+                estimate = 2 * self._gamma ** index / (self._gamma + 1)
+                results[position] = min(max(estimate, self.min), self.max)
+                rank, position = next(pending, (None, None))
+                if rank is None:
+                    return results
+
+        # Arrondis flottants : le rang restant correspond à la valeur maximale
+        for rank, position in [(rank, position)] + list(pending):
+            results[position] = self.max
+        return results
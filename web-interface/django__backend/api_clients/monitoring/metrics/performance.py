@@ -3,16 +3,24 @@ Système de métriques de performance pour les clients API.
 
 Ce module fournit des collecteurs de métriques de performance pour surveiller
 les appels API et leur temps de réponse.
+
+Chaque opération (endpoint) a son propre état, sans verrou global :
+- un tampon circulaire de taille fixe des derniers appels ;
+- des histogrammes logarithmiques par tranche de temps couvrant la période
+  de rétention, fusionnés à la lecture pour les percentiles : le coût d'un
+  enregistrement et d'une requête ne dépend pas du trafic.
 """
 
 import time
 import threading
-import statistics
+from collections import deque
 from functools import wraps
-from typing import Dict, List, Any, Callable, Optional
+from typing import Dict, List, Any, Callable, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 
+from .histogram import LogHistogram
+
 @dataclass
 class MetricPoint:
     """
@@ -38,12 +46,101 @@ class MetricSummary:
     avg_response_time: float = 0.0
     p95_response_time: float = 0.0
     p99_response_time: float = 0.0
+    p50_response_time: float = 0.0
+
+class OperationMetrics:
+    """
+    Métriques d'une opération : tampon circulaire des derniers appels et
+    histogrammes par tranche de temps.
+    """
+    
+    def __init__(self, endpoint: str, ring_size: int, retention_seconds: float, slot_count: int):
+        """
+        Initialise les métriques de l'opération.
+        
+        Args:
+            endpoint: Nom de l'opération
+            ring_size: Nombre d'appels conservés dans le tampon circulaire
+            retention_seconds: Période couverte par les tranches
+            slot_count: Nombre de tranches sur la période de rétention
+        """
+        self.endpoint = endpoint
+        self._lock = threading.Lock()
+        self._ring: List[Optional[Tuple[float, float, int, bool]]] = [None] * ring_size
+        self._cursor = 0
+        # Tranches (début, histogramme, nombre de succès), de la plus ancienne à la plus récente
+        self._slots: deque = deque()
+        self.configure(retention_seconds, slot_count)
+        # Cumul depuis le démarrage (export Prometheus)
+        self.total = LogHistogram()
+        self.total_success = 0
+        self.overhead_ns = 0
+    
+    def configure(self, retention_seconds: float, slot_count: int) -> None:
+        """Ajuste la rétention ; les tranches existantes sont conservées."""
+        self.retention_seconds = retention_seconds
+        self.slot_seconds = max(retention_seconds / slot_count, 1.0)
+    
+    def record(self, timestamp: float, response_time: float, status_code: int, success: bool,
+               started_ns: int) -> None:
+        """Enregistre un appel en O(1)."""
+        with self._lock:
+            self._ring[self._cursor % len(self._ring)] = (timestamp, response_time, status_code, success)
+            self._cursor += 1
+            
+            slots = self._slots
+            if not slots or timestamp >= slots[-1][0] + self.slot_seconds:
+                slot_start = timestamp - timestamp % self.slot_seconds
+                slots.append([slot_start, LogHistogram(), 0])
+                cutoff = timestamp - self.retention_seconds - self.slot_seconds
+                while slots[0][0] < cutoff:
+                    slots.popleft()
+            slot = slots[-1]
+            slot[1].add(response_time)
+            self.total.add(response_time)
+            if success:
+                slot[2] += 1
+                self.total_success += 1
+            self.overhead_ns += time.perf_counter_ns() - started_ns
+    
+    def window(self, cutoff: float) -> Tuple[LogHistogram, int]:
+        """
+        Histogramme fusionné et nombre de succès depuis `cutoff`.
+        
+        La précision temporelle est celle d'une tranche.
+        """
+        with self._lock:
+            selected = [(slot[1], slot[2]) for slot in self._slots if slot[0] + self.slot_seconds > cutoff]
+        histogram = LogHistogram.merged(hist for hist, _ in selected)
+        return histogram, sum(success for _, success in selected)
+    
+    def recent(self, limit: Optional[int] = None) -> List[Tuple[float, float, int, bool]]:
+        """Derniers appels du tampon circulaire, du plus ancien au plus récent."""
+        with self._lock:
+            size = len(self._ring)
+            count = min(self._cursor, size)
+            if limit is not None:
+                count = min(count, limit)
+            return [self._ring[index % size] for index in range(self._cursor - count, self._cursor)]
+    
+    @property
+    def recorded(self) -> int:
+        return self.total.count
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
 
 class PerformanceMetrics:
     """
     Collecteur de métriques de performance pour les clients API.
     """
     
+    RING_SIZE = 1024
+    SLOT_COUNT = 288  # Tranches de 5 minutes pour 24 h de rétention
+    QUANTILES = (0.5, 0.95, 0.99)
+    
     _instance = None
     _lock = threading.Lock()
     
@@ -60,12 +157,27 @@ class PerformanceMetrics:
         if self._initialized:
             return
             
-        self._metrics: List[MetricPoint] = []
-        self._endpoints: Dict[str, Dict[str, Any]] = {}
+        self._operations: Dict[str, OperationMetrics] = {}
         self._retention_period = timedelta(hours=24)
+        # Protège uniquement la création des opérations
         self._lock = threading.Lock()
         self._initialized = True
     
+    def _operation(self, endpoint: str) -> OperationMetrics:
+        operation = self._operations.get(endpoint)
+        if operation is None:
+            with self._lock:
+                operation = self._operations.get(endpoint)
+                if operation is None:
+                    operation = OperationMetrics(
+                        endpoint,
+                        self.RING_SIZE,
+                        self._retention_period.total_seconds(),
+                        self.SLOT_COUNT
+                    )
+                    self._operations[endpoint] = operation
+        return operation
+    
     def record_metric(
         self, 
         endpoint: str, 
@@ -82,50 +194,8 @@ class PerformanceMetrics:
             status_code: Code de statut HTTP
             success: Indique si l'appel a réussi
         """
-        now = datetime.now()
-        
-        with self._lock:
-            # Ajouter la nouvelle métrique
-            self._metrics.append(MetricPoint(
-                timestamp=now,
-                value=response_time,
-                endpoint=endpoint,
-                status_code=status_code,
-                success=success
-            ))
-            
-            # Mettre à jour les statistiques de l'endpoint
-            if endpoint not in self._endpoints:
-                self._endpoints[endpoint] = {
-                    'count': 0,
-                    'success_count': 0,
-                    'failure_count': 0,
-                    'min_time': float('inf'),
-                    'max_time': 0.0,
-                    'total_time': 0.0
-                }
-            
-            self._endpoints[endpoint]['count'] += 1
-            if success:
-                self._endpoints[endpoint]['success_count'] += 1
-            else:
-                self._endpoints[endpoint]['failure_count'] += 1
-            
-            self._endpoints[endpoint]['min_time'] = min(
-                self._endpoints[endpoint]['min_time'], 
-                response_time
-            )
-            self._endpoints[endpoint]['max_time'] = max(
-                self._endpoints[endpoint]['max_time'], 
-                response_time
-            )
-            self._endpoints[endpoint]['total_time'] += response_time
-            
-            # Supprimer les anciennes métriques
-            cutoff_time = now - self._retention_period
-            self._metrics = [
-                m for m in self._metrics if m.timestamp > cutoff_time
-            ]
+        started_ns = time.perf_counter_ns()
+        self._operation(endpoint).record(time.time(), response_time, status_code, success, started_ns)
     
     def get_metrics_summary(
         self, 
@@ -135,6 +205,9 @@ class PerformanceMetrics:
         """
         Récupère un résumé des métriques de performance.
         
+        Les percentiles sont estimés à 1 % près par les histogrammes ; la
+        période est prise en compte à la tranche près (5 minutes par défaut).
+        
         Args:
             endpoint: Filtrer par endpoint spécifique (optionnel)
             timeframe: Période de temps à considérer (optionnel)
@@ -142,61 +215,123 @@ class PerformanceMetrics:
         Returns:
             Liste de résumés de métriques par endpoint
         """
-        now = datetime.now()
-        cutoff_time = now - (timeframe or self._retention_period)
+        cutoff = time.time() - (timeframe or self._retention_period).total_seconds()
         
-        with self._lock:
-            # Filtrer les métriques pertinentes
-            relevant_metrics = [
-                m for m in self._metrics 
-                if m.timestamp > cutoff_time
-                and (endpoint is None or m.endpoint == endpoint)
-            ]
+        operations = list(self._operations.values())
+        if endpoint is not None:
+            operations = [operation for operation in operations if operation.endpoint == endpoint]
+        
+        summaries = []
+        for operation in operations:
+            histogram, success_count = operation.window(cutoff)
+            if not histogram.count:
+                continue
             
-            # Grouper par endpoint
-            metrics_by_endpoint: Dict[str, List[MetricPoint]] = {}
-            for metric in relevant_metrics:
-                if metric.endpoint not in metrics_by_endpoint:
-                    metrics_by_endpoint[metric.endpoint] = []
-                metrics_by_endpoint[metric.endpoint].append(metric)
+            p50, p95, p99 = histogram.quantiles(list(self.QUANTILES))
+            if histogram.count < 20:  # Au moins 20 points pour les percentiles
+                p95 = p99 = 0.0
             
-            # Calculer les statistiques pour chaque endpoint
-            summaries = []
-            for endpoint_name, metrics in metrics_by_endpoint.items():
-                response_times = [m.value for m in metrics]
-                success_count = sum(1 for m in metrics if m.success)
-                
-                # Calculer les percentiles
-                p95 = 0.0
-                p99 = 0.0
-                if response_times:
-                    response_times.sort()
-                    if len(response_times) >= 20:  # Au moins 20 points pour les percentiles
-                        p95 = response_times[int(len(response_times) * 0.95)]
-                        p99 = response_times[int(len(response_times) * 0.99)]
-                
-                summary = MetricSummary(
-                    endpoint=endpoint_name,
-                    count=len(metrics),
-                    success_count=success_count,
-                    failure_count=len(metrics) - success_count,
-                    min_response_time=min(response_times) if response_times else 0.0,
-                    max_response_time=max(response_times) if response_times else 0.0,
-                    avg_response_time=statistics.mean(response_times) if response_times else 0.0,
-                    p95_response_time=p95,
-                    p99_response_time=p99
-                )
-                summaries.append(summary)
+            summaries.append(MetricSummary(
+                endpoint=operation.endpoint,
+                count=histogram.count,
+                success_count=success_count,
+                failure_count=histogram.count - success_count,
+                min_response_time=histogram.min,
+                max_response_time=histogram.max,
+                avg_response_time=histogram.mean,
+                p95_response_time=p95,
+                p99_response_time=p99,
+                p50_response_time=p50
+            ))
+        
+        return summaries
+    
+    def get_recent_metrics(self, endpoint: str, limit: Optional[int] = None) -> List[MetricPoint]:
+        """
+        Retourne les derniers appels d'un endpoint (tampon circulaire).
+        
+        Args:
+            endpoint: Endpoint de l'API
+            limit: Nombre maximum d'appels retournés
+            
+        Returns:
+            Appels du plus ancien au plus récent
+        """
+        operation = self._operations.get(endpoint)
+        if operation is None:
+            return []
+        return [
+            MetricPoint(
+                timestamp=datetime.fromtimestamp(timestamp),
+                value=value,
+                endpoint=endpoint,
+                status_code=status_code,
+                success=success
+            )
+            for timestamp, value, status_code, success in operation.recent(limit)
+        ]
+    
+    def get_instrumentation_overhead(self) -> Dict[str, Any]:
+        """
+        Coût de l'enregistrement des métriques.
+        
+        Returns:
+            Nombre d'appels enregistrés et coût moyen par appel (nanosecondes)
+        """
+        operations = list(self._operations.values())
+        calls = sum(operation.recorded for operation in operations)
+        total_ns = sum(operation.overhead_ns for operation in operations)
+        return {
+            'calls': calls,
+            'total_ns': total_ns,
+            'avg_ns': total_ns / calls if calls else 0.0
+        }
+    
+    def export_prometheus(self, timeframe: Optional[timedelta] = None) -> str:
+        """
+        Exporte les métriques au format d'exposition Prometheus.
+        
+        Les quantiles portent sur la période demandée (rétention par
+        défaut) ; les sommes et compteurs sont cumulés depuis le démarrage.
+        
+        Args:
+            timeframe: Période des quantiles (optionnel)
             
-            return summaries
+        Returns:
+            Texte au format d'exposition Prometheus
+        """
+        cutoff = time.time() - (timeframe or self._retention_period).total_seconds()
+        duration_lines = [
+            '# HELP api_client_call_duration_seconds Durée des appels API instrumentés',
+            '# TYPE api_client_call_duration_seconds summary'
+        ]
+        calls_lines = [
+            '# HELP api_client_calls_total Nombre d\'appels API instrumentés',
+            '# TYPE api_client_calls_total counter'
+        ]
+        
+        for operation in sorted(self._operations.values(), key=lambda op: op.endpoint):
+            label = f'endpoint="{_escape_label(operation.endpoint)}"'
+            histogram, _ = operation.window(cutoff)
+            for q, value in zip(self.QUANTILES, histogram.quantiles(list(self.QUANTILES))):
+                value = 'NaN' if value is None else repr(value)
+                duration_lines.append(f'api_client_call_duration_seconds{{{label},quantile="{q}"}} {value}')
+            
+            with operation._lock:
+                total_sum, total_count, success = operation.total.sum, operation.total.count, operation.total_success
+            duration_lines.append(f'api_client_call_duration_seconds_sum{{{label}}} {total_sum!r}')
+            duration_lines.append(f'api_client_call_duration_seconds_count{{{label}}} {total_count}')
+            calls_lines.append(f'api_client_calls_total{{{label},outcome="success"}} {success}')
+            calls_lines.append(f'api_client_calls_total{{{label},outcome="failure"}} {total_count - success}')
+        
+        return '\n'.join(duration_lines + calls_lines) + '\n'
     
     def clear_metrics(self) -> None:
         """
         Efface toutes les métriques enregistrées.
         """
         with self._lock:
-            self._metrics = []
-            self._endpoints = {}
+            self._operations = {}
     
     def set_retention_period(self, period: timedelta) -> None:
         """
@@ -207,6 +342,8 @@ class PerformanceMetrics:
         """
         with self._lock:
             self._retention_period = period
+            for operation in self._operations.values():
+                operation.configure(period.total_seconds(), self.SLOT_COUNT)
 
 def measure_performance(endpoint_name: Optional[str] = None):
     """
@@ -224,7 +361,7 @@ def measure_performance(endpoint_name: Optional[str] = None):
             metrics = PerformanceMetrics()
             endpoint = endpoint_name or func.__name__
             
-            start_time = time.time()
+            start_time = time.perf_counter()
             success = True
             status_code = 200
             
@@ -244,7 +381,7 @@ def measure_performance(endpoint_name: Optional[str] = None):
                 raise
                 
             finally:
-                response_time = time.time() - start_time
+                response_time = time.perf_counter() - start_time
                 metrics.record_metric(
                     endpoint=endpoint,
                     response_time=response_time,
@@ -156,11 +156,14 @@ class PrometheusExporter:
         """
         Génère les métriques au format Prometheus.
         
+        Les percentiles des appels instrumentés proviennent des histogrammes
+        de `PerformanceMetrics`.
+        
         Returns:
             Métriques au format Prometheus
         """
         self.update_metrics()
-        return generate_latest(self.registry)
+        return generate_latest(self.registry) + PerformanceMetrics().export_prometheus().encode('utf-8')
     
     def metrics_handler(self, request=None) -> tuple:
         """
@@ -1,9 +1,11 @@
 from .gns3_client import GNS3Client
+from .gns3_async_client import AsyncGNS3Client
 from .netflow_client import NetflowClient
 from .snmp_client import SNMPClient
 
 __all__ = [
     'GNS3Client',
+    'AsyncGNS3Client',
     'NetflowClient',
     'SNMPClient',
-] 
\ No newline at end of file
+]
@@ -0,0 +1,419 @@
+# api_clients/network/gns3_async_client.py
+"""
+Client GNS3 asynchrone (asyncio + aiohttp).
+
+Toutes les requêtes passent par une session aiohttp unique dont le
+connecteur conserve les connexions ouvertes (keep-alive) : un relevé de
+topologie ne paie plus une poignée de main TCP/TLS par appel. Les appels
+indépendants (nœuds et liens de chaque projet, statistiques des nœuds) sont
+lancés en parallèle, le nombre de requêtes simultanées étant borné par un
+sémaphore.
+
+Les GET sont conditionnels lorsque le serveur fournit un validateur (ETag
+ou Last-Modified) : la réponse 304 réutilise le corps déjà reçu. Chaque
+point d'API (identifiants remplacés par '{id}') dispose de ses métriques de
+latence.
+"""
+import asyncio
+import logging
+import os
+import re
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from ..domain.exceptions import (
+    APIClientException,
+    APIConnectionException,
+    APIRequestException,
+    APITimeoutException
+)
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximal de réponses conservées pour les GET conditionnels
+CONDITIONAL_CACHE_SIZE = 1024
+# Nombre d'échantillons de latence conservés par point d'API
+LATENCY_SAMPLES = 256
+
+# Segments de chemin considérés comme des identifiants (UUID GNS3 ou entiers)
+_ID_SEGMENT = re.compile(r'^([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+)$')
+
+
+def endpoint_template(endpoint: str) -> str:
+    """
+    Forme générique d'un point d'API, utilisée comme clé de métriques.
+
+    Exemple : '/projects/<uuid>/nodes' -> '/projects/{id}/nodes'
+    """
+    segments = endpoint.strip('/').split('/')
+    return '/' + '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment for segment in segments)
+
+
+class EndpointMetrics:
+    """Métriques de latence d'un point d'API."""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.not_modified = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.samples = deque(maxlen=LATENCY_SAMPLES)
+
+    def record(self, elapsed: float, error: bool = False, not_modified: bool = False):
+        self.count += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.samples.append(elapsed)
+        if error:
+            self.errors += 1
+        if not_modified:
+            self.not_modified += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        samples = sorted(self.samples)
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'not_modified': self.not_modified,
+            'avg_ms': round(self.total_time / self.count * 1000, 3) if self.count else 0.0,
+            'p95_ms': round(p95 * 1000, 3),
+            'max_ms': round(self.max_time * 1000, 3)
+        }
+
+
+class AsyncGNS3Client:
+    """
+    Client asynchrone pour l'API v2 de GNS3.
+
+    La session aiohttp est créée à la première requête et rattachée à la
+    boucle d'événements courante ; si le client est réutilisé depuis une
+    autre boucle (tâche Celery exécutée par asyncio.run, par exemple), une
+    nouvelle session est ouverte. En environnement de test, les requêtes
+    sont servies par le mock du client synchrone.
+    """
+
+    def __init__(
+        self,
+        host: str = None,
+        port: int = None,
+        protocol: str = None,
+        username: str = None,
+        password: str = None,
+        verify_ssl: bool = True,
+        use_mock: bool = None,
+        timeout: int = 30,
+        max_connections: int = 20,
+        max_concurrency: int = 10,
+        keepalive_timeout: int = 30
+    ):
+        """
+        Initialise le client GNS3 asynchrone.
+
+        Args:
+            host: Hôte du serveur GNS3
+            port: Port du serveur GNS3
+            protocol: Protocole de connexion ('http' ou 'https')
+            username: Nom d'utilisateur pour l'authentification
+            password: Mot de passe pour l'authentification
+            verify_ssl: Vérifier le certificat SSL
+            use_mock: Forcer l'utilisation du mock GNS3
+            timeout: Timeout des requêtes en secondes
+            max_connections: Taille du pool de connexions persistantes
+            max_concurrency: Nombre maximal de requêtes simultanées
+            keepalive_timeout: Durée de conservation d'une connexion inactive (secondes)
+        """
+        self.host = host or os.environ.get('GNS3_HOST', 'localhost')
+        self.port = port or int(os.environ.get('GNS3_PORT', '3080'))
+        self.protocol = protocol or os.environ.get('GNS3_PROTOCOL', 'http')
+        self.username = username or os.environ.get('GNS3_USERNAME', '')
+        self.password = password or os.environ.get('GNS3_PASSWORD', '')
+        self.verify_ssl = verify_ssl
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.keepalive_timeout = keepalive_timeout
+        self.base_url = f"{self.protocol}://{self.host}:{self.port}/v2/"
+
+        if use_mock is None:
+            self.use_mock = 'test' in sys.argv or 'pytest' in sys.modules
+        else:
+            self.use_mock = use_mock
+
+        self._mock_client = None
+        if self.use_mock:
+            from .gns3_client import GNS3Client
+            self._mock_client = GNS3Client(use_mock=True)
+        elif not AIOHTTP_AVAILABLE:
+            raise APIClientException("aiohttp est requis pour le client GNS3 asynchrone")
+
+        self._session = None
+        self._session_loop = None
+        self._semaphore = None
+        # url -> (ETag, Last-Modified, corps de la réponse)
+        self._conditional_cache: 'OrderedDict[str, Tuple[Optional[str], Optional[str], Any]]' = OrderedDict()
+        self._metrics: Dict[str, EndpointMetrics] = {}
+
+    # ==================== SESSION ====================
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            if self._session is not None and not self._session.closed:
+                # Session d'une boucle terminée : ses connexions ne sont plus utilisables
+                self._session.detach()
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=self.keepalive_timeout,
+                ssl=self.verify_ssl
+            )
+            auth = aiohttp.BasicAuth(self.username, self.password) if self.username and self.password else None
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                auth=auth,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'Content-Type': 'application/json'}
+            )
+            self._session_loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self):
+        """Ferme la session et ses connexions persistantes."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    async def __aenter__(self) -> 'AsyncGNS3Client':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # ==================== REQUÊTES ====================
+
+    async def request(self, method: str, endpoint: str, data: Dict = None, params: Dict = None) -> Any:
+        """
+        Effectue une requête vers l'API GNS3.
+
+        Args:
+            method: Méthode HTTP ('GET', 'POST', 'PUT', 'DELETE')
+            endpoint: Point d'API (sans le préfixe '/v2')
+            data: Données à envoyer (pour POST/PUT)
+            params: Paramètres de la requête
+
+        Returns:
+            La réponse JSON décodée
+
+        Raises:
+            APIConnectionException: Serveur injoignable
+            APITimeoutException: Délai de réponse dépassé
+            APIRequestException: Réponse HTTP en erreur
+        """
+        metrics = self._metrics.setdefault(f"{method} {endpoint_template(endpoint)}", EndpointMetrics())
+        start_time = time.perf_counter()
+
+        if self.use_mock:
+            result = self._mock_client._make_request(method, endpoint, data, params)
+            metrics.record(time.perf_counter() - start_time)
+            return result
+
+        url = urljoin(self.base_url, endpoint.lstrip('/'))
+        session = self._get_session()
+        cache_key = f"{url}?{sorted(params.items())}" if params else url
+        cached = self._conditional_cache.get(cache_key) if method == 'GET' else None
+        headers = {}
+        if cached:
+            if cached[0]:
+                headers['If-None-Match'] = cached[0]
+            if cached[1]:
+                headers['If-Modified-Since'] = cached[1]
+
+        try:
+            async with self._semaphore:
+                async with session.request(method, url, json=data, params=params, headers=headers) as response:
+                    if response.status == 304 and cached:
+                        self._conditional_cache.move_to_end(cache_key)
+                        metrics.record(time.perf_counter() - start_time, not_modified=True)
+                        return cached[2]
+                    if response.status >= 400:
+                        message = await response.text()
+                        raise APIRequestException(message[:200], status_code=response.status, endpoint=endpoint)
+                    body = await response.read()
+                    result = await response.json(content_type=None) if body else {"success": True}
+                    etag = response.headers.get('ETag')
+                    last_modified = response.headers.get('Last-Modified')
+        except APIRequestException:
+            metrics.record(time.perf_counter() - start_time, error=True)
+            raise
+        except asyncio.TimeoutError as e:
+            metrics.record(time.perf_counter() - start_time, error=True)
+            raise APITimeoutException(str(e) or "Délai dépassé", timeout_duration=self.timeout, endpoint=endpoint)
+        except aiohttp.ClientError as e:
+            metrics.record(time.perf_counter() - start_time, error=True)
+            logger.error(f"Erreur lors de la requête GNS3 ({method} {url}): {e}")
+            raise APIConnectionException(str(e), service_name="GNS3")
+
+        if method == 'GET' and (etag or last_modified):
+            self._conditional_cache[cache_key] = (etag, last_modified, result)
+            self._conditional_cache.move_to_end(cache_key)
+            if len(self._conditional_cache) > CONDITIONAL_CACHE_SIZE:
+                self._conditional_cache.popitem(last=False)
+
+        metrics.record(time.perf_counter() - start_time)
+        return result
+
+    async def _list(self, endpoint: str) -> List[Dict[str, Any]]:
+        # Le mock renvoie un dictionnaire d'erreur pour les points non simulés
+        result = await self.request('GET', endpoint)
+        return result if isinstance(result, list) else []
+
+    # ==================== API PUBLIQUE ====================
+
+    async def get_version(self) -> Dict[str, Any]:
+        """Récupère la version du serveur GNS3."""
+        return await self.request('GET', '/version')
+
+    async def get_projects(self) -> List[Dict[str, Any]]:
+        """Liste tous les projets."""
+        return await self._list('/projects')
+
+    async def get_project(self, project_id: str) -> Dict[str, Any]:
+        """Récupère les détails d'un projet."""
+        return await self.request('GET', f'/projects/{project_id}')
+
+    async def get_nodes(self, project_id: str) -> List[Dict[str, Any]]:
+        """Liste les nœuds d'un projet."""
+        return await self._list(f'/projects/{project_id}/nodes')
+
+    async def get_node(self, project_id: str, node_id: str) -> Dict[str, Any]:
+        """Récupère les détails d'un nœud."""
+        return await self.request('GET', f'/projects/{project_id}/nodes/{node_id}')
+
+    async def list_links(self, project_id: str) -> List[Dict[str, Any]]:
+        """Liste les liens d'un projet."""
+        return await self._list(f'/projects/{project_id}/links')
+
+    async def get_node_stats(self, project_id: str, node_id: str) -> Dict[str, Any]:
+        """Récupère les statistiques d'un nœud."""
+        return await self.request('GET', f'/projects/{project_id}/nodes/{node_id}/stats')
+
+    async def start_node(self, project_id: str, node_id: str) -> Dict[str, Any]:
+        """Démarre un nœud."""
+        return await self.request('POST', f'/projects/{project_id}/nodes/{node_id}/start')
+
+    async def stop_node(self, project_id: str, node_id: str) -> Dict[str, Any]:
+        """Arrête un nœud."""
+        return await self.request('POST', f'/projects/{project_id}/nodes/{node_id}/stop')
+
+    async def suspend_node(self, project_id: str, node_id: str) -> Dict[str, Any]:
+        """Suspend un nœud."""
+        return await self.request('POST', f'/projects/{project_id}/nodes/{node_id}/suspend')
+
+    async def reload_node(self, project_id: str, node_id: str) -> Dict[str, Any]:
+        """Redémarre un nœud."""
+        return await self.request('POST', f'/projects/{project_id}/nodes/{node_id}/reload')
+
+    async def node_action(self, project_id: str, node_id: str, action: str) -> Dict[str, Any]:
+        """
+        Applique une action de cycle de vie à un nœud.
+
+        Args:
+            action: 'start', 'stop', 'suspend' ou 'reload'
+        """
+        return await self.request('POST', f'/projects/{project_id}/nodes/{node_id}/{action}')
+
+    async def project_nodes_action(self, project_id: str, action: str) -> Dict[str, Any]:
+        """
+        Applique une action à tous les nœuds d'un projet en un seul appel.
+
+        Args:
+            action: 'start', 'stop', 'suspend' ou 'reload'
+        """
+        return await self.request('POST', f'/projects/{project_id}/nodes/{action}')
+
+    async def get_topology(self, project_ids: Optional[Iterable[str]] = None,
+                           include_links: bool = True) -> List[Dict[str, Any]]:
+        """
+        Relevé complet de la topologie : projets, nœuds et liens.
+
+        Les nœuds et liens de tous les projets sont récupérés en parallèle
+        (dans la limite de `max_concurrency` requêtes simultanées).
+
+        Args:
+            project_ids: Projets à relever (tous si None)
+            include_links: Récupérer aussi les liens
+
+        Returns:
+            Liste de projets avec 'nodes', 'node_count', 'links' et 'link_count'
+        """
+        projects = await self.get_projects()
+        if project_ids is not None:
+            wanted = set(project_ids)
+            projects = [project for project in projects if project.get('project_id') in wanted]
+        projects = [project for project in projects if project.get('project_id')]
+
+        calls = [self.get_nodes(project['project_id']) for project in projects]
+        if include_links:
+            calls += [self.list_links(project['project_id']) for project in projects]
+        results = await asyncio.gather(*calls)
+
+        topology = []
+        for position, project in enumerate(projects):
+            nodes = results[position]
+            links = results[len(projects) + position] if include_links else []
+            topology.append({
+                **project,
+                'nodes': nodes,
+                'node_count': len(nodes),
+                'links': links,
+                'link_count': len(links)
+            })
+        return topology
+
+    async def get_nodes_stats(self, project_id: str,
+                              nodes: List[Dict[str, Any]]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Statistiques de plusieurs nœuds d'un projet, récupérées en parallèle.
+
+        Returns:
+            {node_id: statistiques, ou None si l'appel a échoué}
+        """
+        node_ids = [node['node_id'] for node in nodes if node.get('node_id')]
+        results = await asyncio.gather(
+            *(self.get_node_stats(project_id, node_id) for node_id in node_ids),
+            return_exceptions=True
+        )
+        return {
+            node_id: None if isinstance(result, Exception) else result
+            for node_id, result in zip(node_ids, results)
+        }
+
+    # ==================== MÉTRIQUES ====================
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Métriques de latence par point d'API.
+
+        Returns:
+            {'endpoints': {'GET /projects/{id}/nodes': {...}}, 'conditional_cache_size': n}
+        """
+        return {
+            'endpoints': {name: metrics.to_dict() for name, metrics in self._metrics.items()},
+            'conditional_cache_size': len(self._conditional_cache)
+        }
+
+    def reset_metrics(self):
+        """Réinitialise les métriques de latence."""
+        self._metrics = {}
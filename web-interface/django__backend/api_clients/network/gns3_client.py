@@ -4,6 +4,7 @@ import sys
 import json
 import logging
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict, List, Any, Optional, Union, Tuple
 from urllib.parse import urljoin
 
@@ -59,6 +60,8 @@ class GNS3Client(BaseAPIClientImpl):
         self.verify_ssl = verify_ssl
         self.timeout = timeout
         self.auth = (self.username, self.password) if self.username and self.password else None
+        # Session HTTP (connexions persistantes), créée à la première requête
+        self._session: Optional[requests.Session] = None
         
         # Déterminer si nous devons utiliser le mock
         if use_mock is None:
@@ -108,7 +111,7 @@ class GNS3Client(BaseAPIClientImpl):
         try:
             # Effectuer la requête HTTP
             headers = {'Content-Type': 'application/json'}
-            response = requests.request(
+            response = self._get_session().request(
                 method=method,
                 url=url,
                 headers=headers,
@@ -131,6 +134,16 @@ class GNS3Client(BaseAPIClientImpl):
             logger.error(f"Erreur lors de la requête GNS3 ({method} {url}): {e}")
             return {"success": False, "error": str(e)}
     
+    def _get_session(self) -> requests.Session:
+        """Session HTTP partagée par les requêtes du client (keep-alive)."""
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=10)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._session = session
+        return self._session
+    
     def _mock_request(self, method: str, endpoint: str, data: Dict = None, params: Dict = None) -> Dict:
         """
         Simule une requête vers l'API GNS3 en utilisant le mock.
@@ -25,6 +25,7 @@ from ..domain.exceptions import (
     APIConnectionException
 )
 from ..monitoring.metrics.performance import measure_performance
+from .snmp_engine import get_snmp_engine
 
 logger = logging.getLogger(__name__)
 
@@ -293,6 +294,40 @@ class SNMPClient(BaseAPIClient):
             logger.error(f"Erreur lors du SNMP WALK: {e}")
             return {"success": False, "error": str(e)}
     
+    @measure_performance(endpoint_name="snmp_get_many")
+    def get_many(self, oids: List[str]) -> Dict[str, Any]:
+        """
+        Récupère plusieurs OIDs en un minimum de PDU.
+        
+        Args:
+            oids: OIDs à récupérer
+            
+        Returns:
+            Dictionnaire OID -> valeur (OIDs absents omis)
+        """
+        validated_oids = [self._validate_oid(oid) for oid in oids]
+        
+        if self.base_url:
+            values = {}
+            for oid, validated_oid in zip(oids, validated_oids):
+                result = self.get(validated_oid)
+                if result.get("success", True) and "value" in result:
+                    values[oid] = result["value"]
+            return values
+        
+        try:
+            values = get_snmp_engine().get(self.host, validated_oids, **self._direct_request_options())
+        except Exception as e:
+            logger.error(f"Erreur lors du SNMP GET groupé: {e}")
+            return {}
+        
+        # Restituer les clés telles que fournies par l'appelant
+        return {
+            oid: values[validated_oid.strip('.')]
+            for oid, validated_oid in zip(oids, validated_oids)
+            if validated_oid.strip('.') in values
+        }
+    
     @measure_performance(endpoint_name="snmp_set")
     def set(self, oid: str, value: Any, value_type: str = "string") -> Dict[str, Any]:
         """
@@ -347,13 +382,13 @@ class SNMPClient(BaseAPIClient):
             Informations système
         """
         try:
-            system_info = {}
-            
-            # Récupérer les OIDs système standard
-            for name, oid in self.STANDARD_OIDS['system'].items():
-                result = self.get(oid)
-                if result.get("success", True) and "value" in result:
-                    system_info[name] = result["value"]
+            # Récupérer les OIDs système standard en une seule requête
+            values = self.get_many(list(self.STANDARD_OIDS['system'].values()))
+            system_info = {
+                name: values[oid]
+                for name, oid in self.STANDARD_OIDS['system'].items()
+                if oid in values
+            }
             
             return {
                 "success": True,
@@ -428,11 +463,11 @@ class SNMPClient(BaseAPIClient):
                 'ifOutOctets': f"{self.STANDARD_OIDS['interfaces']['ifOutOctets']}.{interface_index}"
             }
             
-            # Récupérer chaque statistique
+            # Récupérer toutes les statistiques en une seule requête
+            values = self.get_many(list(stat_oids.values()))
             for name, oid in stat_oids.items():
-                result = self.get(oid)
-                if result.get("success", True) and "value" in result:
-                    stats[name] = result["value"]
+                if oid in values:
+                    stats[name] = values[oid]
             
             # Enrichir avec des informations dérivées
             if 'ifInOctets' in stats and 'ifOutOctets' in stats:
@@ -538,21 +573,30 @@ class SNMPClient(BaseAPIClient):
                 data['priv_protocol'] = self.credentials.priv_protocol.value
                 data['priv_password'] = self.credentials.priv_password
     
-    def _direct_snmp_get(self, oid: str) -> Dict[str, Any]:
-        """Implémentation directe SNMP GET (nécessiterait pysnmp)."""
-        # Cette méthode nécessiterait une bibliothèque SNMP comme pysnmp
-        # Pour l'instant, retourner une erreur explicative
+    def _direct_request_options(self) -> Dict[str, Any]:
+        """Options communes des requêtes envoyées au moteur SNMP intégré."""
+        if self.credentials.version == SNMPVersion.V3:
+            raise APIClientException("SNMP v3 direct non supporté par le moteur intégré")
         return {
-            "success": False,
-            "error": "SNMP direct non implémenté. Utilisez une API REST SNMP."
+            'community': self.credentials.community,
+            'version': self.credentials.version.value,
+            'port': self.port,
+            'timeout': self.timeout,
+            'retries': self.retries
         }
     
+    def _direct_snmp_get(self, oid: str) -> Dict[str, Any]:
+        """Implémentation directe SNMP GET via le moteur intégré."""
+        values = get_snmp_engine().get(self.host, [oid], **self._direct_request_options())
+        if not values:
+            return {"success": False, "error": f"OID inexistant: {oid}"}
+        oid_part, value = next(iter(values.items()))
+        return {"success": True, "oid": oid_part, "value": value}
+    
     def _direct_snmp_walk(self, oid: str) -> Dict[str, Any]:
-        """Implémentation directe SNMP WALK (nécessiterait pysnmp)."""
-        return {
-            "success": False,
-            "error": "SNMP direct non implémenté. Utilisez une API REST SNMP."
-        }
+        """Implémentation directe SNMP WALK (GETBULK) via le moteur intégré."""
+        data = get_snmp_engine().walk(self.host, [oid], **self._direct_request_options())[oid.strip('.')]
+        return {"success": True, "data": data, "count": len(data)}
     
     def _direct_snmp_set(self, oid: str, value: Any, value_type: str) -> Dict[str, Any]:
         """Implémentation directe SNMP SET (nécessiterait pysnmp)."""
@@ -0,0 +1,705 @@
+"""
+Moteur SNMP asynchrone en processus.
+
+Ce module remplace les appels aux binaires snmpget/snmpwalk (un processus
+par OID) par un moteur SNMP v1/v2c natif :
+
+- encodage/décodage BER minimal des PDU GET, GETNEXT et GETBULK ;
+- regroupement de nombreux OIDs dans un seul PDU ;
+- parcours de tables via GETBULK (plusieurs colonnes par requête) ;
+- multiplexage de centaines d'équipements sur une seule socket UDP,
+  les réponses étant routées par request-id et adresse source.
+
+`AsyncSNMPEngine` est le cœur asyncio. `SNMPEngine` expose la même API en
+synchrone en soumettant les coroutines à une boucle dédiée tournant dans un
+thread d'arrière-plan, ce qui permet aux adaptateurs et tâches Celery
+synchrones de partager la même socket.
+"""
+
+import asyncio
+import ipaddress
+import itertools
+import logging
+import socket
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..domain.exceptions import APIClientException, APITimeoutException
+
+logger = logging.getLogger(__name__)
+
+
+# Tags BER universels
+TAG_INTEGER = 0x02
+TAG_OCTET_STRING = 0x04
+TAG_NULL = 0x05
+TAG_OID = 0x06
+TAG_SEQUENCE = 0x30
+
+# Types applicatifs SNMP (RFC 2578)
+TAG_IPADDRESS = 0x40
+TAG_COUNTER32 = 0x41
+TAG_GAUGE32 = 0x42
+TAG_TIMETICKS = 0x43
+TAG_OPAQUE = 0x44
+TAG_COUNTER64 = 0x46
+
+# Exceptions de varbind (RFC 3416)
+TAG_NO_SUCH_OBJECT = 0x80
+TAG_NO_SUCH_INSTANCE = 0x81
+TAG_END_OF_MIB_VIEW = 0x82
+
+# Types de PDU
+PDU_GET = 0xA0
+PDU_GETNEXT = 0xA1
+PDU_RESPONSE = 0xA2
+PDU_SET = 0xA3
+PDU_GETBULK = 0xA5
+
+SNMP_VERSIONS = {'1': 0, '2c': 1}
+
+_UNSIGNED_TAGS = (TAG_COUNTER32, TAG_GAUGE32, TAG_TIMETICKS, TAG_COUNTER64)
+_EXCEPTION_TAGS = (TAG_NO_SUCH_OBJECT, TAG_NO_SUCH_INSTANCE, TAG_END_OF_MIB_VIEW)
+
+
+class SNMPEngineException(APIClientException):
+    """Exception levée par le moteur SNMP (PDU invalide, erreur agent)."""
+
+    def __init__(self, message: str = "Erreur du moteur SNMP", *args, **kwargs):
+        super().__init__(message, *args, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Encodage / décodage BER
+# ---------------------------------------------------------------------------
+
+def _encode_length(length: int) -> bytes:
+    if length < 0x80:
+        return bytes((length,))
+    body = length.to_bytes((length.bit_length() + 7) // 8, 'big')
+    return bytes((0x80 | len(body),)) + body
+
+
+def _encode_tlv(tag: int, value: bytes) -> bytes:
+    return bytes((tag,)) + _encode_length(len(value)) + value
+
+
+def _encode_integer(value: int, tag: int = TAG_INTEGER) -> bytes:
+    if tag in _UNSIGNED_TAGS:
+        body = value.to_bytes(max(1, (value.bit_length() + 8) // 8), 'big')
+    else:
+        body = value.to_bytes(max(1, (value.bit_length() + 8) // 8), 'big', signed=True)
+    return _encode_tlv(tag, body)
+
+
+def _encode_oid(oid: str) -> bytes:
+    parts = [int(p) for p in oid.strip('.').split('.')]
+    if len(parts) < 2:
+        raise SNMPEngineException(f"OID invalide: {oid}")
+    body = bytearray((parts[0] * 40 + parts[1],))
+    for part in parts[2:]:
+        chunk = bytearray((part & 0x7F,))
+        part >>= 7
+        while part:
+            chunk.insert(0, 0x80 | (part & 0x7F))
+            part >>= 7
+        body.extend(chunk)
+    return _encode_tlv(TAG_OID, bytes(body))
+
+
+def encode_value(tag: int, value: Any) -> bytes:
+    """Encode une valeur de varbind selon son tag BER."""
+    if tag == TAG_NULL or tag in _EXCEPTION_TAGS:
+        return _encode_tlv(tag, b'')
+    if tag == TAG_OID:
+        return _encode_oid(value)
+    if tag == TAG_IPADDRESS:
+        return _encode_tlv(tag, bytes(int(p) for p in str(value).split('.')))
+    if tag in (TAG_OCTET_STRING, TAG_OPAQUE):
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        return _encode_tlv(tag, bytes(value))
+    return _encode_integer(int(value), tag)
+
+
+def _decode_tlv(data: bytes, offset: int) -> Tuple[int, int, int]:
+    """Retourne (tag, début de la valeur, fin de la valeur)."""
+    tag = data[offset]
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        num_bytes = length & 0x7F
+        length = int.from_bytes(data[offset:offset + num_bytes], 'big')
+        offset += num_bytes
+    end = offset + length
+    if end > len(data):
+        raise SNMPEngineException("PDU tronqué")
+    return tag, offset, end
+
+
+def _decode_oid(body: bytes) -> str:
+    if not body:
+        return ''
+    first = body[0]
+    parts = [first // 40, first % 40] if first < 80 else [2, first - 80]
+    value = 0
+    for byte in body[1:]:
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            parts.append(value)
+            value = 0
+    return '.'.join(map(str, parts))
+
+
+def _decode_octet_string(body: bytes) -> str:
+    try:
+        text = body.decode('utf-8')
+        if text.isprintable():
+            return text
+    except UnicodeDecodeError:
+        pass
+    return ':'.join(f'{b:02x}' for b in body)
+
+
+def decode_value(tag: int, body: bytes) -> Any:
+    """Décode une valeur de varbind en type Python natif."""
+    if tag == TAG_INTEGER:
+        return int.from_bytes(body, 'big', signed=True)
+    if tag in _UNSIGNED_TAGS:
+        return int.from_bytes(body, 'big', signed=False)
+    if tag == TAG_OCTET_STRING:
+        return _decode_octet_string(body)
+    if tag == TAG_OID:
+        return _decode_oid(body)
+    if tag == TAG_IPADDRESS:
+        return '.'.join(str(b) for b in body)
+    if tag == TAG_OPAQUE:
+        return body.hex()
+    return None
+
+
+@dataclass
+class SNMPMessage:
+    """Message SNMP v1/v2c décodé."""
+    version: int
+    community: str
+    pdu_type: int
+    request_id: int
+    error_status: int = 0
+    error_index: int = 0
+    varbinds: List[Tuple[str, int, Any]] = field(default_factory=list)
+
+
+def encode_message(
+    version: int,
+    community: str,
+    pdu_type: int,
+    request_id: int,
+    varbinds: Sequence[Tuple[str, int, Any]],
+    error_status: int = 0,
+    error_index: int = 0
+) -> bytes:
+    """
+    Encode un message SNMP complet.
+
+    Pour un GETBULK, error_status et error_index portent respectivement
+    non-repeaters et max-repetitions (RFC 3416).
+    """
+    encoded_varbinds = b''.join(
+        _encode_tlv(TAG_SEQUENCE, _encode_oid(oid) + encode_value(tag, value))
+        for oid, tag, value in varbinds
+    )
+    pdu = _encode_tlv(
+        pdu_type,
+        _encode_integer(request_id)
+        + _encode_integer(error_status)
+        + _encode_integer(error_index)
+        + _encode_tlv(TAG_SEQUENCE, encoded_varbinds)
+    )
+    return _encode_tlv(
+        TAG_SEQUENCE,
+        _encode_integer(version) + _encode_tlv(TAG_OCTET_STRING, community.encode('utf-8')) + pdu
+    )
+
+
+def decode_message(data: bytes) -> SNMPMessage:
+    """Décode un message SNMP v1/v2c."""
+    try:
+        tag, offset, end = _decode_tlv(data, 0)
+        if tag != TAG_SEQUENCE:
+            raise SNMPEngineException("Message SNMP invalide")
+
+        _, start, stop = _decode_tlv(data, offset)
+        version = int.from_bytes(data[start:stop], 'big', signed=True)
+        _, start, stop = _decode_tlv(data, stop)
+        community = data[start:stop].decode('utf-8', errors='replace')
+
+        pdu_type, offset, _ = _decode_tlv(data, stop)
+        header = []
+        for _ in range(3):
+            _, start, stop = _decode_tlv(data, offset)
+            header.append(int.from_bytes(data[start:stop], 'big', signed=True))
+            offset = stop
+
+        _, offset, vb_end = _decode_tlv(data, offset)
+        varbinds = []
+        while offset < vb_end:
+            _, vb_start, vb_stop = _decode_tlv(data, offset)
+            _, start, stop = _decode_tlv(data, vb_start)
+            oid = _decode_oid(data[start:stop])
+            value_tag, start, stop = _decode_tlv(data, stop)
+            varbinds.append((oid, value_tag, decode_value(value_tag, data[start:stop])))
+            offset = vb_stop
+
+        return SNMPMessage(
+            version=version,
+            community=community,
+            pdu_type=pdu_type,
+            request_id=header[0],
+            error_status=header[1],
+            error_index=header[2],
+            varbinds=varbinds
+        )
+    except (IndexError, ValueError) as e:
+        raise SNMPEngineException(f"Message SNMP illisible: {e}")
+
+
+def oid_to_tuple(oid: str) -> Tuple[int, ...]:
+    """Convertit un OID pointé en tuple comparable."""
+    return tuple(int(p) for p in oid.strip('.').split('.'))
+
+
+def oid_startswith(oid: str, prefix: str) -> bool:
+    """Indique si un OID appartient au sous-arbre `prefix`."""
+    oid = oid.strip('.')
+    prefix = prefix.strip('.')
+    return oid == prefix or oid.startswith(prefix + '.')
+
+
+def _chunks(items: Sequence[Any], size: int) -> Iterable[Sequence[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# ---------------------------------------------------------------------------
+# Moteur asyncio
+# ---------------------------------------------------------------------------
+
+class _EngineProtocol(asyncio.DatagramProtocol):
+    """Protocole UDP qui route les réponses vers les requêtes en attente."""
+
+    def __init__(self, engine: 'AsyncSNMPEngine'):
+        self.engine = engine
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.engine._on_datagram(data, addr)
+
+    def error_received(self, exc: Exception) -> None:
+        logger.debug(f"Erreur UDP SNMP: {exc}")
+
+
+class AsyncSNMPEngine:
+    """
+    Moteur SNMP v1/v2c asynchrone multiplexé sur une seule socket UDP.
+
+    Toutes les requêtes, quel que soit l'équipement cible, partagent la
+    socket ; chaque réponse est associée à sa requête par request-id, et
+    n'est acceptée que si elle provient de l'adresse interrogée.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 2.0,
+        retries: int = 1,
+        max_oids_per_pdu: int = 32,
+        max_repetitions: int = 25,
+        max_in_flight: int = 1024,
+        local_address: Tuple[str, int] = ('0.0.0.0', 0)
+    ):
+        """
+        Initialise le moteur.
+
+        Args:
+            timeout: Délai d'attente d'une réponse (secondes)
+            retries: Nombre de retransmissions après un timeout
+            max_oids_per_pdu: Nombre maximal de varbinds par PDU GET
+            max_repetitions: Paramètre max-repetitions des GETBULK
+            max_in_flight: Nombre maximal de requêtes simultanées
+            local_address: Adresse locale de la socket UDP
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.max_oids_per_pdu = max_oids_per_pdu
+        self.max_repetitions = max_repetitions
+        self.max_in_flight = max_in_flight
+        self.local_address = local_address
+
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._pending: Dict[int, Tuple[asyncio.Future, Tuple[str, int]]] = {}
+        self._request_ids = itertools.count(1)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+
+        self.stats = {
+            'requests_sent': 0,
+            'responses_received': 0,
+            'timeouts': 0,
+            'retransmissions': 0,
+            'unmatched_responses': 0
+        }
+
+    async def start(self) -> None:
+        """Ouvre la socket UDP partagée (idempotent)."""
+        if self._transport is not None:
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._transport is not None:
+                return
+            loop = asyncio.get_running_loop()
+            self._transport, _ = await loop.create_datagram_endpoint(
+                lambda: _EngineProtocol(self),
+                local_addr=self.local_address
+            )
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+    async def close(self) -> None:
+        """Ferme la socket et annule les requêtes en attente."""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        for future, _ in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+
+    def _next_request_id(self) -> int:
+        request_id = next(self._request_ids) & 0x7FFFFFFF
+        if request_id == 0:
+            self._request_ids = itertools.count(1)
+            request_id = next(self._request_ids)
+        return request_id
+
+    def _on_datagram(self, data: bytes, addr) -> None:
+        try:
+            message = decode_message(data)
+        except SNMPEngineException as e:
+            logger.debug(f"Datagramme SNMP ignoré depuis {addr}: {e}")
+            return
+        pending = self._pending.get(message.request_id)
+        # Une réponse d'une autre adresse (usurpation, agent voisin) laisse la requête en attente
+        if pending is None or pending[0].done() or tuple(addr[:2]) != pending[1]:
+            self.stats['unmatched_responses'] += 1
+            return
+        del self._pending[message.request_id]
+        self.stats['responses_received'] += 1
+        pending[0].set_result(message)
+
+    async def _resolve(self, target: str, port: int) -> Tuple[str, int]:
+        """Adresse (IP, port) d'où doit provenir la réponse de `target`."""
+        try:
+            return str(ipaddress.ip_address(target)), port
+        except ValueError:
+            pass
+        family = self._transport.get_extra_info('socket').family
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            target, port, family=family, type=socket.SOCK_DGRAM
+        )
+        if not infos:
+            raise SNMPEngineException(f"Impossible de résoudre {target}")
+        return infos[0][4][0], port
+
+    async def _request(
+        self,
+        target: str,
+        pdu_type: int,
+        varbinds: Sequence[Tuple[str, int, Any]],
+        community: str,
+        version: str,
+        port: int,
+        error_status: int = 0,
+        error_index: int = 0,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None
+    ) -> SNMPMessage:
+        """Envoie un PDU et attend la réponse correspondante."""
+        await self.start()
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.retries if retries is None else retries
+        if version not in SNMP_VERSIONS:
+            raise SNMPEngineException(f"Version SNMP non supportée par le moteur: {version}")
+
+        loop = asyncio.get_running_loop()
+        address = await self._resolve(target, port)
+        async with self._semaphore:
+            for attempt in range(retries + 1):
+                request_id = self._next_request_id()
+                packet = encode_message(
+                    SNMP_VERSIONS[version], community, pdu_type, request_id,
+                    varbinds, error_status, error_index
+                )
+                future = loop.create_future()
+                self._pending[request_id] = (future, address)
+                self._transport.sendto(packet, address)
+                self.stats['requests_sent'] += 1
+                if attempt:
+                    self.stats['retransmissions'] += 1
+                try:
+                    return await asyncio.wait_for(future, timeout)
+                except asyncio.TimeoutError:
+                    self.stats['timeouts'] += 1
+                finally:
+                    self._pending.pop(request_id, None)
+
+        raise APITimeoutException(
+            f"Pas de réponse SNMP de {target}:{port} après {retries + 1} tentative(s)"
+        )
+
+    @staticmethod
+    def _check_error(message: SNMPMessage, target: str) -> None:
+        if message.error_status:
+            raise SNMPEngineException(
+                f"Erreur SNMP {message.error_status} (index {message.error_index}) depuis {target}"
+            )
+
+    async def get(
+        self,
+        target: str,
+        oids: Sequence[str],
+        community: str = 'public',
+        version: str = '2c',
+        port: int = 161,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Récupère plusieurs OIDs, regroupés en PDU de `max_oids_per_pdu`.
+
+        Returns:
+            Dictionnaire OID -> valeur ; les OIDs absents de l'agent
+            (noSuchObject/noSuchInstance) sont omis.
+        """
+        oids = [oid.strip('.') for oid in oids]
+        messages = await asyncio.gather(*(
+            self._request(target, PDU_GET, [(oid, TAG_NULL, None) for oid in chunk],
+                          community, version, port, timeout=timeout, retries=retries)
+            for chunk in _chunks(oids, self.max_oids_per_pdu)
+        ))
+        values = {}
+        for message in messages:
+            self._check_error(message, target)
+            for oid, tag, value in message.varbinds:
+                if tag not in _EXCEPTION_TAGS:
+                    values[oid] = value
+        return values
+
+    async def get_bulk(
+        self,
+        target: str,
+        oids: Sequence[str],
+        non_repeaters: int = 0,
+        max_repetitions: Optional[int] = None,
+        community: str = 'public',
+        version: str = '2c',
+        port: int = 161,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None
+    ) -> List[Tuple[str, int, Any]]:
+        """Effectue un GETBULK brut et retourne les varbinds (oid, tag, valeur)."""
+        if version == '1':
+            raise SNMPEngineException("GETBULK n'est pas disponible en SNMP v1")
+        message = await self._request(
+            target, PDU_GETBULK, [(oid.strip('.'), TAG_NULL, None) for oid in oids],
+            community, version, port,
+            error_status=non_repeaters,
+            error_index=max_repetitions or self.max_repetitions,
+            timeout=timeout,
+            retries=retries
+        )
+        self._check_error(message, target)
+        return message.varbinds
+
+    async def walk(
+        self,
+        target: str,
+        base_oids: Sequence[str],
+        community: str = 'public',
+        version: str = '2c',
+        port: int = 161,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Parcourt un ou plusieurs sous-arbres en parallèle.
+
+        En v2c, toutes les colonnes encore actives sont interrogées dans un
+        même GETBULK ; en v1, un GETNEXT multi-varbinds est utilisé.
+
+        Returns:
+            Dictionnaire base_oid -> {oid: valeur}
+        """
+        bases = [oid.strip('.') for oid in base_oids]
+        results: Dict[str, Dict[str, Any]] = {base: {} for base in bases}
+        cursors = {base: base for base in bases}
+
+        while cursors:
+            active = list(cursors.items())
+            if version == '1':
+                message = await self._request(
+                    target, PDU_GETNEXT, [(cursor, TAG_NULL, None) for _, cursor in active],
+                    community, version, port, timeout=timeout, retries=retries
+                )
+                if message.error_status == 2:  # noSuchName : fin de MIB en v1
+                    break
+                self._check_error(message, target)
+                varbinds = message.varbinds
+                repetitions = 1
+            else:
+                varbinds = await self.get_bulk(
+                    target, [cursor for _, cursor in active],
+                    community=community, version=version, port=port,
+                    timeout=timeout, retries=retries
+                )
+                repetitions = -(-len(varbinds) // len(active))
+
+            # Une réponse tronquée (agent limité en taille) ne termine pas une
+            # colonne : elle reprend au prochain tour depuis son dernier OID.
+            # Seule la sortie du sous-arbre ou la fin de MIB la terminent.
+            finished = set()
+            served = set(base for base, _ in active[:len(varbinds)])
+            for row in range(repetitions):
+                for column, (base, _) in enumerate(active):
+                    if base in finished:
+                        continue
+                    index = row * len(active) + column
+                    if index >= len(varbinds):
+                        break
+                    oid, tag, value = varbinds[index]
+                    if tag in _EXCEPTION_TAGS or not oid_startswith(oid, base) \
+                            or oid_to_tuple(oid) <= oid_to_tuple(cursors[base]):
+                        finished.add(base)
+                        continue
+                    results[base][oid] = value
+                    cursors[base] = oid
+
+            for base in finished:
+                cursors.pop(base, None)
+            if not varbinds:
+                break
+            # Les colonnes absentes de la réponse passent en tête du prochain PDU
+            cursors = dict(
+                sorted(cursors.items(), key=lambda item: item[0] in served)
+            )
+
+        return results
+
+    async def get_many(
+        self,
+        requests: Sequence[Dict[str, Any]],
+        concurrency: int = 256
+    ) -> List[Dict[str, Any]]:
+        """
+        Exécute des GET sur de nombreux équipements en parallèle.
+
+        Args:
+            requests: Liste de dicts {'target', 'oids', 'community', 'version', 'port',
+                'timeout', 'retries'}
+            concurrency: Nombre maximal d'équipements interrogés simultanément
+
+        Returns:
+            Liste de résultats {'target', 'success', 'values' | 'error'} dans l'ordre
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _one(request: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    values = await self.get(
+                        request['target'], request['oids'],
+                        community=request.get('community', 'public'),
+                        version=request.get('version', '2c'),
+                        port=request.get('port', 161),
+                        timeout=request.get('timeout'),
+                        retries=request.get('retries')
+                    )
+                    return {'target': request['target'], 'success': True, 'values': values}
+                except Exception as e:
+                    return {'target': request['target'], 'success': False, 'error': str(e)}
+
+        return await asyncio.gather(*(_one(request) for request in requests))
+
+
+# ---------------------------------------------------------------------------
+# Façade synchrone
+# ---------------------------------------------------------------------------
+
+class SNMPEngine:
+    """
+    Façade synchrone et thread-safe sur `AsyncSNMPEngine`.
+
+    Une boucle asyncio dédiée tourne dans un thread démon ; les appels
+    synchrones y sont soumis, de sorte que tous les appelants du processus
+    partagent la même socket UDP.
+    """
+
+    def __init__(self, **engine_options):
+        self.engine = AsyncSNMPEngine(**engine_options)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name='snmp-engine',
+                    daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Exécute une coroutine sur la boucle du moteur et attend son résultat."""
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        return future.result(timeout)
+
+    def get(self, target: str, oids: Sequence[str], **kwargs) -> Dict[str, Any]:
+        return self.run(self.engine.get(target, oids, **kwargs))
+
+    def get_bulk(self, target: str, oids: Sequence[str], **kwargs) -> List[Tuple[str, int, Any]]:
+        return self.run(self.engine.get_bulk(target, oids, **kwargs))
+
+    def walk(self, target: str, base_oids: Sequence[str], **kwargs) -> Dict[str, Dict[str, Any]]:
+        return self.run(self.engine.walk(target, base_oids, **kwargs))
+
+    def get_many(self, requests: Sequence[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
+        return self.run(self.engine.get_many(requests, **kwargs))
+
+    def close(self) -> None:
+        """Ferme la socket et arrête la boucle du moteur."""
+        with self._lock:
+            if self._loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self.engine.close(), self._loop).result(5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(5)
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+
+_shared_engine: Optional[SNMPEngine] = None
+_shared_engine_lock = threading.Lock()
+
+
+def get_snmp_engine() -> SNMPEngine:
+    """Retourne le moteur SNMP partagé du processus."""
+    global _shared_engine
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            _shared_engine = SNMPEngine()
+        return _shared_engine
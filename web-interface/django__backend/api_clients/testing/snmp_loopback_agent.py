@@ -0,0 +1,160 @@
+"""
+Agent SNMP de bouclage pour les tests et benchmarks.
+
+Sert une MIB en mémoire sur 127.0.0.1 et répond aux PDU GET, GETNEXT et
+GETBULK encodés par `api_clients.network.snmp_engine`. Il permet de mesurer
+le moteur SNMP sans équipement réel ni démon snmpd.
+"""
+
+import asyncio
+import bisect
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..network.snmp_engine import (
+    PDU_GET,
+    PDU_GETBULK,
+    PDU_GETNEXT,
+    PDU_RESPONSE,
+    TAG_COUNTER32,
+    TAG_END_OF_MIB_VIEW,
+    TAG_INTEGER,
+    TAG_NO_SUCH_OBJECT,
+    TAG_OCTET_STRING,
+    TAG_TIMETICKS,
+    SNMPEngineException,
+    decode_message,
+    encode_message,
+    oid_to_tuple,
+)
+
+
+def build_interface_mib(num_interfaces: int, sys_descr: str = 'NMS loopback agent') -> Dict[str, Tuple[int, Any]]:
+    """
+    Construit une MIB system + ifTable avec `num_interfaces` interfaces.
+
+    Returns:
+        Dictionnaire OID -> (tag BER, valeur)
+    """
+    mib = {
+        '1.3.6.1.2.1.1.1.0': (TAG_OCTET_STRING, sys_descr),
+        '1.3.6.1.2.1.1.3.0': (TAG_TIMETICKS, 123456),
+        '1.3.6.1.2.1.1.4.0': (TAG_OCTET_STRING, 'noc@example.com'),
+        '1.3.6.1.2.1.1.5.0': (TAG_OCTET_STRING, 'loopback'),
+        '1.3.6.1.2.1.1.6.0': (TAG_OCTET_STRING, 'lab'),
+        '1.3.6.1.2.1.2.1.0': (TAG_INTEGER, num_interfaces),
+    }
+    for index in range(1, num_interfaces + 1):
+        mib[f'1.3.6.1.2.1.2.2.1.1.{index}'] = (TAG_INTEGER, index)
+        mib[f'1.3.6.1.2.1.2.2.1.2.{index}'] = (TAG_OCTET_STRING, f'eth{index - 1}')
+        mib[f'1.3.6.1.2.1.2.2.1.5.{index}'] = (TAG_INTEGER, 1000000000)
+        mib[f'1.3.6.1.2.1.2.2.1.8.{index}'] = (TAG_INTEGER, 1)
+        mib[f'1.3.6.1.2.1.2.2.1.10.{index}'] = (TAG_COUNTER32, index * 1000)
+        mib[f'1.3.6.1.2.1.2.2.1.16.{index}'] = (TAG_COUNTER32, index * 2000)
+    return mib
+
+
+class _AgentProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, agent: 'SNMPLoopbackAgent'):
+        self.agent = agent
+        self.transport = None
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        response = self.agent.handle(data)
+        if response is not None:
+            self.transport.sendto(response, addr)
+
+
+class SNMPLoopbackAgent:
+    """Agent SNMP v1/v2c minimal servant une MIB statique."""
+
+    def __init__(self, mib: Dict[str, Tuple[int, Any]], community: str = 'public',
+                 host: str = '127.0.0.1', port: int = 0, max_response_varbinds: Optional[int] = None):
+        """
+        Initialise l'agent.
+
+        Args:
+            mib: Dictionnaire OID -> (tag BER, valeur)
+            community: Communauté acceptée
+            host: Adresse d'écoute
+            port: Port d'écoute (0 : port libre)
+            max_response_varbinds: Tronque les réponses GETBULK à ce nombre de
+                varbinds, comme un agent limité par la taille des PDU
+        """
+        self.community = community
+        self.max_response_varbinds = max_response_varbinds
+        self.host = host
+        self.port = port
+        self.requests_handled = 0
+        self._values = {oid.strip('.'): entry for oid, entry in mib.items()}
+        self._sorted = sorted(self._values, key=oid_to_tuple)
+        self._sorted_keys = [oid_to_tuple(oid) for oid in self._sorted]
+        self._transport = None
+
+    async def start(self) -> Tuple[str, int]:
+        """Démarre l'agent et retourne l'adresse effectivement liée."""
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _AgentProtocol(self),
+            local_addr=(self.host, self.port)
+        )
+        self.port = self._transport.get_extra_info('sockname')[1]
+        return self.host, self.port
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    def _next(self, oid: str) -> Optional[str]:
+        position = bisect.bisect_right(self._sorted_keys, oid_to_tuple(oid))
+        return self._sorted[position] if position < len(self._sorted) else None
+
+    def _next_varbind(self, oid: str) -> Tuple[str, int, Any]:
+        next_oid = self._next(oid)
+        if next_oid is None:
+            return oid, TAG_END_OF_MIB_VIEW, None
+        tag, value = self._values[next_oid]
+        return next_oid, tag, value
+
+    def handle(self, data: bytes) -> Optional[bytes]:
+        """Traite un datagramme et retourne la réponse encodée."""
+        try:
+            request = decode_message(data)
+        except SNMPEngineException:
+            return None
+        if request.community != self.community:
+            return None
+        self.requests_handled += 1
+
+        varbinds: List[Tuple[str, int, Any]] = []
+        oids = [oid for oid, _, _ in request.varbinds]
+        if request.pdu_type == PDU_GET:
+            for oid in oids:
+                tag, value = self._values.get(oid, (TAG_NO_SUCH_OBJECT, None))
+                varbinds.append((oid, tag, value))
+        elif request.pdu_type == PDU_GETNEXT:
+            varbinds = [self._next_varbind(oid) for oid in oids]
+        elif request.pdu_type == PDU_GETBULK:
+            non_repeaters = max(0, request.error_status)
+            max_repetitions = max(0, request.error_index)
+            varbinds = [self._next_varbind(oid) for oid in oids[:non_repeaters]]
+            cursors = oids[non_repeaters:]
+            for _ in range(max_repetitions):
+                row = [self._next_varbind(oid) for oid in cursors]
+                varbinds.extend(row)
+                cursors = [oid for oid, _, _ in row]
+                if all(tag == TAG_END_OF_MIB_VIEW for _, tag, _ in row):
+                    break
+            if self.max_response_varbinds is not None:
+                varbinds = varbinds[:self.max_response_varbinds]
+        else:
+            return None
+
+        return encode_message(
+            request.version, request.community, PDU_RESPONSE,
+            request.request_id, varbinds
+        )
@@ -0,0 +1,194 @@
+"""
+Tests du client GNS3 asynchrone contre un serveur local simulant l'API v2.
+"""
+
+import asyncio
+import unittest
+import uuid
+
+import pytest
+
+try:
+    from aiohttp import web
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from api_clients.domain.exceptions import APIRequestException
+from api_clients.network.gns3_async_client import AsyncGNS3Client, endpoint_template
+
+
+class _GNS3Stub:
+    """Serveur aiohttp minimal reproduisant l'API v2 de GNS3."""
+
+    def __init__(self, projects=3, nodes=4, hold_until=0):
+        # Les requêtes d'un projet sont retenues jusqu'à `hold_until` requêtes simultanées
+        self.hold_until = hold_until
+        self.released = asyncio.Event()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections = set()
+        self.not_modified = 0
+        self.projects = {}
+        for _ in range(projects):
+            project_id = str(uuid.uuid4())
+            node_ids = [str(uuid.uuid4()) for _ in range(nodes)]
+            self.projects[project_id] = {
+                'project': {'project_id': project_id, 'name': f'lab-{project_id[:4]}', 'status': 'opened'},
+                'nodes': [
+                    {'node_id': node_id, 'name': f'R{index}', 'status': 'started'}
+                    for index, node_id in enumerate(node_ids)
+                ],
+                'links': [
+                    {'link_id': str(uuid.uuid4()), 'nodes': [{'node_id': a}, {'node_id': b}]}
+                    for a, b in zip(node_ids, node_ids[1:])
+                ]
+            }
+
+    def app(self):
+        app = web.Application(middlewares=[self._track])
+        app.router.add_get('/v2/version', lambda request: web.json_response({'version': '2.2.0'}))
+        app.router.add_get('/v2/projects', self._projects)
+        app.router.add_get('/v2/projects/{project_id}/nodes', self._nodes)
+        app.router.add_get('/v2/projects/{project_id}/links', self._links)
+        app.router.add_get('/v2/projects/{project_id}/nodes/{node_id}/stats', self._stats)
+        return app
+
+    @web.middleware
+    async def _track(self, request, handler):
+        self.connections.add(request.transport.get_extra_info('peername'))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.hold_until and request.path.startswith('/v2/projects/'):
+                if self.in_flight >= self.hold_until:
+                    self.released.set()
+                try:
+                    await asyncio.wait_for(self.released.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    pass
+            return await handler(request)
+        finally:
+            self.in_flight -= 1
+
+    async def _projects(self, request):
+        etag = f'"{len(self.projects)}"'
+        if request.headers.get('If-None-Match') == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={'ETag': etag})
+        return web.json_response([entry['project'] for entry in self.projects.values()], headers={'ETag': etag})
+
+    def _project(self, request):
+        entry = self.projects.get(request.match_info['project_id'])
+        if entry is None:
+            raise web.HTTPNotFound(text='project not found')
+        return entry
+
+    async def _nodes(self, request):
+        return web.json_response(self._project(request)['nodes'])
+
+    async def _links(self, request):
+        return web.json_response(self._project(request)['links'])
+
+    async def _stats(self, request):
+        self._project(request)
+        return web.json_response({'ports': [{'name': 'e0', 'bytes_received': 10, 'bytes_sent': 5}]})
+
+
+async def _serve(stub):
+    """Démarre le serveur simulé sur un port libre."""
+    runner = web.AppRunner(stub.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+
+@unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp non disponible")
+class AsyncGNS3ClientTest(unittest.IsolatedAsyncioTestCase):
+    """Tests du client asynchrone (pool, parallélisme, GET conditionnels)."""
+
+    async def asyncSetUp(self):
+        self.stub = _GNS3Stub()
+        self.runner, port = await _serve(self.stub)
+        self.client = AsyncGNS3Client(host='127.0.0.1', port=port, use_mock=False)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.runner.cleanup()
+
+    async def test_topology_includes_nodes_and_links(self):
+        topology = await self.client.get_topology()
+
+        self.assertEqual(len(topology), 3)
+        for project in topology:
+            expected = self.stub.projects[project['project_id']]
+            self.assertEqual(project['nodes'], expected['nodes'])
+            self.assertEqual(project['links'], expected['links'])
+            self.assertEqual((project['node_count'], project['link_count']), (4, 3))
+
+    async def test_connections_are_reused(self):
+        await self.client.get_topology()
+        await self.client.get_topology()
+
+        # 14 requêtes, servies par les connexions persistantes du pool
+        self.assertLessEqual(len(self.stub.connections), self.client.max_connections)
+        self.assertLess(len(self.stub.connections), 14)
+
+    async def test_conditional_get_reuses_cached_body(self):
+        first = await self.client.get_projects()
+        second = await self.client.get_projects()
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.stub.not_modified, 1)
+        metrics = self.client.get_metrics()['endpoints']['GET /projects']
+        self.assertEqual((metrics['count'], metrics['not_modified']), (2, 1))
+
+    async def test_http_error_is_raised_and_counted(self):
+        with self.assertRaises(APIRequestException) as context:
+            await self.client.get_nodes(str(uuid.uuid4()))
+
+        self.assertEqual(context.exception.status_code, 404)
+        self.assertEqual(self.client.get_metrics()['endpoints']['GET /projects/{id}/nodes']['errors'], 1)
+
+    async def test_nodes_stats_fan_out(self):
+        project_id, entry = next(iter(self.stub.projects.items()))
+
+        stats = await self.client.get_nodes_stats(project_id, entry['nodes'])
+
+        self.assertEqual(set(stats), {node['node_id'] for node in entry['nodes']})
+        self.assertTrue(all(value['ports'] for value in stats.values()))
+
+    def test_endpoint_template(self):
+        node_id = str(uuid.uuid4())
+        self.assertEqual(endpoint_template(f'/projects/{node_id}/nodes/{node_id}/start'),
+                         '/projects/{id}/nodes/{id}/start')
+        self.assertEqual(endpoint_template('version'), '/version')
+
+
+@unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp non disponible")
+class AsyncGNS3ClientConcurrencyTest(unittest.IsolatedAsyncioTestCase):
+    """Concurrence du relevé de topologie, bornée par `max_concurrency`."""
+
+    async def asyncSetUp(self):
+        # 20 projets : 40 requêtes de nœuds et de liens après la liste des projets
+        self.stub = _GNS3Stub(projects=20, nodes=5, hold_until=8)
+        self.runner, port = await _serve(self.stub)
+        self.client = AsyncGNS3Client(host='127.0.0.1', port=port, use_mock=False, max_concurrency=8)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.runner.cleanup()
+
+    @pytest.mark.performance
+    async def test_topology_fan_out_is_bounded_and_concurrent(self):
+        topology = await self.client.get_topology()
+
+        self.assertEqual(len(topology), 20)
+        # Les 8 premières requêtes ne sont servies qu'une fois toutes en cours
+        self.assertTrue(self.stub.released.is_set())
+        self.assertEqual(self.stub.max_in_flight, 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,209 @@
+"""
+Tests unitaires des métriques de performance des clients API.
+
+Ces tests couvrent l'histogramme logarithmique, le tampon circulaire,
+les résumés par période, l'export Prometheus et le coût de
+l'instrumentation.
+"""
+
+import random
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from api_clients.monitoring.metrics.histogram import LogHistogram
+from api_clients.monitoring.metrics.performance import PerformanceMetrics, measure_performance
+
+
+@pytest.fixture
+def metrics():
+    """Collecteur vidé avant et après chaque test."""
+    collector = PerformanceMetrics()
+    collector.clear_metrics()
+    collector.set_retention_period(timedelta(hours=24))
+    yield collector
+    collector.clear_metrics()
+    collector.set_retention_period(timedelta(hours=24))
+
+
+class TestLogHistogram:
+    """Tests pour l'histogramme logarithmique."""
+
+    def test_quantiles_within_relative_error(self):
+        """Test la précision des quantiles par rapport au tri exact."""
+        rng = random.Random(42)
+        values = [rng.lognormvariate(-3, 1) for _ in range(20000)]
+        histogram = LogHistogram()
+        for value in values:
+            histogram.add(value)
+
+        values.sort()
+        for q, estimate in zip((0.5, 0.95, 0.99), histogram.quantiles([0.5, 0.95, 0.99])):
+            exact = values[int(q * (len(values) - 1))]
+            assert abs(estimate - exact) / exact <= 0.011
+        assert histogram.count == 20000
+        assert histogram.min == values[0]
+        assert histogram.max == values[-1]
+
+    def test_merge_equals_single_histogram(self):
+        """Test que la fusion équivaut à un histogramme unique."""
+        values = [0.001 * i for i in range(1, 1001)]
+        whole, first, second = LogHistogram(), LogHistogram(), LogHistogram()
+        for value in values:
+            whole.add(value)
+            (first if value < 0.3 else second).add(value)
+
+        merged = LogHistogram.merged([first, second])
+
+        assert merged.buckets == whole.buckets
+        assert merged.quantiles([0.5, 0.99]) == whole.quantiles([0.5, 0.99])
+        assert merged.sum == pytest.approx(whole.sum)
+
+    def test_empty_and_zero_values(self):
+        """Test l'histogramme vide et les valeurs nulles."""
+        histogram = LogHistogram()
+        assert histogram.quantile(0.5) is None
+
+        histogram.add(0.0)
+        histogram.add(0.0)
+        histogram.add(1.0)
+
+        assert histogram.quantile(0.5) == 0.0
+        assert histogram.quantile(1.0) == pytest.approx(1.0, rel=0.01)
+
+
+class TestPerformanceMetrics:
+    """Tests pour le collecteur de métriques."""
+
+    def test_summary(self, metrics):
+        """Test le résumé par endpoint."""
+        for i in range(1, 101):
+            metrics.record_metric('get_device', i / 1000, 200 if i % 10 else 500, i % 10 != 0)
+        metrics.record_metric('walk', 0.5, 200, True)
+
+        summary = metrics.get_metrics_summary(endpoint='get_device')[0]
+
+        assert (summary.count, summary.success_count, summary.failure_count) == (100, 90, 10)
+        assert summary.min_response_time == 0.001
+        assert summary.max_response_time == 0.1
+        assert summary.avg_response_time == pytest.approx(0.0505)
+        assert summary.p50_response_time == pytest.approx(0.050, rel=0.03)
+        assert summary.p95_response_time == pytest.approx(0.095, rel=0.03)
+        assert summary.p99_response_time == pytest.approx(0.099, rel=0.03)
+        assert {s.endpoint for s in metrics.get_metrics_summary()} == {'get_device', 'walk'}
+
+    def test_percentiles_require_20_points(self, metrics):
+        """Test que p95/p99 restent nuls sous 20 points."""
+        for i in range(5):
+            metrics.record_metric('rare', 0.1, 200, True)
+
+        summary = metrics.get_metrics_summary(endpoint='rare')[0]
+
+        assert summary.p95_response_time == 0.0
+        assert summary.p50_response_time == pytest.approx(0.1, rel=0.01)
+
+    def test_timeframe_and_retention(self, metrics):
+        """Test le filtrage par période et l'abandon des tranches hors rétention."""
+        now = time.time()
+        with patch('api_clients.monitoring.metrics.performance.time.time', return_value=now - 7200):
+            metrics.record_metric('poll', 1.0, 200, True)
+        metrics.record_metric('poll', 0.1, 200, True)
+
+        assert metrics.get_metrics_summary(endpoint='poll')[0].count == 2
+        assert metrics.get_metrics_summary(endpoint='poll', timeframe=timedelta(minutes=30))[0].count == 1
+
+        metrics.set_retention_period(timedelta(hours=1))
+        with patch('api_clients.monitoring.metrics.performance.time.time', return_value=now + 3600 * 2):
+            metrics.record_metric('poll', 0.2, 200, True)
+            assert metrics.get_metrics_summary(endpoint='poll')[0].count == 1
+
+    def test_ring_buffer_keeps_latest_calls(self, metrics):
+        """Test que le tampon circulaire conserve les derniers appels."""
+        for i in range(PerformanceMetrics.RING_SIZE + 10):
+            metrics.record_metric('get', float(i), 200, True)
+
+        recent = metrics.get_recent_metrics('get')
+
+        assert len(recent) == PerformanceMetrics.RING_SIZE
+        assert recent[-1].value == PerformanceMetrics.RING_SIZE + 9
+        assert [point.value for point in metrics.get_recent_metrics('get', limit=2)] == [
+            PerformanceMetrics.RING_SIZE + 8, PerformanceMetrics.RING_SIZE + 9
+        ]
+        assert metrics.get_recent_metrics('unknown') == []
+
+    def test_export_prometheus(self, metrics):
+        """Test l'export au format d'exposition Prometheus."""
+        for i in range(1, 101):
+            metrics.record_metric('get "sys"', i / 100, 200, i <= 98)
+
+        text = metrics.export_prometheus()
+
+        assert '# TYPE api_client_call_duration_seconds summary' in text
+        assert 'api_client_call_duration_seconds{endpoint="get \\"sys\\"",quantile="0.99"}' in text
+        assert 'api_client_call_duration_seconds_count{endpoint="get \\"sys\\""} 100' in text
+        assert 'api_client_calls_total{endpoint="get \\"sys\\"",outcome="failure"} 2' in text
+        assert text.endswith('\n')
+
+    def test_measure_performance_decorator(self, metrics):
+        """Test le décorateur de mesure."""
+        @measure_performance('decorated')
+        def call():
+            return 42
+
+        assert call() == 42
+        assert metrics.get_metrics_summary(endpoint='decorated')[0].count == 1
+        assert metrics.get_instrumentation_overhead()['calls'] == 1
+
+
+class TestPerformanceMetricsOverhead:
+    """Taille de l'état parcouru par l'enregistrement et les résumés."""
+
+    @staticmethod
+    def _footprint(metrics, endpoint):
+        """Entrées du tampon, tranches et seaux des histogrammes d'une opération."""
+        operation = metrics._operations[endpoint]
+        return (
+            len(operation._ring),
+            len(operation._slots),
+            sum(len(histogram.buckets) for _, histogram, _ in operation._slots),
+            len(operation.total.buckets)
+        )
+
+    @pytest.mark.performance
+    def test_record_cost_independent_of_history(self, metrics):
+        """Test que l'état mis à jour par appel enregistré ne croît pas avec l'historique."""
+        def record(count):
+            for i in range(count):
+                metrics.record_metric('snmp_get', 0.001 + (i % 100) / 10000, 200, True)
+
+        # Horloge figée : tous les appels tombent dans la même tranche
+        with patch('api_clients.monitoring.metrics.performance.time.time', return_value=time.time()):
+            record(10000)
+            first = self._footprint(metrics, 'snmp_get')
+            record(200000)
+            last = self._footprint(metrics, 'snmp_get')
+
+        assert last == first
+        assert first[0] == PerformanceMetrics.RING_SIZE
+        assert metrics.get_instrumentation_overhead()['calls'] == 210000
+
+    @pytest.mark.performance
+    def test_summary_cost_independent_of_samples(self, metrics):
+        """Test qu'un résumé fusionne autant de seaux quel que soit le nombre d'échantillons."""
+        def merged_buckets():
+            with patch.object(LogHistogram, 'merge', autospec=True, side_effect=LogHistogram.merge) as merge:
+                summary = metrics.get_metrics_summary()[0]
+            return summary.count, sum(len(call.args[1].buckets) for call in merge.call_args_list)
+
+        with patch('api_clients.monitoring.metrics.performance.time.time', return_value=time.time()):
+            for i in range(1000):
+                metrics.record_metric('snmp_get', 0.001 + (i % 100) / 10000, 200, True)
+            small_count, small = merged_buckets()
+            for i in range(200000):
+                metrics.record_metric('snmp_get', 0.001 + (i % 100) / 10000, 200, True)
+            large_count, large = merged_buckets()
+
+        assert (small_count, large_count) == (1000, 201000)
+        assert large == small
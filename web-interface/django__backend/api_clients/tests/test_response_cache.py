@@ -10,11 +10,13 @@ import time
 import threading
 from unittest.mock import Mock, patch
 
+from api_clients.infrastructure import response_cache
 from api_clients.infrastructure.response_cache import (
     ResponseCache,
     CacheConfig,
     CacheEntry,
     CacheStats,
+    EvictionIndex,
     LRUEvictionStrategy,
     LFUEvictionStrategy,
     TTLEvictionStrategy,
@@ -418,14 +420,141 @@ class TestResponseCache:
         assert len(results) == 250  # 5 threads * 50 opérations
     
     @patch('threading.Timer')
-    def test_cache_periodic_cleanup(self, mock_timer):
-        """Test le nettoyage périodique automatique."""
-        config = CacheConfig(cleanup_interval=10.0)
-        cache = ResponseCache(config)
+    def test_cache_amortized_expiry(self, mock_timer):
+        """Test l'expiration amortie sans thread de nettoyage."""
+        cache = ResponseCache(CacheConfig(max_size=10, default_ttl=0.05, cleanup_interval=0))
+        
+        cache.set("exp1", "value1")
+        cache.set("exp2", "value2")
+        time.sleep(0.06)
+        
+        # L'écriture suivante purge les entrées échues
+        cache.set("valid", "value_valid", ttl=300.0)
+        
+        mock_timer.assert_not_called()
+        assert cache.get_info()['size'] == 1
+        assert cache.stats.expired_entries == 2
+    
+    def test_cache_expiry_sweep_on_read(self):
+        """Test la purge des entrées échues lors des lectures, au plus une fois par intervalle."""
+        cache = ResponseCache(CacheConfig(max_size=10, default_ttl=0.05, cleanup_interval=0.05))
+        cache.set("exp1", "value1")
+        cache.set("exp2", "value2")
+        
+        time.sleep(0.06)
+        cache.get("other")
+        
+        assert cache.get_info()['size'] == 0
+    
+    def test_cache_expiry_heap_stays_bounded(self):
+        """Test que les réécritures d'une même clé ne font pas grossir le tas des échéances."""
+        cache = ResponseCache(CacheConfig(max_size=10, default_ttl=300.0))
+        
+        for i in range(1000):
+            cache.set("key", i)
+        
+        assert cache.get("key") == 999
+        assert len(cache._expiry_heap) <= 2 * len(cache._cache) + 64
+    
+    def test_cache_eviction_lfu(self):
+        """Test l'éviction LFU par seaux de fréquence."""
+        cache = ResponseCache(CacheConfig(max_size=3, eviction_strategy=LFUEvictionStrategy()))
+        
+        cache.set("key1", "value1")
+        cache.set("key2", "value2")
+        cache.set("key3", "value3")
+        for _ in range(3):
+            cache.get("key1")
+        cache.get("key3")
+        
+        # key2 n'a jamais été relue : évincée
+        cache.set("key4", "value4")
+        assert cache.get("key2") is None
+        
+        # key4 (1 accès) est maintenant la moins utilisée
+        cache.set("key5", "value5")
+        assert cache.get("key4") is None
+        assert cache.get("key1") == "value1"
+        assert cache.get("key3") == "value3"
+    
+    def test_cache_eviction_lfu_after_delete(self):
+        """Test l'éviction LFU lorsque le seau de fréquence minimale a été vidé par une suppression."""
+        cache = ResponseCache(CacheConfig(max_size=2, eviction_strategy=LFUEvictionStrategy()))
+        cache.set("key1", "value1")
+        cache.set("key2", "value2")
+        cache.get("key2")
+        cache.get("key2")
+        cache.get("key1")
+        
+        cache.delete("key1")
+        cache.set("key3", "value3")
+        cache.set("key4", "value4")
+        
+        assert cache.get("key3") is None
+        assert cache.get("key2") == "value2"
+    
+    def test_cache_eviction_ttl_oldest_first(self):
+        """Test que la stratégie TTL évince la plus ancienne entrée, même relue."""
+        cache = ResponseCache(CacheConfig(max_size=2, eviction_strategy=TTLEvictionStrategy()))
+        cache.set("key1", "value1")
+        cache.set("key2", "value2")
+        cache.get("key1")
+        
+        cache.set("key3", "value3")
+        
+        assert cache.get("key1") is None
+        assert cache.get("key2") == "value2"
+    
+    def test_cache_custom_strategy_uses_select_for_eviction(self):
+        """Test qu'une stratégie personnalisée sans index reste prise en charge."""
+        class NewestFirstStrategy(LRUEvictionStrategy):
+            def create_index(self):
+                return EvictionIndex(self)
+            
+            def select_for_eviction(self, entries):
+                return max(entries, key=lambda k: entries[k].created_at)
         
-        # Vérifier que le timer est configuré
-        mock_timer.assert_called_once_with(10.0, cache._periodic_cleanup)
-        mock_timer.return_value.start.assert_called_once()
+        cache = ResponseCache(CacheConfig(max_size=2, eviction_strategy=NewestFirstStrategy()))
+        cache.set("key1", "value1")
+        time.sleep(0.001)
+        cache.set("key2", "value2")
+        cache.set("key3", "value3")
+        
+        assert cache.get("key1") == "value1"
+        assert cache.get("key2") is None
+    
+    def test_cache_memory_budget(self):
+        """Test l'éviction selon le budget mémoire en octets."""
+        cache = ResponseCache(CacheConfig(max_size=100, max_memory_bytes=1000))
+        
+        for i in range(10):
+            cache.set(f"key_{i}", b"x" * 300)
+        
+        info = cache.get_info()
+        assert info['size'] == 3
+        assert info['memory_bytes'] == 900
+        assert cache.get("key_9") == b"x" * 300
+        assert cache.stats.evictions == 7
+        
+        # Une entrée plus grande que le budget n'est pas stockée
+        cache.set("huge", b"x" * 2000)
+        assert cache.get("huge") is None
+        assert cache.get_info()['memory_bytes'] == 900
+    
+    def test_cache_compression(self):
+        """Test la compression zlib des corps volumineux."""
+        cache = ResponseCache(CacheConfig(max_size=10, compress_threshold=1024))
+        body = '{"devices": [' + ','.join('{"id": %d, "status": "up"}' % i for i in range(500)) + ']}'
+        
+        cache.set("body", body)
+        cache.set("raw", body.encode('utf-8'))
+        cache.set("small", "petit")
+        
+        assert cache.get("body") == body
+        assert cache.get("raw") == body.encode('utf-8')
+        assert cache.get("small") == "petit"
+        assert cache.stats.compressed_entries == 2
+        assert cache.get_info()['memory_bytes'] < len(body) // 2
 
 
 class TestCacheUtilities:
@@ -563,6 +692,40 @@ class TestCachePerformance:
         info = cache.get_info()
         assert info['size'] <= 100
     
+    @pytest.mark.performance
+    @pytest.mark.parametrize('strategy_class', [LRUEvictionStrategy, LFUEvictionStrategy, TTLEvictionStrategy])
+    def test_cache_eviction_cost_independent_of_size(self, strategy_class):
+        """Test que chaque éviction lit sa victime dans l'index, sans parcourir le cache."""
+        strategy = strategy_class()
+        cache = ResponseCache(CacheConfig(max_size=100000, eviction_strategy=strategy))
+        for i in range(100000):
+            cache.set(f"key_{i}", i)
+        
+        with patch.object(strategy, 'select_for_eviction', wraps=strategy.select_for_eviction) as scan, \
+                patch.object(cache._index, 'victim', wraps=cache._index.victim) as victim:
+            for i in range(100000, 120000):
+                cache.set(f"key_{i}", i)
+                cache.get(f"key_{i - 1}")
+        
+        # Aucun parcours des 100 000 entrées : une lecture d'index par éviction
+        assert scan.call_count == 0
+        assert victim.call_count == 20000
+        assert cache.get_info()['size'] == 100000
+    
+    @pytest.mark.performance
+    def test_cache_100k_entries_with_expiry(self):
+        """Test 100 000 entrées à TTL court : l'expiration amortie garde le cache borné."""
+        cache = ResponseCache(CacheConfig(max_size=100000, default_ttl=0.01, cleanup_interval=0))
+        # Horloge simulée : une milliseconde par lecture de l'heure
+        clock = Mock(time=Mock(side_effect=(1000.0 + i * 0.001 for i in range(1000000))))
+        
+        with patch.object(response_cache, 'time', clock):
+            for i in range(100000):
+                cache.set(f"key_{i}", i)
+        
+        assert cache.get_info()['size'] <= 11
+        assert len(cache._expiry_heap) <= 2 * len(cache._cache) + 64
+    
     @pytest.mark.performance
     def test_cache_memory_usage(self):
         """Test l'usage mémoire du cache."""
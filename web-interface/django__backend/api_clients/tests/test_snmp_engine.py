@@ -0,0 +1,250 @@
+"""
+Tests unitaires pour le moteur SNMP intégré.
+
+Ces tests couvrent l'encodage BER, les requêtes GET/GETBULK groupées,
+le multiplexage multi-équipements et un benchmark contre l'agent
+SNMP de bouclage.
+"""
+
+import asyncio
+
+import pytest
+
+from api_clients.network.snmp_engine import (
+    AsyncSNMPEngine,
+    SNMPEngine,
+    PDU_GET,
+    PDU_GETBULK,
+    TAG_COUNTER32,
+    TAG_INTEGER,
+    TAG_IPADDRESS,
+    TAG_NULL,
+    TAG_OCTET_STRING,
+    TAG_OID,
+    TAG_TIMETICKS,
+    SNMPEngineException,
+    decode_message,
+    encode_message,
+)
+from api_clients.domain.exceptions import APITimeoutException
+from api_clients.testing.snmp_loopback_agent import SNMPLoopbackAgent, build_interface_mib
+
+
+IF_DESCR = '1.3.6.1.2.1.2.2.1.2'
+IF_IN_OCTETS = '1.3.6.1.2.1.2.2.1.10'
+
+
+class TestBERCodec:
+    """Tests de l'encodage/décodage des messages SNMP."""
+
+    def test_roundtrip_get_request(self):
+        """Un GET multi-varbinds survit à l'encodage puis au décodage."""
+        varbinds = [('1.3.6.1.2.1.1.1.0', TAG_NULL, None), ('1.3.6.1.2.1.1.3.0', TAG_NULL, None)]
+        message = decode_message(encode_message(1, 'public', PDU_GET, 4242, varbinds))
+
+        assert message.version == 1
+        assert message.community == 'public'
+        assert message.pdu_type == PDU_GET
+        assert message.request_id == 4242
+        assert [oid for oid, _, _ in message.varbinds] == ['1.3.6.1.2.1.1.1.0', '1.3.6.1.2.1.1.3.0']
+
+    @pytest.mark.parametrize('tag,value', [
+        (TAG_INTEGER, -129),
+        (TAG_INTEGER, 0),
+        (TAG_COUNTER32, 4294967295),
+        (TAG_TIMETICKS, 128),
+        (TAG_OCTET_STRING, 'GigabitEthernet0/1'),
+        (TAG_IPADDRESS, '192.168.1.254'),
+        (TAG_OID, '1.3.6.1.4.1.9.1.1208'),
+    ])
+    def test_roundtrip_values(self, tag, value):
+        """Chaque type de valeur est restitué à l'identique."""
+        message = decode_message(encode_message(1, 'public', PDU_GET, 1, [('1.3.6.1.2.1.1.1.0', tag, value)]))
+        assert message.varbinds[0][1:] == (tag, value)
+
+    def test_large_sub_identifiers(self):
+        """Les sous-identifiants > 127 sont encodés en base 128."""
+        oid = '1.3.6.1.4.1.2636.3.1.13.1.8.9.1.0.0'
+        message = decode_message(encode_message(1, 'public', PDU_GET, 1, [(oid, TAG_NULL, None)]))
+        assert message.varbinds[0][0] == oid
+
+    def test_getbulk_header(self):
+        """non-repeaters et max-repetitions occupent les champs d'erreur."""
+        message = decode_message(encode_message(1, 'public', PDU_GETBULK, 7, [(IF_DESCR, TAG_NULL, None)], 0, 50))
+        assert message.pdu_type == PDU_GETBULK
+        assert message.error_status == 0
+        assert message.error_index == 50
+
+    def test_truncated_message(self):
+        """Un message tronqué lève une SNMPEngineException."""
+        packet = encode_message(1, 'public', PDU_GET, 1, [('1.3.6.1.2.1.1.1.0', TAG_NULL, None)])
+        with pytest.raises(SNMPEngineException):
+            decode_message(packet[:-3])
+
+
+async def _with_agent(mib, coro_factory, community='public'):
+    agent = SNMPLoopbackAgent(mib, community=community)
+    host, port = await agent.start()
+    engine = AsyncSNMPEngine(timeout=0.5, retries=0, local_address=('127.0.0.1', 0))
+    try:
+        return await coro_factory(engine, host, port), agent
+    finally:
+        await engine.close()
+        agent.close()
+
+
+class TestAsyncSNMPEngine:
+    """Tests du moteur asyncio contre l'agent de bouclage."""
+
+    def test_get_packs_oids_into_few_pdus(self):
+        """100 OIDs partent en ceil(100 / max_oids_per_pdu) PDU."""
+        mib = build_interface_mib(100)
+        oids = [f'{IF_IN_OCTETS}.{i}' for i in range(1, 101)]
+
+        async def scenario(engine, host, port):
+            return await engine.get(host, oids, port=port)
+
+        values, agent = asyncio.run(_with_agent(mib, scenario))
+
+        assert len(values) == 100
+        assert values[f'{IF_IN_OCTETS}.42'] == 42000
+        assert agent.requests_handled == 4  # 100 OIDs / 32 par PDU
+
+    def test_get_omits_missing_objects(self):
+        """Les OIDs inconnus de l'agent sont omis du résultat."""
+        async def scenario(engine, host, port):
+            return await engine.get(host, ['1.3.6.1.2.1.1.5.0', '1.3.6.1.2.1.99.0'], port=port)
+
+        values, _ = asyncio.run(_with_agent(build_interface_mib(1), scenario))
+        assert values == {'1.3.6.1.2.1.1.5.0': 'loopback'}
+
+    def test_walk_multiple_columns_with_getbulk(self):
+        """Plusieurs colonnes de l'ifTable sont parcourues ensemble."""
+        async def scenario(engine, host, port):
+            return await engine.walk(host, [IF_DESCR, IF_IN_OCTETS], port=port)
+
+        tables, agent = asyncio.run(_with_agent(build_interface_mib(60), scenario))
+
+        assert len(tables[IF_DESCR]) == 60
+        assert len(tables[IF_IN_OCTETS]) == 60
+        assert tables[IF_DESCR][f'{IF_DESCR}.60'] == 'eth59'
+        # 60 lignes par GETBULK de 25 répétitions : 3 requêtes
+        assert agent.requests_handled == 3
+
+    def test_walk_resumes_after_truncated_getbulk(self):
+        """Une réponse GETBULK tronquée ne termine pas les colonnes."""
+        async def scenario(engine, host, port):
+            agent = SNMPLoopbackAgent(build_interface_mib(30), max_response_varbinds=3)
+            host, port = await agent.start()
+            try:
+                return await engine.walk(host, columns, port=port)
+            finally:
+                agent.close()
+
+        # Moins de varbinds par réponse que de colonnes demandées
+        columns = [IF_DESCR, '1.3.6.1.2.1.2.2.1.8', IF_IN_OCTETS, '1.3.6.1.2.1.2.2.1.16']
+        tables, _ = asyncio.run(_with_agent(build_interface_mib(1), scenario))
+
+        assert [len(tables[column]) for column in columns] == [30, 30, 30, 30]
+
+    def test_response_from_other_address_is_ignored(self):
+        """Une réponse au bon request-id mais d'une autre adresse est rejetée."""
+        async def scenario(engine, host, port):
+            await engine.start()
+            future = asyncio.get_running_loop().create_future()
+            engine._pending[1] = (future, (host, port))
+            packet = encode_message(1, 'public', PDU_GET, 1, [('1.3.6.1.2.1.1.5.0', TAG_OCTET_STRING, 'spoofed')])
+
+            engine._on_datagram(packet, ('127.0.0.2', port))
+            spoofed = future.done()
+            engine._on_datagram(packet, (host, port))
+            return spoofed, future.done(), engine.stats['unmatched_responses']
+
+        (spoofed, matched, unmatched), _ = asyncio.run(_with_agent(build_interface_mib(1), scenario))
+
+        assert not spoofed
+        assert matched
+        assert unmatched == 1
+
+    def test_walk_snmp_v1_uses_getnext(self):
+        """En v1, le parcours se fait par GETNEXT."""
+        async def scenario(engine, host, port):
+            return await engine.walk(host, [IF_DESCR], version='1', port=port)
+
+        tables, _ = asyncio.run(_with_agent(build_interface_mib(5), scenario))
+        assert list(tables[IF_DESCR].values()) == ['eth0', 'eth1', 'eth2', 'eth3', 'eth4']
+
+    def test_timeout_on_wrong_community(self):
+        """Sans réponse de l'agent, une APITimeoutException est levée."""
+        async def scenario(engine, host, port):
+            with pytest.raises(APITimeoutException):
+                await engine.get(host, ['1.3.6.1.2.1.1.1.0'], community='wrong', port=port, timeout=0.1)
+            return engine.stats
+
+        stats, _ = asyncio.run(_with_agent(build_interface_mib(1), scenario))
+        assert stats['timeouts'] == 1
+
+    def test_get_many_multiplexes_devices(self):
+        """Plusieurs agents sont interrogés sur la même socket."""
+        async def scenario():
+            agents = [SNMPLoopbackAgent(build_interface_mib(2, sys_descr=f'device-{i}')) for i in range(20)]
+            addresses = [await agent.start() for agent in agents]
+            engine = AsyncSNMPEngine(timeout=1.0, retries=0, local_address=('127.0.0.1', 0))
+            try:
+                return await engine.get_many([
+                    {'target': host, 'port': port, 'oids': ['1.3.6.1.2.1.1.1.0']}
+                    for host, port in addresses
+                ])
+            finally:
+                await engine.close()
+                for agent in agents:
+                    agent.close()
+
+        results = asyncio.run(scenario())
+        assert all(result['success'] for result in results)
+        assert [r['values']['1.3.6.1.2.1.1.1.0'] for r in results] == [f'device-{i}' for i in range(20)]
+
+
+class TestSNMPEngineFacade:
+    """Tests de la façade synchrone."""
+
+    def test_sync_calls_share_background_loop(self):
+        """Les appels synchrones passent par la boucle du moteur."""
+        engine = SNMPEngine(timeout=0.5, retries=0, local_address=('127.0.0.1', 0))
+        agent = SNMPLoopbackAgent(build_interface_mib(3))
+        try:
+            host, port = engine.run(agent.start())
+            assert engine.get(host, ['1.3.6.1.2.1.1.5.0'], port=port) == {'1.3.6.1.2.1.1.5.0': 'loopback'}
+            assert len(engine.walk(host, [IF_DESCR], port=port)[IF_DESCR]) == 3
+        finally:
+            agent.close()
+            engine.close()
+
+
+class TestSNMPEnginePerformance:
+    """Benchmark du moteur contre l'agent de bouclage."""
+
+    @pytest.mark.performance
+    def test_poll_thousands_of_interfaces(self):
+        """200 équipements × 24 interfaces × 4 compteurs, une seule requête GETBULK par équipement."""
+        columns = ['1.3.6.1.2.1.2.2.1.2', '1.3.6.1.2.1.2.2.1.8', IF_IN_OCTETS, '1.3.6.1.2.1.2.2.1.16']
+
+        async def scenario():
+            agents = [SNMPLoopbackAgent(build_interface_mib(24)) for _ in range(200)]
+            addresses = [await agent.start() for agent in agents]
+            engine = AsyncSNMPEngine(timeout=2.0, retries=1, local_address=('127.0.0.1', 0))
+            try:
+                tables = await asyncio.gather(*(
+                    engine.walk(host, columns, port=port) for host, port in addresses
+                ))
+                return tables, [agent.requests_handled for agent in agents]
+            finally:
+                await engine.close()
+                for agent in agents:
+                    agent.close()
+
+        tables, requests_handled = asyncio.run(scenario())
+
+        polled = sum(len(column) for device in tables for column in device.values())
+        assert polled == 200 * 24 * 4
+        assert requests_handled == [1] * 200
@@ -24,6 +24,13 @@ from ..domain.interfaces import (
     TopologyDiscoveryRepository, 
     APISearchRepository
 )
+from ..domain.exceptions import (
+    APIValidationException,
+    ResourceNotFoundException,
+    TopologyDiscoveryException,
+    ValidationException
+)
+from network_management.domain.topology_graph import TopologyGraph
 
 logger = logging.getLogger(__name__)
 
@@ -494,15 +501,27 @@ class GetNetworkTopologyUseCase:
     Cas d'utilisation pour récupérer la topologie d'un réseau.
     """
     
+    # Nombre maximal de chemins retournés par discover_paths
+    MAX_DISCOVERED_PATHS = 20
+    
+    # Formats d'export pris en charge par export_network_map
+    EXPORT_FORMATS = ('json',)
+    
+    # Attribut des nœuds utilisé pour chaque critère de regroupement
+    GROUP_BY_FIELDS = {'zone': 'location', 'type': 'type', 'status': 'status'}
+    
     def __init__(self, topology_repository: TopologyDiscoveryRepository):
         self.topology_repository = topology_repository
     
-    @cached_result(timeout=300, key_prefix="network_topology")
     def execute(self, network_id: Optional[str] = None,
                filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Récupère la topologie d'un réseau.
         
+        Le repository sert la topologie depuis un instantané invalidé à
+        chaque modification : le résultat n'est pas mis en cache ici pour
+        ne pas survivre à une invalidation.
+        
         Args:
             network_id: ID du réseau (optionnel)
             filters: Filtres supplémentaires (optionnel)
@@ -528,6 +547,286 @@ class GetNetworkTopologyUseCase:
                 message=f"Erreur lors de la récupération de la topologie: {str(e)}",
                 details={"network_id": network_id}
             )
+    
+    def get_network_map(self, network_id: Optional[str] = None,
+                        filters: Optional[Dict[str, Any]] = None,
+                        user_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Récupère la carte du réseau pour la visualisation.
+        
+        Args:
+            network_id: ID du réseau (optionnel)
+            filters: Filtres et options d'affichage (layout, group_by, device_type, zone)
+            user_id: ID de l'utilisateur
+            
+        Returns:
+            Nœuds, arêtes, métadonnées et informations de disposition
+        """
+        filters = filters or {}
+        topology = self.execute(network_id, {
+            key: filters[key] for key in ('device_type', 'zone') if filters.get(key)
+        })
+        
+        group_by = filters.get('group_by', 'zone')
+        field = self.GROUP_BY_FIELDS.get(group_by)
+        groups: Dict[str, List[str]] = {}
+        if field:
+            for node in topology['nodes']:
+                groups.setdefault(node.get(field) or 'unknown', []).append(node['id'])
+        
+        return {
+            'nodes': topology['nodes'],
+            'edges': topology['edges'],
+            'metadata': topology.get('metadata', {}),
+            'layout_info': {
+                'layout': filters.get('layout', 'force'),
+                'group_by': group_by,
+                'show_metrics': filters.get('show_metrics', True),
+                'groups': groups
+            }
+        }
+    
+    def export_network_map(self, network_id: Optional[str] = None, export_format: str = 'json',
+                           user_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Exporte la carte du réseau.
+        
+        Args:
+            network_id: ID du réseau (optionnel)
+            export_format: Format d'export
+            user_id: ID de l'utilisateur
+            
+        Returns:
+            Carte exportée
+            
+        Raises:
+            ValidationException: Si le format n'est pas pris en charge
+        """
+        if export_format not in self.EXPORT_FORMATS:
+            raise ValidationException(
+                f"Format d'export non pris en charge: {export_format}",
+                errors=[f"Formats disponibles: {', '.join(self.EXPORT_FORMATS)}"]
+            )
+        
+        topology = self.execute(network_id)
+        return {
+            'format': export_format,
+            'exported_at': timezone.now().isoformat(),
+            'nodes': topology['nodes'],
+            'edges': topology['edges'],
+            'metadata': topology.get('metadata', {})
+        }
+    
+    def get_topology_graph(self, network_id: Optional[str] = None) -> TopologyGraph:
+        """
+        Construit le graphe indexé de la topologie d'un réseau.
+        
+        Args:
+            network_id: ID du réseau (optionnel)
+            
+        Returns:
+            Graphe de topologie
+        """
+        return TopologyGraph.from_topology_data(self.execute(network_id))
+    
+    def discover_paths(self, source: str, destination: str, max_paths: int = 5,
+                       include_metrics: bool = True, user_id: Optional[int] = None,
+                       network_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Découvre les k plus courts chemins entre deux équipements.
+        
+        Args:
+            source: ID ou nom de l'équipement source
+            destination: ID ou nom de l'équipement destination
+            max_paths: Nombre maximal de chemins (1 à MAX_DISCOVERED_PATHS)
+            include_metrics: Inclure les liens empruntés par chaque chemin
+            user_id: ID de l'utilisateur
+            network_id: ID du réseau (optionnel)
+            
+        Returns:
+            Chemins par coût croissant
+            
+        Raises:
+            ValidationException: Si les paramètres sont invalides
+        """
+        try:
+            max_paths = int(max_paths)
+        except (TypeError, ValueError):
+            raise ValidationException("max_paths doit être un entier")
+        if not 1 <= max_paths <= self.MAX_DISCOVERED_PATHS:
+            raise ValidationException(f"max_paths doit être compris entre 1 et {self.MAX_DISCOVERED_PATHS}")
+        
+        topology = self.execute(network_id)
+        graph = TopologyGraph.from_topology_data(topology)
+        source_id = self._resolve_device(topology, graph, source)
+        destination_id = self._resolve_device(topology, graph, destination)
+        
+        paths = []
+        for cost, path in graph.k_shortest_paths(source_id, destination_id, max_paths):
+            path_data = {
+                'devices': path,
+                'hops': len(path) - 1,
+                'cost': cost
+            }
+            if include_metrics:
+                path_data['links'] = graph.path_links(path)
+            paths.append(path_data)
+        
+        return {
+            'source': source_id,
+            'destination': destination_id,
+            'reachable': bool(paths),
+            'path_count': len(paths),
+            'paths': paths
+        }
+    
+    def analyze_dependencies(self, device_id: Optional[str], analysis_type: str = 'full',
+                             include_services: bool = True, user_id: Optional[int] = None,
+                             network_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyse les dépendances d'un équipement et l'impact de sa panne.
+        
+        Les dépendances amont sont les points d'articulation dont la panne
+        isole l'équipement du cœur de réseau (l'équipement de plus haut
+        degré) ; les dépendances aval sont les équipements isolés par la
+        panne de l'équipement.
+        
+        Args:
+            device_id: ID ou nom de l'équipement
+            analysis_type: 'full', 'upstream' ou 'downstream'
+            include_services: Inclure les dépendances de services
+            user_id: ID de l'utilisateur
+            network_id: ID du réseau (optionnel)
+            
+        Returns:
+            Dépendances et analyse d'impact
+        """
+        if not device_id:
+            raise ValidationException("device_id est requis")
+        
+        topology = self.execute(network_id)
+        graph = TopologyGraph.from_topology_data(topology)
+        device = self._resolve_device(topology, graph, device_id)
+        nodes = {node['id']: node for node in topology.get('nodes', [])}
+        
+        articulation_points, bridges = graph.critical_elements()
+        core = max(graph.node_ids, key=graph.degree)
+        _, critical_path = graph.shortest_path(device, core)
+        
+        upstream = []
+        if analysis_type in ('full', 'upstream'):
+            candidates = set(articulation_points).intersection(critical_path[1:])
+            upstream = [
+                node_id for node_id in critical_path[1:]
+                if node_id in candidates
+                and device in graph.blast_radius([node_id], roots=[core])['isolated']
+            ]
+        
+        downstream = []
+        if analysis_type in ('full', 'downstream'):
+            roots = [core] if core != device else None
+            downstream = graph.blast_radius([device], roots=roots)['isolated']
+        
+        isolated_ratio = len(downstream) / max(len(graph) - 1, 1)
+        result = {
+            'device_id': device,
+            'upstream_dependencies': [self._device_summary(nodes, node_id) for node_id in upstream],
+            'downstream_dependencies': [self._device_summary(nodes, node_id) for node_id in downstream],
+            'critical_path': critical_path,
+            'impact_analysis': {
+                'is_articulation_point': device in set(articulation_points),
+                'isolated_devices': len(downstream),
+                'isolated_ratio': isolated_ratio,
+                'severity': self._failure_severity(len(downstream), isolated_ratio),
+                'network_articulation_points': len(articulation_points),
+                'network_bridges': len(bridges)
+            },
+            'recovery_time_estimate': self._recovery_time_estimate(1, len(downstream))
+        }
+        if include_services:
+            result['service_dependencies'] = []
+        return result
+    
+    def simulate_failure_impact(self, device_ids: List[str], failure_type: str = 'complete',
+                                include_recovery_plan: bool = True, user_id: Optional[int] = None,
+                                network_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Simule la panne simultanée d'un ensemble d'équipements.
+        
+        Args:
+            device_ids: IDs ou noms des équipements en panne
+            failure_type: Type de panne (seule la panne complète est simulée)
+            include_recovery_plan: Inclure l'ordre de rétablissement recommandé
+            user_id: ID de l'utilisateur
+            network_id: ID du réseau (optionnel)
+            
+        Returns:
+            Équipements isolés et plan de rétablissement
+        """
+        topology = self.execute(network_id)
+        graph = TopologyGraph.from_topology_data(topology)
+        failed = [self._resolve_device(topology, graph, device_id) for device_id in device_ids]
+        
+        blast = graph.blast_radius(failed)
+        isolated_ratio = len(blast['isolated']) / max(len(graph) - len(failed), 1)
+        result = {
+            'failure_type': failure_type,
+            'failed_devices': failed,
+            'isolated_devices': blast['isolated'],
+            'isolated_count': len(blast['isolated']),
+            'isolated_ratio': isolated_ratio,
+            'remaining_components': blast['components'],
+            'severity': self._failure_severity(len(blast['isolated']), isolated_ratio),
+            'recovery_time_estimate': self._recovery_time_estimate(len(failed), len(blast['isolated']))
+        }
+        
+        if include_recovery_plan:
+            # Rétablir d'abord les équipements qui reconnectent le plus d'équipements
+            reconnected = []
+            for device in failed:
+                remaining = [other for other in failed if other != device]
+                still_isolated = len(graph.blast_radius(remaining)['isolated'])
+                reconnected.append((len(blast['isolated']) - still_isolated, device))
+            reconnected.sort(key=lambda item: -item[0])
+            result['recovery_plan'] = [
+                {'step': step, 'device_id': device, 'reconnects': count}
+                for step, (count, device) in enumerate(reconnected, start=1)
+            ]
+        
+        return result
+    
+    def _resolve_device(self, topology: Dict[str, Any], graph: TopologyGraph, reference: Any) -> str:
+        """Identifiant d'un équipement désigné par son ID ou son nom."""
+        reference = str(reference)
+        if reference in graph:
+            return reference
+        for node in topology.get('nodes', []):
+            if node.get('label') == reference:
+                return node['id']
+        raise ValidationException(f"Équipement inconnu dans la topologie: {reference}")
+    
+    @staticmethod
+    def _device_summary(nodes: Dict[str, Dict[str, Any]], node_id: str) -> Dict[str, Any]:
+        node = nodes.get(node_id, {})
+        return {
+            'device_id': node_id,
+            'name': node.get('label'),
+            'type': node.get('type'),
+            'status': node.get('status')
+        }
+    
+    @staticmethod
+    def _failure_severity(isolated: int, ratio: float) -> str:
+        if ratio >= 0.25:
+            return 'critical'
+        if ratio >= 0.05:
+            return 'high'
+        return 'medium' if isolated else 'low'
+    
+    @staticmethod
+    def _recovery_time_estimate(failed: int, isolated: int) -> int:
+        """Estimation (minutes) : 15 par équipement en panne, 2 par équipement isolé, 8 h au plus."""
+        return min(15 * failed + 2 * isolated, 480)
 
 
 class StartTopologyDiscoveryUseCase:
@@ -73,7 +73,7 @@ class TopologyDiscoveryRepository(ABC):
     
     @abstractmethod
     def get_network_topology(self, network_id: Optional[str] = None,
-                           filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                           filters: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         """
         Récupère la topologie d'un réseau.
         
@@ -82,7 +82,7 @@ class TopologyDiscoveryRepository(ABC):
             filters: Filtres supplémentaires (optionnel)
             
         Returns:
-            Topologie du réseau
+            Topologie du réseau, ou None si le réseau n'existe pas
         """
         pass
     
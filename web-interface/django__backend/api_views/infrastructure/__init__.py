@@ -22,6 +22,7 @@ from .cache_config import (
     cache_device_view,
     cache_monitoring_view,
     invalidate_cache_pattern,
+    invalidate_cache_tags,
 )
 
 # Exposition des services WebSocket
@@ -57,6 +58,7 @@ __all__ = [
     'cache_device_view',
     'cache_monitoring_view',
     'invalidate_cache_pattern',
+    'invalidate_cache_tags',
     
     # WebSockets
     'send_dashboard_update',
@@ -3,6 +3,11 @@ Configuration du cache Redis pour les vues API.
 
 Ce module contient les configurations et décorateurs pour utiliser Redis
 comme système de cache distribué pour les réponses des vues API.
+
+Les réponses passent par un cache à calcul unique : à l'expiration d'une
+entrée, une seule requête exécute la vue pendant que les autres reçoivent
+la réponse précédente, et les entrées sont invalidées par étiquettes
+(nom de la vue et préfixe de clé).
 """
 
 from functools import wraps
@@ -12,6 +17,8 @@ import hashlib
 import json
 import time
 
+from common.infrastructure.single_flight_cache import SingleFlightCache
+
 
 # Configuration des durées de cache par défaut (en secondes)
 DEFAULT_CACHE_TTL = 60 * 5  # 5 minutes
@@ -22,6 +29,9 @@ DEVICE_CACHE_TTL = 60 * 15  # 15 minutes
 MONITORING_CACHE_TTL = 60  # 1 minute
 CONFIG_CACHE_TTL = 60 * 60 * 24  # 1 jour
 
+# Cache des réponses d'API (recalcul unique par clé)
+api_response_cache = SingleFlightCache(prefix="api_views")
+
 
 def get_cache_key(view_instance, request, *args, **kwargs):
     """Génère une clé de cache basée sur la vue, l'URL et les paramètres."""
@@ -45,13 +55,20 @@ def get_cache_key(view_instance, request, *args, **kwargs):
     return hashlib.md5(key_base.encode()).hexdigest()
 
 
-def api_cache(timeout=DEFAULT_CACHE_TTL, key_prefix=''):
+def api_cache(timeout=DEFAULT_CACHE_TTL, key_prefix='', stale_timeout=None):
     """
     Décorateur pour mettre en cache les réponses d'API.
     
+    Une réponse périmée est recalculée en arrière-plan en rappelant la vue
+    avec la requête qui l'a servie, alors que celle-ci est déjà terminée :
+    la vue ne doit lire que des données stables de la requête (paramètres,
+    utilisateur authentifié), pas son corps ni un état lié à son cycle.
+    
     Args:
         timeout (int): Durée de validité du cache en secondes
         key_prefix (str): Préfixe optionnel pour la clé de cache
+        stale_timeout (int): Durée pendant laquelle la réponse expirée est encore
+            servie pendant son recalcul (par défaut `timeout`)
         
     Returns:
         function: Décorateur configuré
@@ -68,35 +85,49 @@ def api_cache(timeout=DEFAULT_CACHE_TTL, key_prefix=''):
                 
             # Générer la clé de cache
             cache_key = f"{key_prefix}:{get_cache_key(view_instance, request, *args, **kwargs)}"
+            tags = [view_instance.__class__.__name__]
+            if key_prefix:
+                tags.append(key_prefix)
             
-            # Vérifier si la réponse est dans le cache
-            cached_response = cache.get(cache_key)
-            if cached_response is not None:
-                return cached_response
-                
-            # Exécuter la vue si la réponse n'est pas en cache
-            response = view_func(view_instance, request, *args, **kwargs)
-            
-            # Mettre en cache la réponse si elle est valide
-            if response.status_code == 200:
-                cache.set(cache_key, response, cache_timeout)
-                
-            return response
+            # Une seule exécution de la vue par clé, seules les réponses valides sont conservées
+            return api_response_cache.get_or_compute(
+                cache_key,
+                lambda: view_func(view_instance, request, *args, **kwargs),
+                ttl=cache_timeout,
+                stale_ttl=stale_timeout,
+                tags=tags,
+                cacheable=lambda response: response.status_code == 200
+            )
         return _wrapped_view
     return decorator
 
 
+def invalidate_cache_tags(*tags):
+    """
+    Invalide toutes les réponses en cache portant l'une des étiquettes.
+    
+    Args:
+        *tags (str): Noms de vues ou préfixes de clé (ex: "DashboardView", "dashboard")
+    """
+    api_response_cache.invalidate_tags(*tags)
+
+
 def invalidate_cache_pattern(pattern):
     """
     Invalide toutes les clés de cache correspondant au motif.
     
+    Les clés étant hachées, le motif désigne un nom de vue ou un préfixe de
+    clé : "api_views:DashboardView:*" et "dashboard*" invalident
+    respectivement les étiquettes "DashboardView" et "dashboard".
+    
     Args:
-        pattern (str): Le motif de clés à invalider (ex: "api_views:Dashboard*")
+        pattern (str): Le motif de clés à invalider (ex: "api_views:DashboardView*")
     """
-    # Note: Cette fonction est un placeholder car Django n'expose pas directement
-    # la fonctionnalité de recherche par motif dans son API de cache.
-    # En production, cela nécessiterait l'utilisation directe du client Redis
-    pass
+    if pattern.startswith('api_views:'):
+        pattern = pattern[len('api_views:'):]
+    tag = pattern.rstrip('*').rstrip(':')
+    if tag:
+        invalidate_cache_tags(tag)
 
 
 def monitor_cache_hit_rate(view_func):
@@ -261,74 +261,45 @@ class DjangoTopologyDiscoveryRepository(TopologyDiscoveryRepository):
     """
     
     def get_network_topology(self, network_id: Optional[str] = None,
-                           filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                           filters: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         """
         Récupère la topologie d'un réseau.
+        
+        La carte est servie depuis l'instantané de topologie mis en cache
+        (une lecture du cache, trois requêtes lors d'une reconstruction).
         """
         # Import tardif pour éviter les imports circulaires
-        from network_management.infrastructure.models import NetworkDevice
-        from network_management.infrastructure.models import Topology as NetworkTopology
+        from network_management.infrastructure.models import NetworkTopology
+        from network_management.infrastructure.adapters.topology_snapshot import (
+            filter_snapshot, get_topology_snapshot
+        )
         
         filters = filters or {}
         
-        # Si un ID de réseau est fourni, filtrer par ce réseau
-        topology_query = NetworkTopology.objects.all()
+        # Si un ID de réseau est fourni, restreindre aux équipements de ce réseau
+        device_ids = None
         if network_id:
-            topology_query = topology_query.filter(network_id=network_id)
-        
-        # Appliquer d'autres filtres
-        device_type = filters.get("device_type")
-        if device_type:
-            topology_query = topology_query.filter(
-                Q(source_device__device_type=device_type) | 
-                Q(target_device__device_type=device_type)
-            )
-        
-        # Construire la topologie
-        nodes = []
-        edges = []
-        device_ids = set()
+            if not str(network_id).isdigit():
+                return None
+            topology = NetworkTopology.objects.filter(pk=network_id).first()
+            if topology is None:
+                return None
+            device_ids = topology.devices.values_list('id', flat=True)
         
-        for conn in topology_query:
-            source_id = str(conn.source_device.id)
-            target_id = str(conn.target_device.id)
-            
-            # Ajouter les noeuds s'ils n'existent pas déjà
-            if source_id not in device_ids:
-                device_ids.add(source_id)
-                nodes.append({
-                    "id": source_id,
-                    "label": conn.source_device.name,
-                    "type": conn.source_device.device_type,
-                    "status": conn.source_device.status
-                })
-                
-            if target_id not in device_ids:
-                device_ids.add(target_id)
-                nodes.append({
-                    "id": target_id,
-                    "label": conn.target_device.name,
-                    "type": conn.target_device.device_type,
-                    "status": conn.target_device.status
-                })
-            
-            # Ajouter l'arête
-            edges.append({
-                "id": str(conn.id),
-                "source": source_id,
-                "target": target_id,
-                "interface_source": conn.source_interface,
-                "interface_target": conn.target_interface,
-                "type": conn.connection_type
-            })
+        snapshot = filter_snapshot(
+            get_topology_snapshot(),
+            device_ids=device_ids,
+            device_type=filters.get("device_type"),
+            location=filters.get("zone")
+        )
         
         return {
-            "nodes": nodes,
-            "edges": edges,
+            "nodes": snapshot["nodes"],
+            "edges": snapshot["edges"],
             "metadata": {
+                **snapshot["metadata"],
                 "network_id": network_id,
-                "node_count": len(nodes),
-                "edge_count": len(edges)
+                "snapshot_version": snapshot["version"]
             }
         }
     
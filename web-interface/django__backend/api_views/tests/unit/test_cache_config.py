@@ -0,0 +1,91 @@
+"""
+Tests unitaires du décorateur de cache des vues API.
+
+Ce module vérifie qu'une réponse expirée n'est recalculée qu'une fois
+pour des requêtes simultanées et que l'invalidation par motif fonctionne.
+"""
+
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+
+from api_views.infrastructure import cache_config
+from api_views.infrastructure.cache_config import api_cache, invalidate_cache_pattern
+from common.infrastructure.single_flight_cache import SingleFlightCache
+
+
+class DashboardView:
+    """Vue factice comptant ses exécutions."""
+
+    def __init__(self, status_code=200):
+        self.calls = 0
+        self.status_code = status_code
+        self.lock = threading.Lock()
+
+    @api_cache(timeout=60, key_prefix='dashboard')
+    def get(self, request):
+        with self.lock:
+            self.calls += 1
+        return SimpleNamespace(status_code=self.status_code, data={'calls': self.calls})
+
+
+def _request():
+    return SimpleNamespace(
+        method='GET',
+        body=b'',
+        user=SimpleNamespace(id=1, is_authenticated=True),
+        build_absolute_uri=lambda: 'http://testserver/api/dashboard/'
+    )
+
+
+@pytest.fixture
+def response_cache():
+    backend = LocMemCache('api-cache-test', {})
+    backend.clear()
+    flight = SingleFlightCache(prefix='api_views', backend=backend, beta=0, poll_interval=0.005)
+    with patch.object(cache_config, 'api_response_cache', flight):
+        yield flight
+
+
+class TestApiCache:
+    """Tests pour le décorateur api_cache."""
+
+    @pytest.mark.performance
+    def test_concurrent_requests_execute_view_once(self, response_cache):
+        """Test que 50 requêtes simultanées n'exécutent la vue qu'une fois."""
+        view = DashboardView()
+        barrier = threading.Barrier(50)
+
+        def client():
+            barrier.wait()
+            view.get(_request())
+
+        threads = [threading.Thread(target=client) for _ in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert view.calls == 1
+
+    def test_error_response_not_cached(self, response_cache):
+        """Test que les réponses en erreur ne sont pas mises en cache."""
+        view = DashboardView(status_code=500)
+
+        view.get(_request())
+        view.get(_request())
+
+        assert view.calls == 2
+
+    def test_invalidate_cache_pattern(self, response_cache):
+        """Test l'invalidation par nom de vue."""
+        view = DashboardView()
+        view.get(_request())
+
+        invalidate_cache_pattern('DashboardView:*')
+        view.get(_request())
+
+        assert view.calls == 2
@@ -0,0 +1,98 @@
+"""
+Tests unitaires pour l'analyse de chemins et de dépendances de la topologie.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+
+from api_views.application.use_cases import GetNetworkTopologyUseCase
+from api_views.domain.exceptions import ValidationException
+
+
+# Deux cœurs redondants, deux accès, un serveur derrière l'accès 1
+TOPOLOGY = {
+    'nodes': [
+        {'id': '1', 'label': 'core-1', 'type': 'router', 'status': 'active'},
+        {'id': '2', 'label': 'core-2', 'type': 'router', 'status': 'active'},
+        {'id': '3', 'label': 'access-1', 'type': 'switch', 'status': 'active'},
+        {'id': '4', 'label': 'access-2', 'type': 'switch', 'status': 'active'},
+        {'id': '5', 'label': 'server-1', 'type': 'server', 'status': 'active'},
+    ],
+    'edges': [
+        {'id': 'e1', 'source': '1', 'target': '2'},
+        {'id': 'e2', 'source': '1', 'target': '3'},
+        {'id': 'e3', 'source': '2', 'target': '3'},
+        {'id': 'e4', 'source': '1', 'target': '4'},
+        {'id': 'e5', 'source': '2', 'target': '4'},
+        {'id': 'e6', 'source': '3', 'target': '5'},
+    ],
+}
+
+
+@pytest.fixture
+def use_case():
+    use_case = GetNetworkTopologyUseCase(topology_repository=Mock())
+    with patch.object(GetNetworkTopologyUseCase, 'execute', return_value=TOPOLOGY):
+        yield use_case
+
+
+class TestTopologyAnalysis:
+    """Tests des analyses reposant sur le graphe de topologie."""
+
+    def test_discover_paths(self, use_case):
+        result = use_case.discover_paths(source='server-1', destination='4', max_paths=3)
+
+        assert result['reachable'] is True
+        assert [path['devices'] for path in result['paths']][:2] in (
+            [['5', '3', '1', '4'], ['5', '3', '2', '4']],
+            [['5', '3', '2', '4'], ['5', '3', '1', '4']],
+        )
+        assert result['paths'][0]['hops'] == 3
+        assert len(result['paths'][0]['links']) == 3
+
+    def test_discover_paths_rejects_unknown_device(self, use_case):
+        with pytest.raises(ValidationException):
+            use_case.discover_paths(source='5', destination='unknown')
+
+    def test_analyze_dependencies(self, use_case):
+        result = use_case.analyze_dependencies(device_id='5')
+
+        assert [d['device_id'] for d in result['upstream_dependencies']] == ['3']
+        assert result['downstream_dependencies'] == []
+        assert result['critical_path'][0] == '5'
+
+        access = use_case.analyze_dependencies(device_id='access-1')
+        assert [d['name'] for d in access['downstream_dependencies']] == ['server-1']
+        assert access['impact_analysis']['is_articulation_point'] is True
+
+    def test_simulate_failure_impact(self, use_case):
+        result = use_case.simulate_failure_impact(device_ids=['3', '1'])
+
+        assert result['isolated_devices'] == ['5']
+        assert result['recovery_plan'][0] == {'step': 1, 'device_id': '3', 'reconnects': 1}
+
+
+class TestNetworkMap:
+    """Tests de la carte réseau servie depuis l'instantané de topologie."""
+
+    def test_get_network_map_groups_nodes(self, use_case):
+        result = use_case.get_network_map(filters={
+            'layout': 'circular', 'group_by': 'type', 'device_type': 'router', 'show_metrics': False
+        })
+
+        GetNetworkTopologyUseCase.execute.assert_called_once_with(None, {'device_type': 'router'})
+        assert result['layout_info']['layout'] == 'circular'
+        assert result['layout_info']['groups'] == {
+            'router': ['1', '2'], 'switch': ['3', '4'], 'server': ['5']
+        }
+        assert len(result['edges']) == 6
+
+    def test_export_network_map_json(self, use_case):
+        result = use_case.export_network_map(export_format='json')
+
+        assert result['format'] == 'json'
+        assert result['nodes'] == TOPOLOGY['nodes']
+
+    def test_export_network_map_rejects_unknown_format(self, use_case):
+        with pytest.raises(ValidationException):
+            use_case.export_network_map(export_format='svg')
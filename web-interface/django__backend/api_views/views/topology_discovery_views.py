@@ -31,7 +31,6 @@ from ..presentation.serializers.topology_serializers import (
     ConnectionAnalysisSerializer, DeviceDependencySerializer
 )
 from ..presentation.pagination.cursor_pagination import CursorPagination
-from ..infrastructure.cache_config import cache_topology_view
 from ..presentation.mixins import DIViewMixin
 
 logger = logging.getLogger(__name__)
@@ -413,7 +412,8 @@ class NetworkMapView(DIViewMixin, APIView):
             else:
                 raise
     
-    @cache_topology_view()  # Cache avec TTL configuré
+    # Pas de cache de réponse : la carte est servie depuis l'instantané de
+    # topologie, invalidé à chaque modification des équipements et liens
     @swagger_auto_schema(
         operation_summary="Action get",
         operation_description="Récupère les informations détaillées avec données temps réel et métriques associées.",
@@ -496,6 +496,15 @@ class NetworkMapView(DIViewMixin, APIView):
             else:
                 return Response(exported_data)
                 
+        except ValidationException as e:
+            return Response({
+                'error': str(e),
+                'details': getattr(e, 'errors', [])
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except ResourceNotFoundException as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logger.exception(f"Network map export error: {e}")
             return Response(
@@ -686,6 +695,11 @@ class DeviceDependenciesView(DIViewMixin, APIView):
             serializer = DeviceDependencySerializer(dependencies_data)
             return Response(serializer.data)
             
+        except ValidationException as e:
+            return Response(
+                {'error': str(e), 'details': getattr(e, 'errors', [])},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         except ResourceNotFoundException as e:
             return Response(
                 {'error': str(e)},
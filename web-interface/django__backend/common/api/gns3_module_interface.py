@@ -10,7 +10,6 @@ from typing import Dict, List, Any, Optional, Callable, Set
 from dataclasses import dataclass
 from enum import Enum
 
-from django.core.cache import cache
 from django.utils import timezone
 
 from ..infrastructure.gns3_central_service import gns3_central_service, GNS3Event, GNS3EventType
@@ -127,7 +126,7 @@ class GNS3ModuleInterface:
             Informations du projet ou None
         """
         try:
-            return cache.get(f"{gns3_central_service.cache_prefix}:project:{project_id}")
+            return gns3_central_service.get_cached_project(project_id)
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du projet {project_id}: {e}")
             return None
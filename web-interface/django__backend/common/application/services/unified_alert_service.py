@@ -12,6 +12,7 @@ from django.contrib.auth.models import User
 from monitoring.models import Alert
 from network_management.models import NetworkDevice
 from ...domain.interfaces.unified_alert import UnifiedAlertInterface
+from ...infrastructure.unified_alert_feed import unified_alert_feed
 
 logger = logging.getLogger(__name__)
 
@@ -24,123 +25,44 @@ class UnifiedAlertService(UnifiedAlertInterface):
         filter_by: Optional[Dict[str, Any]] = None,
         user_id: Optional[int] = None, 
         device_ids: Optional[List[int]] = None,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Récupère toutes les alertes de toutes les sources.
         
+        La fusion, le tri et la pagination sont faits par la base
+        (voir `UnifiedAlertFeed`) : le coût d'une page ne dépend pas
+        du nombre d'alertes de la période.
+        
         Args:
             days: Nombre de jours en arrière pour la recherche
             filter_by: Filtres à appliquer (severity, status, etc.)
             user_id: ID de l'utilisateur pour filtrer les alertes ack
             device_ids: Liste des IDs d'équipements à filtrer
             limit: Nombre maximum d'alertes à retourner
+            cursor: Curseur `next_cursor` de la page précédente
             
         Returns:
             Alertes consolidées de toutes les sources
         """
         try:
-            # Récupérer les modèles via lazy loading
-            SecurityAlert = apps.get_model('security_management', 'SecurityAlert')
-            Alert = apps.get_model('monitoring', 'Alert')
-            
             since_date = timezone.now() - timedelta(days=days)
             
-            # Récupérer les alertes de sécurité
-            security_alerts_query = SecurityAlert.objects.filter(
-                timestamp__gte=since_date
-            ).select_related('device', 'acknowledged_by')
-            
-            # Récupérer les alertes de monitoring
-            monitoring_alerts_query = Alert.objects.filter(
-                timestamp__gte=since_date
-            ).select_related('device', 'acknowledged_by', 'metric', 'service_check')
-            
-            # Appliquer les filtres
-            if filter_by:
-                if 'severity' in filter_by:
-                    security_alerts_query = security_alerts_query.filter(severity__in=filter_by['severity'])
-                    monitoring_alerts_query = monitoring_alerts_query.filter(severity__in=filter_by['severity'])
-                
-                if 'status' in filter_by:
-                    security_alerts_query = security_alerts_query.filter(status__in=filter_by['status'])
-                    monitoring_alerts_query = monitoring_alerts_query.filter(status__in=filter_by['status'])
-                    
-                if 'source' in filter_by:
-                    if 'security' in filter_by['source'] and 'monitoring' not in filter_by['source']:
-                        monitoring_alerts_query = monitoring_alerts_query.none()
-                    elif 'monitoring' in filter_by['source'] and 'security' not in filter_by['source']:
-                        security_alerts_query = security_alerts_query.none()
-            
-            # Filtrer par utilisateur ayant acquitté
-            if user_id is not None:
-                security_alerts_query = security_alerts_query.filter(acknowledged_by__id=user_id)
-                monitoring_alerts_query = monitoring_alerts_query.filter(acknowledged_by__id=user_id)
-            
-            # Filtrer par équipement
-            if device_ids:
-                security_alerts_query = security_alerts_query.filter(device__id__in=device_ids)
-                monitoring_alerts_query = monitoring_alerts_query.filter(device__id__in=device_ids)
-            
-            # Convertir en format unifié
-            unified_alerts = []
-            
-            # Traiter les alertes de sécurité
-            for alert in security_alerts_query:
-                unified_alerts.append({
-                    'id': f"security-{alert.id}",
-                    'type': 'security',
-                    'source': alert.source,
-                    'event_type': alert.event_type,
-                    'severity': alert.severity,
-                    'status': alert.status,
-                    'device_id': alert.device.id if alert.device else None,
-                    'device_name': alert.device.name if alert.device else "N/A",
-                    'message': alert.message,
-                    'timestamp': alert.timestamp.isoformat(),
-                    'acknowledged_by': alert.acknowledged_by.username if alert.acknowledged_by else None,
-                    'acknowledged_at': alert.acknowledged_at.isoformat() if alert.acknowledged_at else None,
-                    'resolved_at': alert.resolved_at.isoformat() if alert.resolved_at else None,
-                    'details': {
-                        'source_ip': alert.source_ip,
-                        'destination_ip': alert.destination_ip,
-                    }
-                })
-            
-            # Traiter les alertes de monitoring
-            for alert in monitoring_alerts_query:
-                unified_alerts.append({
-                    'id': f"monitoring-{alert.id}",
-                    'type': 'monitoring',
-                    'source': 'monitoring',
-                    'event_type': alert.service_check.name if alert.service_check else 'metric_alert',
-                    'severity': alert.severity,
-                    'status': alert.status,
-                    'device_id': alert.device.id if alert.device else None,
-                    'device_name': alert.device.name if alert.device else "N/A",
-                    'message': alert.message,
-                    'timestamp': alert.timestamp.isoformat(),
-                    'acknowledged_by': alert.acknowledged_by.username if alert.acknowledged_by else None,
-                    'acknowledged_at': alert.acknowledged_at.isoformat() if alert.acknowledged_at else None,
-                    'resolved_at': alert.resolved_at.isoformat() if alert.resolved_at else None,
-                    'details': {
-                        'metric': alert.metric.name if alert.metric else None,
-                        'value': alert.value,
-                        'service': alert.service_check.name if alert.service_check else None,
-                    }
-                })
-            
-            # Trier par date (les plus récentes d'abord)
-            unified_alerts.sort(key=lambda x: x['timestamp'], reverse=True)
-            
-            # Limiter le nombre de résultats
-            if limit and len(unified_alerts) > limit:
-                unified_alerts = unified_alerts[:limit]
+            page = unified_alert_feed.page(
+                since_date,
+                filter_by=filter_by,
+                user_id=user_id,
+                device_ids=device_ids,
+                limit=limit,
+                cursor=cursor
+            )
             
             return {
                 'success': True,
-                'count': len(unified_alerts),
-                'alerts': unified_alerts
+                'count': len(page['alerts']),
+                'alerts': page['alerts'],
+                'next_cursor': page['next_cursor']
             }
             
         except Exception as e:
@@ -300,51 +222,20 @@ class UnifiedAlertService(UnifiedAlertInterface):
             Statistiques sur les alertes
         """
         try:
-            # Récupérer les modèles via lazy loading
-            SecurityAlert = apps.get_model('security_management', 'SecurityAlert')
-            Alert = apps.get_model('monitoring', 'Alert')
-            
             since_date = timezone.now() - timedelta(days=days)
             
-            # Base des requêtes
-            security_alerts = SecurityAlert.objects.filter(timestamp__gte=since_date)
-            monitoring_alerts = Alert.objects.filter(timestamp__gte=since_date)
-            
-            # Filtrer par équipement
-            if device_ids:
-                security_alerts = security_alerts.filter(device__id__in=device_ids)
-                monitoring_alerts = monitoring_alerts.filter(device__id__in=device_ids)
-            
-            # Statistiques par sévérité
-            security_by_severity = {
-                severity: security_alerts.filter(severity=severity).count()
-                for severity in ['critical', 'high', 'medium', 'low']
-            }
-            
-            monitoring_by_severity = {
-                severity: monitoring_alerts.filter(severity=severity).count()
-                for severity in ['critical', 'high', 'medium', 'low']
-            }
-            
-            # Statistiques par statut
-            security_by_status = {
-                status: security_alerts.filter(status=status).count()
-                for status in ['new', 'acknowledged', 'resolved', 'false_positive']
-            }
-            
-            monitoring_by_status = {
-                status: monitoring_alerts.filter(status=status).count()
-                for status in ['new', 'acknowledged', 'resolved', 'false_positive']
-            }
+            # Deux COUNT groupés, un par table
+            statistics = unified_alert_feed.statistics(since_date, device_ids=device_ids)
             
-            # Statistiques par source (pour les alertes de sécurité)
-            security_by_source = {}
-            for source in security_alerts.values_list('source', flat=True).distinct():
-                security_by_source[source] = security_alerts.filter(source=source).count()
+            security_by_severity = statistics['by_severity']['security']
+            monitoring_by_severity = statistics['by_severity']['monitoring']
+            security_by_status = statistics['by_status']['security']
+            monitoring_by_status = statistics['by_status']['monitoring']
+            security_by_source = statistics['security_by_source']
             
             # Total des alertes
-            total_security = security_alerts.count()
-            total_monitoring = monitoring_alerts.count()
+            total_security = statistics['totals']['security']
+            total_monitoring = statistics['totals']['monitoring']
             total_all = total_security + total_monitoring
             
             return {
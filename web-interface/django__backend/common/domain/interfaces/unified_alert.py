@@ -15,7 +15,8 @@ class UnifiedAlertInterface(ABC):
         filter_by: Optional[Dict[str, Any]] = None,
         user_id: Optional[int] = None, 
         device_ids: Optional[List[int]] = None,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Récupère toutes les alertes de toutes les sources.
@@ -26,6 +27,7 @@ class UnifiedAlertInterface(ABC):
             user_id: ID de l'utilisateur pour filtrer les alertes ack
             device_ids: Liste des IDs d'équipements à filtrer
             limit: Nombre maximum d'alertes à retourner
+            cursor: Curseur `next_cursor` de la page précédente
             
         Returns:
             Alertes consolidées de toutes les sources
@@ -4,24 +4,30 @@ Service Central de Topologie pour l'intégration GNS3 avec tous les modules NMS.
 import logging
 import threading
 import time
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable, Set
 from django.conf import settings
 from django.utils import timezone
 from .gns3_integration_service import gns3_integration_service
 from .inter_module_service import inter_module_service, MessageType, ModuleInterface
 from .ubuntu_notification_service import ubuntu_notification_service
+from .topology_diff import TopologyChangeTracker, apply_patches
 
 logger = logging.getLogger(__name__)
 
 class TopologyModule(ModuleInterface):
     """Module d'interface pour l'intégration topologique."""
     
-    def __init__(self, module_name: str, service_instance: Any):
+    def __init__(self, module_name: str, service_instance: Any,
+                 resync_callback: Optional[Callable[[str], None]] = None):
         super().__init__(module_name)
         self.service = service_instance
         self.gns3_data = {}
         self.last_update = None
         
+        # Séquence de la dernière mise à jour appliquée et demande de resynchronisation
+        self.sequence = 0
+        self.resync_callback = resync_callback
+        
         # S'abonner aux messages de topologie
         self.subscribe_to([
             MessageType.TOPOLOGY_UPDATE,
@@ -48,14 +54,53 @@ class TopologyModule(ModuleInterface):
             logger.error(f"Erreur dans {self.module_name} lors du traitement du message {message_type.value}: {e}")
             
     def _handle_topology_update(self, data: Dict[str, Any], sender: str):
-        """Traite une mise à jour de topologie."""
-        self.gns3_data = data.get('topology_data', {})
+        """
+        Traite une mise à jour de topologie : instantané complet, ou patchs
+        applicables uniquement sur la séquence qui les précède.
+        
+        Les autres messages TOPOLOGY_UPDATE (événements GNS3 de nœud ou de
+        projet diffusés par le service central) ne portent pas la topologie
+        et sont ignorés : ils ne modifient ni l'état ni la séquence.
+        """
+        if 'patches' in data:
+            if data.get('base_sequence') != self.sequence:
+                logger.warning(
+                    f"Module {self.module_name}: séquence de topologie manquante "
+                    f"(reçu {data.get('base_sequence')}, attendu {self.sequence}), resynchronisation demandée"
+                )
+                if self.resync_callback:
+                    self.resync_callback(self.module_name)
+                return
+            
+            self.gns3_data = apply_patches(self.gns3_data or [], data['patches'])
+            self._dispatch_node_status_changes(data['patches'])
+        elif 'topology_data' in data:
+            self.gns3_data = data['topology_data']
+        else:
+            logger.debug(
+                f"Module {self.module_name}: événement {data.get('event_type')} sans topologie ignoré"
+            )
+            return
+            
+        self.sequence = data.get('sequence', self.sequence)
         self.last_update = timezone.now()
         
         # Notifier le service spécifique du module s'il a une méthode d'intégration
         if hasattr(self.service, 'integrate_gns3_topology'):
             self.service.integrate_gns3_topology(self.gns3_data)
             
+    def _dispatch_node_status_changes(self, patches: List[Dict[str, Any]]):
+        """Transmet au service les changements de statut contenus dans des patchs."""
+        if not hasattr(self.service, 'handle_node_status_change'):
+            return
+        for patch in patches:
+            if patch['kind'] == 'node' and patch['op'] == 'update' and 'status' in patch['data']:
+                self.service.handle_node_status_change({
+                    'project_id': patch['project_id'],
+                    'node_id': patch['id'],
+                    'status': patch['data']['status']
+                })
+            
     def _handle_node_status_change(self, data: Dict[str, Any], sender: str):
         """Traite un changement de statut de nœud."""
         if hasattr(self.service, 'handle_node_status_change'):
@@ -124,6 +169,11 @@ class CentralTopologyService:
         self.monitor_interval = 30
         self._lock = threading.Lock()
         
+        # Détection incrémentale des changements et resynchronisations demandées
+        self._change_tracker = TopologyChangeTracker()
+        self._pending_resyncs: Set[str] = set()
+        self._resync_lock = threading.Lock()
+        
         # Enregistrer les callbacks GNS3
         gns3_integration_service.register_detection_callback(self._on_gns3_detected)
         
@@ -154,7 +204,9 @@ class CentralTopologyService:
         try:
             with self._lock:
                 # Créer un module d'interface topologique
-                topology_module = TopologyModule(module_name, service_instance)
+                topology_module = TopologyModule(
+                    module_name, service_instance, resync_callback=self.request_topology_resync
+                )
                 
                 # Enregistrer dans le système inter-modules
                 inter_module_service.register_module(topology_module)
@@ -186,16 +238,15 @@ class CentralTopologyService:
             logger.error(f"Erreur lors de l'intégration du module '{module_name}': {e}")
             return False
             
-    def _send_topology_update_to_module(self, module_name: str):
-        """Envoie une mise à jour de topologie à un module spécifique."""
+    def _send_topology_update_to_module(self, module_name: str, resync: bool = False):
+        """Envoie l'instantané complet de la topologie à un module spécifique."""
         try:
-            topology_data = gns3_integration_service.get_topology_data()
-            
             inter_module_service.send_message(
                 MessageType.TOPOLOGY_UPDATE,
                 {
-                    'topology_data': topology_data,
+                    **self._change_tracker.snapshot(),
                     'source': 'gns3',
+                    'resync': resync,
                     'timestamp': timezone.now().isoformat()
                 },
                 sender='central_topology_service',
@@ -205,6 +256,27 @@ class CentralTopologyService:
         except Exception as e:
             logger.error(f"Erreur lors de l'envoi de mise à jour topologique vers {module_name}: {e}")
             
+    def request_topology_resync(self, module_name: str):
+        """
+        Demande l'envoi d'un instantané complet à un module qui a détecté une
+        séquence manquante.
+        
+        La demande est traitée après la diffusion en cours : le module la
+        formule pendant le traitement d'un message, sous le verrou du
+        service inter-modules.
+        """
+        with self._resync_lock:
+            self._pending_resyncs.add(module_name)
+            
+    def _flush_pending_resyncs(self):
+        """Envoie les instantanés complets demandés."""
+        with self._resync_lock:
+            pending, self._pending_resyncs = self._pending_resyncs, set()
+            
+        for module_name in pending:
+            logger.info(f"Resynchronisation de la topologie du module {module_name}")
+            self._send_topology_update_to_module(module_name, resync=True)
+            
     def _on_gns3_detected(self, gns3_info: Dict[str, Any]):
         """Callback appelé lors de la détection de GNS3."""
         try:
@@ -215,18 +287,21 @@ class CentralTopologyService:
             
             # Mettre à jour nos données locales
             with self._lock:
+                snapshot = self._change_tracker.reset(topology_data)
                 self.topology_data = {
                     'gns3_info': gns3_info,
                     'topology': topology_data,
+                    'sequence': snapshot['sequence'],
+                    'fingerprint': snapshot['fingerprint'],
                     'last_update': timezone.now().isoformat()
                 }
             
-            # Diffuser la mise à jour à tous les modules intégrés
+            # Diffuser l'instantané complet à tous les modules intégrés
             inter_module_service.send_message(
                 MessageType.TOPOLOGY_UPDATE,
                 {
+                    **snapshot,
                     'gns3_info': gns3_info,
-                    'topology_data': topology_data,
                     'source': 'gns3',
                     'event': 'gns3_detected',
                     'timestamp': timezone.now().isoformat()
@@ -313,37 +388,44 @@ class CentralTopologyService:
         )
         
     def _check_topology_changes(self):
-        """Vérifie les changements dans la topologie GNS3."""
+        """
+        Vérifie les changements dans la topologie GNS3.
+        
+        Le relevé est comparé au précédent par empreintes ; seuls les patchs
+        (ajouts, suppressions, modifications de projets, nœuds et liens) sont
+        diffusés, avec leur numéro de séquence.
+        """
         try:
             current_topology = gns3_integration_service.get_topology_data()
             
             with self._lock:
-                previous_topology = self.topology_data.get('topology', {})
-                
-                # Comparer les topologies (simple comparaison du nombre de projets/nœuds)
-                current_projects = len(current_topology)
-                previous_projects = len(previous_topology)
-                
-                if current_projects != previous_projects:
-                    logger.info(f"Changement de topologie détecté: {previous_projects} -> {current_projects} projets")
-                    
-                    # Diffuser le changement
-                    inter_module_service.send_message(
-                        MessageType.TOPOLOGY_UPDATE,
-                        {
-                            'topology_data': current_topology,
-                            'change_type': 'projects_count_changed',
-                            'previous_count': previous_projects,
-                            'current_count': current_projects,
-                            'timestamp': timezone.now().isoformat()
-                        },
-                        sender='central_topology_service'
-                    )
-                    
-                    # Mettre à jour nos données
+                change = self._change_tracker.update(current_topology)
+                if change:
                     self.topology_data['topology'] = current_topology
+                    self.topology_data['sequence'] = change['sequence']
+                    self.topology_data['fingerprint'] = change['fingerprint']
                     self.topology_data['last_update'] = timezone.now().isoformat()
                     
+            if change:
+                logger.info(
+                    f"Changement de topologie détecté: {len(change['patches'])} modification(s) "
+                    f"(séquence {change['sequence']})"
+                )
+                
+                # Diffuser uniquement les patchs
+                inter_module_service.send_message(
+                    MessageType.TOPOLOGY_UPDATE,
+                    {
+                        **change,
+                        'change_type': 'topology_patch',
+                        'change_count': len(change['patches']),
+                        'timestamp': timezone.now().isoformat()
+                    },
+                    sender='central_topology_service'
+                )
+                
+            self._flush_pending_resyncs()
+                    
         except Exception as e:
             logger.error(f"Erreur lors de la vérification des changements de topologie: {e}")
             
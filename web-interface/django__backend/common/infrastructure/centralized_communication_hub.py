@@ -1,12 +1,26 @@
 """
 Hub de communication centralisé pour l'orchestration inter-modules.
+
+Les messages attendent dans une file de priorité (tas) protégée par une
+variable de condition : un message déposé réveille immédiatement l'un des
+workers, sans attente périodique. La file est bornée, y compris pour les
+messages remis en file après un échec ; lorsqu'elle est pleine, un message
+plus prioritaire évince le moins prioritaire en attente, sinon il est
+refusé. Le candidat à l'éviction est tenu dans un second tas (ordre
+inverse) ; les entrées retirées de l'un des tas y sont supprimées
+paresseusement, ce qui garde chaque dépôt en O(log n). L'historique des
+messages traités et en échec est conservé dans des tampons circulaires de
+taille fixe.
 """
+import heapq
+import itertools
 import logging
 import threading
 import time
 import uuid
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Callable, Set
+from typing import Deque, Dict, List, Any, Optional, Callable, Set, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from django.utils import timezone
@@ -25,6 +39,9 @@ class Priority(Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
+# Rang de traitement (CRITICAL > HIGH > NORMAL > LOW)
+PRIORITY_ORDER = {Priority.CRITICAL: 0, Priority.HIGH: 1, Priority.NORMAL: 2, Priority.LOW: 3}
+
 class MessageStatus(Enum):
     """Statuts des messages."""
     PENDING = "pending"
@@ -50,6 +67,7 @@ class CommunicationMessage:
     callback: Optional[Callable] = None
     response_data: Optional[Dict[str, Any]] = None
     error_message: Optional[str] = None
+    queued_at: float = 0.0  # horloge monotone, à la mise en file
 
 class ModuleRegistry:
     """Registre des modules avec leurs capacités."""
@@ -112,16 +130,39 @@ class ModuleRegistry:
 class CentralizedCommunicationHub:
     """Hub de communication centralisé pour orchestrer tous les modules."""
     
-    def __init__(self):
+    def __init__(self, num_workers: Optional[int] = None, max_queue_size: Optional[int] = None,
+                 history_size: Optional[int] = None):
+        """
+        Initialise le hub.
+        
+        Args:
+            num_workers: Nombre de threads de traitement (COMMUNICATION_HUB_WORKERS, 4 par défaut)
+            max_queue_size: Capacité de la file (COMMUNICATION_HUB_MAX_QUEUE_SIZE, 10 000 par défaut)
+            history_size: Taille des historiques (COMMUNICATION_HUB_HISTORY_SIZE, 1 000 par défaut)
+        """
         self.registry = ModuleRegistry()
-        self.message_queue: List[CommunicationMessage] = []
-        self.processing_queue: List[CommunicationMessage] = []
-        self.completed_messages: List[CommunicationMessage] = []
-        self.failed_messages: List[CommunicationMessage] = []
+        self.num_workers = num_workers or getattr(settings, 'COMMUNICATION_HUB_WORKERS', 4)
+        self.max_queue_size = max_queue_size or getattr(settings, 'COMMUNICATION_HUB_MAX_QUEUE_SIZE', 10000)
+        history_size = history_size or getattr(settings, 'COMMUNICATION_HUB_HISTORY_SIZE', 1000)
+        
+        # Tas de (rang de priorité, ordre d'arrivée, message), son miroir
+        # (moins prioritaire et plus récent en tête) pour l'éviction, et les
+        # entrées encore en attente indexées par ordre d'arrivée
+        self.message_queue: List[Tuple[int, int, CommunicationMessage]] = []
+        self._eviction_queue: List[Tuple[int, int, CommunicationMessage]] = []
+        self._pending: Dict[int, Tuple[int, int, CommunicationMessage]] = {}
+        self.processing_queue: Dict[str, CommunicationMessage] = {}
+        self.completed_messages: Deque[CommunicationMessage] = deque(maxlen=history_size)
+        self.failed_messages: Deque[CommunicationMessage] = deque(maxlen=history_size)
+        self._sequence = itertools.count()
         
         self.is_running = False
-        self.processor_thread = None
+        self.worker_threads: List[threading.Thread] = []
+        self.maintenance_thread = None
+        self.maintenance_interval = 1.0
         self._lock = threading.Lock()
+        self._message_available = threading.Condition(self._lock)
+        self._stopped = threading.Event()
         
         # Statistiques
         self.stats = {
@@ -129,7 +170,10 @@ class CentralizedCommunicationHub:
             'successful_messages': 0,
             'failed_messages': 0,
             'average_processing_time': 0.0,
-            'peak_queue_size': 0
+            'average_queue_wait': 0.0,
+            'peak_queue_size': 0,
+            'rejected_messages': 0,
+            'dropped_messages': 0
         }
         
         # Workflows prédéfinis
@@ -281,10 +325,17 @@ class CentralizedCommunicationHub:
             return
             
         self.is_running = True
-        self.processor_thread = threading.Thread(target=self._process_messages, daemon=True)
-        self.processor_thread.start()
+        self._stopped.clear()
+        self.worker_threads = [
+            threading.Thread(target=self._worker_loop, name=f"communication-hub-{index}", daemon=True)
+            for index in range(self.num_workers)
+        ]
+        for thread in self.worker_threads:
+            thread.start()
+        self.maintenance_thread = threading.Thread(target=self._maintenance_loop, daemon=True)
+        self.maintenance_thread.start()
         
-        logger.info("Hub de communication centralisé démarré")
+        logger.info(f"Hub de communication centralisé démarré ({self.num_workers} workers)")
         
         # Notification de démarrage
         ubuntu_notification_service.send_notification(
@@ -296,10 +347,15 @@ class CentralizedCommunicationHub:
         
     def stop(self):
         """Arrête le hub de communication."""
-        self.is_running = False
+        with self._message_available:
+            self.is_running = False
+            self._message_available.notify_all()
+        self._stopped.set()
         
-        if self.processor_thread and self.processor_thread.is_alive():
-            self.processor_thread.join(timeout=5)
+        for thread in self.worker_threads + [self.maintenance_thread]:
+            if thread and thread.is_alive():
+                thread.join(timeout=5)
+        self.worker_threads = []
             
         logger.info("Hub de communication centralisé arrêté")
         
@@ -324,18 +380,103 @@ class CentralizedCommunicationHub:
         self.send_message(welcome_message)
         
     def send_message(self, message: CommunicationMessage) -> str:
-        """Envoie un message via le hub."""
-        with self._lock:
-            self.message_queue.append(message)
-            self.stats['total_messages'] += 1
-            self.stats['peak_queue_size'] = max(
-                self.stats['peak_queue_size'],
-                len(self.message_queue)
-            )
+        """
+        Envoie un message via le hub.
+        
+        Si la file est pleine, le message évince le moins prioritaire des
+        messages en attente s'il le devance, sinon il est refusé (statut
+        FAILED, conservé dans l'historique des échecs).
+        """
+        with self._message_available:
+            accepted, evicted = self._admit(message)
+            if accepted:
+                self.stats['total_messages'] += 1
+                self.stats['peak_queue_size'] = max(
+                    self.stats['peak_queue_size'],
+                    len(self._pending)
+                )
             
-        logger.debug(f"Message {message.id} ajouté à la queue (priorité: {message.priority.value})")
+        if evicted is not None:
+            logger.warning(f"Message {evicted.id} évincé de la file pleine par {message.id}")
+        if accepted:
+            logger.debug(f"Message {message.id} ajouté à la queue (priorité: {message.priority.value})")
         return message.id
         
+    def _admit(self, message: CommunicationMessage) -> Tuple[bool, Optional[CommunicationMessage]]:
+        """
+        Dépose un message en respectant la capacité de la file (verrou détenu).
+        
+        Returns:
+            (message accepté, message évincé ou None)
+        """
+        evicted = None
+        if len(self._pending) >= self.max_queue_size:
+            worst = self._eviction_candidate()
+            if worst is None or PRIORITY_ORDER[message.priority] >= worst[0]:
+                self.stats['rejected_messages'] += 1
+                message.status = MessageStatus.FAILED
+                message.error_message = "File de messages pleine"
+                self.failed_messages.append(message)
+                logger.warning(f"Message {message.id} refusé : file pleine ({self.max_queue_size})")
+                return False, None
+            
+            del self._pending[worst[1]]
+            self.stats['dropped_messages'] += 1
+            evicted = worst[2]
+            evicted.status = MessageStatus.FAILED
+            evicted.error_message = "Évincé par un message plus prioritaire"
+            self.failed_messages.append(evicted)
+            
+        self._enqueue(message)
+        return True, evicted
+        
+    def _enqueue(self, message: CommunicationMessage):
+        """Dépose un message dans la file et réveille un worker (verrou détenu)."""
+        message.queued_at = time.monotonic()
+        rank, sequence = PRIORITY_ORDER[message.priority], next(self._sequence)
+        entry = (rank, sequence, message)
+        self._pending[sequence] = entry
+        heapq.heappush(self.message_queue, entry)
+        heapq.heappush(self._eviction_queue, (-rank, -sequence, message))
+        self._compact_queues()
+        self._message_available.notify()
+        
+    def _dequeue(self) -> Optional[CommunicationMessage]:
+        """Retire le prochain message à traiter, ou None si la file est vide (verrou détenu)."""
+        while self.message_queue:
+            _, sequence, message = heapq.heappop(self.message_queue)
+            if self._pending.pop(sequence, None) is not None:
+                return message
+        return None
+        
+    def _eviction_candidate(self) -> Optional[Tuple[int, int, CommunicationMessage]]:
+        """Entrée la moins prioritaire (la plus récente à rang égal) encore en attente (verrou détenu)."""
+        while self._eviction_queue:
+            _, negative_sequence, _ = self._eviction_queue[0]
+            entry = self._pending.get(-negative_sequence)
+            if entry is not None:
+                return entry
+            heapq.heappop(self._eviction_queue)
+        return None
+        
+    def _compact_queues(self):
+        """
+        Reconstruit les tas lorsque les entrées retirées y dominent
+        (verrou détenu) ; le coût est amorti sur les dépôts.
+        """
+        live = len(self._pending)
+        if len(self.message_queue) + len(self._eviction_queue) <= 4 * live + 64:
+            return
+        self.message_queue = list(self._pending.values())
+        heapq.heapify(self.message_queue)
+        self._eviction_queue = [(-rank, -sequence, message) for rank, sequence, message in self.message_queue]
+        heapq.heapify(self._eviction_queue)
+        
+    def pending_messages(self) -> List[CommunicationMessage]:
+        """Messages en attente, dans l'ordre où ils seront traités."""
+        with self._lock:
+            return [message for _, _, message in sorted(self._pending.values(), key=lambda entry: entry[:2])]
+        
     def send_high_priority_message(self, sender: str, target: str, 
                                  message_type: MessageType, data: Dict[str, Any],
                                  callback: Optional[Callable] = None) -> str:
@@ -471,13 +612,27 @@ class CentralizedCommunicationHub:
             category='system.workflow'
         )
         
-    def _process_messages(self):
-        """Boucle de traitement des messages."""
-        while self.is_running:
+    def _worker_loop(self):
+        """Boucle d'un worker : attend un message, le traite, recommence."""
+        while True:
+            with self._message_available:
+                while self.is_running and not self._pending:
+                    self._message_available.wait()
+                if not self.is_running:
+                    return
+                message = self._dequeue()
+                if message is None:
+                    continue
+                
             try:
-                # Traiter les messages en attente
-                self._process_pending_messages()
+                self._process_single_message(message)
+            except Exception as e:
+                logger.error(f"Erreur dans la boucle de traitement: {e}")
                 
+    def _maintenance_loop(self):
+        """Boucle de maintenance : timeouts, historique, santé des modules."""
+        while self.is_running:
+            try:
                 # Vérifier les timeouts
                 self._check_message_timeouts()
                 
@@ -487,26 +642,11 @@ class CentralizedCommunicationHub:
                 # Health check des modules
                 self._check_module_health()
                 
-                time.sleep(1)  # Pause courte
-                
             except Exception as e:
-                logger.error(f"Erreur dans la boucle de traitement: {e}")
-                time.sleep(5)
+                logger.error(f"Erreur dans la boucle de maintenance: {e}")
+                
+            self._stopped.wait(self.maintenance_interval)
                 
-    def _process_pending_messages(self):
-        """Traite les messages en attente."""
-        with self._lock:
-            # Trier par priorité (CRITICAL > HIGH > NORMAL > LOW)
-            priority_order = {Priority.CRITICAL: 0, Priority.HIGH: 1, Priority.NORMAL: 2, Priority.LOW: 3}
-            self.message_queue.sort(key=lambda m: priority_order[m.priority])
-            
-            # Traiter jusqu'à 10 messages par itération
-            messages_to_process = self.message_queue[:10]
-            self.message_queue = self.message_queue[10:]
-            
-        for message in messages_to_process:
-            self._process_single_message(message)
-            
     def _process_single_message(self, message: CommunicationMessage):
         """Traite un message individuel."""
         try:
@@ -514,7 +654,10 @@ class CentralizedCommunicationHub:
             message.status = MessageStatus.PROCESSING
             
             with self._lock:
-                self.processing_queue.append(message)
+                self.processing_queue[message.id] = message
+                # Attente en file (moyenne mobile exponentielle)
+                queue_wait = time.monotonic() - message.queued_at
+                self.stats['average_queue_wait'] += (queue_wait - self.stats['average_queue_wait']) * 0.1
                 
             # Mettre à jour l'activité du module expéditeur
             self.registry.update_heartbeat(message.sender)
@@ -526,8 +669,11 @@ class CentralizedCommunicationHub:
             
             if workflow_data and step_data and action:
                 # C'est une étape de workflow, déclencher la tâche Celery correspondante
+                # (la tâche appelle elle-même le callback de l'étape)
                 self._execute_celery_task_for_workflow_step(action, step_data, workflow_data, message)
+                callback = None
             else:
+                callback = message.callback
                 # Envoyer le message via inter_module_service comme avant
                 inter_module_service.send_message(
                     message.message_type,
@@ -542,18 +688,19 @@ class CentralizedCommunicationHub:
             message.response_data = {'processing_time': processing_time}
             
             # Mettre à jour les statistiques
-            self.stats['successful_messages'] += 1
-            self._update_average_processing_time(processing_time)
+            with self._lock:
+                self.stats['successful_messages'] += 1
+                self._update_average_processing_time(processing_time)
             
             # Appeler le callback si fourni
-            if message.callback:
+            if callback:
                 try:
-                    message.callback(message.response_data)
+                    callback(message.response_data)
                 except Exception as e:
                     logger.error(f"Erreur dans callback du message {message.id}: {e}")
                     
             with self._lock:
-                self.processing_queue.remove(message)
+                self.processing_queue.pop(message.id, None)
                 self.completed_messages.append(message)
                 
             logger.debug(f"Message {message.id} traité avec succès en {processing_time:.3f}s")
@@ -568,17 +715,19 @@ class CentralizedCommunicationHub:
                 message.status = MessageStatus.PENDING
                 
                 with self._lock:
-                    self.message_queue.append(message)
-                    if message in self.processing_queue:
-                        self.processing_queue.remove(message)
+                    self.processing_queue.pop(message.id, None)
+                    accepted, evicted = self._admit(message)
+                    if not accepted:
+                        self.stats['failed_messages'] += 1
                         
-                logger.warning(f"Message {message.id} en retry ({message.retry_count}/{message.max_retries})")
+                if evicted is not None:
+                    logger.warning(f"Message {evicted.id} évincé de la file pleine par {message.id}")
+                if accepted:
+                    logger.warning(f"Message {message.id} en retry ({message.retry_count}/{message.max_retries})")
             else:
-                self.stats['failed_messages'] += 1
-                
                 with self._lock:
-                    if message in self.processing_queue:
-                        self.processing_queue.remove(message)
+                    self.stats['failed_messages'] += 1
+                    self.processing_queue.pop(message.id, None)
                     self.failed_messages.append(message)
                     
                 logger.error(f"Message {message.id} échoué définitivement: {e}")
@@ -590,14 +739,14 @@ class CentralizedCommunicationHub:
         with self._lock:
             timed_out_messages = []
             
-            for message in self.processing_queue:
+            for message in self.processing_queue.values():
                 elapsed = (current_time - message.timestamp).total_seconds()
                 if elapsed > message.timeout_seconds:
                     timed_out_messages.append(message)
                     
             for message in timed_out_messages:
                 message.status = MessageStatus.TIMEOUT
-                self.processing_queue.remove(message)
+                del self.processing_queue[message.id]
                 self.failed_messages.append(message)
                 
                 logger.warning(f"Message {message.id} timeout après {message.timeout_seconds}s")
@@ -607,16 +756,10 @@ class CentralizedCommunicationHub:
         cutoff_time = timezone.now() - timedelta(hours=24)
         
         with self._lock:
-            # Garder seulement les messages des dernières 24h
-            self.completed_messages = [
-                m for m in self.completed_messages 
-                if m.timestamp > cutoff_time
-            ]
-            
-            self.failed_messages = [
-                m for m in self.failed_messages
-                if m.timestamp > cutoff_time
-            ]
+            # Garder seulement les messages des dernières 24h (les plus anciens en tête)
+            for history in (self.completed_messages, self.failed_messages):
+                while history and history[0].timestamp <= cutoff_time:
+                    history.popleft()
             
     def _check_module_health(self):
         """Vérifie la santé des modules enregistrés."""
@@ -729,17 +872,20 @@ class CentralizedCommunicationHub:
         """Récupère le statut du hub de communication."""
         with self._lock:
             queue_sizes = {
-                'pending': len(self.message_queue),
+                'pending': len(self._pending),
                 'processing': len(self.processing_queue),
                 'completed': len(self.completed_messages),
-                'failed': len(self.failed_messages)
+                'failed': len(self.failed_messages),
+                'capacity': self.max_queue_size
             }
+            statistics = dict(self.stats)
             
         return {
             'hub_status': 'running' if self.is_running else 'stopped',
             'registered_modules': list(self.registry.modules.keys()),
+            'workers': self.num_workers,
             'queue_sizes': queue_sizes,
-            'statistics': self.stats,
+            'statistics': statistics,
             'available_workflows': list(self.workflows.keys()),
             'module_health': {
                 name: self.registry.is_module_healthy(name)
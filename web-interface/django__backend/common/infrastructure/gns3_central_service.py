@@ -8,6 +8,8 @@ gérant toutes les interactions, le cache temps réel et les événements.
 import asyncio
 import logging
 import json
+import time
+import uuid
 import websockets
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Callable, Set
@@ -19,7 +21,11 @@ from django.utils import timezone
 from django.conf import settings
 
 from api_clients.network.gns3_client import GNS3Client
+from api_clients.network.gns3_async_client import AsyncGNS3Client
+from .gns3_notification_stream import GNS3NotificationStream, NOTIFICATIONS_LIVE_KEY
 from .inter_module_service import inter_module_service, MessageType
+from .node_lifecycle import NODE_ACTIONS, REVERSED_ACTIONS, plan_waves
+from .state_cache import NetworkStateCache
 from .ubuntu_notification_service import ubuntu_notification_service
 
 logger = logging.getLogger(__name__)
@@ -33,11 +39,14 @@ class GNS3EventType(Enum):
     NODE_STARTED = "node.started"
     NODE_STOPPED = "node.stopped"
     NODE_SUSPENDED = "node.suspended"
+    NODE_ACTION_FAILED = "node.action_failed"
     PROJECT_OPENED = "project.opened"
     PROJECT_CLOSED = "project.closed"
     PROJECT_CREATED = "project.created"
     PROJECT_DELETED = "project.deleted"
+    PROJECT_UPDATED = "project.updated"
     LINK_CREATED = "link.created"
+    LINK_UPDATED = "link.updated"
     LINK_DELETED = "link.deleted"
     TOPOLOGY_CHANGED = "topology.changed"
 
@@ -89,17 +98,25 @@ class GNS3CentralService:
         
         # Client GNS3 principal
         self.gns3_client = GNS3Client(**self.gns3_config)
+        # Client asynchrone (pool keep-alive) pour les relevés de topologie
+        self.async_client = AsyncGNS3Client(
+            **self.gns3_config,
+            max_concurrency=getattr(settings, 'GNS3_MAX_CONCURRENCY', 10)
+        )
         
         # État du service
         self.is_connected = False
         self.is_monitoring = False
-        self.websocket_connection = None
+        self.notification_stream: Optional[GNS3NotificationStream] = None
         self.event_callbacks: Set[Callable] = set()
+        self._state_flush_handle: Optional[asyncio.TimerHandle] = None
+        self.state_flush_delay = 0.5  # regroupe les écritures de l'état agrégé
         
         # Cache et état
         self.cache_prefix = "gns3_central"
         self.state_ttl = 300  # 5 minutes
         self.current_state: Optional[NetworkState] = None
+        self.state_cache = NetworkStateCache(self.cache_prefix, self.state_ttl)
         
         # Statistiques
         self.stats = {
@@ -157,7 +174,7 @@ class GNS3CentralService:
     async def _test_gns3_connection(self) -> bool:
         """Teste la connexion au serveur GNS3."""
         try:
-            version_info = self.gns3_client.get_version()
+            version_info = await self.async_client.get_version()
             if version_info and 'version' in version_info:
                 logger.info(f"Connecté à GNS3 v{version_info['version']}")
                 return True
@@ -169,23 +186,24 @@ class GNS3CentralService:
     async def _load_initial_state(self):
         """Charge l'état initial du réseau GNS3."""
         try:
-            # Récupérer tous les projets
-            projects_data = {}
-            projects = self.gns3_client.get_projects() or []
+            # Récupérer tous les projets, puis leurs nœuds et liens en parallèle
+            topology = await self.async_client.get_topology()
+            self.stats['api_calls'] += 1 + 2 * len(topology)
             
-            for project in projects:
-                project_id = project.get('project_id')
-                if project_id:
-                    # Récupérer les nœuds
-                    nodes = self.gns3_client.get_nodes(project_id) or []
-                    project['nodes'] = {node.get('node_id'): node for node in nodes}
-                    projects_data[project_id] = project
+            projects_data = {}
+            links_data = {}
+            for project in topology:
+                project_id = project['project_id']
+                for link in project.pop('links'):
+                    links_data[link.get('link_id')] = {**link, 'project_id': project_id}
+                project['nodes'] = {node.get('node_id'): node for node in project['nodes']}
+                projects_data[project_id] = project
             
             # Créer l'état réseau
             self.current_state = NetworkState(
                 projects=projects_data,
                 nodes={},
-                links={},
+                links=links_data,
                 last_update=timezone.now(),
                 server_status="connected"
             )
@@ -211,41 +229,42 @@ class GNS3CentralService:
     
     async def _cache_network_state(self):
         """Met en cache l'état complet du réseau."""
-        if not self.current_state:
-            return
-            
         try:
-            # Cache principal
-            cache.set(
-                f"{self.cache_prefix}:network_state",
-                {
-                    'projects': self.current_state.projects,
-                    'nodes': self.current_state.nodes,
-                    'links': self.current_state.links,
-                    'last_update': self.current_state.last_update.isoformat(),
-                    'server_status': self.current_state.server_status
-                },
-                timeout=self.state_ttl
-            )
-            
-            # Cache individuel pour accès rapide
-            for node_id, node in self.current_state.nodes.items():
-                cache.set(
-                    f"{self.cache_prefix}:node:{node_id}",
-                    node,
-                    timeout=self.state_ttl
-                )
-                
-            for project_id, project in self.current_state.projects.items():
-                cache.set(
-                    f"{self.cache_prefix}:project:{project_id}",
-                    project,
-                    timeout=self.state_ttl
-                )
-                
+            self._write_state_cache()
         except Exception as e:
             logger.error(f"Erreur lors de la mise en cache: {e}")
 
+    def _write_state_cache(self):
+        """
+        Écrit l'état complet (agrégat, nœuds, projets) en un seul appel groupé.
+        
+        Chaque nœud n'est sérialisé qu'une fois : l'agrégat et les projets
+        n'en conservent que l'identifiant.
+        """
+        self._state_flush_handle = None
+        if not self.current_state:
+            return
+        
+        self.state_cache.write_state(
+            projects=self.current_state.projects,
+            nodes=self.current_state.nodes,
+            links=self.current_state.links,
+            last_update=self.current_state.last_update.isoformat(),
+            server_status=self.current_state.server_status
+        )
+
+    def _schedule_state_flush(self):
+        """
+        Programme l'écriture de l'état complet.
+        
+        Les clés par nœud sont écrites immédiatement ; l'état complet n'est
+        réécrit qu'une fois par rafale de notifications.
+        """
+        if self._state_flush_handle is None:
+            self._state_flush_handle = asyncio.get_running_loop().call_later(
+                self.state_flush_delay, self._write_state_cache
+            )
+
     def get_cached_node_status(self, node_id: str) -> Optional[Dict[str, Any]]:
         """
         Récupère le statut d'un nœud depuis le cache.
@@ -257,7 +276,7 @@ class GNS3CentralService:
             Statut du nœud ou None
         """
         try:
-            node_data = cache.get(f"{self.cache_prefix}:node:{node_id}")
+            node_data = cache.get(self.state_cache.node_key(node_id))
             if node_data:
                 self.stats['cache_hits'] += 1
                 return node_data
@@ -268,6 +287,43 @@ class GNS3CentralService:
             logger.error(f"Erreur lors de la lecture du cache pour le nœud {node_id}: {e}")
             return None
 
+    def get_cached_nodes_status(self, node_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Récupère le statut de plusieurs nœuds en une seule lecture du cache.
+        
+        Args:
+            node_ids: IDs des nœuds
+            
+        Returns:
+            {node_id: statut} pour les nœuds présents en cache
+        """
+        try:
+            nodes = self.state_cache.read_nodes(node_ids)
+            self.stats['cache_hits'] += len(nodes)
+            self.stats['cache_misses'] += len(set(node_ids)) - len(nodes)
+            return nodes
+        except Exception as e:
+            logger.error(f"Erreur lors de la lecture groupée du cache des nœuds: {e}")
+            return {}
+
+    def get_cached_project(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Récupère un projet et ses nœuds depuis le cache.
+        
+        Args:
+            project_id: ID du projet
+            
+        Returns:
+            Projet ou None
+        """
+        try:
+            project = self.state_cache.read_project(project_id)
+            self.stats['cache_hits' if project else 'cache_misses'] += 1
+            return project
+        except Exception as e:
+            logger.error(f"Erreur lors de la lecture du cache pour le projet {project_id}: {e}")
+            return None
+
     def get_cached_topology(self) -> Optional[Dict[str, Any]]:
         """
         Récupère la topologie complète depuis le cache.
@@ -276,7 +332,7 @@ class GNS3CentralService:
             Topologie complète ou None
         """
         try:
-            topology = cache.get(f"{self.cache_prefix}:network_state")
+            topology = self.state_cache.read_state()
             if topology:
                 self.stats['cache_hits'] += 1
                 return topology
@@ -443,7 +499,7 @@ class GNS3CentralService:
 
     async def start_project_nodes(self, project_id: str) -> Dict[str, Any]:
         """
-        Démarre tous les nœuds d'un projet.
+        Démarre tous les nœuds d'un projet (routeurs avant hôtes, en parallèle).
         
         Args:
             project_id: ID du projet
@@ -451,55 +507,241 @@ class GNS3CentralService:
         Returns:
             Résultat de l'opération
         """
-        try:
-            project_data = cache.get(f"{self.cache_prefix}:project:{project_id}")
-            if not project_data:
-                return {"success": False, "error": "Projet non trouvé"}
-            
-            nodes = project_data.get('nodes', {})
-            results = {}
-            
-            # Démarrer tous les nœuds en parallèle
-            tasks = []
-            for node_id in nodes:
-                task = self.start_node(project_id, node_id)
-                tasks.append((node_id, task))
-            
-            # Attendre tous les résultats
-            for node_id, task in tasks:
-                try:
-                    result = await task
-                    results[node_id] = result
-                except Exception as e:
-                    results[node_id] = {"success": False, "error": str(e)}
-            
-            success_count = sum(1 for r in results.values() if r.get('success', True))
-            
-            # Événement de démarrage de projet
-            event = GNS3Event(
-                event_type=GNS3EventType.TOPOLOGY_CHANGED,
-                project_id=project_id,
-                data={
-                    'action': 'start_project_nodes',
-                    'total_nodes': len(nodes),
-                    'started_nodes': success_count,
-                    'results': results
-                },
-                timestamp=timezone.now()
-            )
-            
-            await self._broadcast_event(event)
-            
-            return {
-                'success': success_count > 0,
-                'total_nodes': len(nodes),
-                'started_nodes': success_count,
-                'results': results
-            }
+        result = await self.bulk_node_action(project_id, 'start')
+        result['started_nodes'] = result.get('succeeded', 0)
+        return result
+
+    async def bulk_node_action(self, project_id: str, action: str, node_ids: Optional[List[str]] = None,
+                               ordered: bool = True, derive_from_links: bool = True,
+                               max_concurrency: Optional[int] = None,
+                               progress_callback: Optional[Callable] = None) -> Dict[str, Any]:
+        """
+        Applique une action de cycle de vie à un projet ou à une sélection de nœuds.
+        
+        Les nœuds sont traités par vagues (voir node_lifecycle.plan_waves) :
+        démarrage des routeurs avant les hôtes, arrêt et suspension dans
+        l'ordre inverse. Au sein d'une vague, les appels sont parallèles et
+        leur nombre simultané est borné. Pour un projet entier sans
+        contrainte d'ordre, le point d'API de projet 'nodes/<action>' est
+        utilisé ; les nœuds qu'il n'a pas amenés au statut attendu (ou tous,
+        si le serveur ne le fournit pas) sont ensuite traités un par un.
+        
+        Chaque nœud traité produit un événement de progression (diffusé et
+        transmis à `progress_callback`, fonction async facultative).
+        
+        Args:
+            project_id: ID du projet
+            action: 'start', 'stop', 'restart' ou 'suspend'
+            node_ids: Nœuds à traiter (tout le projet si None)
+            ordered: Respecter l'ordre de dépendance entre nœuds
+            derive_from_links: Déduire les dépendances des liens du projet
+            max_concurrency: Nombre maximal d'appels simultanés
+            progress_callback: Fonction async appelée avec chaque événement de progression
             
+        Returns:
+            Résultat de l'opération ('results' par nœud, 'waves', 'mode')
+        """
+        if action not in NODE_ACTIONS:
+            return {"success": False, "error": f"Action inconnue: {action}"}
+        
+        operation_id = uuid.uuid4().hex
+        start_time = time.monotonic()
+        self.stats['last_activity'] = timezone.now()
+        
+        try:
+            if ordered and derive_from_links:
+                project_nodes, links = await asyncio.gather(
+                    self.async_client.get_nodes(project_id),
+                    self.async_client.list_links(project_id)
+                )
+                self.stats['api_calls'] += 2
+            else:
+                project_nodes, links = await self.async_client.get_nodes(project_id), None
+                self.stats['api_calls'] += 1
         except Exception as e:
-            logger.error(f"Erreur lors du démarrage des nœuds du projet {project_id}: {e}")
+            logger.error(f"Erreur lors de la lecture des nœuds du projet {project_id}: {e}")
             return {"success": False, "error": str(e)}
+        
+        nodes_by_id = {node.get('node_id'): node for node in project_nodes if node.get('node_id')}
+        results: Dict[str, Dict[str, Any]] = {}
+        if node_ids is None:
+            selected = list(nodes_by_id.values())
+        else:
+            selected = [nodes_by_id[node_id] for node_id in node_ids if node_id in nodes_by_id]
+            for node_id in node_ids:
+                if node_id not in nodes_by_id:
+                    results[node_id] = {"success": False, "error": "Nœud inconnu"}
+        
+        if ordered:
+            waves = plan_waves(selected, links, topology_nodes=project_nodes)
+            if action in REVERSED_ACTIONS:
+                waves.reverse()
+        else:
+            waves = [[node['node_id'] for node in selected]] if selected else []
+        
+        progress = {'completed': 0, 'total': len(selected), 'waves': len(waves)}
+        mode = 'nodes'
+        
+        if node_ids is None and len(waves) == 1:
+            pending = await self._project_level_action(
+                project_id, action, selected, results, progress, operation_id, progress_callback
+            )
+            if len(pending) < len(selected):
+                mode = 'project'
+            waves = [[node['node_id'] for node in pending]] if pending else []
+        
+        semaphore = asyncio.Semaphore(max_concurrency or self.async_client.max_concurrency)
+        
+        async def run(node, wave_index, updated):
+            async with semaphore:
+                results[node['node_id']] = await self._node_action(
+                    project_id, node, action, wave_index, progress, operation_id, progress_callback, updated
+                )
+        
+        for wave_index, wave in enumerate(waves):
+            # Nœuds mis à jour par la vague, écrits en un seul lot
+            updated: List[Dict[str, Any]] = []
+            await asyncio.gather(*(run(nodes_by_id[node_id], wave_index, updated) for node_id in wave))
+            self.state_cache.write_nodes(updated)
+        
+        succeeded = sum(1 for result in results.values() if result.get('success'))
+        summary = {
+            'success': succeeded > 0 or not results,
+            'action': action,
+            'operation_id': operation_id,
+            'mode': mode,
+            'total_nodes': len(results),
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'waves': waves,
+            'duration_seconds': round(time.monotonic() - start_time, 3),
+            'results': results
+        }
+        
+        # Événement de fin d'opération groupée
+        await self._broadcast_event(GNS3Event(
+            event_type=GNS3EventType.TOPOLOGY_CHANGED,
+            project_id=project_id,
+            data={
+                **{key: value for key, value in summary.items() if key != 'results'},
+                'action': f'{action}_project_nodes' if node_ids is None else f'{action}_nodes'
+            },
+            timestamp=timezone.now()
+        ))
+        
+        return summary
+
+    async def _project_level_action(self, project_id: str, action: str, nodes: List[Dict[str, Any]],
+                                    results: Dict[str, Dict[str, Any]], progress: Dict[str, int],
+                                    operation_id: str, progress_callback: Optional[Callable]) -> List[Dict[str, Any]]:
+        """
+        Tente l'action via le point d'API de projet.
+        
+        Returns:
+            Nœuds restant à traiter individuellement
+        """
+        endpoint, target_status = NODE_ACTIONS[action]
+        try:
+            response = await self.async_client.project_nodes_action(project_id, endpoint)
+            self.stats['api_calls'] += 1
+            if isinstance(response, dict) and response.get('success') is False:
+                return nodes
+            current = {node.get('node_id'): node for node in await self.async_client.get_nodes(project_id)}
+            self.stats['api_calls'] += 1
+        except Exception as e:
+            logger.info(f"Action groupée '{endpoint}' indisponible pour le projet {project_id}, "
+                        f"traitement nœud par nœud: {e}")
+            return nodes
+        
+        pending = []
+        updated: List[Dict[str, Any]] = []
+        for node in nodes:
+            if current.get(node['node_id'], {}).get('status') != target_status:
+                pending.append(node)
+                continue
+            progress['completed'] += 1
+            results[node['node_id']] = {"success": True, "status": target_status}
+            await self._emit_node_progress(
+                project_id, node, action, True, target_status, 0, progress, operation_id, progress_callback, updated
+            )
+        self.state_cache.write_nodes(updated)
+        return pending
+
+    async def _node_action(self, project_id: str, node: Dict[str, Any], action: str, wave_index: int,
+                           progress: Dict[str, int], operation_id: str,
+                           progress_callback: Optional[Callable],
+                           updated: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Applique l'action à un nœud et émet l'événement de progression."""
+        endpoint, target_status = NODE_ACTIONS[action]
+        try:
+            response = await self.async_client.node_action(project_id, node['node_id'], endpoint)
+            self.stats['api_calls'] += 1
+            if isinstance(response, dict) and response.get('success') is False:
+                result = {"success": False, "error": response.get('error', 'Échec')}
+            else:
+                result = {"success": True, "status": target_status}
+        except Exception as e:
+            logger.error(f"Erreur lors de l'action '{action}' sur le nœud {node['node_id']}: {e}")
+            result = {"success": False, "error": str(e)}
+        
+        progress['completed'] += 1
+        await self._emit_node_progress(
+            project_id, node, action, result['success'], target_status, wave_index,
+            progress, operation_id, progress_callback, updated, error=result.get('error')
+        )
+        return result
+
+    async def _emit_node_progress(self, project_id: str, node: Dict[str, Any], action: str, success: bool,
+                                  target_status: str, wave_index: int, progress: Dict[str, int],
+                                  operation_id: str, progress_callback: Optional[Callable],
+                                  updated: List[Dict[str, Any]], error: Optional[str] = None):
+        """
+        Diffuse l'événement de progression d'un nœud.
+        
+        Le nœud mis à jour est ajouté à `updated` ; l'appelant l'écrit dans
+        le cache d'état avec le reste de la vague.
+        """
+        node_id = node['node_id']
+        old_status = node.get('status', 'unknown')
+        
+        if success:
+            updated.append({
+                **node,
+                'status': target_status,
+                'previous_status': old_status,
+                'last_update': timezone.now().isoformat(),
+                'project_id': project_id
+            })
+            event_type = {
+                'stopped': GNS3EventType.NODE_STOPPED,
+                'suspended': GNS3EventType.NODE_SUSPENDED
+            }.get(target_status, GNS3EventType.NODE_STARTED)
+        else:
+            event_type = GNS3EventType.NODE_ACTION_FAILED
+        
+        event = GNS3Event(
+            event_type=event_type,
+            project_id=project_id,
+            data={
+                'node_id': node_id,
+                'node_name': node.get('name', 'Unknown'),
+                'old_status': old_status,
+                'new_status': target_status if success else old_status,
+                'action': f'{action}_node',
+                'success': success,
+                'error': error,
+                'operation_id': operation_id,
+                'progress': {**progress, 'wave': wave_index}
+            },
+            timestamp=timezone.now()
+        )
+        await self._broadcast_event(event)
+        
+        if progress_callback:
+            try:
+                await progress_callback(event)
+            except Exception as e:
+                logger.error(f"Erreur dans le callback de progression: {e}")
 
     # ==================== ÉVÉNEMENTS ====================
     
@@ -547,12 +789,15 @@ class GNS3CentralService:
             GNS3EventType.NODE_STARTED: MessageType.NODE_STATUS_CHANGE,
             GNS3EventType.NODE_STOPPED: MessageType.NODE_STATUS_CHANGE,
             GNS3EventType.NODE_SUSPENDED: MessageType.NODE_STATUS_CHANGE,
+            GNS3EventType.NODE_ACTION_FAILED: MessageType.NETWORK_EVENT,
             GNS3EventType.NODE_CREATED: MessageType.TOPOLOGY_UPDATE,
             GNS3EventType.NODE_DELETED: MessageType.TOPOLOGY_UPDATE,
             GNS3EventType.PROJECT_OPENED: MessageType.TOPOLOGY_UPDATE,
             GNS3EventType.PROJECT_CLOSED: MessageType.TOPOLOGY_UPDATE,
+            GNS3EventType.PROJECT_DELETED: MessageType.TOPOLOGY_UPDATE,
             GNS3EventType.TOPOLOGY_CHANGED: MessageType.TOPOLOGY_UPDATE,
             GNS3EventType.LINK_CREATED: MessageType.NETWORK_EVENT,
+            GNS3EventType.LINK_UPDATED: MessageType.NETWORK_EVENT,
             GNS3EventType.LINK_DELETED: MessageType.NETWORK_EVENT,
         }
         return mapping.get(event_type, MessageType.NETWORK_EVENT)
@@ -571,13 +816,287 @@ class GNS3CentralService:
         """Désenregistre un callback d'événement."""
         self.event_callbacks.discard(callback)
 
-    # ==================== WEBSOCKET (pour le futur) ====================
+    # ==================== NOTIFICATIONS GNS3 ====================
     
     async def _start_websocket_monitoring(self):
-        """Démarre le monitoring WebSocket (sera implémenté plus tard)."""
-        # Pour l'instant, on utilise du polling
+        """
+        Démarre la consommation du flux de notifications GNS3.
+        
+        Les changements d'état sont appliqués dès leur réception et diffusés
+        via le gestionnaire temps réel ; les tâches Celery de synchronisation
+        n'effectuent plus de relevé complet tant que le flux est actif.
+        """
+        if self.async_client.use_mock:
+            self.is_monitoring = True
+            logger.info("Client GNS3 simulé : monitoring en mode polling")
+            return
+        
+        # Import différé : realtime_event_system importe ce module
+        from .realtime_event_system import publish_gns3_event_realtime
+        self.register_event_callback(publish_gns3_event_realtime)
+        
+        self.notification_stream = GNS3NotificationStream(
+            self.async_client,
+            handler=self.apply_notification,
+            backfill=self._backfill_notifications,
+            heartbeat_timeout=getattr(settings, 'GNS3_NOTIFICATION_HEARTBEAT', 30)
+        )
+        self.notification_stream.start()
+        for project_id, project in (self.current_state.projects if self.current_state else {}).items():
+            if project.get('status') == 'opened':
+                self.notification_stream.watch_project(project_id)
+        
         self.is_monitoring = True
-        logger.info("Monitoring WebSocket préparé (polling mode)")
+        logger.info("Monitoring GNS3 démarré (flux de notifications)")
+
+    async def stop_monitoring(self):
+        """Arrête le flux de notifications GNS3."""
+        if self.notification_stream:
+            await self.notification_stream.stop()
+            self.notification_stream = None
+        if self._state_flush_handle:
+            self._state_flush_handle.cancel()
+            self._write_state_cache()
+        cache.delete(NOTIFICATIONS_LIVE_KEY)
+        self.is_monitoring = False
+
+    async def apply_notification(self, notification: Dict[str, Any], project_id: Optional[str] = None):
+        """
+        Applique une notification GNS3 à l'état courant.
+        
+        L'état en mémoire et les clés de cache du nœud, du lien ou du projet
+        concerné sont mis à jour sur place, puis l'événement correspondant
+        est diffusé.
+        
+        Args:
+            notification: Notification GNS3 ({'action': ..., 'event': {...}})
+            project_id: Projet du flux ayant reçu la notification
+        """
+        # Chaque message (ping compris) prouve que le flux est vivant
+        if self.notification_stream:
+            cache.set(NOTIFICATIONS_LIVE_KEY, True, timeout=int(self.notification_stream.heartbeat_timeout * 2))
+        
+        action = notification.get('action', '')
+        payload = notification.get('event') or {}
+        if not self.current_state or not isinstance(payload, dict):
+            return
+        
+        project_id = payload.get('project_id') or project_id
+        kind = action.split('.', 1)[0]
+        if kind == 'node':
+            event = self._apply_node_notification(action, project_id, payload)
+        elif kind == 'link':
+            event = self._apply_link_notification(action, project_id, payload)
+        elif kind == 'project':
+            event = self._apply_project_notification(action, project_id, payload)
+        else:
+            # ping, compute.*, log.* : pas de changement de topologie
+            return
+        
+        if event is None:
+            return
+        
+        self.current_state.last_update = timezone.now()
+        self.stats['last_activity'] = self.current_state.last_update
+        self._schedule_state_flush()
+        await self._broadcast_event(event)
+
+    def _apply_node_notification(self, action: str, project_id: str,
+                                 payload: Dict[str, Any]) -> Optional[GNS3Event]:
+        """Applique node.created / node.updated / node.deleted."""
+        node_id = payload.get('node_id')
+        if not node_id:
+            return None
+        
+        state = self.current_state
+        previous = state.nodes.get(node_id)
+        project = state.projects.get(project_id)
+        
+        if action == 'node.deleted':
+            state.nodes.pop(node_id, None)
+            if project is not None:
+                project.get('nodes', {}).pop(node_id, None)
+            self.state_cache.delete_nodes([node_id])
+            return self._node_event(GNS3EventType.NODE_DELETED, project_id, payload, previous, action)
+        
+        node = {**(previous or {}), **payload}
+        if project is not None:
+            project.setdefault('nodes', {})[node_id] = dict(node)
+        node['project_id'] = project_id
+        state.nodes[node_id] = node
+        self.state_cache.write_nodes([node])
+        
+        old_status = previous.get('status') if previous else None
+        if previous is None:
+            event_type = GNS3EventType.NODE_CREATED
+        elif old_status != node.get('status'):
+            event_type = self._status_event_type(node.get('status'))
+        else:
+            event_type = GNS3EventType.NODE_UPDATED
+        return self._node_event(event_type, project_id, node, previous, action)
+
+    def _apply_link_notification(self, action: str, project_id: str,
+                                 payload: Dict[str, Any]) -> Optional[GNS3Event]:
+        """Applique link.created / link.updated / link.deleted."""
+        link_id = payload.get('link_id')
+        if not link_id:
+            return None
+        
+        if action == 'link.deleted':
+            self.current_state.links.pop(link_id, None)
+            event_type = GNS3EventType.LINK_DELETED
+        else:
+            previous = self.current_state.links.get(link_id)
+            self.current_state.links[link_id] = {**(previous or {}), **payload, 'project_id': project_id}
+            event_type = GNS3EventType.LINK_CREATED if previous is None else GNS3EventType.LINK_UPDATED
+        
+        return GNS3Event(
+            event_type=event_type,
+            project_id=project_id,
+            data={'link_id': link_id, 'link': payload, 'action': action},
+            timestamp=timezone.now()
+        )
+
+    def _apply_project_notification(self, action: str, project_id: str,
+                                    payload: Dict[str, Any]) -> Optional[GNS3Event]:
+        """Applique les notifications de projet (création, mise à jour, ouverture, fermeture, suppression)."""
+        if not project_id:
+            return None
+        
+        state = self.current_state
+        if action == 'project.deleted':
+            state.projects.pop(project_id, None)
+            node_ids = [node_id for node_id, node in state.nodes.items() if node.get('project_id') == project_id]
+            for node_id in node_ids:
+                del state.nodes[node_id]
+            for link_id in [link_id for link_id, link in state.links.items() if link.get('project_id') == project_id]:
+                del state.links[link_id]
+            self.state_cache.delete_nodes(node_ids)
+            self.state_cache.delete_project(project_id)
+            event_type = GNS3EventType.PROJECT_DELETED
+        else:
+            previous = state.projects.get(project_id)
+            project = {'nodes': {}, **(previous or {}), **payload}
+            state.projects[project_id] = project
+            project.setdefault('project_id', project_id)
+            self.state_cache.write_project(project)
+            
+            status = project.get('status')
+            if action == 'project.closed' or (previous and previous.get('status') != status and status == 'closed'):
+                event_type = GNS3EventType.PROJECT_CLOSED
+            elif action == 'project.opened' or (previous and previous.get('status') != status and status == 'opened'):
+                event_type = GNS3EventType.PROJECT_OPENED
+            elif previous is None:
+                event_type = GNS3EventType.PROJECT_CREATED
+            else:
+                event_type = GNS3EventType.PROJECT_UPDATED
+        
+        # Les nœuds et liens ne sont notifiés que sur le flux du projet
+        if self.notification_stream:
+            if event_type == GNS3EventType.PROJECT_OPENED:
+                self.notification_stream.watch_project(project_id)
+            elif event_type in (GNS3EventType.PROJECT_CLOSED, GNS3EventType.PROJECT_DELETED):
+                self.notification_stream.unwatch_project(project_id)
+        
+        return GNS3Event(
+            event_type=event_type,
+            project_id=project_id,
+            data={'project_name': payload.get('name'), 'status': payload.get('status'), 'action': action},
+            timestamp=timezone.now()
+        )
+
+    @staticmethod
+    def _status_event_type(status: Optional[str]) -> GNS3EventType:
+        return {
+            'started': GNS3EventType.NODE_STARTED,
+            'stopped': GNS3EventType.NODE_STOPPED,
+            'suspended': GNS3EventType.NODE_SUSPENDED
+        }.get(status, GNS3EventType.NODE_UPDATED)
+
+    @staticmethod
+    def _node_event(event_type: GNS3EventType, project_id: str, node: Dict[str, Any],
+                    previous: Optional[Dict[str, Any]], action: str) -> GNS3Event:
+        return GNS3Event(
+            event_type=event_type,
+            project_id=project_id,
+            data={
+                'node_id': node.get('node_id'),
+                'node_name': node.get('name', 'Unknown'),
+                'old_status': previous.get('status', 'unknown') if previous else None,
+                'new_status': node.get('status'),
+                'action': action
+            },
+            timestamp=timezone.now()
+        )
+
+    async def _backfill_notifications(self, project_id: Optional[str] = None):
+        """
+        Rattrape les changements manqués pendant une coupure du flux.
+        
+        La portée concernée (tout le contrôleur, ou un projet) est relue,
+        puis un événement est diffusé pour chaque nœud dont le statut a
+        changé entre-temps.
+        
+        Args:
+            project_id: Projet à relire (None pour l'ensemble)
+        """
+        previous = dict(self.current_state.nodes) if self.current_state else {}
+        
+        if project_id is None:
+            await self._load_initial_state()
+        else:
+            nodes, links = await asyncio.gather(
+                self.async_client.get_nodes(project_id),
+                self.async_client.list_links(project_id)
+            )
+            self.stats['api_calls'] += 2
+            state = self.current_state
+            for node_id in [node_id for node_id, node in state.nodes.items() if node.get('project_id') == project_id]:
+                del state.nodes[node_id]
+            for link_id in [link_id for link_id, link in state.links.items() if link.get('project_id') == project_id]:
+                del state.links[link_id]
+            for node in nodes:
+                state.nodes[node['node_id']] = {**node, 'project_id': project_id}
+            self.state_cache.write_nodes(state.nodes[node['node_id']] for node in nodes)
+            for link in links:
+                state.links[link.get('link_id')] = {**link, 'project_id': project_id}
+            if project_id in state.projects:
+                state.projects[project_id]['nodes'] = {node['node_id']: node for node in nodes}
+            state.last_update = timezone.now()
+            self._schedule_state_flush()
+        
+        if not self.current_state:
+            return
+        
+        if project_id is None and self.notification_stream:
+            # Projets ouverts ou fermés pendant la coupure
+            for pid, project in self.current_state.projects.items():
+                if project.get('status') == 'opened':
+                    self.notification_stream.watch_project(pid)
+            for pid in self.notification_stream.watched_projects:
+                if self.current_state.projects.get(pid, {}).get('status') != 'opened':
+                    self.notification_stream.unwatch_project(pid)
+        
+        events = []
+        for node_id, node in self.current_state.nodes.items():
+            before = previous.get(node_id)
+            if project_id is not None and node.get('project_id') != project_id:
+                continue
+            if before is None:
+                events.append(self._node_event(GNS3EventType.NODE_CREATED, node['project_id'], node, None, 'backfill'))
+            elif before.get('status') != node.get('status'):
+                events.append(self._node_event(self._status_event_type(node.get('status')), node['project_id'],
+                                               node, before, 'backfill'))
+        for node_id, before in previous.items():
+            if node_id not in self.current_state.nodes and project_id in (None, before.get('project_id')):
+                self.state_cache.delete_nodes([node_id])
+                events.append(self._node_event(GNS3EventType.NODE_DELETED, before.get('project_id'), before,
+                                               before, 'backfill'))
+        
+        for event in events:
+            await self._broadcast_event(event)
+        logger.info(f"Rattrapage des notifications GNS3 ({project_id or 'contrôleur'}): "
+                    f"{len(events)} changement(s)")
 
     def _register_inter_module_callbacks(self):
         """Enregistre les callbacks pour les messages inter-modules."""
@@ -606,7 +1125,8 @@ class GNS3CentralService:
             },
             'monitoring': {
                 'active': self.is_monitoring,
-                'websocket_connected': self.websocket_connection is not None
+                'websocket_connected': bool(self.notification_stream and self.notification_stream.is_connected),
+                'notifications': self.notification_stream.get_status() if self.notification_stream else None
             },
             'statistics': {
                 **self.stats,
@@ -614,10 +1134,11 @@ class GNS3CentralService:
                 'last_activity_ago': (timezone.now() - self.stats['last_activity']).total_seconds() 
                     if self.stats['last_activity'] else None
             },
+            'api_latency': self.async_client.get_metrics(),
             'cache': {
                 'prefix': self.cache_prefix,
                 'ttl_seconds': self.state_ttl,
-                'network_state_cached': cache.get(f"{self.cache_prefix}:network_state") is not None
+                'network_state_cached': cache.get(self.state_cache.state_key) is not None
             },
             'callbacks': {
                 'registered_callbacks': len(self.event_callbacks)
@@ -254,15 +254,20 @@ class GNS3IntegrationService:
                 if not project_id:
                     continue
                     
-                # Récupérer les nœuds du projet
+                # Récupérer les nœuds et les liens du projet
                 nodes = self.gns3_client.get_nodes(project_id) or []
+                links = self.gns3_client.list_links(project_id)
+                if not isinstance(links, list):
+                    links = []
                 
                 project_data = {
                     'project_id': project_id,
                     'name': project.get('name', 'Projet sans nom'),
                     'status': project.get('status', 'unknown'),
                     'nodes': nodes,
-                    'node_count': len(nodes)
+                    'node_count': len(nodes),
+                    'links': links,
+                    'link_count': len(links)
                 }
                 
                 topology_data.append(project_data)
@@ -0,0 +1,214 @@
+"""
+Consommation du flux de notifications du contrôleur GNS3.
+
+Le contrôleur publie ses changements d'état (nœuds, liens, projets) sur
+un flux WebSocket, ou à défaut sur un flux HTTP découpé en lignes JSON :
+    /v2/notifications/ws                       (contrôleur, projets)
+    /v2/projects/<project_id>/notifications/ws (nœuds et liens du projet)
+Chaque notification a la forme {'action': 'node.updated', 'event': {...}}.
+
+Un flux est maintenu pour le contrôleur et un par projet ouvert. Après
+une coupure, la reconnexion suit un délai exponentiel ; une fois le flux
+rétabli, la portée concernée est relue en entier (rattrapage) avant de
+traiter les notifications suivantes, si bien qu'aucun changement survenu
+pendant la coupure n'est perdu. Un flux resté muet plus longtemps que
+`heartbeat_timeout` (le contrôleur émet un 'ping' périodique) est
+considéré comme rompu.
+"""
+import asyncio
+import json
+import logging
+import random
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Clé de cache indiquant qu'un flux de notifications est actif
+NOTIFICATIONS_LIVE_KEY = "gns3_central:notifications:live"
+
+# Portée du flux du contrôleur (les flux de projet sont indexés par project_id)
+CONTROLLER_SCOPE = None
+
+NotificationHandler = Callable[[Dict[str, Any], Optional[str]], Awaitable[None]]
+BackfillHandler = Callable[[Optional[str]], Awaitable[None]]
+
+
+class StreamClosed(Exception):
+    """Le flux de notifications s'est interrompu."""
+
+
+class GNS3NotificationStream:
+    """
+    Consommateur longue durée des notifications GNS3.
+
+    Les notifications sont transmises, dans leur ordre d'arrivée pour une
+    même portée, à `handler(notification, project_id)`. `backfill(project_id)`
+    relit l'état d'une portée (None pour le contrôleur) après une reconnexion.
+    """
+
+    def __init__(self, client, handler: NotificationHandler, backfill: BackfillHandler,
+                 heartbeat_timeout: float = 30.0, reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 30.0):
+        """
+        Initialise le consommateur.
+
+        Args:
+            client: Client GNS3 asynchrone (AsyncGNS3Client) fournissant la session
+            handler: Coroutine appelée pour chaque notification
+            backfill: Coroutine de rattrapage appelée après une reconnexion
+            heartbeat_timeout: Silence maximal avant de considérer le flux rompu (secondes)
+            reconnect_delay: Délai initial avant reconnexion (secondes)
+            max_reconnect_delay: Délai maximal entre deux tentatives (secondes)
+        """
+        self.client = client
+        self.handler = handler
+        self.backfill = backfill
+        self.heartbeat_timeout = heartbeat_timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        # 'ws' tant que le serveur accepte le WebSocket, 'http' sinon
+        self.transport = 'ws'
+        self._tasks: Dict[Optional[str], asyncio.Task] = {}
+        self._connected: Dict[Optional[str], bool] = {}
+        self.stats = {
+            'notifications': 0,
+            'reconnects': 0,
+            'backfills': 0,
+            'errors': 0
+        }
+
+    # ==================== CYCLE DE VIE ====================
+
+    def start(self):
+        """Démarre le flux du contrôleur."""
+        self._watch(CONTROLLER_SCOPE)
+
+    async def stop(self):
+        """Arrête tous les flux."""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        self._connected.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def watch_project(self, project_id: str):
+        """Ouvre le flux d'un projet (sans effet s'il est déjà suivi)."""
+        if project_id:
+            self._watch(project_id)
+
+    def unwatch_project(self, project_id: str):
+        """Ferme le flux d'un projet."""
+        task = self._tasks.pop(project_id, None)
+        self._connected.pop(project_id, None)
+        if task is not None:
+            task.cancel()
+
+    @property
+    def is_running(self) -> bool:
+        return CONTROLLER_SCOPE in self._tasks
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected.get(CONTROLLER_SCOPE, False)
+
+    @property
+    def watched_projects(self):
+        return [scope for scope in self._tasks if scope is not CONTROLLER_SCOPE]
+
+    def get_status(self) -> Dict[str, Any]:
+        """État des flux et compteurs."""
+        return {
+            'running': self.is_running,
+            'connected': self.is_connected,
+            'transport': self.transport,
+            'watched_projects': len(self.watched_projects),
+            **self.stats
+        }
+
+    def _watch(self, scope: Optional[str]):
+        task = self._tasks.get(scope)
+        if task is None or task.done():
+            self._tasks[scope] = asyncio.create_task(self._run(scope))
+
+    # ==================== CONSOMMATION ====================
+
+    async def _run(self, scope: Optional[str]):
+        """Boucle de connexion d'une portée : lecture, reconnexion, rattrapage."""
+        delay = self.reconnect_delay
+        needs_backfill = False
+        while True:
+            try:
+                async for notification in self._open(scope):
+                    if notification is None:
+                        # Flux établi : rattraper ce qui a été manqué pendant la coupure
+                        self._connected[scope] = True
+                        delay = self.reconnect_delay
+                        if needs_backfill:
+                            self.stats['backfills'] += 1
+                            await self.backfill(scope)
+                        continue
+                    self.stats['notifications'] += 1
+                    try:
+                        await self.handler(notification, scope)
+                    except Exception as e:
+                        self.stats['errors'] += 1
+                        logger.error(f"Erreur lors du traitement d'une notification GNS3: {e}")
+                raise StreamClosed("fin du flux")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['reconnects'] += 1
+                logger.warning(f"Flux de notifications GNS3 interrompu ({scope or 'contrôleur'}): {e}")
+
+            self._connected[scope] = False
+            needs_backfill = True
+            await asyncio.sleep(delay * (0.5 + random.random() / 2))
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _endpoint(self, scope: Optional[str]) -> str:
+        path = 'notifications' if scope is CONTROLLER_SCOPE else f'projects/{scope}/notifications'
+        return path + '/ws' if self.transport == 'ws' else path
+
+    async def _open(self, scope: Optional[str]):
+        """
+        Ouvre le flux d'une portée et produit ses notifications.
+
+        Produit d'abord None une fois la connexion établie.
+        """
+        session = self.client._get_session()
+        url = f"{self.client.base_url}{self._endpoint(scope)}"
+
+        if self.transport == 'ws':
+            try:
+                ws = await session.ws_connect(url, heartbeat=self.heartbeat_timeout / 2)
+            except aiohttp.WSServerHandshakeError as e:
+                if e.status in (400, 404, 405):
+                    # Serveur sans WebSocket : basculer sur le flux HTTP
+                    logger.info("Notifications GNS3 WebSocket indisponibles, utilisation du flux HTTP")
+                    self.transport = 'http'
+                raise
+            async with ws:
+                yield None
+                while True:
+                    message = await asyncio.wait_for(ws.receive(), timeout=self.heartbeat_timeout)
+                    if message.type == aiohttp.WSMsgType.TEXT:
+                        yield json.loads(message.data)
+                    elif message.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED,
+                                          aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.ERROR):
+                        raise StreamClosed(f"WebSocket fermé ({message.type.name})")
+        else:
+            timeout = aiohttp.ClientTimeout(total=None, sock_read=self.heartbeat_timeout)
+            async with session.get(url, timeout=timeout) as response:
+                response.raise_for_status()
+                yield None
+                async for line in response.content:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
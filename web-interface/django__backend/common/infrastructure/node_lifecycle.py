@@ -0,0 +1,139 @@
+"""
+Planification des opérations groupées sur les nœuds GNS3.
+
+Les nœuds d'un projet sont répartis en vagues : une vague ne démarre
+qu'une fois la précédente terminée, et les nœuds d'une même vague sont
+traités en parallèle. L'ordre suit le rôle des nœuds (équipements de
+niveau 2, puis routeurs, appliances et enfin hôtes) ; lorsque les liens
+sont fournis, seules les dépendances réelles sont conservées : un hôte
+attend les routeurs de son segment, pas ceux de tout le projet.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Action groupée -> (point d'API GNS3, statut attendu)
+NODE_ACTIONS = {
+    'start': ('start', 'started'),
+    'stop': ('stop', 'stopped'),
+    'restart': ('reload', 'started'),
+    'suspend': ('suspend', 'suspended'),
+}
+# Actions exécutées dans l'ordre inverse des vagues (hôtes d'abord)
+REVERSED_ACTIONS = frozenset({'stop', 'suspend'})
+
+# Rangs de démarrage
+INFRASTRUCTURE_TIER = 0
+ROUTER_TIER = 1
+APPLIANCE_TIER = 2
+HOST_TIER = 3
+
+NODE_TYPE_TIERS = {
+    'cloud': INFRASTRUCTURE_TIER,
+    'nat': INFRASTRUCTURE_TIER,
+    'ethernet_switch': INFRASTRUCTURE_TIER,
+    'ethernet_hub': INFRASTRUCTURE_TIER,
+    'frame_relay_switch': INFRASTRUCTURE_TIER,
+    'atm_switch': INFRASTRUCTURE_TIER,
+    'dynamips': ROUTER_TIER,
+    'iou': ROUTER_TIER,
+    'qemu': APPLIANCE_TIER,
+    'virtualbox': APPLIANCE_TIER,
+    'vmware': APPLIANCE_TIER,
+    'docker': APPLIANCE_TIER,
+    'vpcs': HOST_TIER,
+    'traceng': HOST_TIER,
+}
+
+# Nœuds de niveau 2 : un segment traverse ces équipements
+L2_NODE_TYPES = frozenset({'ethernet_switch', 'ethernet_hub', 'frame_relay_switch', 'atm_switch'})
+
+
+def node_tier(node: Dict[str, Any]) -> int:
+    """Rang de démarrage d'un nœud d'après son type GNS3."""
+    return NODE_TYPE_TIERS.get(node.get('node_type'), APPLIANCE_TIER)
+
+
+def _link_endpoints(link: Dict[str, Any]) -> List[str]:
+    return [endpoint.get('node_id') for endpoint in link.get('nodes') or [] if endpoint.get('node_id')]
+
+
+def segment_neighbours(links: Iterable[Dict[str, Any]],
+                       node_types: Dict[str, Optional[str]]) -> Dict[str, Set[str]]:
+    """
+    Voisins de chaque nœud, en traversant les équipements de niveau 2.
+
+    Deux nœuds reliés au même commutateur (ou à une chaîne de commutateurs)
+    sont voisins ; les commutateurs restent voisins des nœuds qui y sont
+    raccordés.
+
+    Args:
+        links: Liens GNS3
+        node_types: Type de chaque nœud ({node_id: node_type})
+
+    Returns:
+        {node_id: voisins}
+    """
+    adjacency: Dict[str, Set[str]] = {}
+    for link in links:
+        endpoints = _link_endpoints(link)
+        for node_id in endpoints:
+            adjacency.setdefault(node_id, set()).update(other for other in endpoints if other != node_id)
+
+    neighbours: Dict[str, Set[str]] = {}
+    for node_id, direct in adjacency.items():
+        reached = set(direct)
+        pending = [other for other in direct if node_types.get(other) in L2_NODE_TYPES]
+        visited = set(pending)
+        while pending:
+            for other in adjacency.get(pending.pop(), ()):
+                reached.add(other)
+                if node_types.get(other) in L2_NODE_TYPES and other not in visited:
+                    visited.add(other)
+                    pending.append(other)
+        reached.discard(node_id)
+        neighbours[node_id] = reached
+    return neighbours
+
+
+def plan_waves(nodes: List[Dict[str, Any]], links: Optional[Iterable[Dict[str, Any]]] = None,
+               topology_nodes: Optional[Iterable[Dict[str, Any]]] = None) -> List[List[str]]:
+    """
+    Répartit des nœuds en vagues de démarrage.
+
+    Sans liens, une vague par rang. Avec les liens, un nœud dépend des
+    nœuds de rang inférieur de son segment, et sa vague est la première
+    qui suit toutes ses dépendances ; les dépendances allant toujours vers
+    un rang inférieur, le graphe est acyclique.
+
+    Args:
+        nodes: Nœuds à traiter
+        links: Liens du projet (optionnel)
+        topology_nodes: Tous les nœuds du projet, pour reconnaître les
+            commutateurs hors sélection (par défaut `nodes`)
+
+    Returns:
+        Listes d'identifiants de nœuds, dans l'ordre de démarrage
+    """
+    tiers = {node['node_id']: node_tier(node) for node in nodes}
+
+    if links is None:
+        waves: Dict[int, List[str]] = {}
+        for node in nodes:
+            waves.setdefault(tiers[node['node_id']], []).append(node['node_id'])
+        return [waves[tier] for tier in sorted(waves)]
+
+    node_types = {node['node_id']: node.get('node_type') for node in (topology_nodes or nodes)}
+    node_types.update({node['node_id']: node.get('node_type') for node in nodes})
+    neighbours = segment_neighbours(links, node_types)
+
+    levels: Dict[str, int] = {}
+    for node_id in sorted(tiers, key=tiers.get):
+        dependencies = [
+            other for other in neighbours.get(node_id, ())
+            if other in tiers and tiers[other] < tiers[node_id]
+        ]
+        levels[node_id] = 1 + max((levels[other] for other in dependencies), default=-1)
+
+    waves = {}
+    for node in nodes:
+        waves.setdefault(levels[node['node_id']], []).append(node['node_id'])
+    return [waves[level] for level in sorted(waves)]
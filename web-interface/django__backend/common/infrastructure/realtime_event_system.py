@@ -6,17 +6,23 @@ Ce module implémente un système complet d'événements temps réel utilisant :
 - Redis Pub/Sub pour la distribution d'événements
 - Channels Django pour la gestion WebSocket
 - Queue système pour la gestion des événements asynchrones
+
+Toutes les opérations Redis passent par un client asynchrone unique
+adossé à un pool de connexions : la mise en file, la publication Pub/Sub
+et la trace d'un événement partent dans un seul pipeline, et les files
+sont drainées par un BRPOP bloquant plutôt que par un sondage périodique.
+Les envois vers Channels sont regroupés en micro-lots.
 """
 
 import asyncio
 import json
 import logging
+import re
 import uuid
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Callable, Set
 from dataclasses import dataclass, asdict
 from enum import Enum
-from concurrent.futures import ThreadPoolExecutor
 
 from django.core.cache import cache
 from django.utils import timezone
@@ -27,6 +33,7 @@ from redis import Redis
 import redis.asyncio as aioredis
 
 from .gns3_central_service import GNS3Event, GNS3EventType
+from .topic_fanout import CoalescingSender
 from .ubuntu_notification_service import ubuntu_notification_service
 
 logger = logging.getLogger(__name__)
@@ -77,14 +84,88 @@ class RealtimeEvent:
             'correlation_id': self.correlation_id,
             'target_modules': self.target_modules or []
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RealtimeEvent':
+        """Reconstruit un événement sérialisé par `to_dict`."""
+        return cls(
+            event_id=data['event_id'],
+            event_type=data['event_type'],
+            source=data['source'],
+            data=data.get('data') or {},
+            timestamp=datetime.fromisoformat(data['timestamp']),
+            priority=EventPriority(data.get('priority', EventPriority.NORMAL.value)),
+            delivery_status=EventDeliveryStatus(data.get('delivery_status', EventDeliveryStatus.PENDING.value)),
+            retry_count=data.get('retry_count', 0),
+            target_modules=data.get('target_modules') or None,
+            correlation_id=data.get('correlation_id')
+        )
+
+
+# Abonnement requis par type d'événement
+EVENT_SUBSCRIPTIONS = {
+    'node.started': 'node_status',
+    'node.stopped': 'node_status',
+    'node.suspended': 'node_status',
+    'node.created': 'topology_changes',
+    'node.deleted': 'topology_changes',
+    'node.updated': 'topology_changes',
+    'project.opened': 'project_events',
+    'project.closed': 'project_events',
+    'project.created': 'project_events',
+    'project.deleted': 'project_events',
+    'topology.changed': 'topology_changes',
+    'link.created': 'topology_changes',
+    'link.deleted': 'topology_changes',
+}
+
+EVENT_CATEGORIES = ['node_status', 'topology_changes', 'project_events', 'all_events']
+
+# Abonnements ciblés : "project:<project_id>"
+SCOPED_SUBSCRIPTIONS = ('project',)
+# Identifiant utilisable dans un nom de groupe Channels
+SUBSCRIPTION_ID_PATTERN = re.compile(r'[A-Za-z0-9_.-]{1,64}')
+
+
+def subscription_group(subscription: str) -> str:
+    """Groupe Channels d'un abonnement ('node_status', 'project:<id>'...)."""
+    return "gns3_events." + subscription.replace(':', '.')
+
+
+def event_subscriptions(event_data: Dict[str, Any]) -> List[str]:
+    """Abonnements auxquels un événement est diffusé."""
+    subscriptions = ['all_events']
+    category = EVENT_SUBSCRIPTIONS.get(event_data.get('event_type', ''))
+    if category:
+        subscriptions.append(category)
+    data = event_data.get('data') or {}
+    for scope in SCOPED_SUBSCRIPTIONS:
+        subscription = f"{scope}:{data.get(f'{scope}_id') or ''}"
+        if is_valid_subscription(subscription):
+            subscriptions.append(subscription)
+    return subscriptions
+
+
+def is_valid_subscription(subscription: str) -> bool:
+    """
+    Vérifie un abonnement demandé par un client : catégorie connue, ou
+    abonnement ciblé dont l'identifiant est admis dans un nom de groupe
+    Channels (même alphabet que `TopicFanoutHub.group_name`).
+    """
+    if subscription in EVENT_CATEGORIES:
+        return True
+    scope, _, identifier = subscription.partition(':')
+    return scope in SCOPED_SUBSCRIPTIONS and SUBSCRIPTION_ID_PATTERN.fullmatch(identifier) is not None
 
 
 class GNS3WebSocketConsumer(AsyncWebsocketConsumer):
     """
     Consommateur WebSocket pour les événements GNS3 temps réel.
     
-    Gère les connexions WebSocket des clients et distribue les événements
-    en fonction des abonnements de chaque connexion.
+    Gère les connexions WebSocket des clients. Chaque abonnement correspond
+    à un groupe Channels (`gns3_events.<abonnement>`) : la connexion ne reçoit
+    que les événements qui la concernent, et les mises à jour de statut d'un
+    même nœud en attente d'envoi sont fusionnées.
     """
     
     def __init__(self, *args, **kwargs):
@@ -93,16 +174,15 @@ class GNS3WebSocketConsumer(AsyncWebsocketConsumer):
         self.user_subscriptions: Set[str] = set()
         self.connection_id = str(uuid.uuid4())
         self.last_heartbeat = timezone.now()
+        self.sender = CoalescingSender(self._send_json)
+        # Un événement reçu par plusieurs groupes n'est transmis qu'une fois
+        self._recent_event_ids: Dict[str, None] = {}
+        self.recent_event_ids_size = 512
         
     async def connect(self):
         """Accepte la connexion WebSocket."""
         try:
-            # Rejoindre le groupe d'événements GNS3
-            await self.channel_layer.group_add(
-                self.room_group_name,
-                self.channel_name
-            )
-            
+            # Les groupes d'événements sont rejoints à l'abonnement
             await self.accept()
             
             # Enregistrer la connexion
@@ -113,9 +193,7 @@ class GNS3WebSocketConsumer(AsyncWebsocketConsumer):
                 'type': 'connection_established',
                 'connection_id': self.connection_id,
                 'message': 'Connexion WebSocket GNS3 établie',
-                'available_subscriptions': [
-                    'node_status', 'topology_changes', 'project_events', 'all_events'
-                ],
+                'available_subscriptions': EVENT_CATEGORIES + ['project:<project_id>'],
                 'timestamp': timezone.now().isoformat()
             }))
             
@@ -128,11 +206,10 @@ class GNS3WebSocketConsumer(AsyncWebsocketConsumer):
     async def disconnect(self, close_code):
         """Ferme la connexion WebSocket."""
         try:
-            # Quitter le groupe d'événements
-            await self.channel_layer.group_discard(
-                self.room_group_name,
-                self.channel_name
-            )
+            # Quitter les groupes d'abonnement
+            for subscription in self.user_subscriptions:
+                await self.channel_layer.group_discard(subscription_group(subscription), self.channel_name)
+            await self.sender.close()
             
             # Désenregistrer la connexion
             await self._unregister_connection()
@@ -181,7 +258,8 @@ class GNS3WebSocketConsumer(AsyncWebsocketConsumer):
         subscriptions = data.get('subscriptions', [])
         
         for subscription in subscriptions:
-            if subscription in ['node_status', 'topology_changes', 'project_events', 'all_events']:
+            if is_valid_subscription(subscription) and subscription not in self.user_subscriptions:
+                await self.channel_layer.group_add(subscription_group(subscription), self.channel_name)
                 self.user_subscriptions.add(subscription)
         
         await self.send(text_data=json.dumps({
@@ -198,7 +276,9 @@ class GNS3WebSocketConsumer(AsyncWebsocketConsumer):
         subscriptions = data.get('subscriptions', [])
         
         for subscription in subscriptions:
-            self.user_subscriptions.discard(subscription)
+            if subscription in self.user_subscriptions:
+                await self.channel_layer.group_discard(subscription_group(subscription), self.channel_name)
+                self.user_subscriptions.discard(subscription)
         
         await self.send(text_data=json.dumps({
             'type': 'unsubscription_confirmed',
@@ -302,42 +382,53 @@ class GNS3WebSocketConsumer(AsyncWebsocketConsumer):
     
     # Gestionnaires d'événements du group
     async def gns3_event(self, event):
-        """Reçoit et filtre les événements GNS3."""
-        event_data = event['event_data']
-        event_type = event_data.get('event_type', '')
-        
-        # Filtrer selon les abonnements
-        if self._should_send_event(event_type):
-            await self.send(text_data=json.dumps({
-                'type': 'gns3_event',
-                'event_data': event_data,
-                'timestamp': timezone.now().isoformat()
-            }))
+        """Reçoit un événement GNS3 d'un groupe d'abonnement."""
+        self._queue_event(event['event_data'], timezone.now().isoformat())
     
-    def _should_send_event(self, event_type: str) -> bool:
-        """Détermine si l'événement doit être envoyé au client."""
-        if 'all_events' in self.user_subscriptions:
-            return True
+    async def gns3_events_batch(self, event):
+        """Reçoit un lot d'événements GNS3 d'un groupe d'abonnement."""
+        timestamp = timezone.now().isoformat()
+        for event_data in event['events']:
+            self._queue_event(event_data, timestamp)
+    
+    def _queue_event(self, event_data: Dict[str, Any], timestamp: str):
+        """
+        Met un événement en file d'envoi.
         
-        # Mapping des types d'événements aux abonnements
-        event_mapping = {
-            'node.started': 'node_status',
-            'node.stopped': 'node_status',
-            'node.suspended': 'node_status',
-            'node.created': 'topology_changes',
-            'node.deleted': 'topology_changes',
-            'node.updated': 'topology_changes',
-            'project.opened': 'project_events',
-            'project.closed': 'project_events',
-            'project.created': 'project_events',
-            'project.deleted': 'project_events',
-            'topology.changed': 'topology_changes',
-            'link.created': 'topology_changes',
-            'link.deleted': 'topology_changes',
-        }
+        Les changements de statut d'un nœud se remplacent tant qu'ils n'ont
+        pas été envoyés : un client lent reçoit le dernier statut.
+        """
+        if not self._should_send_event(event_data) or self._already_sent(event_data.get('event_id')):
+            return
         
-        required_subscription = event_mapping.get(event_type)
-        return required_subscription in self.user_subscriptions
+        node_id = (event_data.get('data') or {}).get('node_id')
+        if EVENT_SUBSCRIPTIONS.get(event_data.get('event_type')) == 'node_status' and node_id:
+            key = f"node_status:{node_id}"
+        else:
+            key = event_data.get('event_id') or str(uuid.uuid4())
+        
+        self.sender.push(key, {
+            'type': 'gns3_event',
+            'event_data': event_data,
+            'timestamp': timestamp
+        })
+    
+    def _already_sent(self, event_id: Optional[str]) -> bool:
+        if not event_id:
+            return False
+        if event_id in self._recent_event_ids:
+            return True
+        self._recent_event_ids[event_id] = None
+        if len(self._recent_event_ids) > self.recent_event_ids_size:
+            self._recent_event_ids.pop(next(iter(self._recent_event_ids)))
+        return False
+    
+    async def _send_json(self, message: Dict[str, Any]):
+        await self.send(text_data=json.dumps(message))
+    
+    def _should_send_event(self, event_data: Dict[str, Any]) -> bool:
+        """Détermine si l'événement correspond à un abonnement de la connexion."""
+        return any(subscription in self.user_subscriptions for subscription in event_subscriptions(event_data))
 
 
 class RealtimeEventManager:
@@ -360,7 +451,11 @@ class RealtimeEventManager:
             'decode_responses': True
         }
         
+        # Client synchrone (statistiques) et client asynchrone partagé (pool)
         self.redis_client = Redis(**self.redis_config)
+        self.redis_max_connections = getattr(settings, 'REDIS_MAX_CONNECTIONS', 20)
+        self._redis: Optional[aioredis.Redis] = None
+        self._redis_loop: Optional[asyncio.AbstractEventLoop] = None
         self.event_queues = {
             EventPriority.CRITICAL: f"gns3_events:critical",
             EventPriority.HIGH: f"gns3_events:high",
@@ -378,8 +473,17 @@ class RealtimeEventManager:
             'last_event_time': None
         }
         
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        # Micro-lots vers Channels
+        self.websocket_batch_size = 50
+        self.websocket_batch_window = 0.01  # secondes
+        self._websocket_batch: List[Dict[str, Any]] = []
+        self._websocket_flush_handle: Optional[asyncio.TimerHandle] = None
+        
+        # Événements conservés pour la traçabilité (secondes)
+        self.event_trace_ttl = 3600
+        
         self.is_running = False
+        self._tasks: List[asyncio.Task] = []
         
         logger.info("Gestionnaire d'événements temps réel GNS3 initialisé")
     
@@ -391,18 +495,50 @@ class RealtimeEventManager:
         self.is_running = True
         
         # Démarrer les workers de traitement des événements
-        asyncio.create_task(self._process_event_queues())
-        asyncio.create_task(self._cleanup_expired_events())
-        asyncio.create_task(self._monitor_connections())
+        self._tasks = [
+            asyncio.create_task(self._process_event_queues()),
+            asyncio.create_task(self._cleanup_expired_events()),
+            asyncio.create_task(self._monitor_connections())
+        ]
         
         logger.info("Gestionnaire d'événements temps réel démarré")
     
     async def stop(self):
         """Arrête le gestionnaire d'événements."""
         self.is_running = False
-        self.executor.shutdown(wait=True)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        
+        await self._flush_websocket_batch()
+        if self._redis is not None:
+            await self._redis.close()
+            await self._redis.connection_pool.disconnect()
+            self._redis = None
+        
         logger.info("Gestionnaire d'événements temps réel arrêté")
     
+    def _get_redis(self) -> aioredis.Redis:
+        """
+        Client Redis asynchrone partagé.
+        
+        Les connexions du pool sont liées à la boucle d'événements qui les a
+        ouvertes : le client est recréé si la boucle courante a changé.
+        """
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            pool = aioredis.ConnectionPool(
+                host=self.redis_config['host'],
+                port=self.redis_config['port'],
+                db=self.redis_config['db'],
+                decode_responses=True,
+                max_connections=self.redis_max_connections
+            )
+            self._redis = aioredis.Redis(connection_pool=pool)
+            self._redis_loop = loop
+        return self._redis
+    
     async def publish_event(self, event: RealtimeEvent):
         """
         Publie un événement vers tous les canaux de distribution.
@@ -415,15 +551,8 @@ class RealtimeEventManager:
             if not event.event_id:
                 event.event_id = str(uuid.uuid4())
             
-            # Ajouter à la queue Redis selon la priorité
-            queue_name = self.event_queues[event.priority]
-            event_data = json.dumps(event.to_dict())
-            
-            await self._async_redis_lpush(queue_name, event_data)
-            
-            # Publier immédiatement via Redis Pub/Sub pour les événements critiques
-            if event.priority in [EventPriority.CRITICAL, EventPriority.HIGH]:
-                await self._publish_to_pubsub(event)
+            # File Redis, Pub/Sub et trace : un seul aller-retour
+            await self._redis_enqueue(event)
             
             # Publier via Channels pour WebSocket
             await self._publish_to_websocket(event)
@@ -432,9 +561,6 @@ class RealtimeEventManager:
             self.statistics['events_published'] += 1
             self.statistics['last_event_time'] = timezone.now()
             
-            # Cache pour la traçabilité
-            cache.set(f"gns3_event:{event.event_id}", event.to_dict(), timeout=3600)
-            
             logger.debug(f"Événement publié: {event.event_type} (ID: {event.event_id})")
             
         except Exception as e:
@@ -462,11 +588,16 @@ class RealtimeEventManager:
         
         priority = priority_mapping.get(gns3_event.event_type, EventPriority.NORMAL)
         
+        # Le projet sert au routage vers les abonnements "project:<id>"
+        data = dict(gns3_event.data)
+        if gns3_event.project_id:
+            data.setdefault('project_id', gns3_event.project_id)
+        
         realtime_event = RealtimeEvent(
             event_id=str(uuid.uuid4()),
             event_type=gns3_event.event_type.value,
             source=gns3_event.source,
-            data=gns3_event.data,
+            data=data,
             timestamp=gns3_event.timestamp,
             priority=priority,
             correlation_id=gns3_event.data.get('correlation_id')
@@ -474,62 +605,102 @@ class RealtimeEventManager:
         
         await self.publish_event(realtime_event)
     
-    async def _publish_to_pubsub(self, event: RealtimeEvent):
-        """Publie l'événement via Redis Pub/Sub."""
-        try:
-            redis_async = aioredis.from_url(f"redis://{self.redis_config['host']}:{self.redis_config['port']}")
-            
-            channel = f"gns3_events:{event.event_type}"
-            await redis_async.publish(channel, json.dumps(event.to_dict()))
-            
-            await redis_async.close()
-            
-        except Exception as e:
-            logger.error(f"Erreur lors de la publication Redis Pub/Sub: {e}")
+    async def _redis_enqueue(self, event: RealtimeEvent, publish: bool = True):
+        """
+        Met un événement en file en un seul pipeline Redis.
+        
+        Le pipeline regroupe l'ajout à la file de sa priorité, la publication
+        Pub/Sub des événements critiques et prioritaires, et la trace de
+        l'événement.
+        
+        Args:
+            event: Événement à mettre en file
+            publish: False pour une simple remise en file (retry)
+        """
+        event_data = json.dumps(event.to_dict())
+        
+        async with self._get_redis().pipeline(transaction=False) as pipe:
+            pipe.lpush(self.event_queues[event.priority], event_data)
+            if publish:
+                if event.priority in (EventPriority.CRITICAL, EventPriority.HIGH):
+                    pipe.publish(f"gns3_events:{event.event_type}", event_data)
+                pipe.set(f"gns3_event:{event.event_id}", event_data, ex=self.event_trace_ttl)
+            await pipe.execute()
     
     async def _publish_to_websocket(self, event: RealtimeEvent):
-        """Publie l'événement via WebSocket Channels."""
+        """
+        Publie l'événement via WebSocket Channels.
+        
+        Les événements sont regroupés : un lot part dès qu'il est plein, ou
+        au plus tard `websocket_batch_window` secondes après son premier
+        événement.
+        """
+        self._websocket_batch.append(event.to_dict())
+        
+        if len(self._websocket_batch) >= self.websocket_batch_size:
+            await self._flush_websocket_batch()
+        elif self._websocket_flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._websocket_flush_handle = loop.call_later(
+                self.websocket_batch_window,
+                lambda: asyncio.ensure_future(self._flush_websocket_batch())
+            )
+    
+    async def _flush_websocket_batch(self):
+        """
+        Envoie le lot d'événements en attente vers les groupes Channels.
+        
+        Chaque événement part vers les groupes de ses abonnements (type,
+        projet, tous) : un envoi par groupe concerné, pas par connexion.
+        """
+        if self._websocket_flush_handle is not None:
+            self._websocket_flush_handle.cancel()
+            self._websocket_flush_handle = None
+        
+        batch, self._websocket_batch = self._websocket_batch, []
+        if not batch:
+            return
+        
         try:
             from channels.layers import get_channel_layer
             
             channel_layer = get_channel_layer()
             
-            await channel_layer.group_send(
-                "gns3_events",
-                {
-                    "type": "gns3_event",
-                    "event_data": event.to_dict()
-                }
-            )
+            groups: Dict[str, List[Dict[str, Any]]] = {}
+            for event_data in batch:
+                for subscription in event_subscriptions(event_data):
+                    groups.setdefault(subscription_group(subscription), []).append(event_data)
+            
+            for group, events in groups.items():
+                if len(events) == 1:
+                    message = {"type": "gns3_event", "event_data": events[0]}
+                else:
+                    message = {"type": "gns3_events_batch", "events": events}
+                await channel_layer.group_send(group, message)
             
         except Exception as e:
             logger.error(f"Erreur lors de la publication WebSocket: {e}")
     
-    async def _async_redis_lpush(self, queue_name: str, data: str):
-        """Version async de Redis LPUSH."""
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(self.executor, self.redis_client.lpush, queue_name, data)
-    
     async def _process_event_queues(self):
-        """Traite les queues d'événements par ordre de priorité."""
+        """
+        Traite les queues d'événements par ordre de priorité.
+        
+        BRPOP examine les files dans l'ordre donné : un événement critique
+        est toujours servi avant un événement de priorité inférieure, et la
+        boucle reste en attente sur Redis tant qu'aucune file n'a d'élément.
+        """
         priorities = [EventPriority.CRITICAL, EventPriority.HIGH, EventPriority.NORMAL, EventPriority.LOW]
+        queue_names = [self.event_queues[priority] for priority in priorities]
         
         while self.is_running:
             try:
-                for priority in priorities:
-                    queue_name = self.event_queues[priority]
-                    
-                    # Traiter jusqu'à 10 événements par cycle
-                    for _ in range(10):
-                        event_data = self.redis_client.rpop(queue_name)
-                        if not event_data:
-                            break
-                        
-                        await self._process_single_event(json.loads(event_data))
-                
-                # Pause entre les cycles
-                await asyncio.sleep(0.1)
+                item = await self._get_redis().brpop(queue_names, timeout=1)
+                if item:
+                    _, event_data = item
+                    await self._process_single_event(json.loads(event_data))
                 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Erreur dans le traitement des queues d'événements: {e}")
                 await asyncio.sleep(1)
@@ -537,7 +708,7 @@ class RealtimeEventManager:
     async def _process_single_event(self, event_data: Dict[str, Any]):
         """Traite un événement individuel."""
         try:
-            event = RealtimeEvent(**event_data)
+            event = RealtimeEvent.from_dict(event_data)
             
             # Logique de traitement spécifique
             success = await self._deliver_event(event)
@@ -551,12 +722,10 @@ class RealtimeEventManager:
                     event.delivery_status = EventDeliveryStatus.RETRY
                     self.statistics['events_retried'] += 1
                     
-                    # Remettre en queue avec délai
-                    await asyncio.sleep(2 ** event.retry_count)  # Backoff exponentiel
-                    await self._async_redis_lpush(
-                        self.event_queues[event.priority], 
-                        json.dumps(event.to_dict())
-                    )
+                    # Remettre en queue avec délai, sans bloquer le traitement des autres
+                    self._tasks.append(asyncio.create_task(
+                        self._requeue_later(event, 2 ** event.retry_count)  # Backoff exponentiel
+                    ))
                 else:
                     event.delivery_status = EventDeliveryStatus.FAILED
                     self.statistics['events_failed'] += 1
@@ -565,6 +734,12 @@ class RealtimeEventManager:
         except Exception as e:
             logger.error(f"Erreur lors du traitement d'événement: {e}")
     
+    async def _requeue_later(self, event: RealtimeEvent, delay: float):
+        """Remet un événement en file après un délai."""
+        await asyncio.sleep(delay)
+        await self._redis_enqueue(event, publish=False)
+        self._tasks = [task for task in self._tasks if not task.done()]
+    
     async def _deliver_event(self, event: RealtimeEvent) -> bool:
         """Livre un événement vers ses destinations."""
         try:
@@ -672,12 +847,15 @@ class RealtimeEventManager:
     
     def get_statistics(self) -> Dict[str, Any]:
         """Récupère les statistiques du gestionnaire d'événements."""
+        pipe = self.redis_client.pipeline(transaction=False)
+        for queue_name in self.event_queues.values():
+            pipe.llen(queue_name)
+        queue_sizes = dict(zip((priority.value for priority in self.event_queues), pipe.execute()))
+        
         return {
             **self.statistics,
-            'queue_sizes': {
-                priority.value: self.redis_client.llen(queue_name)
-                for priority, queue_name in self.event_queues.items()
-            },
+            'queue_sizes': queue_sizes,
+            'websocket_batch_pending': len(self._websocket_batch),
             'is_running': self.is_running,
             'last_check': timezone.now().isoformat()
         }
@@ -0,0 +1,324 @@
+"""
+Cache à calcul unique (single-flight) pour les agrégations coûteuses.
+
+Lorsqu'une entrée expire, un seul appelant la recalcule ; les autres :
+- servent la valeur périmée pendant le recalcul (stale-while-revalidate),
+  tant que l'entrée n'a pas atteint son expiration définitive ;
+- sans valeur périmée, attendent le résultat au lieu de recalculer.
+
+Le calcul est attribué par un bail dans le cache (`cache.add`, SET NX avec
+Redis), donc un seul recalcul pour tous les processus ; dans un même
+processus, les threads concurrents partagent en plus le même calcul sans
+interroger le cache.
+
+Avant l'expiration, l'entrée peut être rafraîchie par anticipation selon
+l'algorithme XFetch : la probabilité de rafraîchir croît à l'approche de
+l'échéance, proportionnellement à la durée du dernier calcul.
+
+Invalidation par étiquettes : chaque étiquette a une version dans le cache ;
+une entrée enregistre la version de ses étiquettes et n'est plus servie dès
+que l'une d'elles change.
+
+Clés (préfixe `single_flight` par défaut) :
+    <prefix>:<clé>            enveloppe {value, fresh_until, delta, tags}
+    <prefix>:lease:<clé>      bail du recalcul en cours
+    <prefix>:tag:<étiquette>  version de l'étiquette
+"""
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlightCache:
+    """Cache avec recalcul unique, service des valeurs périmées et invalidation par étiquettes."""
+
+    def __init__(self, prefix: str = "single_flight", backend=None, lease_ttl: Optional[int] = None,
+                 beta: float = 1.0, poll_interval: float = 0.05, max_refresh_workers: int = 4):
+        """
+        Initialise le cache.
+
+        Args:
+            prefix: Préfixe des clés
+            backend: Cache Django à utiliser (par défaut le cache 'default')
+            lease_ttl: Durée maximale d'un recalcul avant qu'un autre appelant
+                puisse le reprendre (par défaut settings.SINGLE_FLIGHT_LEASE_TTL ou 30 s)
+            beta: Facteur XFetch (> 1 favorise le rafraîchissement anticipé, 0 le désactive)
+            poll_interval: Intervalle d'attente du résultat d'un autre processus
+            max_refresh_workers: Nombre de rafraîchissements en arrière-plan simultanés
+        """
+        self.prefix = prefix
+        self.backend = backend
+        self.lease_ttl = lease_ttl or getattr(settings, 'SINGLE_FLIGHT_LEASE_TTL', 30)
+        self.beta = beta
+        self.poll_interval = poll_interval
+        self.max_refresh_workers = max_refresh_workers
+
+        self._lock = threading.Lock()
+        # Calculs en cours dans ce processus, par clé
+        self._inflight: Dict[str, Future] = {}
+        # Rafraîchissements en arrière-plan, par clé
+        self._refreshing: Dict[str, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self.stats = {
+            'hits': 0,
+            'stale_served': 0,
+            'early_refreshes': 0,
+            'computations': 0,
+            'waits': 0,
+            'errors': 0
+        }
+
+    @property
+    def cache(self):
+        return self.backend if self.backend is not None else default_cache
+
+    # ==================== CLÉS ====================
+
+    def entry_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def lease_key(self, key: str) -> str:
+        return f"{self.prefix}:lease:{key}"
+
+    def tag_key(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+    # ==================== LECTURE ====================
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: int, stale_ttl: Optional[int] = None,
+                       tags: Iterable[str] = (), cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Retourne la valeur en cache, ou la calcule une seule fois pour tous les appelants.
+
+        Args:
+            key: Clé de l'entrée
+            compute: Fonction sans argument calculant la valeur. Elle peut être
+                rappelée dans un thread du pool, après la fin de la requête qui
+                l'a fournie : elle ne doit pas dépendre d'un état propre à cette
+                requête (transaction, thread-local, corps de requête déjà lu)
+            ttl: Durée de fraîcheur (secondes)
+            stale_ttl: Durée supplémentaire pendant laquelle la valeur périmée
+                est servie pendant son recalcul (par défaut `ttl`)
+            tags: Étiquettes d'invalidation de l'entrée
+            cacheable: Prédicat indiquant si une valeur calculée doit être conservée
+
+        Returns:
+            Valeur en cache ou calculée
+        """
+        tags = tuple(tags)
+        envelope = self._read(key, tags)
+        now = time.time()
+
+        if envelope is not None:
+            if not self._should_refresh(envelope, now):
+                self.stats['hits'] += 1
+                return envelope['value']
+            if now < envelope['fresh_until']:
+                self.stats['early_refreshes'] += 1
+            else:
+                self.stats['stale_served'] += 1
+            self._refresh_in_background(key, compute, ttl, stale_ttl, tags, cacheable)
+            return envelope['value']
+
+        return self._single_flight(key, compute, ttl, stale_ttl, tags, cacheable)
+
+    def peek(self, key: str, tags: Iterable[str] = ()) -> Any:
+        """Valeur en cache (fraîche ou périmée), sans calcul ; None si absente."""
+        envelope = self._read(key, tuple(tags))
+        return envelope['value'] if envelope is not None else None
+
+    def _read(self, key: str, tags: tuple) -> Optional[Dict[str, Any]]:
+        """Lit l'enveloppe et les versions de ses étiquettes en un seul appel."""
+        entry_key = self.entry_key(key)
+        tag_keys = [self.tag_key(tag) for tag in tags]
+        found = self.cache.get_many([entry_key] + tag_keys)
+        envelope = found.get(entry_key)
+        if envelope is None:
+            return None
+        if envelope.get('tags', {}) != {tag: found.get(self.tag_key(tag), 0) for tag in tags}:
+            return None
+        return envelope
+
+    def _should_refresh(self, envelope: Dict[str, Any], now: float) -> bool:
+        """Échéance atteinte, ou rafraîchissement anticipé XFetch."""
+        early = envelope.get('delta', 0) * self.beta * -math.log(1.0 - random.random())
+        return now + early >= envelope['fresh_until']
+
+    # ==================== CALCUL ====================
+
+    def _single_flight(self, key, compute, ttl, stale_ttl, tags, cacheable):
+        """Calcul unique dans le processus ; les autres threads attendent son résultat."""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            self.stats['waits'] += 1
+            value = future.result()
+            # Relire l'entrée donne à chaque appelant sa propre copie (réponses HTTP mutables)
+            envelope = self._read(key, tags)
+            return envelope['value'] if envelope is not None else value
+
+        try:
+            future.set_result(self._compute_with_lease(key, compute, ttl, stale_ttl, tags, cacheable))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return future.result()
+
+    def _compute_with_lease(self, key, compute, ttl, stale_ttl, tags, cacheable):
+        """Calcule sous bail, ou attend la valeur calculée par un autre processus."""
+        deadline = time.monotonic() + self.lease_ttl
+        while True:
+            token = self._acquire(key)
+            if token is not None:
+                try:
+                    return self._compute_and_store(key, compute, ttl, stale_ttl, tags, cacheable)
+                finally:
+                    self._release(key, token)
+
+            # Un autre processus calcule : attendre sa valeur ou la fin de son bail
+            self.stats['waits'] += 1
+            while self.cache.get(self.lease_key(key)) is not None and time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                envelope = self._read(key, tags)
+                if envelope is not None:
+                    return envelope['value']
+
+            envelope = self._read(key, tags)
+            if envelope is not None:
+                return envelope['value']
+            if time.monotonic() >= deadline:
+                logger.warning(f"Attente du calcul de '{key}' expirée, calcul local")
+                return self._compute_and_store(key, compute, ttl, stale_ttl, tags, cacheable)
+
+    def _compute_and_store(self, key, compute, ttl, stale_ttl, tags, cacheable):
+        # Versions des étiquettes lues avant le calcul : une invalidation
+        # pendant le calcul rend l'entrée immédiatement obsolète
+        versions = self.cache.get_many([self.tag_key(tag) for tag in tags]) if tags else {}
+        started = time.time()
+        self.stats['computations'] += 1
+        value = compute()
+        finished = time.time()
+
+        if cacheable is None or cacheable(value):
+            stale_ttl = ttl if stale_ttl is None else stale_ttl
+            envelope = {
+                'value': value,
+                'fresh_until': finished + ttl,
+                'delta': finished - started,
+                'tags': {tag: versions.get(self.tag_key(tag), 0) for tag in tags}
+            }
+            self.cache.set(self.entry_key(key), envelope, ttl + stale_ttl)
+        return value
+
+    def _refresh_in_background(self, key, compute, ttl, stale_ttl, tags, cacheable):
+        """Recalcule l'entrée hors de la requête si aucun recalcul n'est en cours."""
+        with self._lock:
+            running = self._refreshing.get(key)
+            if running is not None and not running.done():
+                return
+        token = self._acquire(key)
+        if token is None:
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_refresh_workers,
+                                                    thread_name_prefix='single-flight')
+            future = Future()
+            self._refreshing[key] = future
+            self._executor.submit(
+                self._background_refresh, key, token, future, compute, ttl, stale_ttl, tags, cacheable
+            )
+
+    def _background_refresh(self, key, token, future, compute, ttl, stale_ttl, tags, cacheable):
+        # Les threads du pool ne passent pas par le cycle de requête Django :
+        # fermer les connexions périmées ou en erreur avant et après le calcul
+        close_old_connections()
+        try:
+            self._compute_and_store(key, compute, ttl, stale_ttl, tags, cacheable)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Erreur lors du rafraîchissement de '{key}': {e}")
+        finally:
+            self._release(key, token)
+            try:
+                close_old_connections()
+            finally:
+                with self._lock:
+                    # Un rafraîchissement plus récent de la même clé reste enregistré
+                    if self._refreshing.get(key) is future:
+                        del self._refreshing[key]
+                future.set_result(None)
+
+    # ==================== BAIL ====================
+
+    def _acquire(self, key: str) -> Optional[str]:
+        token = uuid.uuid4().hex
+        return token if self.cache.add(self.lease_key(key), token, self.lease_ttl) else None
+
+    def _release(self, key: str, token: str):
+        # Ne pas supprimer le bail d'un autre appelant si le nôtre a expiré
+        if self.cache.get(self.lease_key(key)) == token:
+            self.cache.delete(self.lease_key(key))
+
+    # ==================== INVALIDATION ====================
+
+    def invalidate(self, key: str):
+        """Supprime une entrée."""
+        self.cache.delete(self.entry_key(key))
+
+    def invalidate_tags(self, *tags: str):
+        """
+        Invalide toutes les entrées portant l'une des étiquettes.
+
+        La version initiale d'une étiquette est horodatée : si sa clé est
+        évincée, la nouvelle version ne peut pas coïncider avec une ancienne.
+        """
+        for tag in tags:
+            tag_key = self.tag_key(tag)
+            if not self.cache.add(tag_key, time.time_ns(), None):
+                try:
+                    self.cache.incr(tag_key)
+                except ValueError:
+                    self.cache.set(tag_key, time.time_ns(), None)
+
+    def wait_for_refreshes(self, timeout: Optional[float] = None):
+        """Attend la fin des rafraîchissements en arrière-plan en cours."""
+        with self._lock:
+            pending = list(self._refreshing.values())
+        for future in pending:
+            future.result(timeout)
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            refreshing = [key for key, future in self._refreshing.items() if not future.done()]
+            inflight = list(self._inflight)
+        return {
+            'prefix': self.prefix,
+            'lease_ttl': self.lease_ttl,
+            'inflight': inflight,
+            'refreshing': refreshing,
+            'stats': dict(self.stats)
+        }
+
+
+# Instance partagée
+single_flight_cache = SingleFlightCache()
@@ -0,0 +1,181 @@
+"""
+Cache groupé de l'état réseau GNS3.
+
+Chaque nœud est stocké une seule fois, sous sa propre clé ; l'état agrégé
+et les projets ne conservent que les identifiants de leurs nœuds. Toutes
+les clés d'un relevé sont écrites en un seul appel `set_many` (pipeline
+Redis avec django-redis) et relues avec `get_many`, au lieu d'un aller-retour
+par clé.
+
+Clés (préfixe `gns3_central` par défaut) :
+    <prefix>:network_state     état agrégé (nœuds par référence)
+    <prefix>:node:<node_id>    nœud
+    <prefix>:project:<id>      projet (nœuds par référence)
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.core.cache import cache as default_cache
+
+logger = logging.getLogger(__name__)
+
+
+class NetworkStateCache:
+    """Écriture et lecture groupées de l'état réseau dans le cache Django."""
+
+    def __init__(self, prefix: str = "gns3_central", ttl: int = 300, backend=None):
+        """
+        Initialise le cache.
+
+        Args:
+            prefix: Préfixe des clés
+            ttl: Durée de vie des entrées (secondes)
+            backend: Cache Django à utiliser (par défaut le cache 'default')
+        """
+        self.prefix = prefix
+        self.ttl = ttl
+        self.backend = backend
+        # Nœuds et projets écrits lors du dernier relevé, pour purger les disparus
+        self._written_nodes: set = set()
+        self._written_projects: set = set()
+
+    @property
+    def cache(self):
+        return self.backend if self.backend is not None else default_cache
+
+    # ==================== CLÉS ====================
+
+    @property
+    def state_key(self) -> str:
+        return f"{self.prefix}:network_state"
+
+    def node_key(self, node_id: str) -> str:
+        return f"{self.prefix}:node:{node_id}"
+
+    def project_key(self, project_id: str) -> str:
+        return f"{self.prefix}:project:{project_id}"
+
+    # ==================== ÉCRITURE ====================
+
+    def write_state(self, projects: Dict[str, Dict[str, Any]], nodes: Dict[str, Dict[str, Any]],
+                    links: Dict[str, Dict[str, Any]], last_update: str, server_status: str):
+        """
+        Écrit l'état complet en un seul appel.
+
+        Les nœuds et projets absents depuis le relevé précédent sont supprimés.
+
+        Args:
+            projects: Projets ({project_id: projet}, nœuds inclus)
+            nodes: Nœuds ({node_id: nœud})
+            links: Liens ({link_id: lien})
+            last_update: Date de mise à jour (ISO 8601)
+            server_status: Statut du serveur GNS3
+        """
+        entries = {self.node_key(node_id): node for node_id, node in nodes.items()}
+        project_refs = {project_id: self._project_ref(project) for project_id, project in projects.items()}
+        entries.update({self.project_key(project_id): ref for project_id, ref in project_refs.items()})
+        entries[self.state_key] = {
+            'projects': project_refs,
+            'node_ids': list(nodes),
+            'links': links,
+            'last_update': last_update,
+            'server_status': server_status
+        }
+        self.cache.set_many(entries, timeout=self.ttl)
+
+        removed = [self.node_key(node_id) for node_id in self._written_nodes.difference(nodes)]
+        removed += [self.project_key(project_id) for project_id in self._written_projects.difference(projects)]
+        if removed:
+            self.cache.delete_many(removed)
+        self._written_nodes = set(nodes)
+        self._written_projects = set(projects)
+
+    def write_nodes(self, nodes: Iterable[Dict[str, Any]]):
+        """Écrit un lot de nœuds en un seul appel."""
+        entries = {self.node_key(node['node_id']): node for node in nodes}
+        if entries:
+            self.cache.set_many(entries, timeout=self.ttl)
+            self._written_nodes.update(node['node_id'] for node in entries.values())
+
+    def write_project(self, project: Dict[str, Any]):
+        """Écrit un projet (nœuds par référence)."""
+        self.cache.set(self.project_key(project['project_id']), self._project_ref(project), timeout=self.ttl)
+        self._written_projects.add(project['project_id'])
+
+    def delete_nodes(self, node_ids: Iterable[str]):
+        """Supprime un lot de nœuds en un seul appel."""
+        node_ids = list(node_ids)
+        if node_ids:
+            self.cache.delete_many([self.node_key(node_id) for node_id in node_ids])
+            self._written_nodes.difference_update(node_ids)
+
+    def delete_project(self, project_id: str):
+        """Supprime un projet."""
+        self.cache.delete(self.project_key(project_id))
+        self._written_projects.discard(project_id)
+
+    @staticmethod
+    def _project_ref(project: Dict[str, Any]) -> Dict[str, Any]:
+        ref = {key: value for key, value in project.items() if key != 'nodes'}
+        ref['node_ids'] = list(project.get('nodes') or {})
+        return ref
+
+    # ==================== LECTURE ====================
+
+    def read_nodes(self, node_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Lit un lot de nœuds en un seul appel.
+
+        Returns:
+            {node_id: nœud} pour les nœuds présents en cache
+        """
+        keys = {self.node_key(node_id): node_id for node_id in node_ids}
+        if not keys:
+            return {}
+        found = self.cache.get_many(list(keys))
+        return {keys[key]: node for key, node in found.items()}
+
+    def read_project(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Lit un projet et ses nœuds ; None si une entrée manque."""
+        ref = self.cache.get(self.project_key(project_id))
+        if ref is None:
+            return None
+        nodes = self.read_nodes(ref.get('node_ids', []))
+        if len(nodes) != len(ref.get('node_ids', [])):
+            return None
+        return self._expand_project(ref, nodes)
+
+    def read_state(self) -> Optional[Dict[str, Any]]:
+        """
+        Lit l'état complet (deux appels : l'agrégat, puis tous ses nœuds).
+
+        Returns:
+            État au format {'projects', 'nodes', 'links', 'last_update',
+            'server_status'}, ou None si l'agrégat ou l'un de ses nœuds manque
+        """
+        state = self.cache.get(self.state_key)
+        if state is None:
+            return None
+
+        node_ids: List[str] = state.get('node_ids', [])
+        nodes = self.read_nodes(node_ids)
+        if len(nodes) != len(node_ids):
+            logger.debug(f"État réseau incomplet en cache ({len(nodes)}/{len(node_ids)} nœuds)")
+            return None
+
+        return {
+            'projects': {
+                project_id: self._expand_project(ref, nodes)
+                for project_id, ref in state.get('projects', {}).items()
+            },
+            'nodes': {node_id: nodes[node_id] for node_id in node_ids},
+            'links': state.get('links', {}),
+            'last_update': state.get('last_update'),
+            'server_status': state.get('server_status')
+        }
+
+    @staticmethod
+    def _expand_project(ref: Dict[str, Any], nodes: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        project = {key: value for key, value in ref.items() if key != 'node_ids'}
+        project['nodes'] = {node_id: nodes[node_id] for node_id in ref.get('node_ids', []) if node_id in nodes}
+        return project
@@ -0,0 +1,408 @@
+"""
+Diffusion partagée par sujet vers les consommateurs WebSocket.
+
+Un seul producteur par sujet calcule l'instantané à chaque intervalle, quel
+que soit le nombre de connexions abonnées : la charge base de données reste
+constante de 5 à 500 tableaux de bord ouverts. Entre plusieurs processus
+ASGI, un bail en cache désigne le processus producteur de chaque sujet.
+
+Les abonnés rejoignent le groupe Channels du sujet et reçoivent des deltas
+numérotés : chemins JSON Pointer (RFC 6901) modifiés ('set') et supprimés
+('unset'). Un trou dans la numérotation se résout en relisant le dernier
+instantané, conservé en cache.
+
+Côté connexion, `CoalescingSender` fusionne les messages en attente d'une
+même clé lorsque le client lit moins vite qu'ils n'arrivent.
+"""
+import asyncio
+import logging
+import math
+import re
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+from channels.layers import get_channel_layer
+
+logger = logging.getLogger(__name__)
+
+Producer = Callable[[], Awaitable[Any]]
+
+
+# ==================== DELTAS ====================
+
+def _escape(token: Any) -> str:
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def _unescape(token: str) -> str:
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def flatten(data: Any, prefix: str = '') -> Dict[str, Any]:
+    """Aplatit les dictionnaires imbriqués en {chemin JSON Pointer: feuille}."""
+    if isinstance(data, dict) and data:
+        leaves = {}
+        for key, value in data.items():
+            leaves.update(flatten(value, f"{prefix}/{_escape(key)}"))
+        return leaves
+    return {prefix: data}
+
+
+def unflatten(leaves: Dict[str, Any]) -> Any:
+    """Inverse de `flatten`."""
+    if '' in leaves:
+        return leaves['']
+    data: Dict[str, Any] = {}
+    for path, value in leaves.items():
+        tokens = [_unescape(token) for token in path.split('/')[1:]]
+        node = data
+        for token in tokens[:-1]:
+            node = node.setdefault(token, {})
+        node[tokens[-1]] = value
+    return data
+
+
+def compute_delta(previous: Any, current: Any) -> Dict[str, Any]:
+    """
+    Calcule le delta entre deux instantanés.
+
+    Returns:
+        {'set': {chemin: valeur}, 'unset': [chemins]}
+    """
+    before, after = flatten(previous), flatten(current)
+    return {
+        'set': {path: value for path, value in after.items() if path not in before or before[path] != value},
+        'unset': [path for path in before if path not in after]
+    }
+
+
+def is_empty_delta(delta: Dict[str, Any]) -> bool:
+    return not delta['set'] and not delta['unset']
+
+
+def apply_delta(data: Any, delta: Dict[str, Any]) -> Any:
+    """Applique un delta : suppressions d'abord, puis modifications."""
+    leaves = flatten(data)
+    for removed in delta['unset']:
+        for path in [path for path in leaves if path == removed or path.startswith(removed + '/')]:
+            del leaves[path]
+    for path, value in delta['set'].items():
+        # Une feuille remplacée par un sous-arbre (ou l'inverse) disparaît
+        for stale in [p for p in leaves if p.startswith(path + '/') or path.startswith(p + '/')]:
+            del leaves[stale]
+        leaves[path] = value
+    return unflatten(leaves) if leaves else {}
+
+
+def merge_deltas(older: Dict[str, Any], newer: Dict[str, Any]) -> Dict[str, Any]:
+    """Fusionne deux deltas consécutifs en un seul."""
+    unset = [path for path in older['unset'] if path not in newer['set']]
+    unset += [path for path in newer['unset'] if path not in unset]
+    changed = {path: value for path, value in older['set'].items() if path not in newer['unset']}
+    changed.update(newer['set'])
+    return {'set': changed, 'unset': unset}
+
+
+# ==================== MESSAGES CLIENT ====================
+
+def snapshot_message(topic: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Message client portant un instantané complet."""
+    return {'type': 'topic_snapshot', 'topic': topic, 'seq': entry['seq'], 'data': entry['data']}
+
+
+def delta_message(topic: str, seq: int, delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Message client portant un delta (à appliquer sur `base_seq`)."""
+    return {'type': 'topic_delta', 'topic': topic, 'base_seq': seq - 1, 'seq': seq,
+            'set': delta['set'], 'unset': delta['unset']}
+
+
+def merge_messages(older: Dict[str, Any], newer: Dict[str, Any]) -> Dict[str, Any]:
+    """Fusionne un delta arrivé derrière un message encore en attente d'envoi."""
+    if older['type'] == 'topic_snapshot':
+        return {**older, 'seq': newer['seq'], 'data': apply_delta(older['data'], newer)}
+    return {**newer, **merge_deltas(older, newer), 'base_seq': older['base_seq']}
+
+
+# ==================== PRODUCTEUR PARTAGÉ ====================
+
+class TopicFanoutHub:
+    """
+    Producteurs partagés des sujets temps réel.
+
+    Un sujet est produit tant qu'au moins une connexion du processus y est
+    abonnée ; la dernière désinscription arrête sa tâche.
+    """
+
+    def __init__(self, interval: Optional[float] = None, prefix: str = "topic_fanout", backend=None):
+        """
+        Initialise le hub.
+
+        Args:
+            interval: Période de calcul des instantanés (secondes)
+            prefix: Préfixe des clés de cache (baux et instantanés)
+            backend: Cache Django à utiliser (par défaut le cache 'default')
+        """
+        self.interval = interval if interval is not None else getattr(settings, 'TOPIC_FANOUT_INTERVAL', 5.0)
+        self.prefix = prefix
+        self.backend = backend
+        self.instance_id = uuid.uuid4().hex
+
+        self._producers: Dict[str, Producer] = {}
+        self._subscribers: Dict[str, int] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._leased: Set[str] = set()
+
+        self.stats = {
+            'snapshots_computed': 0,
+            'updates_broadcast': 0,
+            'unchanged': 0,
+            'lease_skipped': 0,
+            'errors': 0
+        }
+
+    @property
+    def cache(self):
+        return self.backend if self.backend is not None else default_cache
+
+    @property
+    def lease_ttl(self) -> int:
+        return max(1, math.ceil(self.interval * 3))
+
+    @staticmethod
+    def group_name(topic: str) -> str:
+        """Nom du groupe Channels d'un sujet (caractères autorisés, < 100)."""
+        return "topic." + re.sub(r'[^A-Za-z0-9_.-]', '_', topic)[:90]
+
+    def _lease_key(self, topic: str) -> str:
+        return f"{self.prefix}:lease:{topic}"
+
+    def _snapshot_key(self, topic: str) -> str:
+        return f"{self.prefix}:snapshot:{topic}"
+
+    # ==================== ABONNEMENTS ====================
+
+    async def subscribe(self, topic: str, channel_name: str, producer: Producer) -> Dict[str, Any]:
+        """
+        Abonne une connexion à un sujet.
+
+        Args:
+            topic: Sujet (ex. 'monitoring.device.12')
+            channel_name: Canal Channels de la connexion
+            producer: Coroutine sans argument calculant l'instantané ; seule
+                celle du premier abonné est utilisée
+
+        Returns:
+            Dernier instantané {'seq', 'data'}
+        """
+        await get_channel_layer().group_add(self.group_name(topic), channel_name)
+        self._subscribers[topic] = self._subscribers.get(topic, 0) + 1
+        self._producers.setdefault(topic, producer)
+        if topic not in self._tasks:
+            self._tasks[topic] = asyncio.create_task(self._produce(topic))
+        return await self.snapshot(topic)
+
+    async def unsubscribe(self, topic: str, channel_name: str):
+        """Désabonne une connexion ; le dernier départ arrête le producteur."""
+        await get_channel_layer().group_discard(self.group_name(topic), channel_name)
+
+        remaining = self._subscribers.get(topic, 0) - 1
+        if remaining > 0:
+            self._subscribers[topic] = remaining
+            return
+
+        self._subscribers.pop(topic, None)
+        self._producers.pop(topic, None)
+        self._snapshots.pop(topic, None)
+        task = self._tasks.pop(topic, None)
+        if task:
+            task.cancel()
+        if topic in self._leased:
+            self._leased.discard(topic)
+            if self.cache.get(self._lease_key(topic)) == self.instance_id:
+                self.cache.delete(self._lease_key(topic))
+
+    async def snapshot(self, topic: str) -> Dict[str, Any]:
+        """
+        Dernier instantané d'un sujet.
+
+        Le processus producteur répond depuis sa mémoire, les autres depuis
+        le cache ; à défaut l'instantané est calculé, une seule fois pour
+        tous les appels concurrents.
+        """
+        local = self._snapshots.get(topic)
+        if local is not None and topic in self._leased:
+            return local
+        cached = self.cache.get(self._snapshot_key(topic))
+        if cached is not None:
+            return cached
+        if local is not None:
+            return local
+        return await self._refresh(topic, broadcast=False)
+
+    def peek(self, topic: str) -> Optional[Dict[str, Any]]:
+        """Instantané en mémoire du processus, sans calcul ni accès au cache."""
+        return self._snapshots.get(topic)
+
+    @property
+    def subscriber_counts(self) -> Dict[str, int]:
+        return dict(self._subscribers)
+
+    # ==================== PRODUCTION ====================
+
+    async def _produce(self, topic: str):
+        """Boucle de production d'un sujet."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                if not self._hold_lease(topic):
+                    self.stats['lease_skipped'] += 1
+                    continue
+                await self._refresh(topic, broadcast=True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Erreur lors de la production du sujet {topic}: {e}")
+
+    def _hold_lease(self, topic: str) -> bool:
+        """Prend ou prolonge le bail de production du sujet."""
+        key = self._lease_key(topic)
+        if not self.cache.add(key, self.instance_id, timeout=self.lease_ttl):
+            if self.cache.get(key) != self.instance_id:
+                self._leased.discard(topic)
+                return False
+            self.cache.touch(key, self.lease_ttl)
+
+        if topic not in self._leased:
+            # Reprise d'un sujet produit ailleurs : continuer sa numérotation
+            self._leased.add(topic)
+            cached = self.cache.get(self._snapshot_key(topic))
+            if cached is not None:
+                self._snapshots[topic] = cached
+        return True
+
+    async def _refresh(self, topic: str, broadcast: bool) -> Dict[str, Any]:
+        inflight = self._inflight.get(topic)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._compute(topic, broadcast))
+            self._inflight[topic] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(topic, None))
+        return await asyncio.shield(inflight)
+
+    async def _compute(self, topic: str, broadcast: bool) -> Dict[str, Any]:
+        """Calcule l'instantané et diffuse son delta s'il a changé."""
+        data = await self._producers[topic]()
+        self.stats['snapshots_computed'] += 1
+
+        previous = self._snapshots.get(topic)
+        if previous is None:
+            entry = {'seq': 0, 'data': data}
+            self._snapshots[topic] = entry
+            # Ne pas écraser l'instantané d'un producteur actif ailleurs
+            self.cache.add(self._snapshot_key(topic), entry, timeout=self.lease_ttl)
+            return entry
+
+        delta = compute_delta(previous['data'], data)
+        if is_empty_delta(delta):
+            self.stats['unchanged'] += 1
+            self.cache.touch(self._snapshot_key(topic), self.lease_ttl)
+            return previous
+
+        entry = {'seq': previous['seq'] + 1, 'data': data}
+        self._snapshots[topic] = entry
+        self.cache.set(self._snapshot_key(topic), entry, timeout=self.lease_ttl)
+        if broadcast:
+            await get_channel_layer().group_send(self.group_name(topic), {
+                'type': 'topic.update',
+                'topic': topic,
+                'seq': entry['seq'],
+                'delta': delta
+            })
+            self.stats['updates_broadcast'] += 1
+        return entry
+
+    async def stop(self):
+        """Arrête tous les producteurs du processus."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'interval': self.interval,
+            'topics': self.subscriber_counts,
+            'leased_topics': sorted(self._leased),
+            'stats': dict(self.stats)
+        }
+
+
+# ==================== ENVOI COALESCÉ ====================
+
+class CoalescingSender:
+    """
+    File d'envoi d'une connexion WebSocket.
+
+    Chaque clé a au plus un message en attente : un nouveau message de même
+    clé le remplace (ou y est fusionné) et passe en fin de file. Tant que le
+    client lit vite, chaque message part aussitôt ; sous contre-pression,
+    seules les dernières valeurs partent.
+    """
+
+    def __init__(self, send: Callable[[Dict[str, Any]], Awaitable[None]], max_pending: int = 1000):
+        self._send = send
+        self.max_pending = max_pending
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {'sent': 0, 'coalesced': 0, 'dropped': 0}
+
+    def push(self, key: str, message: Dict[str, Any],
+             merge: Optional[Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]] = None):
+        """
+        Met un message en attente d'envoi.
+
+        Args:
+            key: Clé de coalescence
+            message: Message JSON
+            merge: Fusion (ancien, nouveau) ; par défaut le nouveau remplace l'ancien
+        """
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            message = merge(pending, message) if merge else message
+            self.stats['coalesced'] += 1
+        elif len(self._pending) >= self.max_pending:
+            self._pending.pop(next(iter(self._pending)))
+            self.stats['dropped'] += 1
+        self._pending[key] = message
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._drain())
+
+    async def _drain(self):
+        while self._pending:
+            key = next(iter(self._pending))
+            message = self._pending.pop(key)
+            try:
+                await self._send(message)
+                self.stats['sent'] += 1
+            except Exception as e:
+                logger.warning(f"Échec d'envoi WebSocket ({key}): {e}")
+
+    @property
+    def pending(self) -> List[str]:
+        return list(self._pending)
+
+    async def close(self):
+        """Abandonne les messages en attente."""
+        self._pending.clear()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+topic_fanout_hub = TopicFanoutHub()
@@ -0,0 +1,280 @@
+"""
+Détection incrémentale des changements de topologie GNS3.
+
+Chaque projet, nœud et lien reçoit une empreinte de contenu ; l'empreinte
+d'un projet combine celles de ses attributs, nœuds et liens, et l'empreinte
+de la topologie celles des projets. Deux relevés identiques se comparent
+donc en une égalité de chaînes, et seuls les projets dont l'empreinte a
+changé sont comparés élément par élément.
+
+Le différentiel est une liste de patchs :
+    {'op': 'add' | 'remove' | 'update', 'kind': 'project' | 'node' | 'link',
+     'project_id': ..., 'id': ..., 'data': {...}, 'removed_fields': [...]}
+Un patch 'add' porte l'élément complet ; un patch 'update' ne porte que les
+champs de premier niveau modifiés.
+"""
+import copy
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Champs dérivés d'un projet, recalculés à l'application des patchs
+PROJECT_CHILDREN = {'nodes': 'node_id', 'links': 'link_id'}
+PROJECT_DERIVED_FIELDS = frozenset({'nodes', 'links', 'node_count', 'link_count'})
+
+# Type d'élément d'un patch pour chaque collection d'un projet
+CHILD_KINDS = {'nodes': 'node', 'links': 'link'}
+KIND_COLLECTIONS = {kind: collection for collection, kind in CHILD_KINDS.items()}
+
+
+def fingerprint(value: Any) -> str:
+    """Empreinte de contenu d'une valeur sérialisable (JSON canonique)."""
+    payload = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _item_id(item: Dict[str, Any], id_field: str) -> str:
+    item_id = item.get(id_field)
+    return str(item_id) if item_id is not None else fingerprint(item)
+
+
+def index_project(project: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Indexe un projet : attributs, nœuds et liens avec leurs empreintes.
+
+    Returns:
+        {'fingerprint', 'attributes', 'attributes_fingerprint',
+         'nodes': {id: (empreinte, nœud)}, 'links': {id: (empreinte, lien)}}
+    """
+    attributes = {key: value for key, value in project.items() if key not in PROJECT_DERIVED_FIELDS}
+    index = {
+        'attributes': attributes,
+        'attributes_fingerprint': fingerprint(attributes)
+    }
+    parts = [index['attributes_fingerprint']]
+    for collection, id_field in PROJECT_CHILDREN.items():
+        items = {
+            _item_id(item, id_field): (fingerprint(item), item)
+            for item in project.get(collection) or []
+        }
+        index[collection] = items
+        parts.append(fingerprint(sorted((item_id, item_fp) for item_id, (item_fp, _) in items.items())))
+    index['fingerprint'] = fingerprint(parts)
+    return index
+
+
+def index_topology(projects: Iterable[Dict[str, Any]]) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+    """
+    Indexe une topologie (liste de projets).
+
+    Returns:
+        (empreinte de la topologie, {project_id: index du projet})
+    """
+    index = {
+        str(project.get('project_id')): index_project(project)
+        for project in projects
+        if project.get('project_id')
+    }
+    topology_fp = fingerprint(sorted((project_id, entry['fingerprint']) for project_id, entry in index.items()))
+    return topology_fp, index
+
+
+def _changed_fields(previous: Dict[str, Any], current: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    changed = {key: value for key, value in current.items() if key not in previous or previous[key] != value}
+    removed = [key for key in previous if key not in current]
+    return changed, removed
+
+
+def _update_patch(kind: str, project_id: str, item_id: Optional[str],
+                  previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    changed, removed = _changed_fields(previous, current)
+    patch = {'op': 'update', 'kind': kind, 'project_id': project_id, 'data': changed}
+    if item_id is not None:
+        patch['id'] = item_id
+    if removed:
+        patch['removed_fields'] = removed
+    return patch
+
+
+def diff_topology(previous: Dict[str, Dict[str, Any]],
+                  current: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Différentiel structurel entre deux index de topologie.
+
+    Args:
+        previous: Index précédent ({project_id: index du projet})
+        current: Index courant
+
+    Returns:
+        Liste de patchs transformant `previous` en `current`
+    """
+    patches = []
+
+    for project_id in previous.keys() - current.keys():
+        patches.append({'op': 'remove', 'kind': 'project', 'project_id': project_id})
+
+    for project_id, entry in current.items():
+        before = previous.get(project_id)
+        if before is None:
+            project = dict(entry['attributes'])
+            for collection in PROJECT_CHILDREN:
+                project[collection] = [item for _, item in entry[collection].values()]
+            patches.append({'op': 'add', 'kind': 'project', 'project_id': project_id, 'data': project})
+            continue
+        if before['fingerprint'] == entry['fingerprint']:
+            continue
+
+        if before['attributes_fingerprint'] != entry['attributes_fingerprint']:
+            patches.append(_update_patch('project', project_id, None, before['attributes'], entry['attributes']))
+
+        for collection, kind in CHILD_KINDS.items():
+            old_items, new_items = before[collection], entry[collection]
+            for item_id in old_items.keys() - new_items.keys():
+                patches.append({'op': 'remove', 'kind': kind, 'project_id': project_id, 'id': item_id})
+            for item_id, (item_fp, item) in new_items.items():
+                old = old_items.get(item_id)
+                if old is None:
+                    patches.append({'op': 'add', 'kind': kind, 'project_id': project_id, 'id': item_id, 'data': item})
+                elif old[0] != item_fp:
+                    patches.append(_update_patch(kind, project_id, item_id, old[1], item))
+
+    return patches
+
+
+def apply_patches(projects: List[Dict[str, Any]], patches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Applique des patchs à une topologie sans modifier l'original.
+
+    Args:
+        projects: Topologie (liste de projets)
+        patches: Patchs produits par diff_topology
+
+    Returns:
+        Nouvelle topologie
+    """
+    result = {str(project.get('project_id')): project for project in projects}
+    # Collections des projets modifiés, indexées par identifiant (ordre conservé)
+    touched: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def project_items(project_id):
+        if project_id not in touched:
+            project = dict(result[project_id])
+            result[project_id] = project
+            touched[project_id] = {
+                collection: {_item_id(item, id_field): item for item in project.get(collection) or []}
+                for collection, id_field in PROJECT_CHILDREN.items()
+            }
+        return result[project_id], touched[project_id]
+
+    for patch in patches:
+        project_id, kind, op = str(patch['project_id']), patch['kind'], patch['op']
+
+        if kind == 'project':
+            if op == 'remove':
+                result.pop(project_id, None)
+                touched.pop(project_id, None)
+                continue
+            if op == 'add':
+                result[project_id] = copy.deepcopy(patch['data'])
+                touched.pop(project_id, None)
+            project, _ = project_items(project_id)
+            if op == 'update':
+                project.update(patch['data'])
+                for field in patch.get('removed_fields', ()):
+                    project.pop(field, None)
+            continue
+
+        items = project_items(project_id)[1][KIND_COLLECTIONS[kind]]
+        item_id = patch['id']
+        if op == 'remove':
+            items.pop(item_id, None)
+        elif op == 'add' or item_id not in items:
+            items[item_id] = copy.deepcopy(patch['data'])
+        else:
+            item = dict(items[item_id])
+            item.update(patch['data'])
+            for field in patch.get('removed_fields', ()):
+                item.pop(field, None)
+            items[item_id] = item
+
+    for project_id, collections in touched.items():
+        project = result[project_id]
+        for collection, items in collections.items():
+            project[collection] = list(items.values())
+        project['node_count'] = len(project['nodes'])
+        project['link_count'] = len(project['links'])
+
+    return list(result.values())
+
+
+class TopologyChangeTracker:
+    """
+    Suivi des relevés successifs de topologie avec numéros de séquence.
+
+    Chaque changement détecté incrémente la séquence ; un message de patchs
+    porte la séquence sur laquelle il s'applique (`base_sequence`), ce qui
+    permet aux consommateurs de détecter une perte et de demander un
+    instantané complet. Les mises à jour doivent être sérialisées par
+    l'appelant ; l'état est remplacé d'un bloc, si bien qu'un instantané lu
+    concurremment reste cohérent.
+    """
+
+    def __init__(self):
+        # (séquence, empreinte, topologie, index)
+        self._state: Tuple[int, Optional[str], List[Dict[str, Any]], Dict[str, Dict[str, Any]]] = (
+            0, None, [], {}
+        )
+
+    @property
+    def sequence(self) -> int:
+        return self._state[0]
+
+    @property
+    def fingerprint(self) -> Optional[str]:
+        return self._state[1]
+
+    @property
+    def topology(self) -> List[Dict[str, Any]]:
+        return self._state[2]
+
+    def update(self, projects: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Compare un nouveau relevé au précédent.
+
+        Returns:
+            Message de patchs, ou None si la topologie n'a pas changé
+        """
+        base_sequence, base_fingerprint, _, base_index = self._state
+        topology_fp, index = index_topology(projects)
+        if topology_fp == base_fingerprint:
+            return None
+
+        patches = diff_topology(base_index, index)
+        self._state = (base_sequence + 1, topology_fp, projects, index)
+        return {
+            'sequence': base_sequence + 1,
+            'base_sequence': base_sequence,
+            'base_fingerprint': base_fingerprint,
+            'fingerprint': topology_fp,
+            'patches': patches
+        }
+
+    def reset(self, projects: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Remplace le relevé courant sans calculer de différentiel.
+
+        Returns:
+            Instantané complet (nouvelle séquence)
+        """
+        topology_fp, index = index_topology(projects)
+        self._state = (self.sequence + 1, topology_fp, projects, index)
+        return self.snapshot()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Instantané complet du relevé courant."""
+        sequence, topology_fp, projects, _ = self._state
+        return {
+            'sequence': sequence,
+            'fingerprint': topology_fp,
+            'topology_data': projects
+        }
@@ -0,0 +1,270 @@
+"""
+Flux unifié des alertes de monitoring et de sécurité, calculé en base.
+
+Une page est obtenue en trois requêtes, quel que soit le volume d'alertes :
+1. un `UNION ALL` des deux tables, réduit aux colonnes de tri
+   (date, type, identifiant), filtré, trié et limité en SQL ; chaque branche
+   est elle-même limitée lorsque la base le permet, ce qui la ramène à un
+   parcours d'index sur (date, id) ;
+2. et 3. le chargement des seules alertes de la page, par type.
+
+La pagination est par curseur (keyset) sur (date, type, id) : la page
+suivante reprend strictement après la dernière alerte renvoyée, sans
+OFFSET, et reste stable lorsque de nouvelles alertes arrivent.
+
+Les statistiques sont des COUNT groupés : une requête par table.
+"""
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.apps import apps
+from django.db import connection
+from django.db.models import CharField, Count, F, Q, Value
+
+logger = logging.getLogger(__name__)
+
+SEVERITIES = ['critical', 'high', 'medium', 'low']
+STATUSES = ['new', 'acknowledged', 'resolved', 'false_positive']
+
+# Type d'alerte -> (application, modèle, champ de date)
+ALERT_SOURCES = {
+    'monitoring': ('monitoring', 'Alert', 'created_at'),
+    'security': ('security_management', 'SecurityAlertModel', 'detection_time'),
+}
+
+
+def encode_cursor(timestamp: datetime, kind: str, alert_id: int) -> str:
+    """Curseur opaque désignant la dernière alerte d'une page."""
+    raw = json.dumps([timestamp.isoformat(), kind, alert_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str, int]:
+    """
+    Décode un curseur produit par `encode_cursor`.
+
+    Raises:
+        ValueError: Si le curseur est invalide
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, kind, alert_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if kind not in ALERT_SOURCES:
+            raise ValueError(kind)
+        return datetime.fromisoformat(timestamp), kind, int(alert_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Curseur invalide: {cursor}") from e
+
+
+def keyset_condition(time_field: str, kind: str, cursor: Tuple[datetime, str, int]) -> Q:
+    """
+    Condition « strictement après le curseur » pour une branche.
+
+    L'ordre est (date DESC, type DESC, id DESC) ; le type étant constant
+    dans une branche, la comparaison se réduit à la date, et à l'id pour
+    la branche du curseur.
+    """
+    timestamp, cursor_kind, cursor_id = cursor
+    if kind == cursor_kind:
+        return Q(**{f'{time_field}__lt': timestamp}) | Q(**{time_field: timestamp, 'id__lt': cursor_id})
+    if kind < cursor_kind:
+        return Q(**{f'{time_field}__lte': timestamp})
+    return Q(**{f'{time_field}__lt': timestamp})
+
+
+class UnifiedAlertFeed:
+    """Pages et statistiques des alertes unifiées, calculées par la base."""
+
+    def _model(self, kind: str):
+        app_label, model_name, _ = ALERT_SOURCES[kind]
+        return apps.get_model(app_label, model_name)
+
+    def _querysets(self, since: datetime, filter_by: Optional[Dict[str, Any]] = None,
+                   user_id: Optional[int] = None, device_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """Requêtes filtrées par type d'alerte (sans tri)."""
+        filter_by = filter_by or {}
+        kinds = [kind for kind in ALERT_SOURCES if 'source' not in filter_by or kind in filter_by['source']]
+        # Les alertes de sécurité ne sont liées ni à un équipement ni à un utilisateur
+        if user_id is not None or device_ids:
+            kinds = [kind for kind in kinds if kind != 'security']
+
+        querysets = {}
+        for kind in kinds:
+            _, _, time_field = ALERT_SOURCES[kind]
+            queryset = self._model(kind).objects.filter(**{f'{time_field}__gte': since})
+            if 'severity' in filter_by:
+                queryset = queryset.filter(severity__in=filter_by['severity'])
+            if 'status' in filter_by:
+                queryset = queryset.filter(status__in=filter_by['status'])
+            if user_id is not None:
+                queryset = queryset.filter(acknowledged_by_id=user_id)
+            if device_ids:
+                queryset = queryset.filter(device_id__in=device_ids)
+            querysets[kind] = queryset.order_by()
+        return querysets
+
+    # ==================== PAGES ====================
+
+    def page(self, since: datetime, filter_by: Optional[Dict[str, Any]] = None, user_id: Optional[int] = None,
+             device_ids: Optional[List[int]] = None, limit: int = 100,
+             cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Récupère une page d'alertes, des plus récentes aux plus anciennes.
+
+        Args:
+            since: Date de début
+            filter_by: Filtres (severity, status, source)
+            user_id: ID de l'utilisateur ayant acquitté les alertes
+            device_ids: IDs des équipements
+            limit: Taille de la page
+            cursor: Curseur de la page précédente (`next_cursor`)
+
+        Returns:
+            {'alerts': [...], 'next_cursor': curseur de la page suivante ou None}
+
+        Raises:
+            ValueError: Si le curseur est invalide
+        """
+        position = decode_cursor(cursor) if cursor else None
+
+        branches = []
+        for kind, queryset in self._querysets(since, filter_by, user_id, device_ids).items():
+            _, _, time_field = ALERT_SOURCES[kind]
+            if position is not None:
+                queryset = queryset.filter(keyset_condition(time_field, kind, position))
+            branch = queryset.annotate(
+                feed_time=F(time_field),
+                feed_kind=Value(kind, output_field=CharField()),
+                feed_id=F('id')
+            ).values('feed_time', 'feed_kind', 'feed_id')
+            branches.append(branch)
+
+        if not branches:
+            return {'alerts': [], 'next_cursor': None}
+
+        if len(branches) > 1:
+            # Chaque branche est bornée avant l'union quand le SGBD le permet
+            if connection.features.supports_slicing_ordering_in_compound:
+                branches = [branch.order_by('-feed_time', '-feed_id')[:limit + 1] for branch in branches]
+            feed = branches[0].union(*branches[1:], all=True)
+        else:
+            feed = branches[0]
+        rows = list(feed.order_by('-feed_time', '-feed_kind', '-feed_id')[:limit + 1])
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last['feed_time'], last['feed_kind'], last['feed_id'])
+
+        return {'alerts': self._load(rows), 'next_cursor': next_cursor}
+
+    def _load(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Charge les alertes de la page (une requête par type) dans l'ordre du flux."""
+        ids: Dict[str, List[int]] = {}
+        for row in rows:
+            ids.setdefault(row['feed_kind'], []).append(row['feed_id'])
+
+        loaded: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        if 'monitoring' in ids:
+            alerts = self._model('monitoring').objects.filter(id__in=ids['monitoring']).select_related(
+                'device', 'acknowledged_by', 'metric', 'service_check'
+            )
+            loaded.update((('monitoring', alert.id), monitoring_alert_dict(alert)) for alert in alerts)
+        if 'security' in ids:
+            alerts = self._model('security').objects.filter(id__in=ids['security']).select_related('source_rule')
+            loaded.update((('security', alert.id), security_alert_dict(alert)) for alert in alerts)
+
+        # Une alerte supprimée entre les deux requêtes est ignorée
+        return [loaded[key] for key in ((row['feed_kind'], row['feed_id']) for row in rows) if key in loaded]
+
+    # ==================== STATISTIQUES ====================
+
+    def statistics(self, since: datetime, device_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Compte les alertes par type, sévérité, statut et source.
+
+        Args:
+            since: Date de début
+            device_ids: IDs des équipements
+
+        Returns:
+            {'totals', 'by_severity', 'by_status', 'security_by_source'}
+        """
+        totals = {kind: 0 for kind in ALERT_SOURCES}
+        by_severity = {kind: dict.fromkeys(SEVERITIES, 0) for kind in ALERT_SOURCES}
+        by_status = {kind: dict.fromkeys(STATUSES, 0) for kind in ALERT_SOURCES}
+        security_by_source: Dict[str, int] = {}
+
+        for kind, queryset in self._querysets(since, device_ids=device_ids).items():
+            group_by = ['severity', 'status'] + (['source_rule__name'] if kind == 'security' else [])
+            for row in queryset.values(*group_by).annotate(count=Count('id')):
+                count = row['count']
+                totals[kind] += count
+                by_severity[kind][row['severity']] = by_severity[kind].get(row['severity'], 0) + count
+                by_status[kind][row['status']] = by_status[kind].get(row['status'], 0) + count
+                if kind == 'security':
+                    source = row['source_rule__name'] or 'security'
+                    security_by_source[source] = security_by_source.get(source, 0) + count
+
+        return {
+            'totals': totals,
+            'by_severity': by_severity,
+            'by_status': by_status,
+            'security_by_source': security_by_source
+        }
+
+
+def monitoring_alert_dict(alert) -> Dict[str, Any]:
+    """Alerte de monitoring au format unifié."""
+    return {
+        'id': f"monitoring-{alert.id}",
+        'type': 'monitoring',
+        'source': 'monitoring',
+        'event_type': alert.service_check.name if alert.service_check else 'metric_alert',
+        'severity': alert.severity,
+        'status': alert.status,
+        'device_id': alert.device.id if alert.device else None,
+        'device_name': alert.device.name if alert.device else "N/A",
+        'message': alert.message,
+        'timestamp': alert.created_at.isoformat(),
+        'acknowledged_by': alert.acknowledged_by.username if alert.acknowledged_by else None,
+        'acknowledged_at': alert.acknowledged_at.isoformat() if alert.acknowledged_at else None,
+        'resolved_at': alert.resolved_at.isoformat() if alert.resolved_at else None,
+        'details': {
+            'metric': alert.metric.name if alert.metric else None,
+            'value': alert.value,
+            'service': alert.service_check.name if alert.service_check else None,
+        }
+    }
+
+
+def security_alert_dict(alert) -> Dict[str, Any]:
+    """Alerte de sécurité au format unifié."""
+    return {
+        'id': f"security-{alert.id}",
+        'type': 'security',
+        'source': alert.source_rule.name if alert.source_rule else 'security',
+        'event_type': alert.source_rule.rule_type if alert.source_rule else 'security_alert',
+        'severity': alert.severity,
+        'status': alert.status,
+        'device_id': None,
+        'device_name': "N/A",
+        'message': alert.title,
+        'timestamp': alert.detection_time.isoformat(),
+        'acknowledged_by': None,
+        'acknowledged_at': None,
+        'resolved_at': None,
+        'details': {
+            'source_ip': alert.source_ip,
+            'destination_ip': alert.destination_ip,
+            'protocol': alert.protocol,
+        }
+    }
+
+
+# Instance partagée
+unified_alert_feed = UnifiedAlertFeed()
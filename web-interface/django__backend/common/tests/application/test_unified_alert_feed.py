@@ -0,0 +1,128 @@
+"""
+Tests du flux d'alertes unifié paginé par curseur.
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from monitoring.models import Alert
+from network_management.models import NetworkDevice
+from security_management.infrastructure.models import SecurityAlertModel, SecurityRuleModel
+from ...application.services.unified_alert_service import UnifiedAlertService
+from ...infrastructure.unified_alert_feed import decode_cursor, encode_cursor
+
+
+class UnifiedAlertFeedTestCase(TestCase):
+    """Tests pour la pagination et les statistiques des alertes unifiées."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="operator", password="secret")
+        cls.device = NetworkDevice.objects.create(
+            name="Router de Test",
+            hostname="test-router.local",
+            ip_address="192.168.1.1",
+            device_type="router",
+            os="cisco_ios",
+            created_by=cls.user
+        )
+        cls.rule = SecurityRuleModel.objects.create(name="ids", rule_type="suricata")
+
+        # Dates communes aux deux tables pour éprouver le départage (type, id)
+        now = timezone.now()
+        for i in range(30):
+            Alert.objects.create(
+                device=cls.device,
+                severity='high' if i % 3 else 'critical',
+                status='active',
+                message=f"monitoring {i}",
+                created_at=now - timedelta(minutes=i // 2)
+            )
+        for i in range(20):
+            SecurityAlertModel.objects.create(
+                title=f"security {i}",
+                severity='medium',
+                detection_time=now - timedelta(minutes=i // 2),
+                source_rule=cls.rule if i % 2 else None
+            )
+        Alert.objects.create(
+            device=cls.device,
+            severity='low',
+            message="hors période",
+            created_at=now - timedelta(days=30)
+        )
+
+    def setUp(self):
+        self.service = UnifiedAlertService()
+
+    def _all_pages(self, limit, **kwargs):
+        alerts, cursor, pages = [], None, 0
+        while True:
+            result = self.service.get_all_alerts(limit=limit, cursor=cursor, **kwargs)
+            self.assertTrue(result['success'], result.get('error'))
+            alerts.extend(result['alerts'])
+            pages += 1
+            cursor = result['next_cursor']
+            if cursor is None:
+                return alerts, pages
+
+    def test_pages_cover_feed_without_gaps_or_duplicates(self):
+        alerts, pages = self._all_pages(limit=7)
+
+        ids = [alert['id'] for alert in alerts]
+        self.assertEqual(len(ids), 50)
+        self.assertEqual(len(set(ids)), 50)
+        self.assertEqual(pages, 8)
+        timestamps = [alert['timestamp'] for alert in alerts]
+        self.assertEqual(timestamps, sorted(timestamps, reverse=True))
+
+    def test_page_query_count_is_constant(self):
+        self.service.get_all_alerts(limit=10)
+        # UNION ALL paginé puis chargement des alertes de chaque type
+        with self.assertNumQueries(3):
+            first = self.service.get_all_alerts(limit=10)
+        with self.assertNumQueries(3):
+            self.service.get_all_alerts(limit=10, cursor=first['next_cursor'])
+
+    def test_filters(self):
+        security, _ = self._all_pages(limit=50, filter_by={'source': ['security']})
+        critical, _ = self._all_pages(limit=50, filter_by={'severity': ['critical']})
+        by_device, _ = self._all_pages(limit=50, device_ids=[self.device.id])
+
+        self.assertEqual(len(security), 20)
+        self.assertTrue(all(alert['source'] in ('ids', 'security') for alert in security))
+        self.assertEqual(len(critical), 10)
+        self.assertEqual({alert['type'] for alert in by_device}, {'monitoring'})
+
+    def test_single_branch_on_backends_ordering_compound_branches(self):
+        # PostgreSQL : une branche seule ne doit pas être réordonnée après découpage
+        with patch.object(connection.features, 'supports_slicing_ordering_in_compound', True):
+            security, pages = self._all_pages(limit=7, filter_by={'source': ['security']})
+
+        self.assertEqual((len(security), pages), (20, 3))
+
+    def test_invalid_cursor(self):
+        result = self.service.get_all_alerts(cursor="pas-un-curseur")
+
+        self.assertFalse(result['success'])
+
+    def test_cursor_round_trip(self):
+        timestamp = timezone.now()
+
+        self.assertEqual(decode_cursor(encode_cursor(timestamp, 'security', 42)), (timestamp, 'security', 42))
+
+    def test_statistics_use_grouped_counts(self):
+        with self.assertNumQueries(2):
+            stats = self.service.get_alert_statistics(days=7)
+
+        self.assertTrue(stats['success'])
+        self.assertEqual(stats['total_alerts'], 50)
+        self.assertEqual(stats['monitoring_alerts'], 30)
+        self.assertEqual(stats['by_severity']['monitoring']['critical'], 10)
+        self.assertEqual(stats['by_severity']['total']['medium'], 20)
+        self.assertEqual(stats['by_status']['security']['new'], 20)
+        self.assertEqual(stats['security_by_source'], {'ids': 10, 'security': 10})
@@ -0,0 +1,187 @@
+"""
+Tests unitaires de la file de priorité du hub de communication.
+"""
+import heapq
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ...infrastructure import centralized_communication_hub as hub_module
+from ...infrastructure.centralized_communication_hub import (
+    CentralizedCommunicationHub,
+    CommunicationMessage,
+    MessageStatus,
+    Priority
+)
+
+
+def _message(priority=Priority.NORMAL, **kwargs):
+    return CommunicationMessage(sender='tests', target='monitoring', priority=priority, **kwargs)
+
+
+class CommunicationHubTestCase(unittest.TestCase):
+    """Tests de CentralizedCommunicationHub."""
+
+    def setUp(self):
+        self.delivered = []
+        inter_module = MagicMock()
+        inter_module.send_message.side_effect = lambda message_type, data, **kwargs: self.delivered.append(data)
+        patcher = patch.multiple(hub_module, inter_module_service=inter_module,
+                                 ubuntu_notification_service=MagicMock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _hub(self, **kwargs):
+        hub = CentralizedCommunicationHub(**kwargs)
+        self.addCleanup(hub.stop)
+        return hub
+
+    def _wait_for(self, predicate, timeout=2.0):
+        deadline = time.perf_counter() + timeout
+        while not predicate():
+            self.assertLess(time.perf_counter(), deadline, "condition non atteinte")
+            time.sleep(0.001)
+
+    def test_messages_processed_by_priority(self):
+        hub = self._hub(num_workers=1)
+        for priority in (Priority.LOW, Priority.NORMAL, Priority.CRITICAL, Priority.NORMAL, Priority.HIGH):
+            hub.send_message(_message(priority, data={'priority': priority.value}))
+
+        hub.start()
+        self._wait_for(lambda: len(self.delivered) == 5)
+
+        self.assertEqual([data['priority'] for data in self.delivered],
+                         ['critical', 'high', 'normal', 'normal', 'low'])
+
+    def test_full_queue_applies_backpressure(self):
+        hub = self._hub(max_queue_size=2)
+        hub.send_message(_message(Priority.LOW))
+        hub.send_message(_message(Priority.NORMAL))
+
+        rejected = _message(Priority.LOW)
+        hub.send_message(rejected)
+        hub.send_message(_message(Priority.CRITICAL))
+
+        self.assertEqual(rejected.status, MessageStatus.FAILED)
+        self.assertEqual([message.priority for message in hub.pending_messages()],
+                         [Priority.CRITICAL, Priority.NORMAL])
+        status = hub.get_status()
+        self.assertEqual((status['statistics']['rejected_messages'], status['statistics']['dropped_messages']), (1, 1))
+        self.assertEqual(status['queue_sizes']['failed'], 2)
+
+    def test_history_is_bounded(self):
+        hub = self._hub(history_size=5)
+        hub.start()
+        for _ in range(20):
+            hub.send_message(_message())
+        self._wait_for(lambda: hub.stats['successful_messages'] == 20)
+
+        self.assertEqual(len(hub.completed_messages), 5)
+
+    def test_failed_message_is_retried(self):
+        hub = self._hub(num_workers=1)
+        hub_module.inter_module_service.send_message.side_effect = [RuntimeError("indisponible"), None]
+        message = _message()
+        hub.start()
+
+        hub.send_message(message)
+        self._wait_for(lambda: message.status == MessageStatus.COMPLETED)
+
+        self.assertEqual(message.retry_count, 1)
+
+    def test_eviction_picks_latest_lowest_priority(self):
+        hub = self._hub(max_queue_size=4)
+        first_low, last_low = _message(Priority.LOW), _message(Priority.LOW)
+        for message in (first_low, _message(Priority.HIGH), last_low, _message(Priority.NORMAL)):
+            hub.send_message(message)
+
+        hub.send_message(_message(Priority.HIGH))
+        hub.send_message(_message(Priority.CRITICAL))
+
+        self.assertEqual(last_low.status, MessageStatus.FAILED)
+        self.assertEqual(first_low.status, MessageStatus.FAILED)
+        self.assertEqual([message.priority for message in hub.pending_messages()],
+                         [Priority.CRITICAL, Priority.HIGH, Priority.HIGH, Priority.NORMAL])
+
+    def test_retry_respects_capacity(self):
+        hub = self._hub(num_workers=1, max_queue_size=1)
+        hub_module.inter_module_service.send_message.side_effect = RuntimeError("indisponible")
+        message = _message()
+
+        hub._process_single_message(message)
+        hub.send_message(_message(Priority.HIGH))
+        hub._process_single_message(hub._dequeue())
+        hub._process_single_message(message)
+
+        self.assertEqual(len(hub.pending_messages()), 1)
+        self.assertEqual(message.status, MessageStatus.FAILED)
+        self.assertEqual(message.error_message, "File de messages pleine")
+
+    def test_message_chain_wakes_workers_without_polling(self):
+        """100 messages enchaînés : les workers attendent sur la condition, sans délai de scrutation."""
+        hub = self._hub()
+        waits = []
+        wait = hub._message_available.wait
+        hub._message_available.wait = lambda *args, **kwargs: waits.append((args, kwargs)) or wait(*args, **kwargs)
+        hub.start()
+        done = threading.Event()
+
+        def hop(remaining):
+            if remaining == 0:
+                done.set()
+                return
+            hub.send_message(_message(Priority.HIGH, callback=lambda response: hop(remaining - 1)))
+
+        hop(100)
+
+        self.assertTrue(done.wait(timeout=5))
+        self.assertEqual(hub.stats['total_messages'], 100)
+        self.assertTrue(waits)
+        self.assertTrue(all(call == ((), {}) for call in waits), waits)
+
+    def test_full_queue_enqueue_is_logarithmic(self):
+        """5 000 dépôts sur une file pleine : un nombre constant d'opérations de tas par dépôt."""
+        hub = self._hub(max_queue_size=1000)
+        for _ in range(1000):
+            hub.send_message(_message(Priority.LOW))
+
+        messages = [_message(Priority.HIGH if index % 2 else Priority.LOW) for index in range(5000)]
+        counting_heapq = _CountingHeapq()
+
+        with patch.object(hub_module, 'logger'), patch.object(hub_module, 'heapq', counting_heapq):
+            for message in messages:
+                hub.send_message(message)
+
+        status = hub.get_status()
+        self.assertEqual(status['queue_sizes']['pending'], 1000)
+        # Les 1 000 premiers messages HIGH évincent les LOW, les autres sont refusés
+        self.assertEqual((hub.stats['dropped_messages'], hub.stats['rejected_messages']), (1000, 4000))
+        # Deux insertions par message accepté, au plus une extraction par
+        # entrée insérée ; reconstructions des tas amorties sur les dépôts
+        accepted = 1000
+        self.assertEqual(counting_heapq.counts['heappush'], 2 * accepted)
+        self.assertLessEqual(counting_heapq.counts['heappop'], 2 * accepted)
+        self.assertLessEqual(counting_heapq.counts['heapified'], 2 * accepted)
+
+
+class _CountingHeapq:
+    """Remplace `heapq` dans le hub en comptant les opérations de tas."""
+
+    def __init__(self):
+        self.counts = {'heappush': 0, 'heappop': 0, 'heapified': 0}
+
+    def heappush(self, heap, item):
+        self.counts['heappush'] += 1
+        heapq.heappush(heap, item)
+
+    def heappop(self, heap):
+        self.counts['heappop'] += 1
+        return heapq.heappop(heap)
+
+    def heapify(self, heap):
+        self.counts['heapified'] += len(heap)
+        heapq.heapify(heap)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,214 @@
+"""
+Tests du flux de notifications GNS3 contre un contrôleur simulé.
+"""
+import asyncio
+import json
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+try:
+    from aiohttp import web
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from api_clients.network.gns3_async_client import AsyncGNS3Client
+from ...infrastructure import gns3_central_service as central_module
+from ...infrastructure.gns3_central_service import GNS3CentralService, GNS3EventType
+from ...infrastructure.gns3_notification_stream import GNS3NotificationStream, NOTIFICATIONS_LIVE_KEY
+
+
+class _NotificationServer:
+    """Contrôleur GNS3 minimal : API v2 et flux de notifications (WebSocket ou HTTP)."""
+
+    def __init__(self):
+        self.websocket = True
+        self.projects = {
+            'p1': {'project_id': 'p1', 'name': 'lab', 'status': 'opened'},
+            'p2': {'project_id': 'p2', 'name': 'archive', 'status': 'closed'},
+        }
+        self.nodes = {
+            'p1': [
+                {'node_id': 'n1', 'name': 'R1', 'node_type': 'dynamips', 'status': 'stopped'},
+                {'node_id': 'n2', 'name': 'PC1', 'node_type': 'vpcs', 'status': 'stopped'},
+            ],
+            'p2': [],
+        }
+        self.streams = {}
+        self.shutdown = asyncio.Event()
+        self.rest_requests = 0
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/v2/version', lambda request: web.json_response({'version': '2.2.0'}))
+        app.router.add_get('/v2/projects', self._projects)
+        app.router.add_get('/v2/projects/{project_id}/nodes', self._nodes)
+        app.router.add_get('/v2/projects/{project_id}/links', self._links)
+        app.router.add_get('/v2/notifications/ws', self._websocket)
+        app.router.add_get('/v2/projects/{project_id}/notifications/ws', self._websocket)
+        app.router.add_get('/v2/notifications', self._chunked)
+        app.router.add_get('/v2/projects/{project_id}/notifications', self._chunked)
+        return app
+
+    async def _projects(self, request):
+        self.rest_requests += 1
+        return web.json_response(list(self.projects.values()))
+
+    async def _nodes(self, request):
+        self.rest_requests += 1
+        return web.json_response(self.nodes[request.match_info['project_id']])
+
+    async def _links(self, request):
+        self.rest_requests += 1
+        return web.json_response([])
+
+    async def _websocket(self, request):
+        if not self.websocket:
+            raise web.HTTPNotFound()
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.streams.setdefault(request.match_info.get('project_id'), set()).add(ws)
+        async for _ in ws:
+            pass
+        return ws
+
+    async def _chunked(self, request):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        self.streams.setdefault(request.match_info.get('project_id'), set()).add(response)
+        await self.shutdown.wait()
+        return response
+
+    async def notify(self, scope, action, event):
+        message = json.dumps({'action': action, 'event': event})
+        for stream in list(self.streams.get(scope, ())):
+            if isinstance(stream, web.WebSocketResponse):
+                await stream.send_str(message)
+            else:
+                await stream.write(message.encode() + b'\n')
+
+    async def drop(self, scope):
+        """Coupe les flux WebSocket d'une portée."""
+        for stream in self.streams.pop(scope, set()):
+            await stream.close()
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise AssertionError("condition non atteinte")
+        await asyncio.sleep(0.005)
+
+
+@unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp non disponible")
+class NotificationStreamTestCase(unittest.IsolatedAsyncioTestCase):
+    """Application des notifications GNS3 à l'état du service central."""
+
+    async def asyncSetUp(self):
+        self.cache = MagicMock()
+        patcher = patch.multiple(central_module, cache=self.cache, inter_module_service=MagicMock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.server = _NotificationServer()
+        self.runner = web.AppRunner(self.server.app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        self.service = GNS3CentralService()
+        self.service.async_client = AsyncGNS3Client(host='127.0.0.1', port=port, use_mock=False)
+        self.service.state_cache.backend = self.cache
+        self.events = []
+        self.service.register_event_callback(self._collect)
+        await self.service._load_initial_state()
+
+    async def asyncTearDown(self):
+        await self.service.stop_monitoring()
+        await self.service.async_client.close()
+        self.server.shutdown.set()
+        await self.runner.cleanup()
+
+    async def _collect(self, event):
+        self.events.append(event)
+
+    async def _start(self):
+        stream = GNS3NotificationStream(
+            self.service.async_client,
+            handler=self.service.apply_notification,
+            backfill=self.service._backfill_notifications,
+            heartbeat_timeout=1.0,
+            reconnect_delay=0.01
+        )
+        self.service.notification_stream = stream
+        stream.start()
+        stream.watch_project('p1')
+        await _wait_for(lambda: stream.is_connected and stream._connected.get('p1'))
+        return stream
+
+    @pytest.mark.performance
+    async def test_node_update_applied_in_place(self):
+        await self._start()
+        node = {**self.server.nodes['p1'][0], 'project_id': 'p1', 'status': 'started'}
+
+        rest_requests = self.server.rest_requests
+        await self.server.notify('p1', 'node.updated', node)
+        await _wait_for(lambda: self.service.current_state.nodes['n1']['status'] == 'started')
+
+        # Appliquée depuis la notification, sans relecture de l'API REST
+        self.assertEqual(self.server.rest_requests, rest_requests)
+        self.cache.set_many.assert_called_with({'gns3_central:node:n1': self.service.current_state.nodes['n1']},
+                                               timeout=300)
+        self.cache.set.assert_any_call(NOTIFICATIONS_LIVE_KEY, True, timeout=2)
+        self.assertEqual(self.service.current_state.projects['p1']['nodes']['n1']['status'], 'started')
+        self.assertEqual(self.events[-1].event_type, GNS3EventType.NODE_STARTED)
+        self.assertEqual(self.events[-1].data['old_status'], 'stopped')
+
+    async def test_reconnect_backfills_missed_changes(self):
+        stream = await self._start()
+
+        # Changement survenu pendant la coupure : aucune notification émise
+        self.server.nodes['p1'][1]['status'] = 'started'
+        await self.server.drop('p1')
+        await _wait_for(lambda: self.service.current_state.nodes['n2']['status'] == 'started')
+
+        self.assertGreaterEqual(stream.stats['reconnects'], 1)
+        self.assertEqual(stream.stats['backfills'], 1)
+        self.assertEqual([(event.event_type, event.data['action']) for event in self.events],
+                         [(GNS3EventType.NODE_STARTED, 'backfill')])
+
+    async def test_opened_project_gets_its_own_stream(self):
+        stream = await self._start()
+
+        await self.server.notify(None, 'project.updated', {**self.server.projects['p2'], 'status': 'opened'})
+        await _wait_for(lambda: stream._connected.get('p2'))
+        await self.server.notify('p2', 'node.created', {'node_id': 'n3', 'name': 'SW1', 'status': 'stopped'})
+        await _wait_for(lambda: 'n3' in self.service.current_state.nodes)
+
+        self.assertEqual(self.service.current_state.nodes['n3']['project_id'], 'p2')
+        self.assertEqual([event.event_type for event in self.events],
+                         [GNS3EventType.PROJECT_OPENED, GNS3EventType.NODE_CREATED])
+
+        await self.server.notify(None, 'project.closed', {**self.server.projects['p2'], 'status': 'closed'})
+        await _wait_for(lambda: 'p2' not in stream.watched_projects)
+
+    async def test_falls_back_to_http_stream(self):
+        self.server.websocket = False
+        stream = await self._start()
+
+        deleted = self.server.nodes['p1'].pop()
+        await self.server.notify('p1', 'node.deleted', {**deleted, 'project_id': 'p1'})
+        await _wait_for(lambda: 'n2' not in self.service.current_state.nodes)
+
+        self.assertEqual(stream.transport, 'http')
+        self.cache.delete_many.assert_any_call(['gns3_central:node:n2'])
+        self.assertEqual(self.events[-1].event_type, GNS3EventType.NODE_DELETED)
+
+
+if __name__ == '__main__':
+    unittest.main()
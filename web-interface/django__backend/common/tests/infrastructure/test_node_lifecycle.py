@@ -0,0 +1,181 @@
+"""
+Tests unitaires des opérations groupées sur les nœuds GNS3.
+"""
+import asyncio
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ...infrastructure.node_lifecycle import plan_waves, segment_neighbours
+from ...infrastructure import gns3_central_service as central_module
+from ...infrastructure.gns3_central_service import GNS3CentralService, GNS3EventType
+
+
+def _node(node_id, node_type, status='stopped'):
+    return {'node_id': node_id, 'name': node_id.upper(), 'node_type': node_type, 'status': status}
+
+
+def _link(a, b):
+    return {'link_id': f'{a}-{b}', 'nodes': [{'node_id': a}, {'node_id': b}]}
+
+
+# Deux sites : routeur r1 derrière sw1 (hôtes h1, h2), routeur r2 relié directement à h3
+LAB_NODES = [
+    _node('sw1', 'ethernet_switch'),
+    _node('r1', 'dynamips'),
+    _node('r2', 'iou'),
+    _node('h1', 'vpcs'),
+    _node('h2', 'vpcs'),
+    _node('h3', 'vpcs'),
+    _node('h4', 'vpcs'),
+]
+LAB_LINKS = [_link('r1', 'sw1'), _link('h1', 'sw1'), _link('h2', 'sw1'), _link('r2', 'h3')]
+
+
+class PlanWavesTestCase(unittest.TestCase):
+    """Tests de la répartition en vagues."""
+
+    def test_without_links_groups_by_role(self):
+        self.assertEqual(plan_waves(LAB_NODES), [['sw1'], ['r1', 'r2'], ['h1', 'h2', 'h3', 'h4']])
+
+    def test_links_keep_only_real_dependencies(self):
+        waves = plan_waves(LAB_NODES, LAB_LINKS)
+
+        # h4 n'est relié à rien, r2 et h3 ne dépendent pas du commutateur
+        self.assertEqual(waves, [['sw1', 'r2', 'h4'], ['r1', 'h3'], ['h1', 'h2']])
+
+    def test_switch_outside_selection_still_bridges_segment(self):
+        selection = [node for node in LAB_NODES if node['node_id'] in ('r1', 'h1')]
+
+        self.assertEqual(plan_waves(selection, LAB_LINKS, topology_nodes=LAB_NODES), [['r1'], ['h1']])
+
+    def test_segment_neighbours_traverse_switch_chains(self):
+        links = [_link('r1', 'sw1'), _link('sw1', 'sw2'), _link('sw2', 'h1')]
+        types = {'r1': 'dynamips', 'sw1': 'ethernet_switch', 'sw2': 'ethernet_switch', 'h1': 'vpcs'}
+
+        self.assertEqual(segment_neighbours(links, types)['h1'], {'sw1', 'sw2', 'r1'})
+
+
+class _FakeGNS3:
+    """Client asynchrone simulé : latence fixe, suivi du parallélisme."""
+
+    max_concurrency = 4
+
+    def __init__(self, nodes, links, delay=0.0, project_endpoint=False):
+        self.nodes = {node['node_id']: dict(node) for node in nodes}
+        self.links = links
+        self.delay = delay
+        self.project_endpoint = project_endpoint
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = []
+
+    async def get_nodes(self, project_id):
+        return [dict(node) for node in self.nodes.values()]
+
+    async def list_links(self, project_id):
+        return self.links
+
+    async def node_action(self, project_id, node_id, action):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.calls.append((node_id, action))
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        self.nodes[node_id]['status'] = {'stop': 'stopped', 'suspend': 'suspended'}.get(action, 'started')
+        return {}
+
+    async def project_nodes_action(self, project_id, action):
+        self.calls.append(('project', action))
+        if not self.project_endpoint:
+            raise RuntimeError("404 Not Found")
+        for node in self.nodes.values():
+            node['status'] = 'started'
+        return {}
+
+
+class BulkNodeActionTestCase(unittest.IsolatedAsyncioTestCase):
+    """Tests de GNS3CentralService.bulk_node_action."""
+
+    def setUp(self):
+        patcher = patch.multiple(central_module, cache=MagicMock(),
+                                 inter_module_service=MagicMock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = GNS3CentralService()
+        self.service.state_cache.backend = MagicMock()
+        self.events = []
+
+    async def _collect(self, event):
+        self.events.append(event)
+
+    async def test_start_follows_waves(self):
+        self.service.async_client = _FakeGNS3(LAB_NODES, LAB_LINKS)
+
+        result = await self.service.bulk_node_action('p1', 'start', progress_callback=self._collect)
+
+        order = [node_id for node_id, _ in self.service.async_client.calls]
+        self.assertLess(order.index('r1'), order.index('h1'))
+        self.assertEqual(result['waves'], [['sw1', 'r2', 'h4'], ['r1', 'h3'], ['h1', 'h2']])
+        self.assertEqual((result['succeeded'], result['failed'], result['mode']), (7, 0, 'nodes'))
+        self.assertEqual([event.data['progress']['completed'] for event in self.events], list(range(1, 8)))
+        self.assertTrue(all(event.event_type == GNS3EventType.NODE_STARTED for event in self.events))
+
+    async def test_node_states_written_once_per_wave(self):
+        self.service.async_client = _FakeGNS3(LAB_NODES, LAB_LINKS)
+
+        await self.service.bulk_node_action('p1', 'start')
+
+        batches = [call.args[0] for call in self.service.state_cache.backend.set_many.call_args_list]
+        self.assertEqual([sorted(batch) for batch in batches], [
+            ['gns3_central:node:h4', 'gns3_central:node:r2', 'gns3_central:node:sw1'],
+            ['gns3_central:node:h3', 'gns3_central:node:r1'],
+            ['gns3_central:node:h1', 'gns3_central:node:h2'],
+        ])
+        self.assertEqual(batches[2]['gns3_central:node:h1']['status'], 'started')
+        self.assertIn('h1', self.service.state_cache._written_nodes)
+
+    async def test_stop_selection_runs_hosts_first(self):
+        self.service.async_client = _FakeGNS3(LAB_NODES, LAB_LINKS)
+
+        result = await self.service.bulk_node_action('p1', 'stop', node_ids=['r1', 'h1', 'unknown'])
+
+        self.assertEqual(self.service.async_client.calls, [('h1', 'stop'), ('r1', 'stop')])
+        self.assertFalse(result['results']['unknown']['success'])
+        self.assertEqual(result['succeeded'], 2)
+
+    async def test_project_endpoint_used_when_order_is_free(self):
+        self.service.async_client = _FakeGNS3(LAB_NODES, LAB_LINKS, project_endpoint=True)
+
+        result = await self.service.bulk_node_action('p1', 'start', ordered=False)
+
+        self.assertEqual(self.service.async_client.calls, [('project', 'start')])
+        self.assertEqual((result['mode'], result['succeeded']), ('project', 7))
+
+    async def test_missing_project_endpoint_falls_back_to_nodes(self):
+        self.service.async_client = _FakeGNS3(LAB_NODES, LAB_LINKS)
+
+        result = await self.service.bulk_node_action('p1', 'suspend', ordered=False)
+
+        self.assertEqual(self.service.async_client.calls[0], ('project', 'suspend'))
+        self.assertEqual((result['mode'], result['succeeded']), ('nodes', 7))
+
+    @pytest.mark.performance
+    async def test_large_lab_starts_concurrently(self):
+        """60 nœuds à 20 ms par appel : deux vagues, chacune bornée à 4 appels simultanés."""
+        nodes = [_node(f'r{i}', 'dynamips') for i in range(10)] + [_node(f'h{i}', 'vpcs') for i in range(50)]
+        links = [_link(f'r{i % 10}', f'h{i}') for i in range(50)]
+        self.service.async_client = _FakeGNS3(nodes, links, delay=0.02)
+
+        result = await self.service.bulk_node_action('p1', 'start')
+
+        self.assertEqual(result['succeeded'], 60)
+        self.assertEqual([len(wave) for wave in result['waves']], [10, 50])
+        # Appels parallèles, sans jamais dépasser la concurrence du client
+        self.assertEqual(self.service.async_client.max_in_flight, 4)
+        self.assertEqual({node_id[0] for node_id, _ in self.service.async_client.calls[:10]}, {'r'})
+
+
+if __name__ == '__main__':
+    unittest.main()
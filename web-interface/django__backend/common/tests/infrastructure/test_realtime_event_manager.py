@@ -0,0 +1,287 @@
+"""
+Tests unitaires de la distribution des événements temps réel (Redis et Channels).
+"""
+import asyncio
+import json
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from ...infrastructure.realtime_event_system import (
+    EventPriority,
+    GNS3WebSocketConsumer,
+    RealtimeEvent,
+    RealtimeEventManager
+)
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        for name, args, kwargs in self.commands:
+            await getattr(self.redis, name)(*args, count=False, **kwargs)
+
+
+class _FakeRedis:
+    """Redis asynchrone en mémoire : listes, Pub/Sub, clés, BRPOP."""
+
+    def __init__(self):
+        self.lists = {}
+        self.keys = {}
+        self.published = []
+        self.round_trips = 0
+        self._pushed = asyncio.Event()
+
+    async def lpush(self, key, value, count=True):
+        self.round_trips += count
+        self.lists.setdefault(key, []).insert(0, value)
+        self._pushed.set()
+
+    async def publish(self, channel, value, count=True):
+        self.round_trips += count
+        self.published.append(channel)
+
+    async def set(self, key, value, ex=None, count=True):
+        self.round_trips += count
+        self.keys[key] = value
+
+    async def brpop(self, keys, timeout=0):
+        self.round_trips += 1
+        deadline = time.perf_counter() + timeout
+        while True:
+            for key in keys:
+                if self.lists.get(key):
+                    return key, self.lists[key].pop()
+            self._pushed.clear()
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(self._pushed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+def _event(priority=EventPriority.NORMAL, event_type='node.updated', index=0, project_id=None):
+    data = {'node_id': f'n{index}'}
+    if project_id:
+        data['project_id'] = project_id
+    return RealtimeEvent(
+        event_id=f'evt-{priority.value}-{index}',
+        event_type=event_type,
+        source='tests',
+        data=data,
+        timestamp=datetime.now(),
+        priority=priority
+    )
+
+
+class RealtimeEventManagerTestCase(unittest.IsolatedAsyncioTestCase):
+    """Tests de RealtimeEventManager."""
+
+    async def asyncSetUp(self):
+        self.manager = RealtimeEventManager()
+        self.redis = _FakeRedis()
+        self.manager._redis = self.redis
+        self.manager._redis_loop = asyncio.get_running_loop()
+        self.channel_layer = MagicMock(group_send=AsyncMock())
+        patcher = patch('channels.layers.get_channel_layer', return_value=self.channel_layer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        self.manager._redis = None
+        await self.manager.stop()
+
+    async def test_publish_is_one_round_trip(self):
+        await self.manager.publish_event(_event(EventPriority.HIGH, 'node.started'))
+        await self.manager.publish_event(_event(EventPriority.NORMAL))
+
+        self.assertEqual(self.redis.round_trips, 2)
+        self.assertEqual(self.redis.published, ['gns3_events:node.started'])
+        self.assertEqual(len(self.redis.lists['gns3_events:high']), 1)
+        self.assertIn('gns3_event:evt-normal-0', self.redis.keys)
+
+    def _sent_to(self, group):
+        return [call.args[1] for call in self.channel_layer.group_send.await_args_list if call.args[0] == group]
+
+    async def test_websocket_delivery_is_batched(self):
+        for index in range(120):
+            await self.manager.publish_event(_event(index=index))
+        await asyncio.sleep(self.manager.websocket_batch_window * 3)
+
+        for group in ('gns3_events.all_events', 'gns3_events.topology_changes'):
+            messages = self._sent_to(group)
+            self.assertEqual([len(message['events']) for message in messages], [50, 50, 20])
+            self.assertTrue(all(message['type'] == 'gns3_events_batch' for message in messages))
+        self.assertEqual(self.channel_layer.group_send.await_count, 6)
+
+    async def test_single_event_keeps_classic_message(self):
+        await self.manager.publish_event(_event())
+        await asyncio.sleep(self.manager.websocket_batch_window * 3)
+
+        message = self._sent_to('gns3_events.all_events')[0]
+        self.assertEqual((message['type'], message['event_data']['event_id']), ('gns3_event', 'evt-normal-0'))
+
+    async def test_events_routed_to_subscription_groups(self):
+        await self.manager.publish_event(_event(event_type='node.started', index=0, project_id='p1'))
+        await self.manager.publish_event(_event(event_type='project.opened', index=1, project_id='p2'))
+        await self.manager._flush_websocket_batch()
+
+        groups = {call.args[0]: call.args[1] for call in self.channel_layer.group_send.await_args_list}
+        self.assertEqual(set(groups), {
+            'gns3_events.all_events', 'gns3_events.node_status', 'gns3_events.project_events',
+            'gns3_events.project.p1', 'gns3_events.project.p2'
+        })
+        self.assertEqual(groups['gns3_events.project.p1']['event_data']['event_id'], 'evt-normal-0')
+        self.assertEqual(len(groups['gns3_events.all_events']['events']), 2)
+
+    async def test_queues_drained_by_priority(self):
+        delivered = []
+        self.manager._deliver_event = AsyncMock(side_effect=lambda event: delivered.append(event.event_id) or True)
+        for priority in (EventPriority.LOW, EventPriority.NORMAL, EventPriority.CRITICAL):
+            await self.manager._redis_enqueue(_event(priority), publish=False)
+
+        await self.manager.start()
+        while len(delivered) < 3:
+            await asyncio.sleep(0.001)
+
+        self.assertEqual(delivered, ['evt-critical-0', 'evt-normal-0', 'evt-low-0'])
+        self.assertEqual(self.manager.statistics['events_delivered'], 3)
+
+    async def test_retry_does_not_stall_queue(self):
+        outcomes = {'evt-normal-0': [False, True]}
+        delivered = []
+        first_delivery = asyncio.Event()
+        requeued = []
+        retry_released = asyncio.Event()
+
+        async def deliver(event):
+            success = outcomes.get(event.event_id, [True]).pop(0)
+            if success:
+                delivered.append(event.event_id)
+                first_delivery.set()
+            return success
+
+        async def requeue_later(event, delay):
+            # La remise en file reste en attente pendant tout le test
+            requeued.append((event.event_id, delay))
+            await retry_released.wait()
+
+        self.manager._deliver_event = deliver
+        self.manager._requeue_later = requeue_later
+        await self.manager.start()
+        await self.manager._redis_enqueue(_event(index=0), publish=False)
+        await self.manager._redis_enqueue(_event(index=1), publish=False)
+
+        await asyncio.wait_for(first_delivery.wait(), timeout=2)
+
+        self.assertEqual(delivered, ['evt-normal-1'])
+        self.assertEqual(requeued, [('evt-normal-0', 2)])
+        self.assertEqual(self.manager.statistics['events_retried'], 1)
+
+    @pytest.mark.performance
+    async def test_burst_uses_few_round_trips(self):
+        """Rafale de 1 000 événements : un aller-retour Redis par événement, 20 envois Channels par groupe."""
+        for index in range(1000):
+            await self.manager.publish_event(_event(EventPriority.HIGH, 'node.started', index))
+        await self.manager._flush_websocket_batch()
+
+        self.assertEqual(self.redis.round_trips, 1000)
+        self.assertEqual(self.channel_layer.group_send.await_count, 40)
+
+
+class SubscriptionConsumerTestCase(unittest.IsolatedAsyncioTestCase):
+    """Abonnements et file d'envoi du consommateur WebSocket."""
+
+    async def asyncSetUp(self):
+        self.consumer = GNS3WebSocketConsumer()
+        self.consumer.channel_name = 'specific.test'
+        self.consumer.channel_layer = MagicMock(group_add=AsyncMock(), group_discard=AsyncMock())
+        self.sent = []
+        self.consumer.send = AsyncMock(side_effect=lambda text_data: self.sent.append(json.loads(text_data)))
+        patcher = patch('common.infrastructure.realtime_event_system.cache')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def _drain(self):
+        while self.consumer.sender.pending or (self.consumer.sender._task and not self.consumer.sender._task.done()):
+            await asyncio.sleep(0)
+
+    async def test_subscriptions_join_groups(self):
+        await self.consumer.receive(json.dumps({
+            'type': 'subscribe',
+            'subscriptions': ['node_status', 'project:p1', 'bogus', 'project:abc def/x', 'project:' + 'x' * 65]
+        }))
+        await self.consumer.receive(json.dumps({'type': 'unsubscribe', 'subscriptions': ['node_status']}))
+
+        joined = [call.args[0] for call in self.consumer.channel_layer.group_add.await_args_list]
+        self.assertEqual(joined, ['gns3_events.node_status', 'gns3_events.project.p1'])
+        self.consumer.channel_layer.group_discard.assert_awaited_once_with('gns3_events.node_status', 'specific.test')
+        self.assertEqual(self.consumer.user_subscriptions, {'project:p1'})
+
+    async def test_batch_filtered_by_subscription(self):
+        self.consumer.user_subscriptions = {'node_status'}
+
+        await self.consumer.gns3_events_batch({'events': [
+            _event(event_type='node.started').to_dict(),
+            _event(event_type='link.created').to_dict(),
+        ]})
+        await self._drain()
+
+        self.assertEqual([message['event_data']['event_type'] for message in self.sent], ['node.started'])
+
+    async def test_event_from_several_groups_sent_once(self):
+        self.consumer.user_subscriptions = {'node_status', 'project:p1'}
+        event_data = _event(event_type='node.started', project_id='p1').to_dict()
+
+        await self.consumer.gns3_event({'event_data': event_data})
+        await self.consumer.gns3_event({'event_data': event_data})
+        await self._drain()
+
+        self.assertEqual(len(self.sent), 1)
+
+    async def test_slow_client_gets_latest_node_status(self):
+        self.consumer.user_subscriptions = {'all_events'}
+        release = asyncio.Event()
+
+        async def slow_send(text_data):
+            await release.wait()
+            self.sent.append(json.loads(text_data))
+
+        self.consumer.send = slow_send
+        await self.consumer.gns3_event({'event_data': _event(event_type='node.created', index=9).to_dict()})
+        for index, event_type in enumerate(['node.started', 'node.stopped', 'node.started']):
+            event_data = _event(event_type=event_type).to_dict()
+            event_data['event_id'] = f'status-{index}'
+            await self.consumer.gns3_event({'event_data': event_data})
+        await self.consumer.gns3_event({'event_data': _event(event_type='link.created', index=5).to_dict()})
+        release.set()
+        await self._drain()
+
+        self.assertEqual([message['event_data']['event_id'] for message in self.sent],
+                         ['evt-normal-9', 'status-2', 'evt-normal-5'])
+        self.assertEqual(self.consumer.sender.stats['coalesced'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
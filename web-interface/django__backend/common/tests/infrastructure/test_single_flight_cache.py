@@ -0,0 +1,169 @@
+"""
+Tests unitaires du cache à calcul unique.
+"""
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+
+from ...infrastructure.single_flight_cache import SingleFlightCache
+
+
+class _Source:
+    """Calcul lent comptant ses appels."""
+
+    def __init__(self, duration=0.05):
+        self.calls = 0
+        self.duration = duration
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+            calls = self.calls
+        time.sleep(self.duration)
+        return {'version': calls}
+
+
+def _concurrently(count, target):
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def run(index):
+        barrier.wait()
+        results[index] = target()
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class SingleFlightCacheTestCase(unittest.TestCase):
+    """Tests de SingleFlightCache."""
+
+    def setUp(self):
+        # Instance partagée entre les SingleFlightCache pour simuler plusieurs processus
+        self.cache = LocMemCache('single-flight-test', {})
+        self.cache.clear()
+        self.flight = self._flight()
+
+    def _flight(self):
+        return SingleFlightCache(backend=self.cache, lease_ttl=5, beta=0, poll_interval=0.005)
+
+    def _expire(self, key):
+        entry_key = self.flight.entry_key(key)
+        envelope = self.cache.get(entry_key)
+        envelope['fresh_until'] = time.time() - 1
+        self.cache.set(entry_key, envelope)
+
+    @pytest.mark.performance
+    def test_concurrent_misses_compute_once(self):
+        """200 appels simultanés sans valeur en cache : un seul calcul."""
+        source = _Source()
+
+        results = _concurrently(200, lambda: self.flight.get_or_compute('dashboard', source, ttl=60))
+
+        self.assertEqual(source.calls, 1)
+        self.assertTrue(all(result == {'version': 1} for result in results))
+
+    @pytest.mark.performance
+    def test_stale_value_served_while_one_refresh_runs(self):
+        """200 appels à l'expiration : la valeur périmée est servie, un seul recalcul."""
+        source = _Source()
+        self.flight.get_or_compute('dashboard', source, ttl=60)
+        self._expire('dashboard')
+
+        results = _concurrently(200, lambda: self.flight.get_or_compute('dashboard', source, ttl=60))
+        self.flight.wait_for_refreshes(5)
+
+        self.assertEqual(source.calls, 2)
+        self.assertTrue(all(result == {'version': 1} for result in results))
+        self.assertEqual(self.flight.peek('dashboard'), {'version': 2})
+
+    def test_background_refresh_closes_stale_connections(self):
+        source = _Source(0)
+        self.flight.get_or_compute('dashboard', source, ttl=60)
+        self._expire('dashboard')
+
+        with patch('common.infrastructure.single_flight_cache.close_old_connections') as close_old_connections:
+            self.flight.get_or_compute('dashboard', source, ttl=60)
+            self.flight.wait_for_refreshes(5)
+
+        self.assertEqual(source.calls, 2)
+        self.assertEqual(close_old_connections.call_count, 2)
+
+    def test_finished_refreshes_are_forgotten(self):
+        source = _Source(0)
+        for index in range(20):
+            self.flight.get_or_compute(f'device:{index}', source, ttl=60)
+            self._expire(f'device:{index}')
+            self.flight.get_or_compute(f'device:{index}', source, ttl=60)
+        self.flight.wait_for_refreshes(5)
+
+        self.assertEqual(source.calls, 40)
+        self.assertEqual(self.flight._refreshing, {})
+
+    def test_waits_for_computation_of_other_process(self):
+        first, second = self.flight, self._flight()
+        first_source, second_source = _Source(0.1), _Source()
+
+        results = {}
+        thread = threading.Thread(target=lambda: results.update(
+            first=first.get_or_compute('k', first_source, ttl=60)))
+        thread.start()
+        time.sleep(0.02)
+        results['second'] = second.get_or_compute('k', second_source, ttl=60)
+        thread.join()
+
+        self.assertEqual((first_source.calls, second_source.calls), (1, 0))
+        self.assertEqual(results['second'], {'version': 1})
+
+    def test_expired_lease_taken_over(self):
+        self.cache.add(self.flight.lease_key('k'), 'crashed')
+        self.flight.lease_ttl = 0.05
+        source = _Source(0)
+
+        self.assertEqual(self.flight.get_or_compute('k', source, ttl=60), {'version': 1})
+        self.assertEqual(source.calls, 1)
+
+    def test_uncacheable_value_not_stored(self):
+        source = _Source(0)
+
+        for _ in range(2):
+            self.flight.get_or_compute('k', source, ttl=60, cacheable=lambda value: False)
+
+        self.assertEqual(source.calls, 2)
+        self.assertIsNone(self.cache.get(self.flight.lease_key('k')))
+
+    def test_tag_invalidation(self):
+        source = _Source(0)
+        self.flight.get_or_compute('a', source, ttl=60, tags=['dashboard'])
+        self.flight.get_or_compute('b', source, ttl=60, tags=['topology'])
+
+        self.flight.invalidate_tags('dashboard')
+        self.flight.invalidate_tags('dashboard')
+
+        self.assertIsNone(self.flight.peek('a', tags=['dashboard']))
+        self.assertEqual(self.flight.get_or_compute('a', source, ttl=60, tags=['dashboard']), {'version': 3})
+        self.assertEqual(self.flight.get_or_compute('b', source, ttl=60, tags=['topology']), {'version': 2})
+
+    def test_early_refresh_probability_grows_near_expiry(self):
+        flight = SingleFlightCache(backend=self.cache, beta=1.0)
+        now = time.time()
+        envelope = {'fresh_until': now + 10, 'delta': 2.0}
+
+        with patch('common.infrastructure.single_flight_cache.random.random', return_value=0.5):
+            self.assertFalse(flight._should_refresh(envelope, now))
+            # Déclenchement lorsque delta * ln 2 (≈ 1,39 s) dépasse le temps restant
+            self.assertFalse(flight._should_refresh(envelope, now + 8.5))
+            self.assertTrue(flight._should_refresh(envelope, now + 8.7))
+
+
+if __name__ == '__main__':
+    unittest.main()
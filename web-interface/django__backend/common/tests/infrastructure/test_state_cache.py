@@ -0,0 +1,135 @@
+"""
+Tests unitaires du cache groupé de l'état réseau.
+"""
+import pickle
+import unittest
+
+import pytest
+
+from ...infrastructure.state_cache import NetworkStateCache
+
+
+class _CountingCache:
+    """Cache en mémoire comptant les allers-retours et les octets sérialisés."""
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+        self.bytes_written = 0
+
+    def set(self, key, value, timeout=None):
+        self.set_many({key: value}, timeout)
+
+    def set_many(self, mapping, timeout=None):
+        self.round_trips += 1
+        for key, value in mapping.items():
+            payload = pickle.dumps(value)
+            self.bytes_written += len(payload)
+            self.data[key] = payload
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        self.round_trips += 1
+        return {key: pickle.loads(self.data[key]) for key in keys if key in self.data}
+
+    def delete(self, key):
+        self.delete_many([key])
+
+    def delete_many(self, keys):
+        self.round_trips += 1
+        for key in keys:
+            self.data.pop(key, None)
+
+
+def _state(projects=2, nodes_per_project=3):
+    projects_data, nodes = {}, {}
+    for p in range(projects):
+        project_id = f'p{p}'
+        project_nodes = {
+            f'{project_id}-n{n}': {'node_id': f'{project_id}-n{n}', 'project_id': project_id, 'name': f'R{n}',
+                                   'status': 'started',
+                                   'ports': [{'name': f'e{i}', 'adapter_number': i} for i in range(8)]}
+            for n in range(nodes_per_project)
+        }
+        projects_data[project_id] = {'project_id': project_id, 'name': f'lab{p}', 'nodes': project_nodes}
+        nodes.update(project_nodes)
+    return {
+        'projects': projects_data,
+        'nodes': nodes,
+        'links': {'l1': {'link_id': 'l1', 'project_id': 'p0'}},
+        'last_update': '2024-01-01T00:00:00',
+        'server_status': 'connected'
+    }
+
+
+class NetworkStateCacheTestCase(unittest.TestCase):
+    """Tests de NetworkStateCache."""
+
+    def setUp(self):
+        self.backend = _CountingCache()
+        self.cache = NetworkStateCache(backend=self.backend)
+
+    def test_state_written_in_one_call_and_read_back(self):
+        state = _state()
+
+        self.cache.write_state(**state)
+
+        self.assertEqual(self.backend.round_trips, 1)
+        self.assertEqual(self.cache.read_state(), state)
+        self.assertEqual(self.backend.round_trips, 3)
+
+    def test_aggregate_refers_to_nodes_by_id(self):
+        self.cache.write_state(**_state())
+
+        aggregate = self.backend.get('gns3_central:network_state')
+        self.assertNotIn('nodes', aggregate)
+        self.assertEqual(aggregate['projects']['p0']['node_ids'], ['p0-n0', 'p0-n1', 'p0-n2'])
+        self.assertEqual(self.backend.get('gns3_central:project:p1')['node_ids'], ['p1-n0', 'p1-n1', 'p1-n2'])
+
+    def test_missing_node_invalidates_aggregate(self):
+        self.cache.write_state(**_state())
+        self.backend.delete('gns3_central:node:p0-n1')
+
+        self.assertIsNone(self.cache.read_state())
+        self.assertIsNone(self.cache.read_project('p0'))
+        self.assertIsNotNone(self.cache.read_project('p1'))
+
+    def test_vanished_entries_are_purged(self):
+        self.cache.write_state(**_state(projects=2))
+        self.cache.write_state(**_state(projects=1))
+
+        self.assertNotIn('gns3_central:node:p1-n0', self.backend.data)
+        self.assertNotIn('gns3_central:project:p1', self.backend.data)
+        self.assertIn('gns3_central:node:p0-n0', self.backend.data)
+
+    def test_read_nodes_in_one_call(self):
+        self.cache.write_state(**_state())
+        self.backend.round_trips = 0
+
+        nodes = self.cache.read_nodes(['p0-n0', 'p1-n2', 'unknown'])
+
+        self.assertEqual(set(nodes), {'p0-n0', 'p1-n2'})
+        self.assertEqual(self.backend.round_trips, 1)
+
+    @pytest.mark.performance
+    def test_large_state_serialized_once(self):
+        """2 000 nœuds : un seul aller-retour, chaque nœud sérialisé une fois."""
+        state = _state(projects=20, nodes_per_project=100)
+        legacy = _CountingCache()
+        legacy.set('network_state', state)
+        for node_id, node in state['nodes'].items():
+            legacy.set(f'node:{node_id}', node)
+        for project_id, project in state['projects'].items():
+            legacy.set(f'project:{project_id}', project)
+
+        self.cache.write_state(**state)
+
+        self.assertEqual(legacy.round_trips, 2021)
+        self.assertEqual(self.backend.round_trips, 1)
+        self.assertLess(self.backend.bytes_written, legacy.bytes_written / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
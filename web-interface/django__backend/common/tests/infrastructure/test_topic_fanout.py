@@ -0,0 +1,233 @@
+"""
+Tests unitaires de la diffusion partagée par sujet.
+"""
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+
+import pytest
+
+from ...infrastructure.topic_fanout import (
+    CoalescingSender,
+    TopicFanoutHub,
+    apply_delta,
+    compute_delta,
+    delta_message,
+    merge_deltas,
+    merge_messages,
+    snapshot_message
+)
+
+
+class _MemoryCache:
+    """Cache Django minimal en mémoire (partagé entre hubs pour simuler plusieurs processus)."""
+
+    def __init__(self):
+        self.data = {}
+
+    def add(self, key, value, timeout=None):
+        if key in self.data:
+            return False
+        self.data[key] = value
+        return True
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key, value, timeout=None):
+        self.data[key] = value
+
+    def touch(self, key, timeout=None):
+        return key in self.data
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class _ChannelLayer:
+    """Couche Channels en mémoire : chaque canal abonné reçoit les messages de ses groupes."""
+
+    def __init__(self):
+        self.groups = {}
+        self.receivers = {}
+
+    async def group_add(self, group, channel_name):
+        self.groups.setdefault(group, set()).add(channel_name)
+
+    async def group_discard(self, group, channel_name):
+        self.groups.get(group, set()).discard(channel_name)
+
+    async def group_send(self, group, message):
+        for channel_name in list(self.groups.get(group, ())):
+            self.receivers[channel_name].append(message)
+
+
+class _Source:
+    """Producteur comptant ses appels ; chaque appel fait évoluer une valeur."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return {'devices_online': 8, 'cpu': {'avg': 40 + self.calls}}
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise AssertionError("condition non atteinte")
+        await asyncio.sleep(0.001)
+
+
+class DeltaTestCase(unittest.TestCase):
+    """Calcul, application et fusion des deltas."""
+
+    def test_delta_round_trip(self):
+        before = {'stats': {'online': 8, 'total': 10}, 'metrics': {'CPU Usage': {'value': 75}}, 'old': 1}
+        after = {'stats': {'online': 9, 'total': 10}, 'metrics': {'CPU Usage': {'value': 75}, 'a/b': 2}}
+
+        delta = compute_delta(before, after)
+
+        self.assertEqual(delta, {'set': {'/stats/online': 9, '/metrics/a~1b': 2}, 'unset': ['/old']})
+        self.assertEqual(apply_delta(before, delta), after)
+
+    def test_merged_deltas_equal_sequential_application(self):
+        states = [{'a': 1, 'b': {'c': 2}}, {'a': 2, 'b': 5}, {'b': {'d': 3}, 'e': 1}]
+        first, second = compute_delta(states[0], states[1]), compute_delta(states[1], states[2])
+
+        self.assertEqual(apply_delta(states[0], merge_deltas(first, second)), states[2])
+
+    def test_delta_merged_into_pending_snapshot(self):
+        base = {'seq': 3, 'data': {'a': 1}}
+        pending = snapshot_message('t', base)
+
+        merged = merge_messages(pending, delta_message('t', 4, compute_delta({'a': 1}, {'a': 2})))
+
+        self.assertEqual((merged['type'], merged['seq'], merged['data']), ('topic_snapshot', 4, {'a': 2}))
+
+
+class TopicFanoutHubTestCase(unittest.IsolatedAsyncioTestCase):
+    """Tests de TopicFanoutHub."""
+
+    async def asyncSetUp(self):
+        self.cache = _MemoryCache()
+        self.layer = _ChannelLayer()
+        patcher = patch('common.infrastructure.topic_fanout.get_channel_layer', return_value=self.layer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.hubs = []
+
+    async def asyncTearDown(self):
+        for hub in self.hubs:
+            await hub.stop()
+
+    def _hub(self):
+        hub = TopicFanoutHub(interval=0.01, backend=self.cache)
+        self.hubs.append(hub)
+        return hub
+
+    async def _subscribe(self, hub, topic, source, count):
+        received = {}
+        for index in range(count):
+            channel_name = f'{id(hub)}.{index}'
+            received[channel_name] = []
+            self.layer.receivers[channel_name] = received[channel_name]
+            await hub.subscribe(topic, channel_name, source)
+        return received
+
+    @pytest.mark.performance
+    async def test_one_computation_per_interval_regardless_of_viewers(self):
+        """5 puis 500 abonnés : un seul calcul par intervalle dans les deux cas."""
+        for viewers in (5, 500):
+            hub, source = self._hub(), _Source()
+            received = await self._subscribe(hub, f'monitoring.global.{viewers}', source, viewers)
+
+            await _wait_for(lambda: hub.stats['updates_broadcast'] >= 3)
+            await hub.stop()
+
+            self.assertEqual(source.calls, hub.stats['updates_broadcast'] + 1)
+            self.assertTrue(all(len(messages) >= 3 for messages in received.values()))
+            self.assertEqual(received[f'{id(hub)}.0'][0]['delta'], {'set': {'/cpu/avg': 42}, 'unset': []})
+
+    async def test_unchanged_snapshot_not_broadcast(self):
+        hub = self._hub()
+        calls = []
+
+        async def constant():
+            calls.append(1)
+            return {'value': 1}
+
+        received = await self._subscribe(hub, 'monitoring.global', constant, 2)
+        await _wait_for(lambda: len(calls) >= 3)
+
+        self.assertEqual(hub.stats['updates_broadcast'], 0)
+        self.assertTrue(all(messages == [] for messages in received.values()))
+
+    async def test_last_unsubscribe_stops_producer(self):
+        hub, source = self._hub(), _Source()
+        await self._subscribe(hub, 'monitoring.device.7', source, 2)
+
+        await hub.unsubscribe('monitoring.device.7', f'{id(hub)}.0')
+        self.assertIn('monitoring.device.7', hub._tasks)
+        await hub.unsubscribe('monitoring.device.7', f'{id(hub)}.1')
+
+        self.assertEqual(hub.subscriber_counts, {})
+        self.assertEqual(hub._tasks, {})
+
+    async def test_single_producer_across_processes(self):
+        first, second = self._hub(), self._hub()
+        first_source, second_source = _Source(), _Source()
+        received = await self._subscribe(first, 'monitoring.global', first_source, 1)
+        received.update(await self._subscribe(second, 'monitoring.global', second_source, 1))
+
+        await _wait_for(lambda: first.stats['updates_broadcast'] + second.stats['updates_broadcast'] >= 5)
+
+        # Le second processus lit l'instantané en cache au lieu de le calculer
+        self.assertEqual(second_source.calls, 0)
+        self.assertGreater(second.stats['lease_skipped'], 0)
+        for messages in received.values():
+            seqs = [message['seq'] for message in messages]
+            self.assertEqual(seqs, list(range(seqs[0], seqs[0] + len(seqs))))
+
+
+class CoalescingSenderTestCase(unittest.IsolatedAsyncioTestCase):
+    """Tests de CoalescingSender."""
+
+    async def test_slow_client_receives_merged_state(self):
+        release = asyncio.Event()
+        sent = []
+
+        async def send(message):
+            await release.wait()
+            sent.append(message)
+
+        sender = CoalescingSender(send)
+        states = [{'cpu': 40 + index, 'mem': {'used': index % 2}} for index in range(20)]
+        sender.push('t', snapshot_message('t', {'seq': 0, 'data': states[0]}))
+        await asyncio.sleep(0)
+        for seq in range(1, 20):
+            sender.push('t', delta_message('t', seq, compute_delta(states[seq - 1], states[seq])),
+                        merge=merge_messages)
+        release.set()
+        await _wait_for(lambda: not sender.pending and sender._task.done())
+
+        self.assertEqual([message['type'] for message in sent], ['topic_snapshot', 'topic_delta'])
+        self.assertEqual((sent[1]['base_seq'], sent[1]['seq']), (0, 19))
+        self.assertEqual(apply_delta(sent[0]['data'], sent[1]), states[-1])
+        self.assertEqual(sender.stats['coalesced'], 18)
+
+    async def test_pending_bound_drops_oldest(self):
+        sender = CoalescingSender(lambda message: asyncio.sleep(0), max_pending=2)
+        for key in 'abc':
+            sender.push(key, {'key': key})
+
+        self.assertEqual(sender.pending, ['b', 'c'])
+        self.assertEqual(sender.stats['dropped'], 1)
+        await sender.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
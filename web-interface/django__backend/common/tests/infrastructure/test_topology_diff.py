@@ -0,0 +1,222 @@
+"""
+Tests unitaires pour la détection incrémentale des changements de topologie.
+"""
+import copy
+import random
+import unittest
+from unittest.mock import Mock, patch
+
+import pytest
+
+from ...infrastructure import topology_diff
+from ...infrastructure.topology_diff import (
+    TopologyChangeTracker, apply_patches, diff_topology, index_topology
+)
+from ...infrastructure.central_topology_service import TopologyModule
+from ...infrastructure.inter_module_service import MessageType
+
+
+def _node(node_id, status='started', x=0):
+    return {'node_id': node_id, 'name': f'R{node_id}', 'status': status, 'x': x, 'y': 0}
+
+
+def _link(link_id, a, b):
+    return {'link_id': link_id, 'nodes': [{'node_id': a}, {'node_id': b}]}
+
+
+def _project(project_id, nodes, links, name=None):
+    return {
+        'project_id': project_id,
+        'name': name or project_id,
+        'status': 'opened',
+        'nodes': nodes,
+        'node_count': len(nodes),
+        'links': links,
+        'link_count': len(links)
+    }
+
+
+def _canonical(projects):
+    """Topologie comparable indépendamment de l'ordre des éléments."""
+    return {
+        project['project_id']: {
+            **{key: value for key, value in project.items() if key not in ('nodes', 'links')},
+            'nodes': sorted(project['nodes'], key=lambda node: node['node_id']),
+            'links': sorted(project['links'], key=lambda link: link['link_id'])
+        }
+        for project in projects
+    }
+
+
+class TopologyDiffTestCase(unittest.TestCase):
+    """Tests du différentiel structurel."""
+
+    def setUp(self):
+        self.topology = [
+            _project('p1', [_node('1'), _node('2'), _node('3')], [_link('l1', '1', '2'), _link('l2', '2', '3')]),
+            _project('p2', [_node('4')], []),
+        ]
+
+    def _diff(self, before, after):
+        return diff_topology(index_topology(before)[1], index_topology(after)[1])
+
+    def test_identical_topologies_have_same_fingerprint(self):
+        self.assertEqual(index_topology(self.topology)[0], index_topology(copy.deepcopy(self.topology))[0])
+        self.assertEqual(self._diff(self.topology, copy.deepcopy(self.topology)), [])
+
+    def test_detects_moves_status_flips_and_link_changes(self):
+        after = copy.deepcopy(self.topology)
+        after[0]['nodes'][0]['x'] = 120
+        after[0]['nodes'][1]['status'] = 'stopped'
+        after[0]['links'] = [_link('l1', '1', '2'), _link('l3', '1', '3')]
+
+        patches = self._diff(self.topology, after)
+
+        self.assertCountEqual(patches, [
+            {'op': 'update', 'kind': 'node', 'project_id': 'p1', 'id': '1', 'data': {'x': 120}},
+            {'op': 'update', 'kind': 'node', 'project_id': 'p1', 'id': '2', 'data': {'status': 'stopped'}},
+            {'op': 'remove', 'kind': 'link', 'project_id': 'p1', 'id': 'l2'},
+            {'op': 'add', 'kind': 'link', 'project_id': 'p1', 'id': 'l3', 'data': _link('l3', '1', '3')},
+        ])
+
+    def test_unchanged_projects_are_not_patched(self):
+        after = copy.deepcopy(self.topology)
+        after[1]['name'] = 'renamed'
+
+        patches = self._diff(self.topology, after)
+
+        self.assertEqual(patches, [
+            {'op': 'update', 'kind': 'project', 'project_id': 'p2', 'data': {'name': 'renamed'}}
+        ])
+
+    def test_apply_patches_reproduces_random_changes(self):
+        rng = random.Random(7)
+        counter = iter(range(1000, 100000))
+        before = self.topology
+        for _ in range(200):
+            after = copy.deepcopy(before)
+            for _ in range(rng.randint(1, 4)):
+                project = rng.choice(after)
+                action = rng.randrange(5)
+                if action == 0 and project['nodes']:
+                    rng.choice(project['nodes'])['status'] = rng.choice(['started', 'stopped'])
+                elif action == 1:
+                    project['nodes'].append(_node(str(next(counter)), x=rng.randrange(100)))
+                elif action == 2 and project['nodes']:
+                    project['nodes'].pop(rng.randrange(len(project['nodes'])))
+                elif action == 3:
+                    project['links'].append(_link(f'l{next(counter)}', '1', '2'))
+                elif project['links']:
+                    project['links'].pop(rng.randrange(len(project['links'])))
+            if rng.random() < 0.1:
+                after.append(_project(f'p{next(counter)}', [_node('9')], []))
+            if rng.random() < 0.05 and len(after) > 1:
+                after.pop(0)
+            for project in after:
+                project['node_count'] = len(project['nodes'])
+                project['link_count'] = len(project['links'])
+
+            patched = apply_patches(before, self._diff(before, after))
+
+            self.assertEqual(_canonical(patched), _canonical(after))
+            before = after
+
+
+class TopologyChangeTrackerTestCase(unittest.TestCase):
+    """Tests des numéros de séquence du suivi de topologie."""
+
+    def test_sequence_advances_only_on_change(self):
+        tracker = TopologyChangeTracker()
+        topology = [_project('p1', [_node('1')], [])]
+
+        first = tracker.update(topology)
+        self.assertEqual((first['base_sequence'], first['sequence']), (0, 1))
+        self.assertIsNone(tracker.update(copy.deepcopy(topology)))
+
+        changed = copy.deepcopy(topology)
+        changed[0]['nodes'][0]['status'] = 'stopped'
+        second = tracker.update(changed)
+
+        self.assertEqual((second['base_sequence'], second['sequence']), (1, 2))
+        self.assertEqual(second['base_fingerprint'], first['fingerprint'])
+        self.assertEqual(tracker.snapshot()['topology_data'], changed)
+
+
+class TopologyModuleTestCase(unittest.TestCase):
+    """Tests de l'application des patchs par un module consommateur."""
+
+    def setUp(self):
+        self.service = Mock(spec=['integrate_gns3_topology', 'handle_node_status_change'])
+        self.resync = Mock()
+        self.module = TopologyModule('monitoring', self.service, resync_callback=self.resync)
+        self.tracker = TopologyChangeTracker()
+
+    def test_patches_are_applied_in_sequence(self):
+        topology = [_project('p1', [_node('1'), _node('2')], [_link('l1', '1', '2')])]
+        self.module.handle_message(MessageType.TOPOLOGY_UPDATE, self.tracker.update(topology), 'central')
+
+        changed = copy.deepcopy(topology)
+        changed[0]['nodes'][1]['status'] = 'stopped'
+        self.module.handle_message(MessageType.TOPOLOGY_UPDATE, self.tracker.update(changed), 'central')
+
+        self.assertEqual(self.module.sequence, 2)
+        self.assertEqual(_canonical(self.module.gns3_data), _canonical(changed))
+        self.service.handle_node_status_change.assert_called_once_with(
+            {'project_id': 'p1', 'node_id': '2', 'status': 'stopped'}
+        )
+        self.resync.assert_not_called()
+
+    def test_gap_requests_resync(self):
+        self.tracker.update([_project('p1', [_node('1')], [])])
+        missed = self.tracker.update([_project('p1', [_node('1'), _node('2')], [])])
+
+        self.module.handle_message(MessageType.TOPOLOGY_UPDATE, missed, 'central')
+
+        self.resync.assert_called_once_with('monitoring')
+        self.assertEqual(self.module.sequence, 0)
+
+        self.module.handle_message(MessageType.TOPOLOGY_UPDATE, self.tracker.snapshot(), 'central')
+        self.assertEqual(self.module.sequence, 2)
+        self.assertEqual(len(self.module.gns3_data[0]['nodes']), 2)
+
+    def test_gns3_events_do_not_replace_topology(self):
+        topology = [_project('p1', [_node('1')], [])]
+        self.module.handle_message(MessageType.TOPOLOGY_UPDATE, self.tracker.update(topology), 'central')
+        self.service.integrate_gns3_topology.reset_mock()
+
+        for event in (
+            {'event_type': 'node_created', 'project_id': 'p1', 'node_id': '2'},
+            {'event_type': 'project_closed', 'project_id': 'p1'},
+            {'event_type': 'topology_changed', 'project_id': 'p1', 'sequence': 42},
+        ):
+            self.module.handle_message(MessageType.TOPOLOGY_UPDATE, event, 'gns3_central_service')
+
+        self.assertEqual(self.module.sequence, 1)
+        self.assertEqual(_canonical(self.module.gns3_data), _canonical(topology))
+        self.service.integrate_gns3_topology.assert_not_called()
+        self.resync.assert_not_called()
+
+
+class TopologyDiffPerformanceTestCase(unittest.TestCase):
+    """Benchmark de la détection de changements."""
+
+    @pytest.mark.performance
+    def test_large_topology_diff(self):
+        """Relevé de 50 projets x 200 nœuds : seul le nœud modifié est comparé champ par champ."""
+        topology = [
+            _project(f'p{p}', [_node(str(n)) for n in range(200)],
+                     [_link(f'l{n}', str(n), str(n + 1)) for n in range(199)])
+            for p in range(50)
+        ]
+        tracker = TopologyChangeTracker()
+        tracker.update(topology)
+        changed = copy.deepcopy(topology)
+        changed[10]['nodes'][5]['status'] = 'stopped'
+
+        with patch.object(topology_diff, '_changed_fields', wraps=topology_diff._changed_fields) as changed_fields:
+            change = tracker.update(changed)
+
+        self.assertEqual(len(change['patches']), 1)
+        self.assertEqual(change['patches'][0]['id'], '5')
+        # Les 49 projets inchangés sont écartés par leur empreinte
+        self.assertEqual(changed_fields.call_count, 1)
@@ -183,7 +183,7 @@ class TestRealtimeEventSystem(TransactionTestCase):
         )
         
         with patch.object(self.event_manager, '_publish_to_websocket') as mock_ws:
-            with patch.object(self.event_manager, '_async_redis_lpush') as mock_redis:
+            with patch.object(self.event_manager, '_redis_enqueue') as mock_redis:
                 await self.event_manager.publish_event(event)
                 
                 mock_ws.assert_called_once()
@@ -18,6 +18,7 @@ DEFAULT_DASHBOARD_SETTINGS = {
     'ENABLE_WEBSOCKET': True,  # Activer les mises à jour en temps réel via WebSockets
     'CUSTOM_DASHBOARDS_ENABLED': True,  # Activer les tableaux de bord personnalisés
     'DATA_RETENTION_DAYS': 30,  # Durée de conservation des données historiques en jours
+    'METRIC_HISTORY_RETENTION_HOURS': 24,  # Conservation de l'historique des métriques temps réel
     'LOG_LEVEL': 'INFO',  # Niveau de journalisation
     'ENABLE_PROMETHEUS': True,  # Activer l'intégration Prometheus
 }
@@ -57,6 +58,10 @@ def get_data_retention_days():
     """Récupère la durée de conservation des données historiques."""
     return DASHBOARD_SETTINGS['DATA_RETENTION_DAYS']
 
+def get_metric_history_retention_hours():
+    """Récupère la durée de conservation de l'historique des métriques temps réel."""
+    return DASHBOARD_SETTINGS['METRIC_HISTORY_RETENTION_HOURS']
+
 def get_log_level():
     """Récupère le niveau de journalisation."""
     return DASHBOARD_SETTINGS['LOG_LEVEL']
@@ -0,0 +1,296 @@
+"""
+Historique des métriques par tranches horaires.
+
+Chaque série (type de métrique, équipement) est découpée en tranches d'une
+heure. Avec Redis, une tranche est un ensemble trié (score = horodatage,
+membre = "horodatage:valeur") : l'ajout d'une lecture est un ZADD, et la
+lecture d'une plage parcourt toutes ses tranches en un seul aller-retour
+(pipeline), ou en un seul EVAL qui sous-échantillonne côté Redis
+(min/max/moyenne par intervalle).
+
+Sans Redis, chaque lecture est un enregistrement compact de taille fixe
+(horodatage uint32, valeur float64) rangé sous sa propre clé du cache
+Django : `<tranche>:<n>`, où n est tiré d'un compteur de tranche par
+`incr`, atomique. Deux écritures concurrentes dans une même tranche ne
+s'écrasent donc pas (contrairement à un `get` suivi d'un `set`). Une plage
+est relue en deux `get_many` : les compteurs des tranches, puis leurs
+lectures.
+"""
+
+import logging
+import struct
+import time
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import redis
+from django.conf import settings
+from django.core.cache import cache
+
+from ..conf import get_metric_history_retention_hours
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SECONDS = 3600
+# Délai avant une nouvelle tentative de connexion à Redis après un échec
+REDIS_RETRY_SECONDS = 60
+RECORD = struct.Struct('<Id')
+
+# Sous-échantillonnage côté Redis : KEYS = tranches, ARGV = début, fin, points
+DOWNSAMPLE_SCRIPT = """
+local start_ts, end_ts, points = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local width = (end_ts - start_ts) / points
+local mins, maxs, sums, counts = {}, {}, {}, {}
+for _, key in ipairs(KEYS) do
+    local entries = redis.call('ZRANGEBYSCORE', key, start_ts, end_ts, 'WITHSCORES')
+    for i = 1, #entries, 2 do
+        local member = entries[i]
+        local ts = tonumber(entries[i + 1])
+        local value = tonumber(string.sub(member, string.find(member, ':', 1, true) + 1))
+        local slot = math.min(math.floor((ts - start_ts) / width), points - 1)
+        if counts[slot] then
+            if value < mins[slot] then mins[slot] = value end
+            if value > maxs[slot] then maxs[slot] = value end
+            sums[slot] = sums[slot] + value
+            counts[slot] = counts[slot] + 1
+        else
+            mins[slot], maxs[slot], sums[slot], counts[slot] = value, value, value, 1
+        end
+    end
+end
+local result = {}
+for slot = 0, points - 1 do
+    if counts[slot] then
+        table.insert(result, {slot, tostring(mins[slot]), tostring(maxs[slot]),
+                              tostring(sums[slot] / counts[slot]), counts[slot]})
+    end
+end
+return result
+"""
+
+
+def _epoch(moment: datetime) -> float:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=dt_timezone.utc)
+    return moment.timestamp()
+
+
+def _isoformat(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=dt_timezone.utc).isoformat()
+
+
+def downsample(readings: Iterable[Tuple[float, float]], start: float, end: float,
+               points: int) -> List[Tuple[int, float, float, float, int]]:
+    """
+    Regroupe des lectures (horodatage, valeur) en `points` intervalles.
+
+    Même calcul que le script Redis, pour le stockage sans Redis.
+
+    Returns:
+        [(intervalle, min, max, moyenne, nombre)] pour les intervalles non vides
+    """
+    width = (end - start) / points
+    slots: Dict[int, List[float]] = {}
+    for ts, value in readings:
+        if start <= ts <= end:
+            slot = min(int((ts - start) // width), points - 1)
+            current = slots.get(slot)
+            if current is None:
+                slots[slot] = [value, value, value, 1]
+            else:
+                current[0] = min(current[0], value)
+                current[1] = max(current[1], value)
+                current[2] += value
+                current[3] += 1
+    return [(slot, low, high, total / count, count)
+            for slot, (low, high, total, count) in sorted(slots.items())]
+
+
+class MetricHistoryStore:
+    """
+    Stockage de l'historique des métriques par tranches horaires.
+
+    Le client Redis est créé au premier usage ; s'il est injoignable, le
+    cache Django prend le relais et la connexion est retentée après
+    REDIS_RETRY_SECONDS.
+    """
+
+    def __init__(self, redis_client=None, retention_hours: Optional[int] = None, prefix: str = "metric_history"):
+        """
+        Initialise le stockage.
+
+        Args:
+            redis_client: Client Redis (par défaut créé depuis les settings)
+            retention_hours: Durée de conservation de l'historique
+            prefix: Préfixe des clés
+        """
+        self.prefix = prefix
+        self.retention_hours = retention_hours or get_metric_history_retention_hours()
+        self._redis = redis_client
+        # Prochaine tentative de connexion (monotonic) tant que Redis manque
+        self._retry_after = 0.0
+        self._downsample = None
+
+    @property
+    def bucket_ttl(self) -> int:
+        return (self.retention_hours + 1) * BUCKET_SECONDS
+
+    def _client(self):
+        """Client Redis, ou None pour utiliser le cache Django."""
+        if self._redis is None and time.monotonic() >= self._retry_after:
+            self._retry_after = time.monotonic() + REDIS_RETRY_SECONDS
+            try:
+                client = redis.Redis(
+                    host=getattr(settings, 'REDIS_HOST', 'localhost'),
+                    port=int(getattr(settings, 'REDIS_PORT', 6379)),
+                    password=getattr(settings, 'REDIS_PASSWORD', None) or None,
+                    db=int(getattr(settings, 'REDIS_DB_CACHE', 2)),
+                    decode_responses=True,
+                    socket_connect_timeout=2
+                )
+                client.ping()
+                self._redis = client
+            except Exception as e:
+                logger.warning(f"Historique des métriques sans Redis ({e}), utilisation du cache Django "
+                               f"(nouvelle tentative dans {REDIS_RETRY_SECONDS} s)")
+        return self._redis
+
+    # ==================== CLÉS ====================
+
+    def series(self, metric_type: str, device_id: Optional[int] = None) -> str:
+        return f"{self.prefix}:{metric_type}:{device_id or 'global'}"
+
+    def bucket_key(self, series: str, epoch: float) -> str:
+        return f"{series}:{int(epoch // BUCKET_SECONDS)}"
+
+    def _bucket_keys(self, series: str, start: float, end: float) -> List[str]:
+        first, last = int(start // BUCKET_SECONDS), int(end // BUCKET_SECONDS)
+        return [f"{series}:{bucket}" for bucket in range(first, last + 1)]
+
+    # ==================== ÉCRITURE ====================
+
+    def append(self, metric_type: str, device_id: Optional[int], value: float, timestamp: datetime,
+               device_name: Optional[str] = None):
+        """
+        Ajoute une lecture à sa tranche horaire.
+
+        Args:
+            metric_type: Type de métrique
+            device_id: ID de l'équipement (None pour une métrique globale)
+            value: Valeur lue
+            timestamp: Date de la lecture
+            device_name: Nom de l'équipement (conservé une fois par série)
+        """
+        series = self.series(metric_type, device_id)
+        epoch = _epoch(timestamp)
+        key = self.bucket_key(series, epoch)
+
+        client = self._client()
+        if client is not None:
+            pipe = client.pipeline(transaction=False)
+            pipe.zadd(key, {f"{epoch:.3f}:{float(value)!r}": epoch})
+            pipe.expire(key, self.bucket_ttl)
+            if device_name:
+                pipe.set(f"{series}:name", device_name, ex=self.bucket_ttl)
+            pipe.execute()
+            return
+
+        counter = f"{key}:count"
+        try:
+            index = cache.incr(counter)
+        except ValueError:
+            # Première lecture de la tranche (ou compteur expiré)
+            cache.add(counter, 0, timeout=self.bucket_ttl)
+            index = cache.incr(counter)
+        cache.set(f"{key}:{index}", RECORD.pack(int(epoch), float(value)), timeout=self.bucket_ttl)
+        if device_name:
+            cache.set(f"{series}:name", device_name, timeout=self.bucket_ttl)
+
+    # ==================== LECTURE ====================
+
+    def read(self, metric_type: str, device_id: Optional[int], start: datetime, end: datetime,
+             points: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Lit l'historique d'une série sur une plage.
+
+        Args:
+            metric_type: Type de métrique
+            device_id: ID de l'équipement (None pour une métrique globale)
+            start: Début de la plage
+            end: Fin de la plage
+            points: Nombre de points souhaité ; None pour les lectures brutes
+
+        Returns:
+            Points triés par date : {'timestamp', 'value', 'device_name'},
+            plus 'min', 'max' et 'count' lorsque les lectures sont regroupées
+        """
+        series = self.series(metric_type, device_id)
+        start_epoch, end_epoch = _epoch(start), _epoch(end)
+        keys = self._bucket_keys(series, start_epoch, end_epoch)
+
+        client = self._client()
+        if client is not None:
+            readings, device_name, slots = self._read_redis(client, series, keys, start_epoch, end_epoch, points)
+        else:
+            readings, device_name, slots = self._read_cache(series, keys, start_epoch, end_epoch, points)
+
+        if slots is None:
+            return [
+                {'timestamp': _isoformat(ts), 'value': value, 'device_name': device_name}
+                for ts, value in readings
+            ]
+
+        width = (end_epoch - start_epoch) / points
+        return [
+            {
+                'timestamp': _isoformat(start_epoch + slot * width),
+                'value': average,
+                'min': low,
+                'max': high,
+                'count': count,
+                'device_name': device_name
+            }
+            for slot, low, high, average, count in slots
+        ]
+
+    def _read_redis(self, client, series, keys, start, end, points):
+        if points:
+            if self._downsample is None:
+                self._downsample = client.register_script(DOWNSAMPLE_SCRIPT)
+            pipe = client.pipeline(transaction=False)
+            pipe.get(f"{series}:name")
+            self._downsample(keys=keys, args=[start, end, points], client=pipe)
+            device_name, rows = pipe.execute()
+            slots = [(int(slot), float(low), float(high), float(average), int(count))
+                     for slot, low, high, average, count in rows]
+            return [], device_name, slots
+
+        pipe = client.pipeline(transaction=False)
+        pipe.get(f"{series}:name")
+        for key in keys:
+            pipe.zrangebyscore(key, start, end, withscores=True)
+        device_name, *buckets = pipe.execute()
+        readings = [
+            (ts, float(member.split(':', 1)[1]))
+            for entries in buckets for member, ts in entries
+        ]
+        return readings, device_name, None
+
+    def _read_cache(self, series, keys, start, end, points):
+        name_key = f"{series}:name"
+        found = cache.get_many([f"{key}:count" for key in keys] + [name_key])
+        device_name = found.get(name_key)
+        reading_keys = [
+            f"{key}:{index}"
+            for key in keys
+            for index in range(1, (found.get(f"{key}:count") or 0) + 1)
+        ]
+        records = cache.get_many(reading_keys) if reading_keys else {}
+        readings = sorted(
+            (ts, value)
+            for ts, value in (RECORD.unpack(record) for record in records.values())
+            if start <= ts <= end
+        )
+        if points:
+            return [], device_name, downsample(readings, start, end, points)
+        return readings, device_name, None
@@ -7,15 +7,16 @@ avec seuils configurables et alertes automatiques.
 
 import logging
 import asyncio
+import operator
 from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
 from django.utils import timezone
-from django.core.cache import cache
 from django.db import transaction
 
 from ..domain.entities import AlertSeverity, DeviceStatus
+from .metric_history import MetricHistoryStore
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +46,16 @@ class ThresholdOperator(str, Enum):
     NOT_EQUAL = 'ne'
 
 
+THRESHOLD_OPERATIONS = {
+    ThresholdOperator.GREATER_THAN: operator.gt,
+    ThresholdOperator.GREATER_EQUAL: operator.ge,
+    ThresholdOperator.LESS_THAN: operator.lt,
+    ThresholdOperator.LESS_EQUAL: operator.le,
+    ThresholdOperator.EQUAL: operator.eq,
+    ThresholdOperator.NOT_EQUAL: operator.ne,
+}
+
+
 @dataclass
 class MetricThreshold:
     """Configuration d'un seuil de métrique."""
@@ -66,15 +77,8 @@ class MetricThreshold:
         Returns:
             True si le seuil est dépassé
         """
-        operations = {
-            ThresholdOperator.GREATER_THAN: metric_value > self.value,
-            ThresholdOperator.GREATER_EQUAL: metric_value >= self.value,
-            ThresholdOperator.LESS_THAN: metric_value < self.value,
-            ThresholdOperator.LESS_EQUAL: metric_value <= self.value,
-            ThresholdOperator.EQUAL: metric_value == self.value,
-            ThresholdOperator.NOT_EQUAL: metric_value != self.value,
-        }
-        return operations.get(self.operator, False)
+        operation = THRESHOLD_OPERATIONS.get(self.operator)
+        return operation(metric_value, self.value) if operation else False
     
     def format_message(self, metric_value: float, device_name: str = None) -> str:
         """
@@ -119,12 +123,21 @@ class MetricsCollector:
     détection automatique des anomalies et alertes.
     """
     
-    def __init__(self):
-        """Initialise le collecteur de métriques."""
+    def __init__(self, history_store: Optional[MetricHistoryStore] = None):
+        """
+        Initialise le collecteur de métriques.
+        
+        Args:
+            history_store: Stockage de l'historique (par défaut tranches horaires Redis)
+        """
         self.thresholds: List[MetricThreshold] = []
         self.metric_handlers: Dict[MetricType, Callable] = {}
         self.alert_callbacks: List[Callable] = []
         self.is_collecting = False
+        self.history_store = history_store or MetricHistoryStore()
+        # Index des seuils : type de métrique -> équipement (None = tous) -> seuils,
+        # reconstruit au premier usage après chaque modification des seuils
+        self._threshold_index: Optional[Dict[MetricType, Dict[Optional[int], List[MetricThreshold]]]] = None
         self._setup_default_thresholds()
         self._setup_metric_handlers()
     
@@ -230,6 +243,7 @@ class MetricsCollector:
             threshold: Configuration du seuil
         """
         self.thresholds.append(threshold)
+        self._threshold_index = None
         logger.info(f"Seuil ajouté: {threshold.metric_type.value} {threshold.operator.value} {threshold.value}")
     
     def remove_threshold(self, metric_type: MetricType, value: float, operator: ThresholdOperator):
@@ -245,6 +259,7 @@ class MetricsCollector:
             t for t in self.thresholds 
             if not (t.metric_type == metric_type and t.value == value and t.operator == operator)
         ]
+        self._threshold_index = None
     
     def add_alert_callback(self, callback: Callable[[str, AlertSeverity, Dict[str, Any]], None]):
         """
@@ -308,26 +323,39 @@ class MetricsCollector:
         Args:
             metric: Lecture de métrique à traiter
         """
-        # Sauvegarder la métrique en cache
-        cache_key = f"metric:{metric.metric_type.value}:{metric.device_id or 'global'}:{metric.timestamp.strftime('%Y%m%d%H%M')}"
-        cache.set(cache_key, {
-            'value': metric.value,
-            'timestamp': metric.timestamp.isoformat(),
-            'device_name': metric.device_name
-        }, timeout=3600)  # 1 heure
+        # Ajouter la lecture à l'historique (tranche horaire de la série)
+        try:
+            self.history_store.append(
+                metric.metric_type.value, metric.device_id, metric.value,
+                metric.timestamp, metric.device_name
+            )
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enregistrement de l'historique: {e}")
         
-        # Vérifier les seuils
-        for threshold in self.thresholds:
-            if not threshold.is_active or threshold.metric_type != metric.metric_type:
-                continue
-            
-            # Filtrer par équipement si spécifié
-            if threshold.device_id and threshold.device_id != metric.device_id:
-                continue
-            
-            if threshold.evaluate(metric.value):
+        # Vérifier les seuils de cette métrique (globaux et propres à l'équipement)
+        by_device = self._thresholds_for(metric.metric_type)
+        candidates = by_device.get(None, [])
+        if metric.device_id is not None and metric.device_id in by_device:
+            candidates = candidates + by_device[metric.device_id]
+        
+        for threshold in candidates:
+            if threshold.is_active and threshold.evaluate(metric.value):
                 self._trigger_alert(threshold, metric)
     
+    def _thresholds_for(self, metric_type: MetricType) -> Dict[Optional[int], List[MetricThreshold]]:
+        """
+        Seuils d'un type de métrique, regroupés par équipement.
+        
+        L'index est invalidé par `add_threshold` et `remove_threshold`.
+        """
+        if self._threshold_index is None:
+            index: Dict[MetricType, Dict[Optional[int], List[MetricThreshold]]] = {}
+            for threshold in self.thresholds:
+                by_device = index.setdefault(threshold.metric_type, {})
+                by_device.setdefault(threshold.device_id or None, []).append(threshold)
+            self._threshold_index = index
+        return self._threshold_index.get(metric_type, {})
+    
     def _trigger_alert(self, threshold: MetricThreshold, metric: MetricReading):
         """
         Déclenche une alerte.
@@ -730,7 +758,8 @@ class MetricsCollector:
             logger.error(f"Erreur lors de la collecte de perte de paquets: {e}")
             return None
     
-    def get_metric_history(self, metric_type: MetricType, device_id: int = None, hours: int = 24) -> List[Dict[str, Any]]:
+    def get_metric_history(self, metric_type: MetricType, device_id: int = None, hours: int = 24,
+                           points: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Récupère l'historique d'une métrique.
         
@@ -738,27 +767,16 @@ class MetricsCollector:
             metric_type: Type de métrique
             device_id: ID de l'équipement (optionnel)
             hours: Nombre d'heures d'historique
+            points: Nombre de points souhaité ; les lectures sont alors
+                regroupées par intervalle (moyenne, min, max)
             
         Returns:
-            Liste des valeurs historiques
+            Liste des valeurs historiques triées par date
         """
         try:
-            history = []
             end_time = timezone.now()
             start_time = end_time - timedelta(hours=hours)
-            
-            # Rechercher dans le cache par intervalles de minutes
-            current_time = start_time
-            while current_time <= end_time:
-                cache_key = f"metric:{metric_type.value}:{device_id or 'global'}:{current_time.strftime('%Y%m%d%H%M')}"
-                cached_data = cache.get(cache_key)
-                
-                if cached_data:
-                    history.append(cached_data)
-                
-                current_time += timedelta(minutes=1)
-            
-            return sorted(history, key=lambda x: x['timestamp'])
+            return self.history_store.read(metric_type.value, device_id, start_time, end_time, points)
             
         except Exception as e:
             logger.error(f"Erreur lors de la récupération de l'historique: {e}")
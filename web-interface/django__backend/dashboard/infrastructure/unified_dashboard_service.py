@@ -22,7 +22,6 @@ import logging
 from typing import Dict, List, Any, Optional, Tuple, Union
 from datetime import datetime, timedelta
 from django.utils import timezone
-from django.core.cache import cache
 from django.db import transaction
 from dataclasses import dataclass, asdict
 import uuid
@@ -35,6 +34,7 @@ import requests
 # Import des services communs
 from common.api.gns3_module_interface import create_gns3_interface
 from common.infrastructure.gns3_central_service import GNS3EventType
+from common.infrastructure.single_flight_cache import single_flight_cache
 
 logger = logging.getLogger(__name__)
 
@@ -802,49 +802,68 @@ class UnifiedDashboardService:
     - APIs unifiées pour le frontend
     """
     
+    # Clé et étiquette du tableau de bord complet dans le cache à calcul unique
+    DASHBOARD_CACHE_KEY = "unified_dashboard_complete"
+    DASHBOARD_CACHE_TAG = "unified_dashboard"
+    
     def __init__(self):
         self.gns3_adapter = GNS3DashboardAdapter()
         self.docker_collector = DockerServicesCollector()
         self.inter_module_communicator = InterModuleCommunicator()
         self.cache_timeout = 300  # 5 minutes
+        # Boucle asyncio dédiée, partagée par tous les appels synchrones
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None or not self._loop_thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name='unified-dashboard',
+                    daemon=True
+                )
+                self._loop_thread.start()
+            return self._loop
+    
+    def _run(self, coro):
+        """Exécute une coroutine sur la boucle du service et attend son résultat."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
         
     def get_unified_dashboard(self) -> Dict[str, Any]:
         """
         Récupère le tableau de bord unifié complet.
         
+        À l'expiration du cache, une seule requête (tous processus confondus)
+        relance la collecte ; les autres reçoivent les données précédentes
+        ou attendent le résultat de cette collecte.
+        
         Returns:
             Données complètes du tableau de bord unifié
         """
         try:
-            # Vérifier le cache
-            cache_key = "unified_dashboard_complete"
-            cached_data = cache.get(cache_key)
-            
-            if cached_data:
-                logger.debug("Données dashboard récupérées depuis le cache")
-                return cached_data
-            
-            # Collecter toutes les données
-            logger.info("Collecte des données dashboard unifié...")
-            
-            # Collection en parallèle avec asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            try:
-                dashboard_data = loop.run_until_complete(self._collect_all_data())
-            finally:
-                loop.close()
-            
-            # Mettre en cache
-            cache.set(cache_key, dashboard_data, self.cache_timeout)
-            
-            return dashboard_data
+            return single_flight_cache.get_or_compute(
+                self.DASHBOARD_CACHE_KEY,
+                self._collect_dashboard,
+                ttl=self.cache_timeout,
+                tags=[self.DASHBOARD_CACHE_TAG]
+            )
             
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du dashboard unifié: {e}")
             return self._get_fallback_dashboard_data()
     
+    def _collect_dashboard(self) -> Dict[str, Any]:
+        """Collecte toutes les données du tableau de bord (sans cache)."""
+        logger.info("Collecte des données dashboard unifié...")
+        return self._run(self._collect_all_data())
+    
+    def invalidate_dashboard_cache(self):
+        """Invalide le tableau de bord en cache ; le prochain appel relance la collecte."""
+        single_flight_cache.invalidate_tags(self.DASHBOARD_CACHE_TAG)
+    
     async def _collect_all_data(self) -> Dict[str, Any]:
         """Collecte toutes les données en parallèle."""
         # Lancer toutes les collectes en parallèle
@@ -1073,13 +1092,7 @@ class UnifiedDashboardService:
         Returns:
             Statut consolidé des services Docker
         """
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            return loop.run_until_complete(self.docker_collector.collect_all_services_data())
-        finally:
-            loop.close()
+        return self._run(self.docker_collector.collect_all_services_data())
 
 
 # Instance globale du service unifié
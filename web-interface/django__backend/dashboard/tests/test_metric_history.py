@@ -0,0 +1,273 @@
+"""
+Tests de l'historique des métriques par tranches horaires.
+"""
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+import pytest
+
+from dashboard.domain.entities import AlertSeverity
+from dashboard.infrastructure import metric_history
+from dashboard.infrastructure.metric_history import MetricHistoryStore, downsample
+from dashboard.infrastructure.metrics_collector import (
+    MetricReading,
+    MetricsCollector,
+    MetricThreshold,
+    MetricType,
+    ThresholdOperator,
+)
+
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+
+class _CountingCache:
+    """Cache Django en mémoire comptant les allers-retours."""
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+
+    def get(self, key, default=None):
+        self.round_trips += 1
+        return self.data.get(key, default)
+
+    def set(self, key, value, timeout=None):
+        self.round_trips += 1
+        self.data[key] = value
+
+    def add(self, key, value, timeout=None):
+        self.round_trips += 1
+        return self.data.setdefault(key, value) is value
+
+    def incr(self, key, delta=1):
+        self.round_trips += 1
+        if key not in self.data:
+            raise ValueError(f"Key '{key}' not found")
+        self.data[key] += delta
+        return self.data[key]
+
+    def get_many(self, keys):
+        self.round_trips += 1
+        return {key: self.data[key] for key in keys if key in self.data}
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.results = []
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.results.append(getattr(self.redis, name)(*args, **kwargs))
+        return command
+
+    def execute(self):
+        self.redis.round_trips += 1
+        return self.results
+
+
+class _FakeRedis:
+    """
+    Redis en mémoire : ensembles triés et chaînes.
+
+    Le script de sous-échantillonnage est émulé par `downsample`, qui
+    applique le même calcul.
+    """
+
+    def __init__(self):
+        self.zsets = {}
+        self.strings = {}
+        self.round_trips = 0
+
+    def ping(self):
+        return True
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def expire(self, key, ttl):
+        pass
+
+    def set(self, key, value, ex=None):
+        self.strings[key] = value
+
+    def get(self, key):
+        return self.strings.get(key)
+
+    def zrangebyscore(self, key, low, high, withscores=False):
+        entries = sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1])
+        return [(member, score) for member, score in entries if low <= score <= high]
+
+    def register_script(self, script):
+        def run(keys, args, client):
+            start, end, points = args
+            readings = [(score, float(member.split(':', 1)[1]))
+                        for key in keys for member, score in self.zrangebyscore(key, start, end)]
+            rows = [[slot, str(low), str(high), str(average), count]
+                    for slot, low, high, average, count in downsample(sorted(readings), start, end, points)]
+            client.results.append(rows)
+        return run
+
+
+def _fill(store, minutes, device_id=7):
+    for minute in range(minutes):
+        store.append('device_cpu', device_id, float(minute % 60), NOW - timedelta(minutes=minutes - minute),
+                      device_name='R1')
+
+
+class MetricHistoryStoreTest(unittest.TestCase):
+    """Tests du stockage sur Redis (ensembles triés)."""
+
+    def setUp(self):
+        self.redis = _FakeRedis()
+        self.store = MetricHistoryStore(redis_client=self.redis, retention_hours=24)
+
+    def test_one_sorted_set_per_hour(self):
+        _fill(self.store, 180)
+
+        self.assertEqual(len(self.redis.zsets), 3)
+        self.assertTrue(all(len(bucket) == 60 for bucket in self.redis.zsets.values()))
+
+    @pytest.mark.performance
+    def test_day_read_in_one_round_trip(self):
+        """24 h de lectures à la minute : un aller-retour au lieu de 1 440."""
+        _fill(self.store, 1440)
+        self.redis.round_trips = 0
+
+        history = self.store.read('device_cpu', 7, NOW - timedelta(hours=24), NOW)
+
+        self.assertEqual(self.redis.round_trips, 1)
+        self.assertEqual(len(history), 1440)
+        self.assertEqual(history[0]['device_name'], 'R1')
+        timestamps = [point['timestamp'] for point in history]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+    def test_downsampled_read(self):
+        _fill(self.store, 1440)
+        self.redis.round_trips = 0
+
+        points = self.store.read('device_cpu', 7, NOW - timedelta(hours=24), NOW, points=24)
+
+        self.assertEqual(self.redis.round_trips, 1)
+        self.assertEqual(len(points), 24)
+        self.assertEqual((points[0]['min'], points[0]['max'], points[0]['count']), (0.0, 59.0, 60))
+        self.assertAlmostEqual(points[0]['value'], 29.5)
+
+
+class MetricHistoryCacheFallbackTest(unittest.TestCase):
+    """Tests du stockage compact dans le cache Django (sans Redis)."""
+
+    def setUp(self):
+        self.cache = _CountingCache()
+        patcher = patch.object(metric_history, 'cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.store = MetricHistoryStore(retention_hours=24)
+        self.store._retry_after = float('inf')
+
+    def test_one_packed_record_per_reading(self):
+        _fill(self.store, 120)
+
+        counters = {key: value for key, value in self.cache.data.items() if key.endswith(':count')}
+        records = [value for key, value in self.cache.data.items() if key.rsplit(':', 1)[1].isdigit()]
+        self.assertEqual(sorted(counters.values()), [60, 60])
+        self.assertEqual({len(record) for record in records}, {metric_history.RECORD.size})
+        self.assertEqual(len(records), 120)
+
+    def test_concurrent_appends_are_not_lost(self):
+        """Deux écrivains dont les ajouts s'entrelacent dans la même tranche."""
+        other = MetricHistoryStore(retention_hours=24)
+        other._retry_after = float('inf')
+        for minute in range(30):
+            writer = self.store if minute % 2 else other
+            writer.append('device_cpu', 7, float(minute), NOW - timedelta(minutes=30 - minute))
+
+        history = self.store.read('device_cpu', 7, NOW - timedelta(hours=1), NOW)
+
+        self.assertEqual([point['value'] for point in history], [float(minute) for minute in range(30)])
+
+    def test_redis_retried_after_backoff(self):
+        store = MetricHistoryStore(retention_hours=24)
+        client = _FakeRedis()
+        with patch.object(metric_history.redis, 'Redis', side_effect=[ConnectionError('refused'), client]), \
+                patch.object(metric_history.time, 'monotonic', side_effect=[1000.0, 1000.0, 1030.0, 1060.0, 1060.0]):
+            self.assertIsNone(store._client())
+            self.assertIsNone(store._client())
+            self.assertIs(store._client(), client)
+
+    def test_range_read_in_two_round_trips(self):
+        _fill(self.store, 1440)
+        self.cache.round_trips = 0
+
+        history = self.store.read('device_cpu', 7, NOW - timedelta(hours=2), NOW, points=4)
+
+        self.assertEqual(self.cache.round_trips, 2)
+        self.assertEqual([point['count'] for point in history], [30, 30, 30, 30])
+        self.assertEqual(history[0]['device_name'], 'R1')
+
+
+class ThresholdIndexTest(unittest.TestCase):
+    """Tests de l'index des seuils du collecteur."""
+
+    def setUp(self):
+        self.collector = MetricsCollector(history_store=Mock())
+        self.alerts = []
+        self.collector.add_alert_callback(lambda message, severity, data: self.alerts.append((severity, data)))
+
+    def _reading(self, metric_type, value, device_id=None):
+        return MetricReading(metric_type=metric_type, value=value, timestamp=NOW, device_id=device_id,
+                             device_name='R1')
+
+    def test_only_thresholds_of_metric_and_device_are_evaluated(self):
+        self.collector.add_threshold(MetricThreshold(
+            MetricType.DEVICE_CPU, ThresholdOperator.GREATER_THAN, 50.0, AlertSeverity.MEDIUM, "cpu", device_id=7
+        ))
+
+        with patch.object(MetricThreshold, 'evaluate', autospec=True, side_effect=lambda t, v: v > t.value) as evaluate:
+            self.collector._process_metric(self._reading(MetricType.DEVICE_CPU, 60.0, device_id=7))
+            self.collector._process_metric(self._reading(MetricType.DEVICE_CPU, 60.0, device_id=8))
+
+        # 2 seuils CPU globaux + 1 propre à l'équipement 7, puis 2 seuils globaux
+        self.assertEqual(evaluate.call_count, 5)
+        self.assertEqual([data['device_id'] for _, data in self.alerts], [7])
+
+    def test_index_follows_threshold_changes(self):
+        self.collector._process_metric(self._reading(MetricType.DEVICE_TEMPERATURE, 80.0))
+        self.collector.add_threshold(MetricThreshold(
+            MetricType.DEVICE_TEMPERATURE, ThresholdOperator.GREATER_THAN, 70.0, AlertSeverity.HIGH, "temp"
+        ))
+        self.collector._process_metric(self._reading(MetricType.DEVICE_TEMPERATURE, 80.0))
+        self.collector.remove_threshold(MetricType.DEVICE_TEMPERATURE, 70.0, ThresholdOperator.GREATER_THAN)
+        self.collector._process_metric(self._reading(MetricType.DEVICE_TEMPERATURE, 80.0))
+
+        self.assertEqual(len(self.alerts), 1)
+
+    def test_index_follows_threshold_replacement(self):
+        threshold = MetricThreshold(
+            MetricType.DEVICE_TEMPERATURE, ThresholdOperator.GREATER_THAN, 80.0, AlertSeverity.HIGH, "temp"
+        )
+        self.collector.add_threshold(threshold)
+        self.collector._process_metric(self._reading(MetricType.DEVICE_TEMPERATURE, 50.0))
+        # Même nombre de seuils après le remplacement
+        self.collector.remove_threshold(MetricType.DEVICE_TEMPERATURE, 80.0, ThresholdOperator.GREATER_THAN)
+        self.collector.add_threshold(MetricThreshold(
+            MetricType.DEVICE_TEMPERATURE, ThresholdOperator.GREATER_THAN, 40.0, AlertSeverity.HIGH, "temp"
+        ))
+        self.collector._process_metric(self._reading(MetricType.DEVICE_TEMPERATURE, 50.0))
+
+        self.assertEqual([data['threshold_value'] for _, data in self.alerts], [40.0])
+
+    def test_critical_and_high_both_fire(self):
+        self.collector._process_metric(self._reading(MetricType.DEVICE_CPU, 95.0, device_id=3))
+
+        self.assertEqual([severity for severity, _ in self.alerts], [AlertSeverity.CRITICAL, AlertSeverity.HIGH])
+
+
+if __name__ == "__main__":
+    unittest.main()
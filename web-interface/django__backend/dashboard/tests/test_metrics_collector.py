@@ -211,7 +211,7 @@ class TestMetricsCollector(TestCase):
         assert test_callback in self.collector.alert_callbacks
     
     def test_process_metric_caching(self):
-        """Test de mise en cache des métriques."""
+        """Test de l'enregistrement des métriques dans l'historique."""
         timestamp = timezone.now()
         metric = MetricReading(
             metric_type=MetricType.DEVICE_CPU,
@@ -223,13 +223,12 @@ class TestMetricsCollector(TestCase):
         
         self.collector._process_metric(metric)
         
-        # Vérifier que la métrique est en cache
-        cache_key = f"metric:device_cpu:123:{timestamp.strftime('%Y%m%d%H%M')}"
-        cached_data = cache.get(cache_key)
+        # Vérifier que la lecture est dans l'historique de la série
+        history = self.collector.get_metric_history(MetricType.DEVICE_CPU, device_id=123, hours=1)
         
-        assert cached_data is not None
-        assert cached_data['value'] == 75.0
-        assert cached_data['device_name'] == "Test Device"
+        assert len(history) == 1
+        assert history[0]['value'] == 75.0
+        assert history[0]['device_name'] == "Test Device"
     
     def test_process_metric_threshold_trigger(self):
         """Test de déclenchement d'alerte lors du traitement."""
@@ -0,0 +1,85 @@
+"""
+Tests du cache du tableau de bord unifié sous charge.
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+
+from common.infrastructure.single_flight_cache import SingleFlightCache
+from dashboard.infrastructure import unified_dashboard_service as service_module
+from dashboard.infrastructure.unified_dashboard_service import UnifiedDashboardService
+
+
+class UnifiedDashboardCacheTest(unittest.TestCase):
+    """Une seule collecte GNS3/Docker/modules par expiration, quel que soit le nombre de clients."""
+
+    def setUp(self):
+        backend = LocMemCache('unified-dashboard-test', {})
+        backend.clear()
+        self.flight = SingleFlightCache(backend=backend, beta=0, poll_interval=0.005)
+        patcher = patch.object(service_module, 'single_flight_cache', self.flight)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.service = UnifiedDashboardService()
+        self.collections = 0
+
+        async def collect_all_data():
+            self.collections += 1
+            await service_module.asyncio.sleep(0.05)
+            return {'success': True, 'dashboard_data': {'collection': self.collections}}
+
+        self.service._collect_all_data = collect_all_data
+
+    def _clients(self, count):
+        barrier = threading.Barrier(count)
+        results = []
+
+        def client():
+            barrier.wait()
+            results.append(self.service.get_unified_dashboard())
+
+        threads = [threading.Thread(target=client) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    @pytest.mark.performance
+    def test_200_clients_at_expiry_trigger_one_collection(self):
+        self.service.get_unified_dashboard()
+        entry_key = self.flight.entry_key(self.service.DASHBOARD_CACHE_KEY)
+        entry = self.flight.cache.get(entry_key)
+        entry['fresh_until'] = time.time() - 1
+        self.flight.cache.set(entry_key, entry)
+
+        results = self._clients(200)
+        self.flight.wait_for_refreshes(5)
+
+        self.assertEqual(self.collections, 2)
+        self.assertTrue(all(result['dashboard_data']['collection'] == 1 for result in results))
+        self.assertEqual(self.service.get_unified_dashboard()['dashboard_data']['collection'], 2)
+
+    @pytest.mark.performance
+    def test_200_clients_on_empty_cache_trigger_one_collection(self):
+        results = self._clients(200)
+
+        self.assertEqual(self.collections, 1)
+        self.assertEqual(len(results), 200)
+        self.assertTrue(all(result['success'] for result in results))
+
+    def test_invalidation_forces_new_collection(self):
+        self.service.get_unified_dashboard()
+        self.service.invalidate_dashboard_cache()
+
+        self.assertEqual(self.service.get_unified_dashboard()['dashboard_data']['collection'], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -485,10 +485,8 @@ def refresh_dashboard_cache(request):
     de toutes les données du dashboard.
     """
     try:
-        from django.core.cache import cache
-        
-        # Vider le cache
-        cache.delete("unified_dashboard_complete")
+        # Invalider le cache
+        unified_dashboard_service.invalidate_dashboard_cache()
         
         # Forcer une nouvelle collecte
         dashboard_data = unified_dashboard_service.get_unified_dashboard()
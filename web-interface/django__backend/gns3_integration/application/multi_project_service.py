@@ -27,6 +27,9 @@ from ..domain.exceptions import (
 
 logger = logging.getLogger(__name__)
 
+# Niveaux de trafic, du plus faible au plus élevé
+TRAFFIC_LEVELS = ('low', 'medium', 'high')
+
 @dataclass
 class ProjectSelection:
     """Représente une sélection de projet avec ses métadonnées."""
@@ -65,7 +68,8 @@ class MultiProjectService:
     CACHE_KEY_TRAFFIC_STATUS = "gns3_traffic_status_{}"
     CACHE_TIMEOUT = 3600  # 1 heure
     
-    def __init__(self, project_service: ProjectService, gns3_client: GNS3ClientPort, gns3_repository: GNS3Repository):
+    def __init__(self, project_service: ProjectService, gns3_client: GNS3ClientPort, gns3_repository: GNS3Repository,
+                 async_client=None):
         """
         Initialise le service.
         
@@ -73,10 +77,14 @@ class MultiProjectService:
             project_service: Service de gestion des projets
             gns3_client: Client GNS3
             gns3_repository: Repository GNS3
+            async_client: Client GNS3 asynchrone (AsyncGNS3Client) pour la détection
+                de trafic en parallèle (optionnel)
         """
         self.project_service = project_service
         self.client = gns3_client
         self.repository = gns3_repository
+        self.async_client = async_client
+        self._traffic_concurrency = getattr(settings, 'GNS3_MAX_CONCURRENCY', 10)
         self._monitoring_enabled = True
         self._monitoring_interval = getattr(settings, 'GNS3_MONITOR_INTERVAL', 30)
         self._auto_monitor = getattr(settings, 'GNS3_AUTO_MONITOR', True)
@@ -336,30 +344,11 @@ class MultiProjectService:
                     if node.get('status') == 'started':
                         # Vérifier les statistiques des interfaces
                         node_stats = self.client.get_node_statistics(project_id, node['node_id'])
-                        if node_stats:
-                            # Analyser les statistiques pour détecter le trafic
-                            for port in node_stats.get('ports', []):
-                                rx_bytes = port.get('bytes_received', 0)
-                                tx_bytes = port.get('bytes_sent', 0)
-                                
-                                if rx_bytes > 0 or tx_bytes > 0:
-                                    has_traffic = True
-                                    
-                                    # Déterminer le niveau de trafic
-                                    total_bytes = rx_bytes + tx_bytes
-                                    if total_bytes > 1000000:  # > 1MB
-                                        traffic_level = 'high'
-                                    elif total_bytes > 100000:  # > 100KB
-                                        traffic_level = 'medium'
-                                    
-                                    interface_stats[f"{node['name']}_{port.get('name', 'unknown')}"] = {
-                                        'rx_bytes': rx_bytes,
-                                        'tx_bytes': tx_bytes,
-                                        'total_bytes': total_bytes
-                                    }
-                            
-                            if has_traffic:
-                                break
+                        level = self._analyze_node_statistics(node, node_stats, interface_stats)
+                        if level:
+                            has_traffic = True
+                            traffic_level = level
+                            break
                 
             except Exception as e:
                 logger.warning(f"Impossible de récupérer les statistiques pour le projet {project_id}: {e}")
@@ -367,20 +356,7 @@ class MultiProjectService:
                 project_status = self.client.get_project(project_id)
                 has_traffic = project_status.get('status') == 'opened'
             
-            traffic_status = TrafficStatus(
-                project_id=project_id,
-                has_traffic=has_traffic,
-                traffic_level=traffic_level,
-                detected_at=datetime.now(),
-                interface_stats=interface_stats
-            )
-            
-            # Mettre en cache le statut du trafic
-            cache.set(
-                self.CACHE_KEY_TRAFFIC_STATUS.format(project_id),
-                traffic_status.__dict__,
-                300  # 5 minutes
-            )
+            traffic_status = self._store_traffic_status(project_id, has_traffic, traffic_level, interface_stats)
             
             return traffic_status
             
@@ -393,6 +369,126 @@ class MultiProjectService:
                 detected_at=datetime.now()
             )
     
+    async def detect_traffic_on_projects(self, project_ids: List[str]) -> Dict[str, TrafficStatus]:
+        """
+        Détecte le trafic réseau sur plusieurs projets en parallèle.
+        
+        Avec le client asynchrone, les nœuds de chaque projet puis les
+        statistiques de leurs nœuds démarrés sont récupérés en parallèle sur
+        des connexions persistantes. Sinon, les détections synchrones sont
+        exécutées dans des threads, en nombre borné.
+        
+        Args:
+            project_ids: IDs des projets à surveiller
+            
+        Returns:
+            État du trafic par ID de projet
+        """
+        if self.async_client is not None:
+            statuses = await asyncio.gather(
+                *(self._detect_traffic_async(project_id) for project_id in project_ids)
+            )
+        else:
+            semaphore = asyncio.Semaphore(self._traffic_concurrency)
+            
+            async def detect(project_id):
+                async with semaphore:
+                    return await asyncio.to_thread(self.detect_traffic_on_project, project_id)
+            
+            statuses = await asyncio.gather(*(detect(project_id) for project_id in project_ids))
+        
+        return dict(zip(project_ids, statuses))
+    
+    async def _detect_traffic_async(self, project_id: str) -> TrafficStatus:
+        """Détection de trafic d'un projet via le client asynchrone."""
+        has_traffic = False
+        traffic_level = 'low'
+        interface_stats = {}
+        
+        try:
+            nodes = [
+                node for node in await self.async_client.get_nodes(project_id)
+                if node.get('status') == 'started'
+            ]
+            node_stats = await self.async_client.get_nodes_stats(project_id, nodes)
+            
+            for node in nodes:
+                level = self._analyze_node_statistics(node, node_stats.get(node['node_id']), interface_stats)
+                if level:
+                    has_traffic = True
+                    if TRAFFIC_LEVELS.index(level) > TRAFFIC_LEVELS.index(traffic_level):
+                        traffic_level = level
+                        
+        except Exception as e:
+            logger.warning(f"Impossible de récupérer les statistiques pour le projet {project_id}: {e}")
+            try:
+                # Fallback : considérer qu'il y a du trafic si le projet est ouvert
+                project_status = await self.async_client.get_project(project_id)
+                has_traffic = project_status.get('status') == 'opened'
+            except Exception as e:
+                logger.error(f"Erreur lors de la détection de trafic pour le projet {project_id}: {e}")
+        
+        return self._store_traffic_status(project_id, has_traffic, traffic_level, interface_stats)
+    
+    @staticmethod
+    def _analyze_node_statistics(node: Dict[str, Any], node_stats: Optional[Dict[str, Any]],
+                                 interface_stats: Dict[str, Any]) -> Optional[str]:
+        """
+        Analyse les statistiques des ports d'un nœud.
+        
+        Args:
+            node: Nœud GNS3
+            node_stats: Statistiques du nœud (None si indisponibles)
+            interface_stats: Statistiques par interface, complétées sur place
+            
+        Returns:
+            Niveau de trafic le plus élevé observé, ou None sans trafic
+        """
+        level = None
+        for port in (node_stats or {}).get('ports', []):
+            rx_bytes = port.get('bytes_received', 0)
+            tx_bytes = port.get('bytes_sent', 0)
+            
+            if rx_bytes > 0 or tx_bytes > 0:
+                # Déterminer le niveau de trafic
+                total_bytes = rx_bytes + tx_bytes
+                if total_bytes > 1000000:  # > 1MB
+                    port_level = 'high'
+                elif total_bytes > 100000:  # > 100KB
+                    port_level = 'medium'
+                else:
+                    port_level = 'low'
+                
+                if level is None or TRAFFIC_LEVELS.index(port_level) > TRAFFIC_LEVELS.index(level):
+                    level = port_level
+                
+                interface_stats[f"{node['name']}_{port.get('name', 'unknown')}"] = {
+                    'rx_bytes': rx_bytes,
+                    'tx_bytes': tx_bytes,
+                    'total_bytes': total_bytes
+                }
+        return level
+    
+    def _store_traffic_status(self, project_id: str, has_traffic: bool, traffic_level: str,
+                              interface_stats: Dict[str, Any]) -> TrafficStatus:
+        """Construit l'état du trafic d'un projet et le met en cache."""
+        traffic_status = TrafficStatus(
+            project_id=project_id,
+            has_traffic=has_traffic,
+            traffic_level=traffic_level,
+            detected_at=datetime.now(),
+            interface_stats=interface_stats
+        )
+        
+        # Mettre en cache le statut du trafic
+        cache.set(
+            self.CACHE_KEY_TRAFFIC_STATUS.format(project_id),
+            traffic_status.__dict__,
+            300  # 5 minutes
+        )
+        
+        return traffic_status
+    
     def start_automatic_monitoring(self) -> bool:
         """
         Démarre la surveillance automatique des projets sélectionnés.
@@ -458,12 +554,14 @@ class MultiProjectService:
             current_active = self.get_active_project()
             traffic_detected_projects = []
             
-            # Vérifier le trafic pour chaque projet
-            for selection in selected_projects:
-                if not selection.auto_start_on_traffic:
-                    continue
-                
-                traffic_status = self.detect_traffic_on_project(selection.project_id)
+            # Vérifier le trafic de tous les projets en parallèle
+            monitored = [selection for selection in selected_projects if selection.auto_start_on_traffic]
+            traffic_statuses = await self.detect_traffic_on_projects(
+                [selection.project_id for selection in monitored]
+            )
+            
+            for selection in monitored:
+                traffic_status = traffic_statuses[selection.project_id]
                 
                 if traffic_status.has_traffic:
                     selection.traffic_detected = True
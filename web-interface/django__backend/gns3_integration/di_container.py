@@ -37,9 +37,11 @@ def init_di_container():
         from gns3_integration.application.workflow_service import WorkflowService
         from gns3_integration.infrastructure.gns3_client_impl import DefaultGNS3Client
         from gns3_integration.infrastructure.gns3_repository_impl import DjangoGNS3Repository
+        from api_clients.network.gns3_async_client import AsyncGNS3Client
         
         # Configuration des services d'infrastructure
         gns3_container.gns3_client = providers.Singleton(DefaultGNS3Client)
+        gns3_container.async_gns3_client = providers.Singleton(AsyncGNS3Client)
         gns3_container.gns3_repository = providers.Singleton(DjangoGNS3Repository)
         
         # Configuration des services métier
@@ -59,7 +61,8 @@ def init_di_container():
             MultiProjectService,
             project_service=gns3_container.project_service,
             gns3_client=gns3_container.gns3_client,
-            gns3_repository=gns3_container.gns3_repository
+            gns3_repository=gns3_container.gns3_repository,
+            async_client=gns3_container.async_gns3_client
         )
         
         gns3_container.node_service = providers.Singleton(
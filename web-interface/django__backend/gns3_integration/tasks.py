@@ -11,6 +11,7 @@ from django.utils import timezone
 from django.core.cache import cache
 from datetime import timedelta
 
+from common.infrastructure.gns3_notification_stream import NOTIFICATIONS_LIVE_KEY
 from .infrastructure.gns3_detection_service import get_gns3_server_status
 
 logger = logging.getLogger(__name__)
@@ -127,6 +128,11 @@ def sync_gns3_projects():
     les projets GNS3 disponibles avec la base de données locale.
     """
     try:
+        # Le flux de notifications tient déjà l'état GNS3 à jour
+        if cache.get(NOTIFICATIONS_LIVE_KEY):
+            logger.debug("Flux de notifications GNS3 actif - synchronisation ignorée")
+            return
+        
         logger.info("Synchronisation des projets GNS3")
         
         # Vérifier la disponibilité du serveur
@@ -187,12 +193,14 @@ def monitor_multi_projects_traffic():
         from .application.project_service import ProjectService
         from .infrastructure.gns3_client_impl import GNS3ClientImpl
         from .infrastructure.gns3_repository_impl import GNS3RepositoryImpl
+        from api_clients.network.gns3_async_client import AsyncGNS3Client
         
         # Initialiser les services
         client = GNS3ClientImpl()
         repository = GNS3RepositoryImpl()
         project_service = ProjectService(client, repository)
-        multi_project_service = MultiProjectService(project_service, client, repository)
+        async_client = AsyncGNS3Client()
+        multi_project_service = MultiProjectService(project_service, client, repository, async_client=async_client)
         
         # Récupérer les projets sélectionnés
         selected_projects = multi_project_service.get_selected_projects()
@@ -208,14 +216,28 @@ def monitor_multi_projects_traffic():
         project_switches = 0
         work_started = 0
         
-        # Vérifier le trafic pour chaque projet
-        for selection in selected_projects:
-            if not selection.auto_start_on_traffic:
-                continue
-                
+        # Détecter le trafic de tous les projets en parallèle (connexions persistantes)
+        monitored = [selection for selection in selected_projects if selection.auto_start_on_traffic]
+        
+        async def detect_all():
+            try:
+                return await multi_project_service.detect_traffic_on_projects(
+                    [selection.project_id for selection in monitored]
+                )
+            finally:
+                await async_client.close()
+        
+        import asyncio
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            traffic_statuses = loop.run_until_complete(detect_all())
+        finally:
+            loop.close()
+        
+        for selection in monitored:
             try:
-                # Détecter le trafic
-                traffic_status = multi_project_service.detect_traffic_on_project(selection.project_id)
+                traffic_status = traffic_statuses[selection.project_id]
                 
                 if traffic_status.has_traffic:
                     projects_with_traffic += 1
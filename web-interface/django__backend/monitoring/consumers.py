@@ -6,19 +6,71 @@ alertes et états des équipements en temps réel.
 """
 
 import json
-import asyncio
 import logging
 from datetime import datetime, timedelta
+from functools import partial
 from typing import Dict, Any, Optional
+from urllib.parse import parse_qs
 
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import AnonymousUser
 from asgiref.sync import sync_to_async
 
+from common.infrastructure.topic_fanout import (
+    CoalescingSender, apply_delta, delta_message, merge_messages, snapshot_message, topic_fanout_hub
+)
+
 logger = logging.getLogger(__name__)
 
 
+def device_metrics(device_id) -> list[Dict[str, Any]]:
+    """Métriques actuelles d'un équipement."""
+    # Connexion aux repositories réels nécessaire
+    return [
+        {
+            "name": "CPU Usage",
+            "value": 75.5,
+            "unit": "%",
+            "timestamp": datetime.now().isoformat()
+        },
+        {
+            "name": "Memory Usage",
+            "value": 60.2,
+            "unit": "%",
+            "timestamp": datetime.now().isoformat()
+        }
+    ]
+
+
+def global_stats() -> Dict[str, Any]:
+    """Statistiques globales de monitoring."""
+    return {
+        "devices_online": 8,
+        "devices_total": 10,
+        "active_alerts": 3,
+        "avg_cpu_usage": 45.2,
+        "avg_memory_usage": 67.8
+    }
+
+
+def device_snapshot(device_id) -> Dict[str, Any]:
+    """Instantané du sujet d'un équipement (métriques indexées par nom)."""
+    return {"metrics": {metric["name"]: metric for metric in device_metrics(device_id)}}
+
+
+def topic_for(device_id) -> str:
+    """Sujet diffusé pour un équipement, ou le sujet global."""
+    return f"monitoring.device.{device_id}" if device_id else "monitoring.global"
+
+
+def topic_producer(device_id):
+    """Producteur partagé du sujet (une requête par intervalle, tous abonnés confondus)."""
+    if device_id:
+        return database_sync_to_async(partial(device_snapshot, device_id))
+    return database_sync_to_async(global_stats)
+
+
 class MonitoringWebSocketConsumer(AsyncWebsocketConsumer):
     """
     Consumer WebSocket principal pour le monitoring.
@@ -32,7 +84,11 @@ class MonitoringWebSocketConsumer(AsyncWebsocketConsumer):
         self.user = None
         self.device_id = None
         self.room_group_name = None
-        self.update_task = None
+        self.topic = None
+        self.topic_seq = 0
+        self.topic_data = None
+        self.encoding = "full"
+        self.sender = None
     
     async def connect(self):
         """Gère la connexion WebSocket."""
@@ -59,11 +115,17 @@ class MonitoringWebSocketConsumer(AsyncWebsocketConsumer):
         # Accepter la connexion
         await self.accept()
         
+        # "?encoding=delta" : deltas numérotés au lieu des instantanés complets
+        query = parse_qs(self.scope.get("query_string", b"").decode())
+        if query.get("encoding") == ["delta"]:
+            self.encoding = "delta"
+        self.sender = CoalescingSender(self.send_json_message)
+        
         # Envoyer les données initiales
         await self.send_initial_data()
         
-        # Démarrer les mises à jour périodiques
-        self.update_task = asyncio.create_task(self.periodic_updates())
+        # S'abonner au producteur partagé des mises à jour périodiques
+        await self.subscribe_topic()
         
         logger.info(f"WebSocket connecté pour utilisateur {self.user.username}, dispositif {self.device_id}")
     
@@ -76,9 +138,10 @@ class MonitoringWebSocketConsumer(AsyncWebsocketConsumer):
                 self.channel_name
             )
         
-        # Arrêter les mises à jour périodiques
-        if self.update_task:
-            self.update_task.cancel()
+        # Quitter le sujet des mises à jour périodiques
+        await self.unsubscribe_topic()
+        if self.sender:
+            await self.sender.close()
         
         logger.info(f"WebSocket déconnecté pour utilisateur {self.user.username if self.user else 'Anonyme'}")
     
@@ -128,33 +191,75 @@ class MonitoringWebSocketConsumer(AsyncWebsocketConsumer):
             logger.error(f"Erreur lors de l'envoi des données initiales: {e}")
             await self.send_error("Erreur lors du chargement des données")
     
-    async def periodic_updates(self):
-        """Envoie des mises à jour périodiques."""
-        try:
-            while True:
-                await asyncio.sleep(5)  # Mise à jour toutes les 5 secondes
-                
-                if self.device_id:
-                    metrics = await self.get_device_metrics(self.device_id)
-                    await self.send(text_data=json.dumps({
-                        "type": "metrics_update",
-                        "device_id": self.device_id,
-                        "timestamp": datetime.now().isoformat(),
-                        "metrics": metrics
-                    }))
-                else:
-                    # Mise à jour globale
-                    stats = await self.get_global_stats()
-                    await self.send(text_data=json.dumps({
-                        "type": "global_update",
-                        "timestamp": datetime.now().isoformat(),
-                        "stats": stats
-                    }))
-                    
-        except asyncio.CancelledError:
-            pass
-        except Exception as e:
-            logger.error(f"Erreur lors des mises à jour périodiques: {e}")
+    async def subscribe_topic(self):
+        """
+        Abonne la connexion au sujet de son équipement (ou au sujet global).
+        
+        Les métriques sont calculées une fois par intervalle par le producteur
+        partagé, quel que soit le nombre de connexions abonnées.
+        """
+        self.topic = topic_for(self.device_id)
+        entry = await topic_fanout_hub.subscribe(self.topic, self.channel_name, topic_producer(self.device_id))
+        self.topic_seq, self.topic_data = entry["seq"], entry["data"]
+        if self.encoding == "delta":
+            self.sender.push(self.topic, snapshot_message(self.topic, entry))
+    
+    async def unsubscribe_topic(self):
+        """Quitte le sujet courant."""
+        if self.topic:
+            await topic_fanout_hub.unsubscribe(self.topic, self.channel_name)
+            self.topic = None
+    
+    async def topic_update(self, event):
+        """
+        Reçoit un delta du producteur partagé.
+        
+        Le message client est mis en attente dans la file coalescée : un
+        client lent reçoit le dernier état plutôt que chaque intervalle.
+        """
+        if event["topic"] != self.topic or event["seq"] <= self.topic_seq:
+            return
+        
+        if event["seq"] != self.topic_seq + 1:
+            # Message perdu : repartir du dernier instantané
+            entry = await topic_fanout_hub.snapshot(self.topic)
+            if entry["seq"] < event["seq"]:
+                return
+            self.topic_seq, self.topic_data = entry["seq"], entry["data"]
+            message = snapshot_message(self.topic, entry)
+        else:
+            # L'instantané du producteur local évite de réappliquer le delta
+            local = topic_fanout_hub.peek(self.topic)
+            if local is not None and local["seq"] == event["seq"]:
+                self.topic_data = local["data"]
+            else:
+                self.topic_data = apply_delta(self.topic_data, event["delta"])
+            self.topic_seq = event["seq"]
+            message = delta_message(self.topic, event["seq"], event["delta"])
+        
+        if self.encoding == "delta":
+            self.sender.push(self.topic, message, merge=merge_messages)
+        else:
+            self.sender.push(self.topic, self.full_update_message())
+    
+    def full_update_message(self) -> Dict[str, Any]:
+        """Message complet historique (metrics_update / global_update)."""
+        if self.device_id:
+            return {
+                "type": "metrics_update",
+                "device_id": self.device_id,
+                "timestamp": datetime.now().isoformat(),
+                "metrics": list(self.topic_data.get("metrics", {}).values())
+            }
+        return {
+            "type": "global_update",
+            "timestamp": datetime.now().isoformat(),
+            "stats": self.topic_data
+        }
+    
+    async def send_json_message(self, message: Dict[str, Any]):
+        """Envoie un message JSON au client."""
+        await self.send(text_data=json.dumps(message))
     
     async def handle_get_metrics(self, data):
         """Traite la demande de métriques."""
@@ -199,8 +304,11 @@ class MonitoringWebSocketConsumer(AsyncWebsocketConsumer):
         """Traite la demande d'abonnement."""
         try:
             new_device_id = data.get("device_id")
+            if data.get("encoding") in ("full", "delta"):
+                self.encoding = data["encoding"]
             
-            # Quitter l'ancien groupe
+            # Quitter l'ancien groupe et l'ancien sujet
+            await self.unsubscribe_topic()
             if self.room_group_name:
                 await self.channel_layer.group_discard(
                     self.room_group_name,
@@ -227,6 +335,7 @@ class MonitoringWebSocketConsumer(AsyncWebsocketConsumer):
             
             # Envoyer les nouvelles données initiales
             await self.send_initial_data()
+            await self.subscribe_topic()
             
         except Exception as e:
             logger.error(f"Erreur lors de l'abonnement: {e}")
@@ -235,6 +344,7 @@ class MonitoringWebSocketConsumer(AsyncWebsocketConsumer):
     async def handle_unsubscribe(self, data):
         """Traite la demande de désabonnement."""
         try:
+            await self.unsubscribe_topic()
             if self.room_group_name:
                 await self.channel_layer.group_discard(
                     self.room_group_name,
@@ -299,21 +409,7 @@ class MonitoringWebSocketConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def get_device_metrics(self, device_id: int) -> list[Dict[str, Any]]:
         """Récupère les métriques actuelles d'un équipement."""
-        # Connexion aux repositories réels nécessaire
-        return [
-            {
-                "name": "CPU Usage",
-                "value": 75.5,
-                "unit": "%",
-                "timestamp": datetime.now().isoformat()
-            },
-            {
-                "name": "Memory Usage",
-                "value": 60.2,
-                "unit": "%",
-                "timestamp": datetime.now().isoformat()
-            }
-        ]
+        return device_metrics(device_id)
     
     @database_sync_to_async
     def get_device_metrics_history(
@@ -348,13 +444,7 @@ class MonitoringWebSocketConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def get_global_stats(self) -> Dict[str, Any]:
         """Récupère les statistiques globales."""
-        return {
-            "devices_online": 8,
-            "devices_total": 10,
-            "active_alerts": 3,
-            "avg_cpu_usage": 45.2,
-            "avg_memory_usage": 67.8
-        }
+        return global_stats()
 
 
 class AlertsWebSocketConsumer(AsyncWebsocketConsumer):
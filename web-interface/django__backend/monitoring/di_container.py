@@ -19,7 +19,8 @@ from .infrastructure.repositories import (
     DashboardRepository,
     NotificationRepository,
     NotificationChannelRepository,
-    NotificationRuleRepository
+    NotificationRuleRepository,
+    AnomalyStateRepository
 )
 
 # Adaptateurs pour les services externes
@@ -56,7 +57,6 @@ from .domain.services import (
 
 from .application import (
     # Use cases pour les métriques
-    CollectMetricsUseCase,
     CollectMetricUseCase,
     CreateMetricDefinitionUseCase,
     UpdateMetricUseCase,
@@ -88,9 +88,10 @@ from .application import (
     ApplyMonitoringTemplateUseCase,
     
     # Use cases pour l'analyse avancée
-    DetectAnomaliesUseCase,
     PredictMetricTrendUseCase
 )
+from .use_cases.metrics_use_cases import CollectMetricsUseCase
+from .use_cases.anomaly_detection_use_cases import DetectAnomaliesUseCase
 
 # Configuration du logger
 logger = logging.getLogger(__name__)
@@ -127,13 +128,13 @@ class DIContainer(containers.DeclarativeContainer):
     notification_repository = providers.Singleton(NotificationRepository)
     notification_channel_repository = providers.Singleton(NotificationChannelRepository)
     notification_rule_repository = providers.Singleton(NotificationRuleRepository)
+    anomaly_state_repository = providers.Singleton(AnomalyStateRepository)
     
     # Services
     metric_collection_service = providers.Factory(
         MetricCollectionService,
         device_metric_repository=device_metric_repository,
-        metric_value_repository=metric_value_repository,
-        external_integration_service=external_integration_service
+        metric_value_repository=metric_value_repository
     )
     
     alerting_service = providers.Factory(
@@ -171,8 +172,10 @@ class DIContainer(containers.DeclarativeContainer):
     # Use cases pour les métriques
     collect_metrics_use_case = providers.Factory(
         CollectMetricsUseCase,
-        metric_collection_service=metric_collection_service,
-        device_metric_repository=device_metric_repository
+        device_metric_repository=device_metric_repository,
+        metric_value_repository=metric_value_repository,
+        collection_service=metric_collection_service,
+        alert_service=alerting_service
     )
     
     collect_metric_use_case = providers.Factory(
@@ -289,10 +292,12 @@ class DIContainer(containers.DeclarativeContainer):
     # Use cases pour l'analyse avancée
     detect_anomalies_use_case = providers.Factory(
         DetectAnomaliesUseCase,
-        anomaly_detection_service=anomaly_detection_service,
         metric_value_repository=metric_value_repository,
-        device_metric_repository=device_metric_repository,
-        alerting_service=alerting_service
+        metrics_repository=device_metric_repository,
+        alert_repository=alert_repository,
+        anomaly_detection_service=anomaly_detection_service,
+        alert_service=alerting_service,
+        anomaly_state_repository=anomaly_state_repository
     )
     
     predict_metric_trend_use_case = providers.Factory(
@@ -328,6 +333,15 @@ def resolve(name):
 # Instance du conteneur
 _container = None
 
+def get_container():
+    """
+    Retourne le conteneur, initialisé au premier appel.
+    
+    Returns:
+        L'instance du conteneur
+    """
+    return initialize_container()
+
 def initialize_container():
     """
     Initialise le conteneur d'injection de dépendances.
@@ -0,0 +1,282 @@
+"""
+Détecteurs d'anomalies vectorisés.
+
+Les séries de plusieurs métriques sont traitées ensemble sous forme d'une
+matrice NumPy (une ligne par métrique, complétée par des NaN). Deux modes
+sont proposés :
+
+- par lot : moyenne, écart-type et quartiles calculés sur toute la fenêtre ;
+- en continu : état EWMA / Welford conservé par métrique et mis à jour
+  uniquement avec les nouveaux échantillons.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Nombre minimal de points valides par algorithme
+MIN_POINTS = {
+    'statistical': 3,
+    'z_score': 3,
+    'isolation_forest': 10,
+}
+
+
+def to_matrix(series: Sequence[Sequence[float]]) -> np.ndarray:
+    """
+    Construit une matrice (métriques × échantillons) complétée par des NaN.
+
+    Args:
+        series: Valeurs de chaque métrique
+
+    Returns:
+        Matrice float64
+    """
+    width = max((len(values) for values in series), default=0)
+    matrix = np.full((len(series), width), np.nan)
+    for row, values in enumerate(series):
+        if len(values):
+            matrix[row, :len(values)] = np.asarray(values, dtype=float)
+    return matrix
+
+
+@dataclass
+class BatchDetection:
+    """
+    Résultat d'une détection par lot.
+
+    `mask` et `score` ont la forme de la matrice ; `center`, `lower`,
+    `upper` et `scale` contiennent une valeur par ligne.
+    """
+    mask: np.ndarray
+    score: np.ndarray
+    center: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    scale: np.ndarray
+    valid_rows: np.ndarray
+
+
+def _row_counts(matrix: np.ndarray) -> np.ndarray:
+    return np.sum(~np.isnan(matrix), axis=1)
+
+
+def _empty_rows(matrix: np.ndarray) -> np.ndarray:
+    return np.full(matrix.shape[0], np.nan)
+
+
+def _row_stats(matrix: np.ndarray, min_points: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Moyenne et écart-type d'échantillon (ddof=1) par ligne."""
+    valid_rows = _row_counts(matrix) >= min_points
+    mean = _empty_rows(matrix)
+    std = _empty_rows(matrix)
+    if valid_rows.any():
+        rows = matrix[valid_rows]
+        mean[valid_rows] = np.nanmean(rows, axis=1)
+        std[valid_rows] = np.nanstd(rows, axis=1, ddof=1)
+    return mean, std, valid_rows
+
+
+def detect_statistical(matrix: np.ndarray, sensitivity: float) -> BatchDetection:
+    """Écart à la moyenne supérieur à k écarts-types, k = 3 - 2 × sensibilité."""
+    mean, std, valid_rows = _row_stats(matrix, MIN_POINTS['statistical'])
+    threshold = std * (3 - sensitivity * 2)
+    deviation = np.abs(matrix - mean[:, None])
+    with np.errstate(invalid='ignore'):
+        mask = (deviation > threshold[:, None]) & valid_rows[:, None]
+    return BatchDetection(mask, deviation, mean, mean - threshold, mean + threshold, std, valid_rows)
+
+
+def detect_z_score(matrix: np.ndarray, sensitivity: float) -> BatchDetection:
+    """Z-score supérieur à 3 - 1,5 × sensibilité."""
+    mean, std, valid_rows = _row_stats(matrix, MIN_POINTS['z_score'])
+    z_threshold = 3 - sensitivity * 1.5
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z_score = np.where(std[:, None] > 0, np.abs(matrix - mean[:, None]) / std[:, None], 0.0)
+        mask = (z_score > z_threshold) & valid_rows[:, None]
+    return BatchDetection(
+        mask, z_score, mean,
+        mean - z_threshold * std, mean + z_threshold * std, std, valid_rows
+    )
+
+
+def detect_iqr(matrix: np.ndarray, sensitivity: float) -> BatchDetection:
+    """
+    Valeurs hors de [Q1 - f × IQR, Q3 + f × IQR], f = 1,5 + 1,5 × (1 - sensibilité).
+
+    Les quartiles utilisent la méthode exclusive, comme `statistics.quantiles`.
+    """
+    valid_rows = _row_counts(matrix) >= MIN_POINTS['isolation_forest']
+    q1 = _empty_rows(matrix)
+    q3 = _empty_rows(matrix)
+    if valid_rows.any():
+        q1[valid_rows], q3[valid_rows] = np.nanpercentile(
+            matrix[valid_rows], [25, 75], axis=1, method='weibull'
+        )
+    iqr = q3 - q1
+    outlier_factor = 1.5 + (1 - sensitivity) * 1.5
+    lower = q1 - outlier_factor * iqr
+    upper = q3 + outlier_factor * iqr
+    with np.errstate(invalid='ignore'):
+        below = matrix < lower[:, None]
+        above = matrix > upper[:, None]
+        distance = np.where(below, lower[:, None] - matrix, np.where(above, matrix - upper[:, None], 0.0))
+    mask = (below | above) & valid_rows[:, None]
+    return BatchDetection(mask, distance, (q1 + q3) / 2, lower, upper, iqr, valid_rows)
+
+
+DETECTORS = {
+    'statistical': detect_statistical,
+    'z_score': detect_z_score,
+    'isolation_forest': detect_iqr,
+}
+
+
+def detect(matrix: np.ndarray, algorithm: str, sensitivity: float) -> BatchDetection:
+    """
+    Applique un détecteur par lot à toutes les lignes de la matrice.
+
+    Raises:
+        ValueError: Si l'algorithme n'est pas supporté
+    """
+    detector = DETECTORS.get(algorithm)
+    if detector is None:
+        raise ValueError(f"Algorithme non supporté: {algorithm}")
+    return detector(matrix, sensitivity)
+
+
+@dataclass
+class StreamingState:
+    """
+    État incrémental d'une métrique.
+
+    `count`, `mean` et `m2` suivent l'algorithme de Welford ; `ewma` et
+    `ewm_var` sont la moyenne et la variance mobiles exponentielles.
+    """
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    ewma: Optional[float] = None
+    ewm_var: float = 0.0
+    last_timestamp: Optional[datetime] = None
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+
+@dataclass
+class StreamingDetection:
+    """Résultat d'un passage du détecteur continu (formes : métriques × échantillons)."""
+    mask: np.ndarray
+    score: np.ndarray
+    expected: np.ndarray
+    scale: np.ndarray
+    threshold: float = 0.0
+
+
+class StreamingDetector:
+    """
+    Détecteur continu EWMA, vectorisé sur l'ensemble des métriques.
+
+    Chaque nouvel échantillon est comparé à la moyenne mobile exponentielle
+    antérieure : il est anormal si son écart dépasse `threshold` écarts-types
+    mobiles. Les métriques n'ayant pas encore vu `warmup` échantillons ne
+    lèvent pas d'anomalie.
+    """
+
+    def __init__(self, alpha: float = 0.1, sensitivity: float = 0.95, warmup: int = 10):
+        self.alpha = alpha
+        self.threshold = 3 - sensitivity * 1.5
+        self.warmup = warmup
+
+    def process(self, states: List[StreamingState], matrix: np.ndarray) -> StreamingDetection:
+        """
+        Évalue puis intègre les nouveaux échantillons.
+
+        Les états sont mis à jour en place.
+
+        Args:
+            states: État de chaque ligne de la matrice
+            matrix: Nouveaux échantillons, complétés par des NaN
+
+        Returns:
+            Détection pour chaque échantillon
+        """
+        count = np.array([state.count for state in states], dtype=float)
+        mean = np.array([state.mean for state in states], dtype=float)
+        m2 = np.array([state.m2 for state in states], dtype=float)
+        ewma = np.array([np.nan if state.ewma is None else state.ewma for state in states], dtype=float)
+        ewm_var = np.array([state.ewm_var for state in states], dtype=float)
+
+        shape = matrix.shape
+        mask = np.zeros(shape, dtype=bool)
+        score = np.zeros(shape)
+        expected = np.full(shape, np.nan)
+        scale = np.zeros(shape)
+
+        # Une itération par pas de temps, vectorisée sur les métriques
+        for column in range(shape[1]):
+            x = matrix[:, column]
+            valid = ~np.isnan(x)
+            std = np.sqrt(ewm_var)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                z = np.where(valid & (std > 0), np.abs(x - ewma) / std, 0.0)
+            score[:, column] = z
+            expected[:, column] = ewma
+            scale[:, column] = std
+            mask[:, column] = valid & (count >= self.warmup) & (z > self.threshold)
+
+            # Welford
+            count = count + valid
+            delta = np.where(valid, x - mean, 0.0)
+            mean = mean + np.where(valid, delta / np.maximum(count, 1), 0.0)
+            m2 = m2 + np.where(valid, delta * (np.where(valid, x, 0.0) - mean), 0.0)
+
+            # EWMA : le premier échantillon initialise la moyenne
+            first = valid & np.isnan(ewma)
+            diff = np.where(valid & ~first, x - ewma, 0.0)
+            increment = self.alpha * diff
+            ewm_var = np.where(valid & ~first, (1 - self.alpha) * (ewm_var + diff * increment), ewm_var)
+            ewma = np.where(first, x, np.where(valid, ewma + increment, ewma))
+
+        for row, state in enumerate(states):
+            state.count = int(count[row])
+            state.mean = float(mean[row])
+            state.m2 = float(m2[row])
+            state.ewma = None if np.isnan(ewma[row]) else float(ewma[row])
+            state.ewm_var = float(ewm_var[row])
+
+        return StreamingDetection(mask, score, expected, scale, self.threshold)
+
+
+def linear_trend(timestamps: Sequence[float], values: Sequence[float],
+                 horizon: Sequence[float]) -> Dict[str, float]:
+    """
+    Régression linéaire moindres carrés d'une série.
+
+    Args:
+        timestamps: Horodatages (secondes)
+        values: Valeurs
+        horizon: Horodatages à prédire (secondes)
+
+    Returns:
+        Pente (unités / heure), ordonnée, R² et prédictions
+    """
+    t = np.asarray(timestamps, dtype=float)
+    y = np.asarray(values, dtype=float)
+    origin = t[0]
+    slope, intercept = np.polyfit(t - origin, y, 1)
+    fitted = slope * (t - origin) + intercept
+    total = np.sum((y - y.mean()) ** 2)
+    r_squared = 1.0 - np.sum((y - fitted) ** 2) / total if total > 0 else 1.0
+    predictions = slope * (np.asarray(horizon, dtype=float) - origin) + intercept
+    return {
+        'slope_per_hour': float(slope * 3600),
+        'intercept': float(intercept),
+        'r_squared': float(r_squared),
+        'predictions': predictions.tolist()
+    }
@@ -409,6 +409,33 @@ class DeviceMetricRepository(ABC):
         """
         pass
     
+    @abstractmethod
+    def get_active_metrics(self, device_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Liste les métriques d'équipement actives.
+        
+        Args:
+            device_id: Restreint à un équipement (optionnel)
+            
+        Returns:
+            Liste des métriques actives
+        """
+        pass
+
+    @abstractmethod
+    def get_collection_configs(self, device_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Liste les métriques actives avec leur configuration de sonde
+        (type de collecte, adresse de l'équipement, paramètres).
+
+        Args:
+            device_id: Restreint à un équipement (optionnel)
+
+        Returns:
+            Liste des métriques prêtes à être collectées
+        """
+        pass
+
     @abstractmethod
     def create(self, device_metric_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -548,6 +575,52 @@ class MetricValueRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_values_for_metrics(self, device_metric_ids: List[int], start_time: datetime,
+                               end_time: Optional[datetime] = None) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Récupère les valeurs de plusieurs métriques en une seule requête.
+
+        Args:
+            device_metric_ids: IDs des métriques d'équipement
+            start_time: Début de la période (exclu)
+            end_time: Fin de la période (optionnelle)
+
+        Returns:
+            Dictionnaire ID de métrique -> valeurs ordonnées dans le temps
+        """
+        pass
+
+    @abstractmethod
+    def get_series(self, device_metric_id: int, start_time: datetime, end_time: datetime,
+                   max_points: int = 500) -> Dict[str, Any]:
+        """
+        Récupère une série temporelle à la résolution adaptée à la période.
+
+        Args:
+            device_metric_id: ID de la métrique d'équipement
+            start_time: Début de la période
+            end_time: Fin de la période
+            max_points: Nombre maximal de points souhaité
+
+        Returns:
+            Résolution utilisée et points de la série
+        """
+        pass
+
+    @abstractmethod
+    def apply_retention(self, retention_days: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+        """
+        Applique la rétention propre à chaque résolution (brute, 1m, 1h, 1d).
+
+        Args:
+            retention_days: Rétention en jours par résolution
+
+        Returns:
+            Nombre d'enregistrements supprimés par résolution
+        """
+        pass
+
 
 class MetricsDefinitionRepository(ABC):
     """
@@ -5,9 +5,13 @@ Ce module contient les services métier qui implémentent la logique du domaine.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any, Union
-from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any, Union, Tuple
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
+import time
+
+from .anomaly_detectors import detect, linear_trend, to_matrix
 
 logger = logging.getLogger(__name__)
 
@@ -108,7 +112,7 @@ class MetricCollectionService:
         try:
             from ..infrastructure.adapters.snmp_adapter import SNMPAdapter
             
-            snmp_adapter = SNMPAdapter()
+            snmp_adapter = SNMPAdapter(port=int(device_metric.get('snmp_port', 161)))
             device_ip = device_metric.get('device_ip')
             oid = device_metric.get('oid')
             community = device_metric.get('snmp_community', 'public')
@@ -244,6 +248,94 @@ class MetricCollectionService:
                 'error': f'Erreur lors du test de port: {e}'
             }
     
+    def probe_device(self, device_metrics: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Collecte toutes les métriques d'un même équipement en le contactant
+        une seule fois par protocole.
+        
+        Les OIDs SNMP sont regroupés dans une même requête, un seul ping est
+        partagé par les métriques de latence et chaque port n'est testé qu'une fois.
+        
+        Args:
+            device_metrics: Configurations des métriques d'un équipement
+            
+        Returns:
+            Liste de couples (métrique, résultat de collecte)
+        """
+        by_protocol: Dict[str, List[Dict[str, Any]]] = {}
+        for device_metric in device_metrics:
+            by_protocol.setdefault(device_metric.get('metric_type', 'snmp'), []).append(device_metric)
+        
+        results = []
+        for metric_type, metrics in by_protocol.items():
+            try:
+                if metric_type == 'snmp':
+                    results.extend(self._collect_snmp_group(metrics))
+                elif metric_type == 'ping':
+                    ping_result = self._collect_ping_metric(metrics[0])
+                    results.extend((metric, ping_result) for metric in metrics)
+                elif metric_type == 'port_check':
+                    port_results = {}
+                    for metric in metrics:
+                        port = metric.get('port')
+                        if port not in port_results:
+                            port_results[port] = self._collect_port_metric(metric)
+                        results.append((metric, port_results[port]))
+                else:
+                    results.extend((metric, self._collect_metric_value(metric)) for metric in metrics)
+            except Exception as e:
+                logger.error(f"Erreur lors de la collecte {metric_type}: {e}")
+                results.extend((metric, {'success': False, 'error': str(e)}) for metric in metrics)
+        
+        return results
+    
+    def _collect_snmp_group(self, device_metrics: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Collecte les métriques SNMP d'un équipement en un minimum de PDU.
+        """
+        from ..infrastructure.adapters.snmp_adapter import SNMPAdapter
+        
+        results = []
+        by_session: Dict[Tuple[Any, str, int], List[Dict[str, Any]]] = {}
+        for device_metric in device_metrics:
+            if not device_metric.get('device_ip') or not device_metric.get('oid'):
+                results.append((device_metric, {
+                    'success': False,
+                    'error': 'Adresse IP ou OID manquant pour la métrique SNMP'
+                }))
+                continue
+            session = (
+                device_metric['device_ip'],
+                device_metric.get('snmp_community', 'public'),
+                int(device_metric.get('snmp_port', 161))
+            )
+            by_session.setdefault(session, []).append(device_metric)
+        
+        for (device_ip, community, port), metrics in by_session.items():
+            snmp_adapter = SNMPAdapter(port=port)
+            response = snmp_adapter.snmp_get_many(device_ip, [m['oid'] for m in metrics], community)
+            values = response.get('values', {})
+            
+            for metric in metrics:
+                oid = metric['oid'].strip('.')
+                if oid in values:
+                    results.append((metric, {
+                        'success': True,
+                        'value': values[oid],
+                        'metadata': {
+                            'oid': oid,
+                            'community': community,
+                            'response_time': response.get('response_time')
+                        }
+                    }))
+                else:
+                    results.append((metric, {
+                        'success': False,
+                        'error': response.get('error') or 'Erreur SNMP inconnue'
+                    }))
+        
+        return results
+    
     def collect_metrics_for_device(self, device_id: int) -> List[Dict[str, Any]]:
         """
         Collecte toutes les métriques pour un équipement.
@@ -262,28 +354,15 @@ class MetricCollectionService:
                 logger.warning(f"Aucune métrique configurée pour l'équipement {device_id}")
                 return []
             
-            results = []
-            successful_collections = 0
-            failed_collections = 0
-            
-            for device_metric in device_metrics:
-                if not device_metric.get('is_enabled', True):
-                    continue
-                    
-                metric_result = self.collect_metric(device_metric['id'])
-                results.append(metric_result)
-                
-                if metric_result['success']:
-                    successful_collections += 1
-                else:
-                    failed_collections += 1
+            pipeline = MetricCollectionPipeline(self, self.metric_value_repository)
+            collection = pipeline.run(device_metrics)
             
             logger.info(
                 f"Collecte terminée pour l'équipement {device_id}: "
-                f"{successful_collections} succès, {failed_collections} échecs"
+                f"{collection['collected']} succès, {collection['failed']} échecs"
             )
             
-            return results
+            return collection['results']
             
         except Exception as e:
             logger.error(f"Erreur lors de la collecte pour l'équipement {device_id}: {e}")
@@ -294,6 +373,147 @@ class MetricCollectionService:
             }]
 
 
+class MetricCollectionPipeline:
+    """
+    Pipeline de collecte concurrente des métriques.
+    
+    Les métriques sont regroupées par équipement ; chaque équipement est
+    confié à un seul worker (un contact par protocole et par cycle) et les
+    équipements sont interrogés en parallèle sur un pool borné. Les valeurs
+    sont persistées par lots via `MetricValueRepository.batch_create`.
+    """
+    
+    def __init__(self, collection_service: MetricCollectionService, metric_value_repository,
+                 max_workers: int = 64, batch_size: int = 500):
+        """
+        Args:
+            collection_service: Service réalisant les sondes par équipement
+            metric_value_repository: Repository des valeurs de métriques
+            max_workers: Nombre maximal d'équipements interrogés simultanément
+            batch_size: Nombre de valeurs par écriture groupée
+        """
+        self.collection_service = collection_service
+        self.metric_value_repository = metric_value_repository
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+    
+    @staticmethod
+    def _probe_config(device_metric: Dict[str, Any]) -> Dict[str, Any]:
+        """Fusionne la configuration spécifique avec la métrique."""
+        specific_config = device_metric.get('specific_config') or {}
+        return {**specific_config, **device_metric}
+    
+    def group_by_device(self, device_metrics: List[Dict[str, Any]]) -> Dict[Any, List[Dict[str, Any]]]:
+        """
+        Regroupe les métriques actives par équipement.
+        """
+        devices: Dict[Any, List[Dict[str, Any]]] = {}
+        for device_metric in device_metrics:
+            if not device_metric.get('is_enabled', device_metric.get('is_active', True)):
+                continue
+            devices.setdefault(device_metric.get('device_id'), []).append(self._probe_config(device_metric))
+        return devices
+    
+    def _flush(self, buffer: List[Dict[str, Any]], stats: Dict[str, Any]) -> None:
+        if not buffer:
+            return
+        start = time.perf_counter()
+        try:
+            self.metric_value_repository.batch_create(buffer)
+            stats['persisted'] += len(buffer)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'écriture groupée de {len(buffer)} valeurs: {e}")
+            stats['persist_errors'] += len(buffer)
+        stats['batches'] += 1
+        stats['persist_time'] += time.perf_counter() - start
+        buffer.clear()
+    
+    def run(self, device_metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Exécute un cycle de collecte.
+        
+        Args:
+            device_metrics: Métriques d'équipements à collecter
+            
+        Returns:
+            Résultats par métrique, compteurs et durées par étape (secondes)
+        """
+        cycle_start = time.perf_counter()
+        devices = self.group_by_device(device_metrics)
+        plan_time = time.perf_counter() - cycle_start
+        
+        results = []
+        buffer: List[Dict[str, Any]] = []
+        stats = {'persisted': 0, 'persist_errors': 0, 'batches': 0, 'persist_time': 0.0}
+        
+        probe_start = time.perf_counter()
+        if devices:
+            workers = max(1, min(self.max_workers, len(devices)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='metric-probe') as executor:
+                futures = {
+                    executor.submit(self.collection_service.probe_device, metrics): device_id
+                    for device_id, metrics in devices.items()
+                }
+                # Les écritures restent dans le thread appelant
+                for future in as_completed(futures):
+                    device_id = futures[future]
+                    try:
+                        probe_results = future.result()
+                    except Exception as e:
+                        probe_results = [
+                            (metric, {'success': False, 'error': str(e)})
+                            for metric in devices[device_id]
+                        ]
+                    
+                    for device_metric, collection_result in probe_results:
+                        timestamp = datetime.now(timezone.utc)
+                        if collection_result.get('success'):
+                            buffer.append({
+                                'device_metric_id': device_metric.get('id'),
+                                'value': collection_result['value'],
+                                'timestamp': timestamp,
+                                'status': 'success',
+                                'metadata': collection_result.get('metadata', {})
+                            })
+                            results.append({
+                                'success': True,
+                                'device_id': device_id,
+                                'device_metric_id': device_metric.get('id'),
+                                'value': collection_result['value'],
+                                'timestamp': timestamp.isoformat()
+                            })
+                        else:
+                            results.append({
+                                'success': False,
+                                'device_id': device_id,
+                                'device_metric_id': device_metric.get('id'),
+                                'error': collection_result.get('error', 'Échec de collecte')
+                            })
+                    
+                    if len(buffer) >= self.batch_size:
+                        self._flush(buffer, stats)
+        
+        self._flush(buffer, stats)
+        probe_time = time.perf_counter() - probe_start - stats['persist_time']
+        
+        collected = sum(1 for result in results if result['success'])
+        return {
+            'results': results,
+            'devices': len(devices),
+            'collected': collected,
+            'failed': len(results) - collected,
+            'persisted': stats['persisted'],
+            'persist_errors': stats['persist_errors'],
+            'batches': stats['batches'],
+            'timings': {
+                'plan': round(plan_time, 4),
+                'probe': round(probe_time, 4),
+                'persist': round(stats['persist_time'], 4),
+                'total': round(time.perf_counter() - cycle_start, 4)
+            }
+        }
+
+
 class AlertingService:
     """
     Service pour la gestion des alertes.
@@ -749,30 +969,101 @@ class AnomalyDetectionService:
     def __init__(self, metric_value_repository):
         self.metric_value_repository = metric_value_repository
     
-    def detect_anomalies(self, device_metric_id: int, time_range: Dict[str, datetime]) -> List[Dict[str, Any]]:
+    def _load_series(self, device_metric_id: int, time_range: Dict[str, datetime]) -> List[Dict[str, Any]]:
+        start_time = time_range.get('start') or datetime.now() - timedelta(days=30)
+        end_time = time_range.get('end') or datetime.now()
+        return self.metric_value_repository.get_values_by_period(device_metric_id, start_time, end_time)
+    
+    def detect_anomalies(self, device_metric_id: int, time_range: Dict[str, datetime],
+                         algorithm: str = 'z_score', sensitivity: float = 0.95) -> List[Dict[str, Any]]:
         """
         Détecte les anomalies pour une métrique.
         
         Args:
             device_metric_id: ID de la métrique d'équipement
             time_range: Plage de temps
+            algorithm: Algorithme ('statistical', 'z_score', 'isolation_forest')
+            sensitivity: Sensibilité de la détection (0.0 à 1.0)
             
         Returns:
             Liste des anomalies détectées
         """
-        # Implémentation de la détection d'anomalies
-        pass
+        values = self._load_series(device_metric_id, time_range)
+        if not values:
+            return []
+        
+        detection = detect(to_matrix([[float(v['value']) for v in values]]), algorithm, sensitivity)
+        return [
+            {
+                'timestamp': values[index]['timestamp'],
+                'value': float(values[index]['value']),
+                'score': float(detection.score[0, index]),
+                'expected_range': {
+                    'min': float(detection.lower[0]),
+                    'max': float(detection.upper[0])
+                },
+                'algorithm': algorithm
+            }
+            for index in detection.mask[0].nonzero()[0]
+        ]
     
-    def predict_trend(self, device_metric_id: int, time_range: Dict[str, datetime]) -> Dict[str, Any]:
+    def predict_trend(self, device_metric_id: int, time_range: Dict[str, datetime],
+                      horizon_hours: int = 24, points: int = 24) -> Dict[str, Any]:
         """
         Prédit la tendance pour une métrique.
         
+        Régression linéaire sur la plage, extrapolée sur `horizon_hours`.
+        
         Args:
             device_metric_id: ID de la métrique d'équipement
             time_range: Plage de temps
+            horizon_hours: Horizon de prédiction (heures)
+            points: Nombre de points prédits
             
         Returns:
             La prédiction de tendance
         """
-        # Implémentation de la prédiction de tendance
-        pass 
\ No newline at end of file
+        values = self._load_series(device_metric_id, time_range)
+        if len(values) < 2:
+            return {
+                'success': False,
+                'error': 'Données insuffisantes pour prédire une tendance',
+                'device_metric_id': device_metric_id,
+                'available_points': len(values)
+            }
+        
+        # Le repository renvoie les valeurs les plus récentes d'abord, en ISO
+        samples = sorted(
+            (self._epoch(v['timestamp']), float(v['value'])) for v in values
+        )
+        timestamps = [timestamp for timestamp, _ in samples]
+        step = horizon_hours * 3600 / points
+        horizon = [timestamps[-1] + step * (i + 1) for i in range(points)]
+        trend = linear_trend(timestamps, [value for _, value in samples], horizon)
+        
+        if abs(trend['slope_per_hour']) < 1e-9:
+            direction = 'stable'
+        else:
+            direction = 'increasing' if trend['slope_per_hour'] > 0 else 'decreasing'
+        
+        return {
+            'success': True,
+            'device_metric_id': device_metric_id,
+            'direction': direction,
+            'slope_per_hour': trend['slope_per_hour'],
+            'r_squared': trend['r_squared'],
+            'points_used': len(values),
+            'predictions': [
+                {'timestamp': datetime.fromtimestamp(t, timezone.utc).isoformat(), 'value': value}
+                for t, value in zip(horizon, trend['predictions'])
+            ]
+        }
+    
+    @staticmethod
+    def _epoch(timestamp: Union[datetime, str]) -> float:
+        """Horodatage POSIX d'une valeur ; un horodatage naïf est lu en UTC."""
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp.timestamp()
@@ -7,9 +7,9 @@ via SNMP et collecter des métriques en temps réel.
 
 import logging
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-import subprocess
-import json
+from typing import Dict, Any, List, Optional, Sequence
+
+from api_clients.network.snmp_engine import SNMPEngine, get_snmp_engine
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +18,9 @@ class SNMPAdapter:
     """
     Adaptateur pour la collecte SNMP.
     
-    Utilise les outils système snmpget et snmpwalk pour
-    la collecte de métriques depuis les équipements réseau.
+    S'appuie sur le moteur SNMP en processus (`SNMPEngine`) : plusieurs OIDs
+    sont regroupés dans un même PDU, les tables sont parcourues par GETBULK
+    et tous les équipements partagent une seule socket UDP.
     """
     
     # OIDs standards pour les métriques communes
@@ -39,72 +40,89 @@ class SNMPAdapter:
         'ifOutOctets': '1.3.6.1.2.1.2.2.1.16'
     }
     
-    def __init__(self, timeout: int = 5, retries: int = 3):
+    def __init__(self, timeout: int = 5, retries: int = 3, port: int = 161,
+                 engine: Optional[SNMPEngine] = None):
         """
         Initialise l'adaptateur SNMP.
         
         Args:
             timeout: Délai d'attente pour les requêtes SNMP
             retries: Nombre de tentatives en cas d'échec
+            port: Port SNMP des équipements
+            engine: Moteur SNMP à utiliser (moteur partagé du processus par défaut)
         """
         self.timeout = timeout
         self.retries = retries
+        self.port = port
+        self.engine = engine or get_snmp_engine()
     
-    def snmp_get(self, target: str, oid: str, community: str = 'public', version: str = '2c') -> Dict[str, Any]:
+    @property
+    def _request_options(self) -> Dict[str, Any]:
+        return {'port': self.port, 'timeout': self.timeout, 'retries': self.retries}
+    
+    def snmp_get_many(self, target: str, oids: Sequence[str], community: str = 'public',
+                      version: str = '2c') -> Dict[str, Any]:
         """
-        Exécute une requête SNMP GET.
+        Récupère plusieurs OIDs en un minimum de PDU.
         
         Args:
             target: Adresse IP de l'équipement
-            oid: OID à interroger
+            oids: OIDs à interroger
             community: Communauté SNMP
             version: Version SNMP
             
         Returns:
-            Résultat de la requête
+            Résultat de la requête avec les valeurs par OID
         """
+        start_time = datetime.now()
         try:
-            cmd = [
-                'snmpget',
-                '-v', version,
-                '-c', community,
-                '-t', str(self.timeout),
-                '-r', str(self.retries),
-                '-Oq',
-                target,
-                oid
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout + 5)
-            
-            if result.returncode == 0 and result.stdout:
-                # Parser la sortie SNMP
-                output = result.stdout.strip()
-                if ' = ' in output:
-                    oid_part, value_part = output.split(' = ', 1)
-                    return {
-                        'success': True,
-                        'oid': oid_part.strip(),
-                        'value': value_part.strip(),
-                        'raw_output': output
-                    }
-            
+            values = self.engine.get(target, oids, community=community, version=version,
+                                     **self._request_options)
             return {
-                'success': False,
-                'error': result.stderr.strip() if result.stderr else 'No output',
-                'returncode': result.returncode
+                'success': bool(values),
+                'values': values,
+                'error': None if values else 'No such object',
+                'response_time': (datetime.now() - start_time).total_seconds()
             }
-            
-        except subprocess.TimeoutExpired:
+        except Exception as e:
             return {
                 'success': False,
-                'error': f'Timeout after {self.timeout} seconds'
+                'error': str(e)
             }
-        except Exception as e:
+    
+    def snmp_get(self, target: str, oid: str, community: str = 'public', version: str = '2c') -> Dict[str, Any]:
+        """
+        Exécute une requête SNMP GET.
+        
+        Args:
+            target: Adresse IP de l'équipement
+            oid: OID à interroger
+            community: Communauté SNMP
+            version: Version SNMP
+            
+        Returns:
+            Résultat de la requête
+        """
+        result = self.snmp_get_many(target, [oid], community, version)
+        if not result['success']:
             return {
                 'success': False,
-                'error': str(e)
+                'error': result.get('error', 'No output')
             }
+        
+        oid_part, value = next(iter(result['values'].items()))
+        return {
+            'success': True,
+            'oid': oid_part,
+            'value': value,
+            'response_time': result['response_time']
+        }
+    
+    def get_single_oid(self, target: str, oid: str, community: str = 'public') -> Dict[str, Any]:
+        """
+        Récupère la valeur d'un OID unique (utilisé par la collecte de métriques).
+        """
+        return self.snmp_get(target, oid, community)
     
     def snmp_walk(self, target: str, oid: str, community: str = 'public', version: str = '2c') -> Dict[str, Any]:
         """
@@ -120,26 +138,9 @@ class SNMPAdapter:
             Résultats du walk
         """
         try:
-            cmd = [
-                'snmpwalk',
-                '-v', version,
-                '-c', community,
-                '-t', str(self.timeout),
-                '-r', str(self.retries),
-                '-Oq',
-                target,
-                oid
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=(self.timeout + 5) * 3)
-            
-            if result.returncode == 0 and result.stdout:
-                data = {}
-                for line in result.stdout.strip().split('\n'):
-                    if ' = ' in line:
-                        oid_part, value_part = line.split(' = ', 1)
-                        data[oid_part.strip()] = value_part.strip()
-                
+            data = self.engine.walk(target, [oid], community=community, version=version,
+                                    **self._request_options)[oid.strip('.')]
+            if data:
                 return {
                     'success': True,
                     'data': data,
@@ -148,15 +149,9 @@ class SNMPAdapter:
             
             return {
                 'success': False,
-                'error': result.stderr.strip() if result.stderr else 'No output',
-                'returncode': result.returncode
+                'error': 'No output'
             }
             
-        except subprocess.TimeoutExpired:
-            return {
-                'success': False,
-                'error': f'Timeout after {self.timeout * 3} seconds'
-            }
         except Exception as e:
             return {
                 'success': False,
@@ -177,12 +172,13 @@ class SNMPAdapter:
         system_info = {}
         errors = []
         
+        result = self.snmp_get_many(target, list(self.SYSTEM_OIDS.values()), community)
+        values = result.get('values', {})
         for name, oid in self.SYSTEM_OIDS.items():
-            result = self.snmp_get(target, oid, community)
-            if result['success']:
-                system_info[name] = result['value']
+            if oid in values:
+                system_info[name] = values[oid]
             else:
-                errors.append(f"{name}: {result.get('error', 'Unknown error')}")
+                errors.append(f"{name}: {result.get('error') or 'No such object'}")
         
         return {
             'success': len(system_info) > 0,
@@ -196,6 +192,9 @@ class SNMPAdapter:
         """
         Collecte les métriques des interfaces réseau.
         
+        Les colonnes de l'ifTable sont parcourues ensemble par GETBULK,
+        sans limite sur le nombre d'interfaces.
+        
         Args:
             target: Adresse IP de l'équipement
             community: Communauté SNMP
@@ -204,42 +203,18 @@ class SNMPAdapter:
             Métriques des interfaces
         """
         try:
-            # Obtenir le nombre d'interfaces
-            num_result = self.snmp_get(target, self.INTERFACE_OIDS['ifNumber'], community)
-            
-            if not num_result['success']:
-                return {
-                    'success': False,
-                    'target': target,
-                    'error': f"Cannot get interface count: {num_result.get('error')}",
-                    'timestamp': datetime.now().isoformat()
-                }
-            
-            try:
-                num_interfaces = int(num_result['value'].split()[0])
-            except (ValueError, IndexError):
-                num_interfaces = 10  # Valeur par défaut
+            columns = {
+                metric: base_oid for metric, base_oid in self.INTERFACE_OIDS.items()
+                if metric != 'ifNumber'
+            }
+            tables = self.engine.walk(target, list(columns.values()), community=community,
+                                      **self._request_options)
             
-            # Collecter les métriques pour chaque interface
             interfaces = {}
-            
-            for i in range(1, min(num_interfaces + 1, 25)):  # Limite à 24 interfaces
-                interface_data = {}
-                
-                for metric, base_oid in self.INTERFACE_OIDS.items():
-                    if metric != 'ifNumber':
-                        oid = f"{base_oid}.{i}"
-                        result = self.snmp_get(target, oid, community)
-                        
-                        if result['success']:
-                            value = result['value']
-                            # Nettoyer la valeur
-                            if ' ' in value:
-                                value = value.split()[0]
-                            interface_data[metric] = value
-                
-                if interface_data:
-                    interfaces[f"interface_{i}"] = interface_data
+            for metric, base_oid in columns.items():
+                for oid, value in tables[base_oid].items():
+                    index = oid.rsplit('.', 1)[-1]
+                    interfaces.setdefault(f"interface_{index}", {})[metric] = value
             
             return {
                 'success': True,
@@ -257,6 +232,21 @@ class SNMPAdapter:
                 'timestamp': datetime.now().isoformat()
             }
     
+    def get_values_for_devices(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Interroge de nombreux équipements en parallèle sur la socket partagée.
+        
+        Args:
+            requests: Liste de dicts {'target', 'oids', 'community'}
+            
+        Returns:
+            Liste de résultats {'target', 'success', 'values' | 'error'}
+        """
+        return self.engine.get_many([
+            {**self._request_options, **request}
+            for request in requests
+        ])
+    
     def test_connectivity(self, target: str, community: str = 'public') -> Dict[str, Any]:
         """
         Teste la connectivité SNMP avec un équipement.
@@ -282,7 +272,7 @@ class SNMPAdapter:
                 'target': target,
                 'community': community,
                 'response_time_seconds': response_time,
-                'system_description': result['value'][:100] + '...' if len(result['value']) > 100 else result['value'],
+                'system_description': str(result['value'])[:100] + '...' if len(str(result['value'])) > 100 else str(result['value']),
                 'timestamp': datetime.now().isoformat()
             }
         else:
@@ -345,14 +335,9 @@ class SNMPAdapter:
     
     def is_snmp_available(self) -> bool:
         """
-        Vérifie si les outils SNMP sont disponibles sur le système.
+        Vérifie si la collecte SNMP est disponible.
         
         Returns:
-            True si les outils SNMP sont disponibles
+            True : le moteur SNMP est intégré au processus
         """
-        try:
-            result = subprocess.run(['snmpget', '--version'], 
-                                  capture_output=True, text=True, timeout=5)
-            return result.returncode == 0
-        except Exception:
-            return False 
\ No newline at end of file
+        return True
@@ -6,7 +6,8 @@ from .alert_repository import AlertRepository
 from .metrics_repository import (
     MetricsDefinitionRepository,
     DeviceMetricRepository,
-    MetricValueRepository
+    MetricValueRepository,
+    AnomalyStateRepository
 )
 from .service_check_repository import (
     ServiceCheckRepository,
@@ -6,19 +6,68 @@ import logging
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timezone, timedelta
 
-from django.db.models import Q, Avg, Max, Min, Count
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q, Avg, Max, Min, Count, Sum
+from django.utils.timezone import is_naive, make_aware
 
 from ...domain.interfaces.repositories import (
     DeviceMetricRepository as IDeviceMetricRepository,
     MetricValueRepository as IMetricValueRepository,
     MetricsDefinitionRepository as IMetricsDefinitionRepository
 )
-from ...models import MetricsDefinition, DeviceMetric, MetricValue, MetricThreshold
+from ...domain.anomaly_detectors import StreamingState
+from ...models import (
+    MetricsDefinition, DeviceMetric, MetricValue, MetricThreshold, MetricRollup, AnomalyDetectorState
+)
 from .base_repository import BaseRepository
 
 # Configuration du logger
 logger = logging.getLogger(__name__)
 
+# Résolutions des agrégats, de la plus fine à la plus grossière
+ROLLUP_RESOLUTIONS = {
+    '1m': timedelta(minutes=1),
+    '1h': timedelta(hours=1),
+    '1d': timedelta(days=1),
+}
+
+# Rétention par résolution (jours), surchargeable via MONITORING_METRIC_RETENTION_DAYS
+DEFAULT_RETENTION_DAYS = {
+    'raw': 7,
+    '1m': 30,
+    '1h': 365,
+    '1d': 1825,
+}
+
+
+def get_retention_days() -> Dict[str, int]:
+    """Retourne la rétention par résolution, configuration comprise."""
+    return {**DEFAULT_RETENTION_DAYS, **getattr(settings, 'MONITORING_METRIC_RETENTION_DAYS', {})}
+
+
+def to_utc(timestamp: datetime) -> datetime:
+    """
+    Convertit un horodatage en datetime aware UTC.
+    
+    Un horodatage naïf est interprété dans le fuseau courant de Django ;
+    sans cette normalisation, un intervalle déjà stocké (aware) ne serait
+    pas retrouvé à partir d'une valeur naïve.
+    """
+    if is_naive(timestamp):
+        timestamp = make_aware(timestamp)
+    return timestamp.astimezone(timezone.utc)
+
+
+def floor_timestamp(timestamp: datetime, resolution: str) -> datetime:
+    """Ramène un horodatage (converti en UTC) au début de son intervalle d'agrégation."""
+    timestamp = to_utc(timestamp).replace(second=0, microsecond=0)
+    if resolution in ('1h', '1d'):
+        timestamp = timestamp.replace(minute=0)
+    if resolution == '1d':
+        timestamp = timestamp.replace(hour=0)
+    return timestamp
+
 
 class MetricsDefinitionRepository(BaseRepository[MetricsDefinition], IMetricsDefinitionRepository):
     """
@@ -459,44 +508,80 @@ class DeviceMetricRepository(BaseRepository[DeviceMetric], IDeviceMetricReposito
     def get_by_id(self, device_metric_id: int) -> Optional[Dict[str, Any]]:
         """Récupère une métrique d'équipement par son ID."""
         try:
-            device_metric = DeviceMetric.objects.get(id=device_metric_id)
-            return {
-                'id': device_metric.id,
-                'device_id': device_metric.device_id,
-                'metric_id': device_metric.metric_id,
-                'name': device_metric.name,
-                'specific_config': device_metric.specific_config,
-                'is_active': device_metric.is_active,
-                'last_collection': device_metric.last_collection.isoformat() if device_metric.last_collection else None,
-                'last_collection_success': device_metric.last_collection_success,
-                'last_value': device_metric.last_value,
-                'last_collection_message': device_metric.last_collection_message,
-                'created_at': device_metric.created_at.isoformat() if device_metric.created_at else None,
-                'updated_at': device_metric.updated_at.isoformat() if device_metric.updated_at else None,
-            }
+            return self._to_dict(DeviceMetric.objects.select_related('metric').get(id=device_metric_id))
         except DeviceMetric.DoesNotExist:
             return None
 
     def list_by_device(self, device_id: int) -> List[Dict[str, Any]]:
         """Liste les métriques pour un équipement."""
-        device_metrics = self.get_by_device(device_id, active_only=False)
-        return [
-            {
-                'id': device_metric.id,
-                'device_id': device_metric.device_id,
-                'metric_id': device_metric.metric_id,
-                'name': device_metric.name,
-                'specific_config': device_metric.specific_config,
-                'is_active': device_metric.is_active,
-                'last_collection': device_metric.last_collection.isoformat() if device_metric.last_collection else None,
-                'last_collection_success': device_metric.last_collection_success,
-                'last_value': device_metric.last_value,
-                'last_collection_message': device_metric.last_collection_message,
-                'created_at': device_metric.created_at.isoformat() if device_metric.created_at else None,
-                'updated_at': device_metric.updated_at.isoformat() if device_metric.updated_at else None,
-            }
-            for device_metric in device_metrics
-        ]
+        device_metrics = DeviceMetric.objects.filter(device_id=device_id).select_related('metric')
+        return [self._to_dict(device_metric) for device_metric in device_metrics]
+    
+    def get_active_metrics(self, device_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Liste les métriques d'équipement actives, en une requête.
+        
+        Args:
+            device_id: Restreint à un équipement (optionnel)
+            
+        Returns:
+            Liste des métriques actives
+        """
+        device_metrics = DeviceMetric.objects.filter(is_active=True).select_related('metric')
+        if device_id is not None:
+            device_metrics = device_metrics.filter(device_id=device_id)
+        return [self._to_dict(device_metric) for device_metric in device_metrics.order_by('id')]
+    
+    def get_collection_configs(self, device_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Liste les métriques actives avec leur configuration de sonde, en une requête.
+        
+        Args:
+            device_id: Restreint à un équipement (optionnel)
+            
+        Returns:
+            Liste des métriques prêtes à être collectées
+        """
+        device_metrics = DeviceMetric.objects.filter(is_active=True).select_related('metric', 'device')
+        if device_id is not None:
+            device_metrics = device_metrics.filter(device_id=device_id)
+        return [self._to_probe_config(device_metric) for device_metric in device_metrics.order_by('id')]
+    
+    @classmethod
+    def _to_probe_config(cls, device_metric: DeviceMetric) -> Dict[str, Any]:
+        """
+        Configuration de sonde d'une métrique (la définition et l'équipement
+        doivent être chargés).
+        
+        Le type de collecte vient de `collection_method` ; les paramètres de la
+        définition (OID, port...) sont surchargés par `custom_parameters`.
+        """
+        device = device_metric.device
+        return {
+            'metric_type': device_metric.metric.collection_method,
+            'device_ip': device.ip_address,
+            'snmp_community': device.snmp_community or 'public',
+            **(device_metric.metric.collection_parameters or {}),
+            **(device_metric.custom_parameters or {}),
+            **cls._to_dict(device_metric),
+        }
+    
+    @staticmethod
+    def _to_dict(device_metric: DeviceMetric) -> Dict[str, Any]:
+        """Représentation d'une métrique d'équipement (la définition doit être chargée)."""
+        return {
+            'id': device_metric.id,
+            'device_id': device_metric.device_id,
+            'metric_id': device_metric.metric_id,
+            'name': device_metric.metric.name,
+            'specific_config': device_metric.custom_parameters,
+            'collection_interval': device_metric.collection_interval,
+            'is_active': device_metric.is_active,
+            'last_collection': device_metric.last_collection.isoformat() if device_metric.last_collection else None,
+            'next_collection': device_metric.next_collection.isoformat() if device_metric.next_collection else None,
+            'created_at': device_metric.created_at.isoformat() if device_metric.created_at else None,
+            'updated_at': device_metric.updated_at.isoformat() if device_metric.updated_at else None,
+        }
 
     def create(self, device_metric_data: Dict[str, Any]) -> Dict[str, Any]:
         """Crée une nouvelle métrique d'équipement."""
@@ -549,24 +634,202 @@ class DeviceMetricRepository(BaseRepository[DeviceMetric], IDeviceMetricReposito
 
     def list_all(self) -> List[Dict[str, Any]]:
         """Liste toutes les métriques d'équipements."""
-        device_metrics = DeviceMetric.objects.all()
+        device_metrics = DeviceMetric.objects.select_related('metric').order_by('id')
+        return [self._to_dict(device_metric) for device_metric in device_metrics]
+
+
+class MetricRollupRepository:
+    """
+    Repository des agrégats de métriques (1 minute, 1 heure, 1 jour).
+    
+    Les agrégats sont maintenus incrémentalement à partir des valeurs
+    brutes ingérées ; les lectures choisissent la résolution la plus
+    fine compatible avec le nombre de points demandé.
+    """
+    
+    @staticmethod
+    def accumulate(values: List[MetricValue]) -> Dict[Tuple[int, str, datetime], Dict[str, float]]:
+        """
+        Calcule les agrégats partiels d'un lot de valeurs.
+        
+        Returns:
+            Dictionnaire (device_metric_id, résolution, début d'intervalle) -> agrégat
+        """
+        partials: Dict[Tuple[int, str, datetime], Dict[str, float]] = {}
+        for metric_value in values:
+            try:
+                value = float(metric_value.value)
+            except (TypeError, ValueError):
+                continue
+            for resolution in ROLLUP_RESOLUTIONS:
+                key = (metric_value.device_metric_id, resolution,
+                       floor_timestamp(metric_value.timestamp, resolution))
+                partial = partials.get(key)
+                if partial is None:
+                    partials[key] = {'count': 1, 'sum': value, 'min': value, 'max': value}
+                else:
+                    partial['count'] += 1
+                    partial['sum'] += value
+                    partial['min'] = min(partial['min'], value)
+                    partial['max'] = max(partial['max'], value)
+        return partials
+    
+    def apply(self, values: List[MetricValue]) -> int:
+        """
+        Fusionne un lot de valeurs brutes dans les agrégats existants.
+        
+        Les intervalles manquants sont d'abord insérés vides
+        (`ignore_conflicts` : un écrivain concurrent qui crée le même
+        intervalle ne provoque pas d'IntegrityError), puis tous les
+        intervalles du lot sont relus verrouillés (une requête par
+        résolution) et mis à jour en masse. Les écrivains d'un même
+        intervalle sont ainsi sérialisés par le verrou de ligne.
+        
+        Returns:
+            Nombre d'agrégats créés ou mis à jour
+        """
+        partials = self.accumulate(values)
+        if not partials:
+            return 0
+        
+        with transaction.atomic():
+            # Intervalle vide : min/max initialisés avec ceux du lot
+            MetricRollup.objects.bulk_create([
+                MetricRollup(device_metric_id=device_metric_id, resolution=resolution,
+                             bucket_start=bucket_start, count=0, sum=0.0,
+                             min=partial['min'], max=partial['max'])
+                for (device_metric_id, resolution, bucket_start), partial in partials.items()
+            ], ignore_conflicts=True)
+            
+            to_update = []
+            for resolution in ROLLUP_RESOLUTIONS:
+                keys = [key for key in partials if key[1] == resolution]
+                existing = MetricRollup.objects.select_for_update().filter(
+                    resolution=resolution,
+                    device_metric_id__in={key[0] for key in keys},
+                    bucket_start__in={key[2] for key in keys}
+                )
+                for rollup in existing:
+                    partial = partials.get((rollup.device_metric_id, resolution, to_utc(rollup.bucket_start)))
+                    if partial is None:
+                        continue
+                    rollup.count += partial['count']
+                    rollup.sum += partial['sum']
+                    rollup.min = min(rollup.min, partial['min'])
+                    rollup.max = max(rollup.max, partial['max'])
+                    to_update.append(rollup)
+            
+            MetricRollup.objects.bulk_update(to_update, ['count', 'sum', 'min', 'max'])
+        
+        return len(to_update)
+    
+    @staticmethod
+    def select_resolution(start_time: datetime, end_time: datetime, max_points: int,
+                          now: Optional[datetime] = None) -> str:
+        """
+        Choisit la résolution la plus fine qui reste sous `max_points` points
+        et dont la rétention couvre le début de la plage.
+        
+        Une plage plus courte qu'une minute est lue sur les valeurs brutes ;
+        une plage qui dépasse le budget à toutes les résolutions est lue à la
+        plus grossière.
+        
+        Returns:
+            'raw', '1m', '1h' ou '1d'
+        """
+        retention = get_retention_days()
+        now = now or datetime.now(start_time.tzinfo)
+        span = end_time - start_time
+        
+        def retained(resolution):
+            return start_time >= now - timedelta(days=retention[resolution])
+        
+        if span < ROLLUP_RESOLUTIONS['1m'] and retained('raw'):
+            return 'raw'
+        resolutions = [resolution for resolution in ROLLUP_RESOLUTIONS if retained(resolution)]
+        for resolution in resolutions:
+            if span / ROLLUP_RESOLUTIONS[resolution] <= max_points:
+                return resolution
+        return resolutions[-1] if resolutions else '1d'
+    
+    @staticmethod
+    def whole_buckets(resolution: str, start_time: datetime, end_time: datetime) -> Tuple[datetime, datetime]:
+        """
+        Bornes [début, fin) des intervalles entièrement compris dans la plage.
+        
+        La fin peut précéder le début si aucun intervalle complet n'y tient.
+        """
+        step = ROLLUP_RESOLUTIONS[resolution]
+        first = floor_timestamp(start_time, resolution)
+        if first < to_utc(start_time):
+            first += step
+        return first, floor_timestamp(end_time, resolution)
+    
+    def _range(self, device_metric_id: int, resolution: str, start_time: datetime, end_time: datetime):
+        first, end = self.whole_buckets(resolution, start_time, end_time)
+        return MetricRollup.objects.filter(
+            device_metric_id=device_metric_id,
+            resolution=resolution,
+            bucket_start__gte=first,
+            bucket_start__lt=end
+        )
+    
+    def get_series(self, device_metric_id: int, resolution: str,
+                   start_time: datetime, end_time: datetime) -> List[Dict[str, Any]]:
+        """
+        Retourne les agrégats d'une plage, ordonnés dans le temps.
+        
+        Seuls les intervalles entièrement compris dans la plage sont
+        retournés : un intervalle de bord partiel n'est pas représentatif.
+        """
+        rows = self._range(device_metric_id, resolution, start_time, end_time).order_by(
+            'bucket_start'
+        ).values_list('bucket_start', 'count', 'sum', 'min', 'max')
         return [
             {
-                'id': device_metric.id,
-                'device_id': device_metric.device_id,
-                'metric_id': device_metric.metric_id,
-                'name': device_metric.name,
-                'specific_config': device_metric.specific_config,
-                'is_active': device_metric.is_active,
-                'last_collection': device_metric.last_collection.isoformat() if device_metric.last_collection else None,
-                'last_collection_success': device_metric.last_collection_success,
-                'last_value': device_metric.last_value,
-                'last_collection_message': device_metric.last_collection_message,
-                'created_at': device_metric.created_at.isoformat() if device_metric.created_at else None,
-                'updated_at': device_metric.updated_at.isoformat() if device_metric.updated_at else None,
+                'timestamp': bucket_start.isoformat(),
+                'count': count,
+                'avg': total / count if count else None,
+                'min': minimum,
+                'max': maximum
             }
-            for device_metric in device_metrics
+            for bucket_start, count, total, minimum, maximum in rows
         ]
+    
+    def aggregate(self, device_metric_id: int, resolution: str,
+                  start_time: datetime, end_time: datetime) -> Dict[str, Any]:
+        """
+        Agrège une plage : intervalles complets sur les agrégats, bords
+        partiels sur les valeurs brutes encore conservées.
+        """
+        first, end = self.whole_buckets(resolution, start_time, end_time)
+        edges = Q(timestamp__gte=start_time) & Q(timestamp__lte=end_time)
+        if first < end:
+            edges &= Q(timestamp__lt=first) | Q(timestamp__gte=end)
+            result = self._range(device_metric_id, resolution, start_time, end_time).aggregate(
+                count=Sum('count'), total=Sum('sum'), min=Min('min'), max=Max('max')
+            )
+        else:
+            result = {'count': None, 'total': None, 'min': None, 'max': None}
+        
+        raw = MetricValue.objects.filter(Q(device_metric_id=device_metric_id) & edges).aggregate(
+            count=Count('id'), total=Sum('value'), min=Min('value'), max=Max('value')
+        )
+        count = (result['count'] or 0) + raw['count']
+        total = (result['total'] or 0.0) + (raw['total'] or 0.0)
+        minimums = [value for value in (result['min'], raw['min']) if value is not None]
+        maximums = [value for value in (result['max'], raw['max']) if value is not None]
+        return {
+            'count': count,
+            'avg': total / count if count else None,
+            'min': min(minimums) if minimums else None,
+            'max': max(maximums) if maximums else None
+        }
+    
+    def delete_before(self, resolution: str, cutoff_date: datetime) -> int:
+        """Supprime les agrégats d'une résolution antérieurs à une date."""
+        deleted, _ = MetricRollup.objects.filter(resolution=resolution, bucket_start__lt=cutoff_date).delete()
+        return deleted
 
 
 class MetricValueRepository(BaseRepository[MetricValue], IMetricValueRepository):
@@ -579,6 +842,7 @@ class MetricValueRepository(BaseRepository[MetricValue], IMetricValueRepository)
         Initialise le repository avec le modèle MetricValue.
         """
         super().__init__(MetricValue)
+        self.rollups = MetricRollupRepository()
     
     def create_metric_value(self, device_metric_id: int, value: float, 
                            timestamp: Optional[datetime] = None) -> MetricValue:
@@ -594,8 +858,7 @@ class MetricValueRepository(BaseRepository[MetricValue], IMetricValueRepository)
             La valeur de métrique créée
         """
         try:
-            if timestamp is None:
-                timestamp = datetime.now(timezone.utc)
+            timestamp = to_utc(timestamp) if timestamp is not None else datetime.now(timezone.utc)
                 
             metric_value = MetricValue(
                 device_metric_id=device_metric_id,
@@ -604,6 +867,7 @@ class MetricValueRepository(BaseRepository[MetricValue], IMetricValueRepository)
             )
             
             metric_value.save()
+            self.rollups.apply([metric_value])
             return metric_value
         except Exception as e:
             logger.error(f"Erreur lors de la création d'une valeur de métrique: {e}")
@@ -637,6 +901,7 @@ class MetricValueRepository(BaseRepository[MetricValue], IMetricValueRepository)
                         timestamp = datetime.fromisoformat(timestamp)
                     except ValueError:
                         timestamp = datetime.now(timezone.utc)
+                timestamp = to_utc(timestamp)
                 
                 metric_value = MetricValue(
                     device_metric_id=device_metric_id,
@@ -646,9 +911,11 @@ class MetricValueRepository(BaseRepository[MetricValue], IMetricValueRepository)
                 
                 metric_values.append(metric_value)
             
-            # Créer les objets en masse
+            # Créer les objets en masse et maintenir les agrégats
             if metric_values:
-                MetricValue.objects.bulk_create(metric_values)
+                with transaction.atomic():
+                    MetricValue.objects.bulk_create(metric_values)
+                    self.rollups.apply(metric_values)
                 
             return metric_values
         except Exception as e:
@@ -702,6 +969,9 @@ class MetricValueRepository(BaseRepository[MetricValue], IMetricValueRepository)
         """
         Récupère des valeurs agrégées pour une métrique d'équipement.
         
+        Les plages longues sont calculées sur les agrégats pré-calculés ;
+        les plages courtes sur les valeurs brutes, en une seule requête.
+        
         Args:
             device_metric_id: ID de la métrique d'équipement
             start_time: Heure de début
@@ -711,25 +981,81 @@ class MetricValueRepository(BaseRepository[MetricValue], IMetricValueRepository)
         Returns:
             Dictionnaire contenant les valeurs agrégées
         """
-        query = Q(device_metric_id=device_metric_id) & Q(timestamp__gte=start_time) & Q(timestamp__lte=end_time)
+        resolution = self.rollups.select_resolution(start_time, end_time, max_points=1440)
         
-        values = MetricValue.objects.filter(query)
+        if resolution == 'raw':
+            query = Q(device_metric_id=device_metric_id) & Q(timestamp__gte=start_time) & Q(timestamp__lte=end_time)
+            aggregates = MetricValue.objects.filter(query).aggregate(
+                avg=Avg('value'), min=Min('value'), max=Max('value'), count=Count('id')
+            )
+        else:
+            aggregates = self.rollups.aggregate(device_metric_id, resolution, start_time, end_time)
         
-        result = {}
+        if aggregation == 'all':
+            return {key: aggregates[key] for key in ('avg', 'min', 'max', 'count')}
+        if aggregation in aggregates:
+            return {aggregation: aggregates[aggregation]}
+        return {}
+    
+    def get_values_for_metrics(self, device_metric_ids: List[int], start_time: datetime,
+                               end_time: Optional[datetime] = None) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Récupère en une seule requête les valeurs de plusieurs métriques.
         
-        if aggregation == 'avg' or aggregation == 'all':
-            result['avg'] = values.aggregate(avg_value=Avg('value'))['avg_value']
-            
-        if aggregation == 'min' or aggregation == 'all':
-            result['min'] = values.aggregate(min_value=Min('value'))['min_value']
-            
-        if aggregation == 'max' or aggregation == 'all':
-            result['max'] = values.aggregate(max_value=Max('value'))['max_value']
+        Args:
+            device_metric_ids: IDs des métriques d'équipement
+            start_time: Heure de début (exclue)
+            end_time: Heure de fin (incluse, optionnelle)
             
-        if aggregation == 'count' or aggregation == 'all':
-            result['count'] = values.count()
+        Returns:
+            Dictionnaire ID de métrique -> valeurs ordonnées dans le temps
+        """
+        query = Q(device_metric_id__in=device_metric_ids) & Q(timestamp__gt=start_time)
+        if end_time:
+            query &= Q(timestamp__lte=end_time)
+        
+        values: Dict[int, List[Dict[str, Any]]] = {device_metric_id: [] for device_metric_id in device_metric_ids}
+        rows = MetricValue.objects.filter(query).order_by(
+            'device_metric_id', 'timestamp'
+        ).values_list('device_metric_id', 'timestamp', 'value')
+        for device_metric_id, timestamp, value in rows.iterator(chunk_size=10000):
+            values[device_metric_id].append({'timestamp': timestamp, 'value': value})
+        return values
+    
+    def get_series(self, device_metric_id: int, start_time: datetime, end_time: datetime,
+                   max_points: int = 500) -> Dict[str, Any]:
+        """
+        Récupère une série temporelle bornée à `max_points` points.
+        
+        Args:
+            device_metric_id: ID de la métrique d'équipement
+            start_time: Heure de début
+            end_time: Heure de fin
+            max_points: Nombre maximal de points souhaité
             
-        return result
+        Returns:
+            Résolution utilisée et points (timestamp, count, avg, min, max)
+        """
+        resolution = self.rollups.select_resolution(start_time, end_time, max_points)
+        
+        if resolution == 'raw':
+            rows = MetricValue.objects.filter(
+                device_metric_id=device_metric_id,
+                timestamp__gte=start_time,
+                timestamp__lte=end_time
+            ).order_by('timestamp').values_list('timestamp', 'value')[:max_points]
+            points = [
+                {'timestamp': timestamp.isoformat(), 'count': 1, 'avg': value, 'min': value, 'max': value}
+                for timestamp, value in rows
+            ]
+        else:
+            points = self.rollups.get_series(device_metric_id, resolution, start_time, end_time)
+        
+        return {
+            'device_metric_id': device_metric_id,
+            'resolution': resolution,
+            'points': points
+        }
     
     def clean_old_values(self, device_metric_id: int, 
                         retention_days: int = 30) -> int:
@@ -945,14 +1271,85 @@ class MetricValueRepository(BaseRepository[MetricValue], IMetricValueRepository)
             Nombre de valeurs supprimées
         """
         try:
-            # Compter les valeurs à supprimer
-            count = MetricValue.objects.filter(timestamp__lt=cutoff_date).count()
+            deleted, _ = MetricValue.objects.filter(timestamp__lt=cutoff_date).delete()
             
-            # Supprimer les valeurs
-            MetricValue.objects.filter(timestamp__lt=cutoff_date).delete()
-            
-            logger.info(f"Suppression de {count} valeurs avant {cutoff_date}")
-            return count
+            logger.info(f"Suppression de {deleted} valeurs avant {cutoff_date}")
+            return deleted
         except Exception as e:
             logger.error(f"Erreur lors de la suppression des valeurs avant {cutoff_date}: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def apply_retention(self, retention_days: Optional[Dict[str, int]] = None,
+                        now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Applique la rétention propre à chaque résolution.
+
+        Args:
+            retention_days: Rétention par résolution ('raw', '1m', '1h', '1d'),
+                complétée par la configuration
+            now: Date de référence (maintenant par défaut)
+
+        Returns:
+            Nombre d'enregistrements supprimés par résolution
+        """
+        retention = {**get_retention_days(), **(retention_days or {})}
+        now = now or datetime.now(timezone.utc)
+
+        deleted = {'raw': self.delete_before_date(now - timedelta(days=retention['raw']))}
+        for resolution in ROLLUP_RESOLUTIONS:
+            cutoff_date = floor_timestamp(now - timedelta(days=retention[resolution]), resolution)
+            deleted[resolution] = self.rollups.delete_before(resolution, cutoff_date)
+
+        logger.info(f"Rétention appliquée: {deleted}")
+        return deleted
+
+
+class AnomalyStateRepository:
+    """
+    Repository des états du détecteur d'anomalies continu.
+    """
+    
+    FIELDS = ['count', 'mean', 'm2', 'ewma', 'ewm_var', 'last_timestamp']
+    
+    def get_states(self, device_metric_ids: List[int]) -> Dict[int, StreamingState]:
+        """
+        Récupère l'état de plusieurs métriques (état vierge si absent).
+        
+        Args:
+            device_metric_ids: IDs des métriques d'équipement
+            
+        Returns:
+            Dictionnaire ID de métrique -> état
+        """
+        states = {device_metric_id: StreamingState() for device_metric_id in device_metric_ids}
+        rows = AnomalyDetectorState.objects.filter(
+            device_metric_id__in=device_metric_ids
+        ).values('device_metric_id', *self.FIELDS)
+        for row in rows:
+            states[row.pop('device_metric_id')] = StreamingState(**row)
+        return states
+    
+    def save_states(self, states: Dict[int, StreamingState]) -> int:
+        """
+        Enregistre les états en une seule requête (insertion ou mise à jour).
+        
+        Args:
+            states: Dictionnaire ID de métrique -> état
+            
+        Returns:
+            Nombre d'états enregistrés
+        """
+        objects = [
+            AnomalyDetectorState(
+                device_metric_id=device_metric_id,
+                **{name: getattr(state, name) for name in self.FIELDS}
+            )
+            for device_metric_id, state in states.items()
+        ]
+        AnomalyDetectorState.objects.bulk_create(
+            objects,
+            update_conflicts=True,
+            unique_fields=['device_metric'],
+            update_fields=self.FIELDS + ['updated_at']
+        )
+        return len(objects)
@@ -0,0 +1,72 @@
+# Generated by Django 4.2.23 on 2026-10-16 21:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0016_alerthistory_alertcomment"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MetricRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "resolution",
+                    models.CharField(
+                        choices=[
+                            ("1m", "1 minute"),
+                            ("1h", "1 heure"),
+                            ("1d", "1 jour"),
+                        ],
+                        max_length=2,
+                        verbose_name="Résolution",
+                    ),
+                ),
+                (
+                    "bucket_start",
+                    models.DateTimeField(verbose_name="Début de l'intervalle"),
+                ),
+                (
+                    "count",
+                    models.IntegerField(default=0, verbose_name="Nombre de valeurs"),
+                ),
+                ("sum", models.FloatField(default=0.0, verbose_name="Somme")),
+                ("min", models.FloatField(verbose_name="Minimum")),
+                ("max", models.FloatField(verbose_name="Maximum")),
+                (
+                    "device_metric",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rollups",
+                        to="monitoring.devicemetric",
+                        verbose_name="Métrique d'équipement",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Agrégat de métrique",
+                "verbose_name_plural": "Agrégats de métriques",
+                "ordering": ["device_metric", "resolution", "bucket_start"],
+                "indexes": [
+                    models.Index(
+                        fields=["resolution", "bucket_start"],
+                        name="monitoring__resolut_3a2e50_idx",
+                    )
+                ],
+                "unique_together": {("device_metric", "resolution", "bucket_start")},
+            },
+        ),
+    ]
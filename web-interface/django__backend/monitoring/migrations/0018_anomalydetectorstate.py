@@ -0,0 +1,80 @@
+# Generated by Django 4.2.23 on 2026-10-16 21:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0017_metricrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnomalyDetectorState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "count",
+                    models.BigIntegerField(
+                        default=0, verbose_name="Nombre d'échantillons"
+                    ),
+                ),
+                ("mean", models.FloatField(default=0.0, verbose_name="Moyenne")),
+                (
+                    "m2",
+                    models.FloatField(
+                        default=0.0, verbose_name="Somme des carrés des écarts"
+                    ),
+                ),
+                (
+                    "ewma",
+                    models.FloatField(
+                        blank=True,
+                        null=True,
+                        verbose_name="Moyenne mobile exponentielle",
+                    ),
+                ),
+                (
+                    "ewm_var",
+                    models.FloatField(
+                        default=0.0, verbose_name="Variance mobile exponentielle"
+                    ),
+                ),
+                (
+                    "last_timestamp",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Dernier échantillon traité"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Date de mise à jour"
+                    ),
+                ),
+                (
+                    "device_metric",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="anomaly_state",
+                        to="monitoring.devicemetric",
+                        verbose_name="Métrique d'équipement",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "État de détection d'anomalies",
+                "verbose_name_plural": "États de détection d'anomalies",
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.23 on 2026-10-16 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0018_anomalydetectorstate"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="alert",
+            index=models.Index(
+                fields=["created_at", "id"], name="monitoring_alert_feed_idx"
+            ),
+        ),
+    ]
@@ -7,8 +7,8 @@ from .alert import Alert, AlertComment, AlertHistory
 
 # Import des modèles de métriques
 from .metric import (
-    MetricsDefinition, DeviceMetric, MetricValue,
-    ThresholdRule, AnomalyDetectionConfig, MetricThreshold
+    MetricsDefinition, DeviceMetric, MetricValue, MetricRollup,
+    ThresholdRule, AnomalyDetectionConfig, AnomalyDetectorState, MetricThreshold
 )
 
 # Import des modèles de vérifications de service
@@ -138,6 +138,8 @@ class Alert(models.Model):
             models.Index(fields=['created_at']),
             models.Index(fields=['device', 'status']),
             models.Index(fields=['status', 'severity']),
+            # Pagination par curseur du flux d'alertes unifié
+            models.Index(fields=['created_at', 'id'], name='monitoring_alert_feed_idx'),
         ]
         
     def acknowledge(self, user=None, comment=None):
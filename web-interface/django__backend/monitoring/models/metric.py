@@ -259,6 +259,65 @@ class MetricValue(models.Model):
         return f"{self.device_metric} = {self.value} ({self.timestamp.strftime('%Y-%m-%d %H:%M:%S')})"
 
 
+class MetricRollup(models.Model):
+    """
+    Agrégats pré-calculés des valeurs de métriques par intervalle de temps.
+    
+    Maintenus incrémentalement à l'ingestion des valeurs brutes ; la moyenne
+    d'un intervalle vaut sum / count.
+    """
+    RESOLUTIONS = [
+        ('1m', '1 minute'),
+        ('1h', '1 heure'),
+        ('1d', '1 jour')
+    ]
+    
+    device_metric = models.ForeignKey(
+        DeviceMetric,
+        on_delete=models.CASCADE,
+        related_name='rollups',
+        verbose_name='Métrique d\'équipement'
+    )
+    resolution = models.CharField(
+        max_length=2,
+        choices=RESOLUTIONS,
+        verbose_name='Résolution'
+    )
+    bucket_start = models.DateTimeField(
+        verbose_name='Début de l\'intervalle'
+    )
+    count = models.IntegerField(
+        default=0,
+        verbose_name='Nombre de valeurs'
+    )
+    sum = models.FloatField(
+        default=0.0,
+        verbose_name='Somme'
+    )
+    min = models.FloatField(
+        verbose_name='Minimum'
+    )
+    max = models.FloatField(
+        verbose_name='Maximum'
+    )
+    
+    class Meta:
+        verbose_name = "Agrégat de métrique"
+        verbose_name_plural = "Agrégats de métriques"
+        ordering = ['device_metric', 'resolution', 'bucket_start']
+        unique_together = ('device_metric', 'resolution', 'bucket_start')
+        indexes = [
+            models.Index(fields=['resolution', 'bucket_start']),
+        ]
+
+    @property
+    def avg(self):
+        return self.sum / self.count if self.count else None
+
+    def __str__(self):
+        return f"{self.device_metric} [{self.resolution}] {self.bucket_start:%Y-%m-%d %H:%M}"
+
+
 class ThresholdRule(models.Model):
     """
     Règles de seuil d'alerte.
@@ -412,4 +471,56 @@ class AnomalyDetectionConfig(models.Model):
     class Meta:
         verbose_name = "Configuration de détection d'anomalies"
         verbose_name_plural = "Configurations de détection d'anomalies"
-        ordering = ['name'] 
\ No newline at end of file
+        ordering = ['name']
+
+
+class AnomalyDetectorState(models.Model):
+    """
+    État du détecteur d'anomalies continu d'une métrique (Welford et EWMA).
+    
+    Permet à la détection périodique de ne traiter que les échantillons
+    postérieurs à `last_timestamp`.
+    """
+    device_metric = models.OneToOneField(
+        DeviceMetric,
+        on_delete=models.CASCADE,
+        related_name='anomaly_state',
+        verbose_name='Métrique d\'équipement'
+    )
+    count = models.BigIntegerField(
+        default=0,
+        verbose_name='Nombre d\'échantillons'
+    )
+    mean = models.FloatField(
+        default=0.0,
+        verbose_name='Moyenne'
+    )
+    m2 = models.FloatField(
+        default=0.0,
+        verbose_name='Somme des carrés des écarts'
+    )
+    ewma = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='Moyenne mobile exponentielle'
+    )
+    ewm_var = models.FloatField(
+        default=0.0,
+        verbose_name='Variance mobile exponentielle'
+    )
+    last_timestamp = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Dernier échantillon traité'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Date de mise à jour'
+    )
+    
+    class Meta:
+        verbose_name = "État de détection d'anomalies"
+        verbose_name_plural = "États de détection d'anomalies"
+
+    def __str__(self):
+        return f"{self.device_metric} (n={self.count})"
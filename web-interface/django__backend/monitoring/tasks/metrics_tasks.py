@@ -13,15 +13,16 @@ from celery import shared_task
 from django.utils import timezone
 
 from ..use_cases.metrics_use_cases import (
-    CollectMetricsUseCase,
     AnalyzeMetricsUseCase, 
     CleanupMetricsUseCase
 )
-from ..use_cases.anomaly_detection_use_cases import DetectAnomaliesUseCase
 from ..di_container import get_container
 
 logger = logging.getLogger(__name__)
 
+# Intervalle du beat de collect_all_metrics (voir celery_config.py)
+COLLECT_ALL_METRICS_INTERVAL = 60.0
+
 
 @shared_task(bind=True, max_retries=3)
 def collect_device_metrics(self, device_id: Optional[int] = None) -> Dict[str, Any]:
@@ -38,8 +39,7 @@ def collect_device_metrics(self, device_id: Optional[int] = None) -> Dict[str, A
     
     try:
         # Résoudre les dépendances
-        container = get_container()
-        use_case = container.resolve(CollectMetricsUseCase)
+        use_case = get_container().collect_metrics_use_case()
         
         # Exécuter la collecte
         result = use_case.execute(device_id=device_id)
@@ -149,8 +149,7 @@ def detect_metric_anomalies(
     
     try:
         # Résoudre les dépendances
-        container = get_container()
-        use_case = container.resolve(DetectAnomaliesUseCase)
+        use_case = get_container().detect_anomalies_use_case()
         
         # Exécuter la détection
         result = use_case.execute(
@@ -184,7 +183,8 @@ def cleanup_old_metrics(self, retention_days: int = 30) -> Dict[str, Any]:
     Nettoie les anciennes données de métriques.
     
     Args:
-        retention_days: Nombre de jours de rétention
+        retention_days: Nombre de jours de rétention des valeurs brutes
+            (les agrégats suivent MONITORING_METRIC_RETENTION_DAYS)
         
     Returns:
         Résultat du nettoyage
@@ -228,7 +228,9 @@ def collect_all_metrics(self) -> Dict[str, Any]:
     """
     Collecte toutes les métriques de tous les équipements en une fois.
     
-    Tâche optimisée pour les collectes périodiques massives.
+    Tâche optimisée pour les collectes périodiques massives : la collecte
+    s'exécute directement dans ce worker et le résultat rapporte la durée
+    de chaque étape, comparée à l'intervalle du beat.
     
     Returns:
         Résultat de la collecte globale
@@ -236,9 +238,25 @@ def collect_all_metrics(self) -> Dict[str, Any]:
     logger.info("Démarrage collecte massive de toutes les métriques")
     
     try:
-        # Utiliser la tâche de collecte sans device_id pour tous les équipements
-        result = collect_device_metrics.delay()
-        return result.get()
+        use_case = get_container().collect_metrics_use_case()
+        result = use_case.execute()
+        
+        timings = result.get("timings", {})
+        total = sum(timings.get(stage, 0.0) for stage in ("load", "plan", "probe", "persist", "thresholds"))
+        result["beat_interval"] = COLLECT_ALL_METRICS_INTERVAL
+        result["fits_in_beat_slot"] = total < COLLECT_ALL_METRICS_INTERVAL
+        
+        logger.info(
+            f"Collecte massive: {result.get('collected', 0)}/{result.get('total', 0)} métriques "
+            f"sur {result.get('devices_processed', 0)} équipements, étapes {timings}"
+        )
+        if not result["fits_in_beat_slot"]:
+            logger.warning(
+                f"La collecte ({total:.1f}s) dépasse l'intervalle du beat "
+                f"({COLLECT_ALL_METRICS_INTERVAL:.0f}s)"
+            )
+        
+        return result
         
     except Exception as exc:
         logger.error(f"Erreur lors de la collecte massive: {exc}")
@@ -250,7 +268,9 @@ def periodic_anomaly_detection() -> Dict[str, Any]:
     """
     Détection périodique d'anomalies sur toutes les métriques actives.
     
-    Exécutée régulièrement pour surveiller automatiquement les anomalies.
+    Exécutée régulièrement en mode continu : seuls les échantillons reçus
+    depuis le passage précédent sont lus et intégrés à l'état EWMA de
+    chaque métrique.
     
     Returns:
         Résultat de la détection globale
@@ -258,9 +278,15 @@ def periodic_anomaly_detection() -> Dict[str, Any]:
     logger.info("Démarrage détection périodique d'anomalies")
     
     try:
-        # Lancer la détection pour toutes les métriques
-        result = detect_metric_anomalies.delay()
-        return result.get()
+        use_case = get_container().detect_anomalies_use_case()
+        result = use_case.execute(mode="online")
+        
+        if result.get("success"):
+            logger.info(
+                f"Détection continue: {result.get('samples_processed', 0)} échantillons, "
+                f"{result.get('total_anomalies', 0)} anomalies"
+            )
+        return result
         
     except Exception as exc:
         logger.error(f"Erreur lors de la détection périodique: {exc}")
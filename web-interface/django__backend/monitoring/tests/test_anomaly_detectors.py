@@ -0,0 +1,260 @@
+"""
+Tests des détecteurs d'anomalies vectorisés et du mode continu.
+"""
+
+import statistics
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from ..domain.anomaly_detectors import (
+    StreamingDetector,
+    StreamingState,
+    detect,
+    to_matrix,
+)
+from ..di_container import DIContainer
+from ..domain.services import AnomalyDetectionService
+from ..use_cases.anomaly_detection_use_cases import DetectAnomaliesUseCase
+
+
+START = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def _series(values, start=START, step=timedelta(minutes=1)):
+    return [{'timestamp': start + step * i, 'value': value} for i, value in enumerate(values)]
+
+
+def _noisy(seed, size=200, spikes=()):
+    values = np.random.default_rng(seed).normal(50.0, 2.0, size)
+    for index in spikes:
+        values[index] = 120.0
+    return values.tolist()
+
+
+def _square(size=200, spikes=()):
+    return [120.0 if i in spikes else 50.0 + (-1) ** i for i in range(size)]
+
+
+class BatchDetectorsTest(unittest.TestCase):
+    """Les détecteurs par lot reproduisent les calculs de `statistics`."""
+
+    def test_padded_rows_match_per_series_statistics(self):
+        series = [_noisy(1, 200, spikes=[50]), _noisy(2, 120, spikes=[10, 90]), [1.0, 2.0]]
+        detection = detect(to_matrix(series), 'z_score', 0.95)
+
+        for row, values in enumerate(series[:2]):
+            self.assertAlmostEqual(detection.center[row], statistics.mean(values))
+            self.assertAlmostEqual(detection.scale[row], statistics.stdev(values))
+        self.assertEqual(list(np.nonzero(detection.mask[0])[0]), [50])
+        self.assertEqual(list(np.nonzero(detection.mask[1])[0]), [10, 90])
+        self.assertFalse(detection.mask[2].any())
+
+    def test_iqr_uses_exclusive_quartiles(self):
+        values = _noisy(3, 40, spikes=[5])
+        q1, _, q3 = statistics.quantiles(values, n=4)
+        detection = detect(to_matrix([values]), 'isolation_forest', 0.95)
+
+        self.assertAlmostEqual(detection.scale[0], q3 - q1)
+        self.assertTrue(detection.mask[0, 5])
+
+    def test_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            detect(to_matrix([[1.0, 2.0, 3.0]]), 'lstm', 0.5)
+
+
+class StreamingDetectorTest(unittest.TestCase):
+    """Tests du détecteur continu EWMA / Welford."""
+
+    def test_state_is_independent_of_chunking(self):
+        values = _noisy(4, 100)
+        whole, split = StreamingState(), StreamingState()
+        detector = StreamingDetector()
+
+        detector.process([whole], to_matrix([values]))
+        detector.process([split], to_matrix([values[:37]]))
+        detector.process([split], to_matrix([values[37:]]))
+
+        self.assertEqual(whole.count, split.count)
+        self.assertAlmostEqual(whole.ewma, split.ewma)
+        self.assertAlmostEqual(whole.ewm_var, split.ewm_var)
+        self.assertAlmostEqual(split.mean, statistics.mean(values))
+        self.assertAlmostEqual(split.variance, statistics.variance(values))
+
+    def test_spike_after_warmup_is_flagged(self):
+        states = [StreamingState(), StreamingState()]
+        matrix = to_matrix([_noisy(5, 60, spikes=[55]), _noisy(6, 30)])
+
+        detection = StreamingDetector(sensitivity=0.0).process(states, matrix)
+
+        self.assertEqual(list(np.nonzero(detection.mask[0])[0]), [55])
+        self.assertFalse(detection.mask[1].any())
+        self.assertEqual(states[1].count, 30)
+
+
+class DetectAnomaliesUseCaseTest(unittest.TestCase):
+    """Tests du cas d'utilisation en mode lot et en mode continu."""
+
+    def setUp(self):
+        self.metrics = [{'id': i, 'name': f'm{i}', 'device_id': i // 2} for i in range(4)]
+        self.metric_value_repository = MagicMock()
+        self.metrics_repository = MagicMock()
+        self.metrics_repository.get_active_metrics.return_value = self.metrics
+        self.alert_service = MagicMock()
+        self.state_repository = MagicMock()
+        self.use_case = DetectAnomaliesUseCase(
+            self.metric_value_repository, self.metrics_repository, MagicMock(), MagicMock(),
+            self.alert_service, anomaly_state_repository=self.state_repository
+        )
+
+    def test_all_metrics_are_loaded_in_one_query(self):
+        self.metric_value_repository.get_values_for_metrics.return_value = {
+            0: _series(_square(spikes=[20])),
+            1: _series(_square()),
+            2: _series(_square(spikes=[7, 150])),
+            3: _series([1.0, 2.0]),
+        }
+
+        result = self.use_case.execute(algorithm='z_score', sensitivity=0.0)
+
+        self.metric_value_repository.get_values_for_metrics.assert_called_once()
+        self.metric_value_repository.get_values_by_period.assert_not_called()
+        self.assertEqual(result['total_anomalies'], 3)
+        self.assertEqual(result['total_alerts'], 3)
+        self.assertEqual(result['errors'], 1)
+        self.metrics_repository.get_by_id.assert_not_called()
+        details = self.alert_service.create_alert.call_args[0][0]['details']
+        self.assertIsInstance(details['timestamp'], str)
+
+    def test_online_mode_only_reads_new_samples(self):
+        states = {metric['id']: StreamingState() for metric in self.metrics}
+        self.state_repository.get_states.return_value = states
+        history = {metric['id']: _series(_noisy(metric['id'], 50)) for metric in self.metrics}
+        self.metric_value_repository.get_values_for_metrics.return_value = history
+
+        first = self.use_case.execute(mode='online', sensitivity=0.0)
+        self.assertEqual(first['samples_processed'], 200)
+        self.assertEqual(states[0].last_timestamp, history[0][-1]['timestamp'])
+
+        # Second passage : seul un nouvel échantillon anormal s'ajoute
+        history[0] = history[0] + _series([500.0], start=history[0][-1]['timestamp'] + timedelta(minutes=1))
+        second = self.use_case.execute(mode='online', sensitivity=0.0)
+
+        self.assertEqual(second['samples_processed'], 1)
+        self.assertEqual(second['total_anomalies'], 1)
+        self.assertEqual(states[0].count, 51)
+        since = self.metric_value_repository.get_values_for_metrics.call_args[0][1]
+        self.assertEqual(since, min(state.last_timestamp for state in states.values()))
+        self.assertEqual(self.state_repository.save_states.call_count, 2)
+
+    def test_online_mode_for_one_metric(self):
+        self.metrics_repository.get_by_id.return_value = self.metrics[2]
+        self.state_repository.get_states.return_value = {2: StreamingState()}
+        self.metric_value_repository.get_values_for_metrics.return_value = {2: _series(_noisy(2, 50, spikes=[40]))}
+
+        result = self.use_case.execute(metric_id=2, mode='online', sensitivity=0.0)
+
+        self.assertTrue(result['success'], result.get('error'))
+        self.assertEqual(result['samples_processed'], 50)
+        self.assertEqual(self.alert_service.create_alert.call_args[0][0]['device_id'], 1)
+
+
+class DetectAnomaliesContainerTest(unittest.TestCase):
+    """Le cas d'utilisation fourni par le conteneur fonctionne en mode continu."""
+
+    def test_online_mode_through_container(self):
+        container = DIContainer()
+        metrics_repository = MagicMock()
+        metrics_repository.get_active_metrics.return_value = [{'id': 1, 'name': 'cpu', 'device_id': 3}]
+        state_repository = MagicMock()
+        state_repository.get_states.return_value = {1: StreamingState()}
+        metric_value_repository = MagicMock()
+        metric_value_repository.get_values_for_metrics.return_value = {1: _series(_noisy(1, 30))}
+        container.device_metric_repository.override(metrics_repository)
+        container.metric_value_repository.override(metric_value_repository)
+        container.anomaly_state_repository.override(state_repository)
+        container.alert_repository.override(MagicMock())
+        container.alerting_service.override(MagicMock())
+        container.anomaly_detection_service.override(MagicMock())
+
+        use_case = container.detect_anomalies_use_case()
+        result = use_case.execute(mode='online')
+
+        self.assertIs(use_case.anomaly_state_repository, state_repository)
+        self.assertTrue(result['success'], result.get('error'))
+        self.assertEqual(result['samples_processed'], 30)
+        state_repository.save_states.assert_called_once()
+
+
+class AnomalyDetectionServiceTest(unittest.TestCase):
+    """Tests du service de détection et de prédiction de tendance."""
+
+    def setUp(self):
+        self.repository = MagicMock()
+        self.service = AnomalyDetectionService(self.repository)
+
+    def test_detect_anomalies(self):
+        self.repository.get_values_by_period.return_value = _series(_noisy(7, spikes=[42]))
+
+        anomalies = self.service.detect_anomalies(
+            1, {'start': START, 'end': START + timedelta(hours=4)}, sensitivity=0.0
+        )
+
+        self.assertEqual([a['timestamp'] for a in anomalies], [START + timedelta(minutes=42)])
+
+    def test_predict_trend(self):
+        values = [10.0 + i * 0.5 for i in range(48)]
+        self.repository.get_values_by_period.return_value = _series(values, step=timedelta(hours=1))
+
+        trend = self.service.predict_trend(1, {}, horizon_hours=4, points=4)
+
+        self.assertEqual(trend['direction'], 'increasing')
+        self.assertAlmostEqual(trend['slope_per_hour'], 0.5)
+        self.assertAlmostEqual(trend['predictions'][-1]['value'], 10.0 + 51 * 0.5)
+
+    def test_predict_trend_from_repository_order(self):
+        """Valeurs en ISO, les plus récentes d'abord, comme les renvoie le repository."""
+        values = _series([10.0 + i * 0.5 for i in range(48)], step=timedelta(hours=1))
+        self.repository.get_values_by_period.return_value = [
+            {'timestamp': v['timestamp'].isoformat(), 'value': v['value']} for v in reversed(values)
+        ]
+
+        trend = self.service.predict_trend(1, {}, horizon_hours=4, points=4)
+
+        self.assertAlmostEqual(trend['slope_per_hour'], 0.5)
+        predictions = trend['predictions']
+        self.assertEqual(
+            [datetime.fromisoformat(p['timestamp']) for p in predictions],
+            [START + timedelta(hours=47 + i) for i in range(1, 5)]
+        )
+        self.assertTrue(all(p['timestamp'].endswith('+00:00') for p in predictions))
+        self.assertAlmostEqual(predictions[-1]['value'], 10.0 + 51 * 0.5)
+
+
+class AnomalyDetectorsPerformanceTest(unittest.TestCase):
+    """Benchmark des détecteurs vectorisés."""
+
+    @pytest.mark.performance
+    def test_fleet_matrix(self):
+        """2 000 métriques × 1 440 points analysées en une réduction par détecteur."""
+        matrix = np.random.default_rng(0).normal(50.0, 5.0, (2000, 1440))
+
+        with patch.object(np, 'nanmean', wraps=np.nanmean) as nanmean, \
+                patch.object(np, 'nanpercentile', wraps=np.nanpercentile) as nanpercentile:
+            detections = [
+                detect(matrix, algorithm, 0.95) for algorithm in ('statistical', 'z_score', 'isolation_forest')
+            ]
+        states = [StreamingState() for _ in range(2000)]
+        streaming = StreamingDetector().process(states, matrix[:, :60])
+
+        # Toute la flotte en un appel, et non une boucle par métrique
+        self.assertEqual(nanmean.call_count, 2)
+        self.assertEqual(nanpercentile.call_count, 1)
+        self.assertTrue(all(detection.mask.shape == matrix.shape and detection.valid_rows.all()
+                            for detection in detections))
+        self.assertEqual(streaming.mask.shape, (2000, 60))
+        self.assertEqual({state.count for state in states}, {60})
+        self.assertAlmostEqual(states[0].mean, matrix[0, :60].mean())
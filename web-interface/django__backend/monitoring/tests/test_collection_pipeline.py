@@ -0,0 +1,74 @@
+"""
+Tests du pipeline de collecte concurrente des métriques.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from network_management.models import NetworkDevice
+from ..domain.services import MetricCollectionService
+from ..models import DeviceMetric, MetricValue, MetricsDefinition
+from ..tasks.metrics_tasks import collect_all_metrics
+
+
+UPTIME_OID = '1.3.6.1.2.1.1.3.0'
+IF_IN_OCTETS_OID = '1.3.6.1.2.1.2.2.1.10.1'
+
+
+class CollectAllMetricsTaskTest(TestCase):
+    """
+    Exécution de la tâche Celery sur des métriques configurées en base.
+    """
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='collector', password='secret')
+        self.router = NetworkDevice.objects.create(
+            name="Router de Test", ip_address="192.168.1.1", device_type="router",
+            snmp_community="nms-ro", created_by=user
+        )
+        self.switch = NetworkDevice.objects.create(
+            name="Switch de Test", ip_address="192.168.1.2", device_type="switch", created_by=user
+        )
+        uptime = MetricsDefinition.objects.create(
+            name="Uptime", metric_type="counter", collection_method="snmp",
+            collection_parameters={"oid": UPTIME_OID}
+        )
+        traffic = MetricsDefinition.objects.create(
+            name="Octets entrants", metric_type="counter", collection_method="snmp",
+            collection_parameters={"oid": "1.3.6.1.2.1.2.2.1.10"}
+        )
+        latency = MetricsDefinition.objects.create(
+            name="Latence", metric_type="gauge", unit="ms", collection_method="ping"
+        )
+        self.uptime = DeviceMetric.objects.create(device=self.router, metric=uptime)
+        # L'OID de la définition est précisé par les paramètres de l'instance
+        self.traffic = DeviceMetric.objects.create(
+            device=self.router, metric=traffic, custom_parameters={"oid": IF_IN_OCTETS_OID}
+        )
+        self.latency = DeviceMetric.objects.create(device=self.switch, metric=latency)
+        DeviceMetric.objects.create(device=self.switch, metric=uptime, is_active=False)
+
+    def test_task_collects_and_persists_configured_metrics(self):
+        with patch('monitoring.infrastructure.adapters.snmp_adapter.SNMPAdapter') as adapter_class, \
+                patch.object(MetricCollectionService, '_collect_ping_metric',
+                             return_value={'success': True, 'value': 1.5}) as ping:
+            adapter_class.return_value.snmp_get_many.return_value = {
+                'success': True,
+                'values': {UPTIME_OID: 42, IF_IN_OCTETS_OID: 7},
+                'response_time': 0.01
+            }
+            result = collect_all_metrics.apply().get()
+
+        self.assertTrue(result['success'], result)
+        self.assertEqual((result['collected'], result['total'], result['devices_processed']), (3, 3, 2))
+        # Les deux OIDs du routeur partent dans une seule requête, avec sa communauté
+        adapter_class.return_value.snmp_get_many.assert_called_once_with(
+            '192.168.1.1', [UPTIME_OID, IF_IN_OCTETS_OID], 'nms-ro'
+        )
+        self.assertEqual(ping.call_args.args[0]['device_ip'], '192.168.1.2')
+        self.assertEqual(
+            dict(MetricValue.objects.values_list('device_metric_id', 'value')),
+            {self.uptime.id: 42.0, self.traffic.id: 7.0, self.latency.id: 1.5}
+        )
@@ -0,0 +1,118 @@
+"""
+Tests des mises à jour temps réel partagées du consumer de monitoring.
+"""
+
+import asyncio
+import json
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from channels.layers import InMemoryChannelLayer
+from django.core.cache.backends.locmem import LocMemCache
+
+from common.infrastructure.topic_fanout import TopicFanoutHub, apply_delta
+from .. import consumers
+from ..consumers import MonitoringWebSocketConsumer
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise AssertionError("condition non atteinte")
+        await asyncio.sleep(0.001)
+
+
+class LiveUpdatesTest(unittest.IsolatedAsyncioTestCase):
+    """Tests du producteur partagé des métriques par équipement."""
+
+    async def asyncSetUp(self):
+        self.layer = InMemoryChannelLayer()
+        self.hub = TopicFanoutHub(interval=0.01, backend=LocMemCache("live-updates-test", {}))
+        self.readers = []
+        self.queries = 0
+
+        def device_metrics(device_id):
+            self.queries += 1
+            return [{"name": "CPU Usage", "value": 50 + self.queries, "unit": "%"}]
+
+        for patcher in (
+            patch("common.infrastructure.topic_fanout.get_channel_layer", return_value=self.layer),
+            patch.object(consumers, "topic_fanout_hub", self.hub),
+            patch.object(consumers, "device_metrics", device_metrics),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.hub.stop()
+        for reader in self.readers:
+            reader.cancel()
+        await asyncio.gather(*self.readers, return_exceptions=True)
+
+    async def _read_channel(self, consumer):
+        """Remet au consumer les messages de son canal, comme le ferait le serveur ASGI."""
+        while True:
+            message = await self.layer.receive(consumer.channel_name)
+            await getattr(consumer, message["type"].replace(".", "_"))(message)
+
+    async def _connect(self, index, query_string=b""):
+        consumer = MonitoringWebSocketConsumer()
+        consumer.scope = {
+            "user": SimpleNamespace(username=f"viewer{index}"),
+            "url_route": {"kwargs": {"device_id": "7"}},
+            "query_string": query_string,
+        }
+        consumer.channel_name = f"viewer.{index}"
+        consumer.channel_layer = self.layer
+        consumer.messages = []
+
+        async def accept():
+            pass
+
+        async def send(text_data):
+            consumer.messages.append(json.loads(text_data))
+
+        consumer.accept, consumer.send = accept, send
+        self.readers.append(asyncio.create_task(self._read_channel(consumer)))
+        await consumer.connect()
+        return consumer
+
+    def _updates(self, consumer, message_type):
+        return [message for message in consumer.messages if message["type"] == message_type]
+
+    async def test_device_metrics_queried_once_per_interval(self):
+        viewers = [await self._connect(index) for index in range(50)]
+
+        await _wait_for(lambda: all(len(self._updates(viewer, "metrics_update")) >= 3 for viewer in viewers))
+
+        self.assertEqual(self.queries, self.hub.stats["snapshots_computed"])
+        self.assertEqual(self.hub.stats["snapshots_computed"], self.hub.stats["updates_broadcast"] + 1)
+        latest = self._updates(viewers[0], "metrics_update")[-1]
+        self.assertEqual(latest["metrics"][0]["name"], "CPU Usage")
+
+    async def test_delta_encoding_reconstructs_metrics(self):
+        viewer = await self._connect(0, b"encoding=delta")
+        await _wait_for(lambda: len(self._updates(viewer, "topic_delta")) >= 3)
+
+        snapshot = self._updates(viewer, "topic_snapshot")[0]
+        state, seq = snapshot["data"], snapshot["seq"]
+        for delta in self._updates(viewer, "topic_delta"):
+            self.assertEqual(delta["base_seq"], seq)
+            state, seq = apply_delta(state, delta), delta["seq"]
+
+        # Instantané initial (seq 0) au premier calcul, puis un calcul par delta
+        self.assertEqual(state["metrics"]["CPU Usage"]["value"], 51 + seq)
+
+    async def test_disconnect_releases_topic(self):
+        viewer = await self._connect(0)
+
+        await viewer.disconnect(1000)
+
+        self.assertEqual(self.hub.subscriber_counts, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
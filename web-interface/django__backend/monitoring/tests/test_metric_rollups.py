@@ -0,0 +1,173 @@
+"""
+Tests des agrégats temporels (rollups) des valeurs de métriques.
+"""
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils.timezone import localtime
+
+from network_management.models import NetworkDevice
+from ..infrastructure.repositories.metrics_repository import (
+    MetricRollupRepository,
+    MetricValueRepository,
+    floor_timestamp,
+)
+from ..models import DeviceMetric, MetricRollup, MetricValue, MetricsDefinition
+
+
+NOW = datetime(2026, 3, 10, 12, 34, 56, 789000, tzinfo=timezone.utc)
+
+
+def _value(device_metric_id, timestamp, value):
+    return SimpleNamespace(device_metric_id=device_metric_id, timestamp=timestamp, value=value)
+
+
+class FloorTimestampTest(unittest.TestCase):
+    """Tests du calcul du début d'intervalle."""
+
+    def test_each_resolution(self):
+        self.assertEqual(floor_timestamp(NOW, '1m'), datetime(2026, 3, 10, 12, 34, tzinfo=timezone.utc))
+        self.assertEqual(floor_timestamp(NOW, '1h'), datetime(2026, 3, 10, 12, tzinfo=timezone.utc))
+        self.assertEqual(floor_timestamp(NOW, '1d'), datetime(2026, 3, 10, tzinfo=timezone.utc))
+
+
+class AccumulateTest(unittest.TestCase):
+    """Tests de l'agrégation partielle d'un lot de valeurs."""
+
+    def test_values_of_same_minute_are_merged(self):
+        values = [
+            _value(1, NOW, 10.0),
+            _value(1, NOW + timedelta(seconds=2), 30.0),
+            _value(1, NOW + timedelta(minutes=1), 5.0),
+            _value(2, NOW, 7.0),
+        ]
+
+        partials = MetricRollupRepository.accumulate(values)
+
+        minute = partials[(1, '1m', floor_timestamp(NOW, '1m'))]
+        self.assertEqual(minute, {'count': 2, 'sum': 40.0, 'min': 10.0, 'max': 30.0})
+        hour = partials[(1, '1h', floor_timestamp(NOW, '1h'))]
+        self.assertEqual(hour, {'count': 3, 'sum': 45.0, 'min': 5.0, 'max': 30.0})
+        self.assertEqual(partials[(2, '1d', floor_timestamp(NOW, '1d'))]['count'], 1)
+
+    def test_non_numeric_values_are_ignored(self):
+        self.assertEqual(MetricRollupRepository.accumulate([_value(1, NOW, None)]), {})
+
+
+class SelectResolutionTest(unittest.TestCase):
+    """Tests du choix de la résolution de lecture."""
+
+    def select(self, span, max_points=500, age=timedelta(0)):
+        end_time = NOW - age
+        return MetricRollupRepository.select_resolution(end_time - span, end_time, max_points, now=NOW)
+
+    def test_finest_resolution_within_budget(self):
+        self.assertEqual(self.select(timedelta(hours=1)), '1m')
+        self.assertEqual(self.select(timedelta(hours=6)), '1m')
+        self.assertEqual(self.select(timedelta(days=1), max_points=1440), '1m')
+        self.assertEqual(self.select(timedelta(days=1), max_points=100), '1h')
+        self.assertEqual(self.select(timedelta(days=365)), '1d')
+
+    def test_range_shorter_than_a_minute_uses_raw_values(self):
+        self.assertEqual(self.select(timedelta(seconds=30)), 'raw')
+
+    def test_range_over_budget_uses_coarsest_resolution(self):
+        self.assertEqual(self.select(timedelta(days=1000), max_points=100), '1d')
+
+    def test_expired_raw_values_fall_back_to_rollups(self):
+        self.assertEqual(self.select(timedelta(seconds=30), age=timedelta(days=10)), '1m')
+        self.assertEqual(self.select(timedelta(minutes=30), age=timedelta(days=60)), '1h')
+
+
+class ApplyRetentionTest(unittest.TestCase):
+    """Tests de la rétention par résolution."""
+
+    def test_each_resolution_has_its_own_cutoff(self):
+        repository = MetricValueRepository()
+        repository.delete_before_date = MagicMock(return_value=100)
+        repository.rollups = MagicMock()
+        repository.rollups.delete_before.return_value = 3
+
+        with patch('monitoring.infrastructure.repositories.metrics_repository.settings') as settings:
+            settings.MONITORING_METRIC_RETENTION_DAYS = {'1h': 90}
+            deleted = repository.apply_retention({'raw': 2}, now=NOW)
+
+        self.assertEqual(deleted, {'raw': 100, '1m': 3, '1h': 3, '1d': 3})
+        repository.delete_before_date.assert_called_once_with(NOW - timedelta(days=2))
+        cutoffs = {call.args[0]: call.args[1] for call in repository.rollups.delete_before.call_args_list}
+        self.assertEqual(cutoffs['1h'], floor_timestamp(NOW - timedelta(days=90), '1h'))
+        self.assertEqual(cutoffs['1d'], floor_timestamp(NOW - timedelta(days=1825), '1d'))
+
+
+class MetricRollupPersistenceTest(TestCase):
+    """Tests de la fusion des lots dans les agrégats stockés."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='rollup', password='secret')
+        device = NetworkDevice.objects.create(
+            name="Router de Test",
+            hostname="test-router.local",
+            ip_address="192.168.1.1",
+            device_type="router",
+            os="cisco_ios",
+            created_by=user
+        )
+        metric = MetricsDefinition.objects.create(
+            name="CPU Usage",
+            metric_type="gauge",
+            unit="%",
+            collection_method="snmp",
+            collection_parameters={"oid": "1.3.6.1.4.1.2021.11.9.0"}
+        )
+        self.device_metric = DeviceMetric.objects.create(device=device, metric=metric)
+        self.repository = MetricValueRepository()
+
+    def test_two_batches_in_same_bucket(self):
+        # Second lot naïf (heure locale), comme l'horodatage d'un collecteur
+        self.repository.batch_create([
+            {'device_metric_id': self.device_metric.id, 'value': 10.0, 'timestamp': NOW}
+        ])
+        self.repository.batch_create([
+            {'device_metric_id': self.device_metric.id, 'value': 30.0,
+             'timestamp': localtime(NOW + timedelta(seconds=3)).replace(tzinfo=None)}
+        ])
+
+        self.assertEqual(MetricValue.objects.filter(device_metric=self.device_metric).count(), 2)
+        minute = MetricRollup.objects.get(device_metric=self.device_metric, resolution='1m')
+        self.assertEqual(minute.bucket_start, floor_timestamp(NOW, '1m'))
+        self.assertEqual((minute.count, minute.sum, minute.min, minute.max), (2, 40.0, 10.0, 30.0))
+        self.assertEqual(MetricRollup.objects.filter(device_metric=self.device_metric).count(), 3)
+
+    def _store_hourly_edges(self):
+        day = datetime(2026, 3, 10, tzinfo=timezone.utc)
+        samples = [((11, 50), 100.0), ((12, 10), 10.0), ((12, 40), 20.0), ((13, 5), 30.0),
+                   ((13, 50), 40.0), ((14, 5), 50.0), ((14, 30), 500.0)]
+        self.repository.batch_create([
+            {'device_metric_id': self.device_metric.id, 'value': value,
+             'timestamp': day.replace(hour=hour, minute=minute)}
+            for (hour, minute), value in samples
+        ])
+        return day.replace(hour=11, minute=55), day.replace(hour=14, minute=10)
+
+    def test_partial_edge_buckets_are_read_from_raw_values(self):
+        start_time, end_time = self._store_hourly_edges()
+
+        aggregates = MetricRollupRepository().aggregate(self.device_metric.id, '1h', start_time, end_time)
+
+        # 12:00 et 13:00 sur les agrégats, 14:05 sur les valeurs brutes ; 11:50 et 14:30 hors plage
+        self.assertEqual(aggregates, {'count': 5, 'avg': 30.0, 'min': 10.0, 'max': 50.0})
+
+    def test_series_is_clipped_to_whole_buckets(self):
+        start_time, end_time = self._store_hourly_edges()
+
+        points = MetricRollupRepository().get_series(self.device_metric.id, '1h', start_time, end_time)
+
+        self.assertEqual([(point['timestamp'], point['count']) for point in points], [
+            ('2026-03-10T12:00:00+00:00', 2),
+            ('2026-03-10T13:00:00+00:00', 2),
+        ])
@@ -7,18 +7,20 @@ d'anomalies dans les métriques de surveillance.
 
 import logging
 from typing import Dict, Any, List, Optional, Union
-from datetime import datetime, timedelta
-import statistics
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
+import numpy as np
+
+from ..domain.anomaly_detectors import StreamingDetector, detect, to_matrix
 from ..domain.interfaces.repositories import (
     MetricValueRepository,
-    MetricsRepository,
+    DeviceMetricRepository as MetricsRepository,
     AlertRepository
 )
-from ..domain.interfaces.services import (
+from ..domain.services import (
     AnomalyDetectionService,
-    AlertService
+    AlertingService as AlertService
 )
 
 logger = logging.getLogger(__name__)
@@ -29,29 +31,41 @@ class DetectAnomaliesUseCase:
     Use case pour la détection d'anomalies dans les métriques.
     
     Utilise différents algorithmes de détection d'anomalies
-    pour identifier les comportements anormaux.
+    pour identifier les comportements anormaux. Les séries de plusieurs
+    métriques sont analysées ensemble sous forme de matrice NumPy ; le mode
+    "online" ne traite que les échantillons reçus depuis le dernier passage.
     """
     
+    # Fenêtre d'historique du mode par lot
+    HISTORY_DAYS = 30
+    # Historique utilisé pour amorcer l'état d'une métrique en mode continu
+    ONLINE_BOOTSTRAP_DAYS = 1
+    # Nombre de métriques analysées par matrice
+    CHUNK_SIZE = 500
+    
     def __init__(
         self,
         metric_value_repository: MetricValueRepository,
         metrics_repository: MetricsRepository,
         alert_repository: AlertRepository,
         anomaly_detection_service: AnomalyDetectionService,
-        alert_service: AlertService
+        alert_service: AlertService,
+        anomaly_state_repository=None
     ):
         self.metric_value_repository = metric_value_repository
         self.metrics_repository = metrics_repository
         self.alert_repository = alert_repository
         self.anomaly_detection_service = anomaly_detection_service
         self.alert_service = alert_service
+        self.anomaly_state_repository = anomaly_state_repository
     
     def execute(
         self,
         metric_id: Optional[int] = None,
         device_id: Optional[int] = None,
         algorithm: str = "statistical",
-        sensitivity: float = 0.95
+        sensitivity: float = 0.95,
+        mode: str = "batch"
     ) -> Dict[str, Any]:
         """
         Exécute la détection d'anomalies.
@@ -61,11 +75,14 @@ class DetectAnomaliesUseCase:
             device_id: ID de l'équipement spécifique (optionnel)
             algorithm: Algorithme de détection ("statistical", "isolation_forest", "z_score")
             sensitivity: Sensibilité de la détection (0.0 à 1.0)
+            mode: "batch" (fenêtre complète) ou "online" (EWMA incrémental)
             
         Returns:
             Résultat de la détection avec anomalies trouvées
         """
         try:
+            if mode == "online":
+                return self._detect_online_anomalies(metric_id, device_id, sensitivity)
             if metric_id:
                 return self._detect_metric_anomalies(metric_id, algorithm, sensitivity)
             elif device_id:
@@ -148,7 +165,7 @@ class DetectAnomaliesUseCase:
     ) -> Dict[str, Any]:
         """Détecte les anomalies pour toutes les métriques d'un équipement."""
         try:
-            metrics = self.metrics_repository.get_by_device(device_id)
+            metrics = self.metrics_repository.get_active_metrics(device_id=device_id)
             
             if not metrics:
                 return {
@@ -157,27 +174,22 @@ class DetectAnomaliesUseCase:
                     "device_id": device_id
                 }
             
-            total_anomalies = 0
-            total_alerts = 0
-            metric_results = []
-            
-            for metric in metrics:
-                result = self._detect_metric_anomalies(metric.id, algorithm, sensitivity)
-                if result["success"]:
-                    total_anomalies += result["anomalies_found"]
-                    total_alerts += result["alerts_created"]
-                    metric_results.append({
-                        "metric_id": metric.id,
-                        "metric_name": metric.name,
-                        "anomalies_found": result["anomalies_found"]
-                    })
+            results = self._detect_metrics_anomalies(metrics, algorithm, sensitivity)
+            metric_results = [
+                {
+                    "metric_id": metric["id"],
+                    "metric_name": metric["name"],
+                    "anomalies_found": result["anomalies_found"]
+                }
+                for metric, result in results if result["success"]
+            ]
             
             return {
                 "success": True,
                 "device_id": device_id,
                 "metrics_analyzed": len(metrics),
-                "total_anomalies": total_anomalies,
-                "total_alerts": total_alerts,
+                "total_anomalies": sum(r["anomalies_found"] for _, r in results if r["success"]),
+                "total_alerts": sum(r["alerts_created"] for _, r in results if r["success"]),
                 "algorithm": algorithm,
                 "sensitivity": sensitivity,
                 "metric_results": metric_results,
@@ -207,19 +219,22 @@ class DetectAnomaliesUseCase:
             devices_processed = set()
             error_count = 0
             
-            for metric in metrics:
+            for chunk_start in range(0, len(metrics), self.CHUNK_SIZE):
+                chunk = metrics[chunk_start:chunk_start + self.CHUNK_SIZE]
                 try:
-                    result = self._detect_metric_anomalies(metric.id, algorithm, sensitivity)
+                    results = self._detect_metrics_anomalies(chunk, algorithm, sensitivity)
+                except Exception as e:
+                    logger.error(f"Erreur lors de la détection pour {len(chunk)} métriques: {e}")
+                    error_count += len(chunk)
+                    continue
+                
+                for metric, result in results:
                     if result["success"]:
                         total_anomalies += result["anomalies_found"]
                         total_alerts += result["alerts_created"]
-                        devices_processed.add(metric.device_id)
+                        devices_processed.add(metric["device_id"])
                     else:
                         error_count += 1
-                        
-                except Exception as e:
-                    logger.error(f"Erreur lors de la détection pour la métrique {metric.id}: {e}")
-                    error_count += 1
             
             return {
                 "success": True,
@@ -241,141 +256,211 @@ class DetectAnomaliesUseCase:
                 "timestamp": datetime.now().isoformat()
             }
     
-    def _detect_with_algorithm(
+    def _detect_metrics_anomalies(
         self,
-        values: List[Dict],
+        metrics: List[Any],
         algorithm: str,
         sensitivity: float
-    ) -> List[Dict[str, Any]]:
-        """Applique l'algorithme de détection choisi."""
-        if algorithm == "statistical":
-            return self._statistical_detection(values, sensitivity)
-        elif algorithm == "z_score":
-            return self._z_score_detection(values, sensitivity)
-        elif algorithm == "isolation_forest":
-            return self._isolation_forest_detection(values, sensitivity)
-        else:
-            raise ValueError(f"Algorithme non supporté: {algorithm}")
-    
-    def _statistical_detection(
-        self,
-        values: List[Dict],
-        sensitivity: float
-    ) -> List[Dict[str, Any]]:
-        """Détection statistique basée sur les écarts-types."""
-        numeric_values = [float(v['value']) for v in values]
+    ) -> List[tuple]:
+        """
+        Détecte les anomalies d'un ensemble de métriques en une seule passe.
         
-        if len(numeric_values) < 3:
-            return []
+        Les valeurs sont chargées en une requête et analysées comme une
+        matrice (une ligne par métrique).
         
-        mean = statistics.mean(numeric_values)
-        std_dev = statistics.stdev(numeric_values)
+        Returns:
+            Liste de couples (métrique, résultat)
+        """
+        end_time = datetime.now()
+        start_time = end_time - timedelta(days=self.HISTORY_DAYS)
+        values_by_metric = self.metric_value_repository.get_values_for_metrics(
+            [metric["id"] for metric in metrics], start_time, end_time
+        )
         
-        # Calculer le seuil basé sur la sensibilité
-        threshold = std_dev * (3 - sensitivity * 2)  # Sensibilité élevée = seuil bas
+        series = [values_by_metric.get(metric["id"], []) for metric in metrics]
+        anomalies_by_metric = self._detect_matrix(series, algorithm, sensitivity)
         
-        anomalies = []
-        for i, value_dict in enumerate(values):
-            value = float(value_dict['value'])
-            deviation = abs(value - mean)
+        results = []
+        for metric, values, anomalies in zip(metrics, series, anomalies_by_metric):
+            if len(values) < 10:
+                results.append((metric, {
+                    "success": False,
+                    "message": f"Données insuffisantes pour la métrique {metric['id']}",
+                    "metric_id": metric["id"],
+                    "required_points": 10,
+                    "available_points": len(values)
+                }))
+                continue
             
-            if deviation > threshold:
-                anomalies.append({
-                    "timestamp": value_dict['timestamp'],
-                    "value": value,
-                    "expected_range": {
-                        "min": mean - threshold,
-                        "max": mean + threshold
-                    },
-                    "deviation": deviation,
-                    "severity": self._calculate_severity(deviation, std_dev),
-                    "algorithm": "statistical"
-                })
-        
-        return anomalies
+            alerts_created = sum(
+                1 for anomaly in anomalies
+                if self._create_anomaly_alert(metric["id"], anomaly, metric)
+            )
+            results.append((metric, {
+                "success": True,
+                "metric_id": metric["id"],
+                "anomalies_found": len(anomalies),
+                "alerts_created": alerts_created
+            }))
+        return results
     
-    def _z_score_detection(
+    def _detect_online_anomalies(
         self,
-        values: List[Dict],
+        metric_id: Optional[int],
+        device_id: Optional[int],
         sensitivity: float
-    ) -> List[Dict[str, Any]]:
-        """Détection basée sur le Z-score."""
-        numeric_values = [float(v['value']) for v in values]
-        
-        if len(numeric_values) < 3:
-            return []
+    ) -> Dict[str, Any]:
+        """
+        Détection continue : seuls les échantillons postérieurs au dernier
+        passage sont lus, puis intégrés à l'état EWMA / Welford de chaque
+        métrique.
+        """
+        if self.anomaly_state_repository is None:
+            raise ValueError("Le mode online nécessite un anomaly_state_repository")
         
-        mean = statistics.mean(numeric_values)
-        std_dev = statistics.stdev(numeric_values)
+        if metric_id:
+            metric = self.metrics_repository.get_by_id(metric_id)
+            metrics = [metric] if metric else []
+        elif device_id:
+            metrics = self.metrics_repository.get_active_metrics(device_id=device_id)
+        else:
+            metrics = self.metrics_repository.get_active_metrics()
         
-        # Seuil Z-score basé sur la sensibilité
-        z_threshold = 3 - sensitivity * 1.5  # Sensibilité élevée = seuil bas
+        detector = StreamingDetector(sensitivity=sensitivity)
+        # Aware, comme les horodatages des états et des valeurs stockées
+        now = datetime.now(timezone.utc)
+        bootstrap_since = now - timedelta(days=self.ONLINE_BOOTSTRAP_DAYS)
+        samples_processed = 0
+        total_anomalies = 0
+        total_alerts = 0
         
-        anomalies = []
-        for i, value_dict in enumerate(values):
-            value = float(value_dict['value'])
-            z_score = abs(value - mean) / std_dev if std_dev > 0 else 0
+        for chunk_start in range(0, len(metrics), self.CHUNK_SIZE):
+            chunk = metrics[chunk_start:chunk_start + self.CHUNK_SIZE]
+            metric_ids = [metric["id"] for metric in chunk]
+            states = self.anomaly_state_repository.get_states(metric_ids)
+            
+            since = min(
+                (states[mid].last_timestamp or bootstrap_since for mid in metric_ids),
+                default=bootstrap_since
+            )
+            values_by_metric = self.metric_value_repository.get_values_for_metrics(metric_ids, since, now)
+            
+            # Ne garder que les échantillons que chaque état n'a pas encore vus
+            series = []
+            for mid in metric_ids:
+                last_timestamp = states[mid].last_timestamp
+                series.append([
+                    value for value in values_by_metric.get(mid, [])
+                    if last_timestamp is None or value['timestamp'] > last_timestamp
+                ])
             
-            if z_score > z_threshold:
-                anomalies.append({
-                    "timestamp": value_dict['timestamp'],
-                    "value": value,
+            detection = detector.process(
+                [states[mid] for mid in metric_ids],
+                to_matrix([[v['value'] for v in values] for values in series])
+            )
+            
+            for row, column in zip(*np.nonzero(detection.mask)):
+                metric, sample = chunk[row], series[row][column]
+                expected = float(detection.expected[row, column])
+                margin = detection.threshold * float(detection.scale[row, column])
+                z_score = float(detection.score[row, column])
+                anomaly = {
+                    "timestamp": self._isoformat(sample['timestamp']),
+                    "value": float(sample['value']),
+                    "expected_range": {"min": expected - margin, "max": expected + margin},
                     "z_score": z_score,
-                    "threshold": z_threshold,
+                    "threshold": detection.threshold,
                     "severity": self._calculate_severity_from_z_score(z_score),
-                    "algorithm": "z_score"
-                })
+                    "algorithm": "ewma"
+                }
+                total_anomalies += 1
+                if self._create_anomaly_alert(metric["id"], anomaly, metric):
+                    total_alerts += 1
+            
+            for mid, values in zip(metric_ids, series):
+                if values:
+                    states[mid].last_timestamp = values[-1]['timestamp']
+                    samples_processed += len(values)
+            self.anomaly_state_repository.save_states(states)
         
-        return anomalies
+        return {
+            "success": True,
+            "mode": "online",
+            "metrics_analyzed": len(metrics),
+            "samples_processed": samples_processed,
+            "total_anomalies": total_anomalies,
+            "total_alerts": total_alerts,
+            "algorithm": "ewma",
+            "sensitivity": sensitivity,
+            "timestamp": datetime.now().isoformat()
+        }
     
-    def _isolation_forest_detection(
+    def _detect_with_algorithm(
         self,
         values: List[Dict],
+        algorithm: str,
         sensitivity: float
     ) -> List[Dict[str, Any]]:
-        """Détection par Isolation Forest (version simplifiée)."""
-        # Implémentation simplifiée d'Isolation Forest
-        # Dans un vrai système, utiliser scikit-learn
-        
-        numeric_values = [float(v['value']) for v in values]
-        
-        if len(numeric_values) < 10:
-            return []
+        """Applique l'algorithme de détection choisi."""
+        return self._detect_matrix([values], algorithm, sensitivity)[0]
+    
+    def _detect_matrix(
+        self,
+        series: List[List[Dict]],
+        algorithm: str,
+        sensitivity: float
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Applique l'algorithme choisi à plusieurs séries à la fois.
         
-        # Simulation d'Isolation Forest avec des quartiles
-        q1 = statistics.quantiles(numeric_values, n=4)[0]
-        q3 = statistics.quantiles(numeric_values, n=4)[2]
-        iqr = q3 - q1
+        Seuls les points signalés sont convertis en dictionnaires.
         
-        # Seuil basé sur la sensibilité
-        outlier_factor = 1.5 + (1 - sensitivity) * 1.5
-        lower_bound = q1 - outlier_factor * iqr
-        upper_bound = q3 + outlier_factor * iqr
+        Returns:
+            Anomalies de chaque série
+        """
+        matrix = to_matrix([[float(v['value']) for v in values] for values in series])
+        detection = detect(matrix, algorithm, sensitivity)
         
-        anomalies = []
-        for i, value_dict in enumerate(values):
-            value = float(value_dict['value'])
+        anomalies: List[List[Dict[str, Any]]] = [[] for _ in series]
+        for row, column in zip(*np.nonzero(detection.mask)):
+            value_dict = series[row][column]
+            value = float(matrix[row, column])
+            score = float(detection.score[row, column])
+            lower = float(detection.lower[row])
+            upper = float(detection.upper[row])
+            scale = float(detection.scale[row])
             
-            if value < lower_bound or value > upper_bound:
-                distance_from_bounds = min(
-                    abs(value - lower_bound) if value < lower_bound else float('inf'),
-                    abs(value - upper_bound) if value > upper_bound else float('inf')
-                )
-                
-                anomalies.append({
-                    "timestamp": value_dict['timestamp'],
-                    "value": value,
-                    "bounds": {
-                        "lower": lower_bound,
-                        "upper": upper_bound
-                    },
-                    "distance": distance_from_bounds,
-                    "severity": self._calculate_severity_from_distance(distance_from_bounds, iqr),
-                    "algorithm": "isolation_forest"
-                })
+            if algorithm == "statistical":
+                anomaly = {
+                    "expected_range": {"min": lower, "max": upper},
+                    "deviation": score,
+                    "severity": self._calculate_severity(score, scale)
+                }
+            elif algorithm == "z_score":
+                anomaly = {
+                    "z_score": score,
+                    "threshold": 3 - sensitivity * 1.5,
+                    "severity": self._calculate_severity_from_z_score(score)
+                }
+            else:
+                anomaly = {
+                    "bounds": {"lower": lower, "upper": upper},
+                    "distance": score,
+                    "severity": self._calculate_severity_from_distance(score, scale)
+                }
+            anomaly.update({
+                "timestamp": self._isoformat(value_dict['timestamp']),
+                "value": value,
+                "algorithm": algorithm
+            })
+            anomalies[row].append(anomaly)
         
         return anomalies
     
+    @staticmethod
+    def _isoformat(timestamp: Any) -> Any:
+        return timestamp.isoformat() if hasattr(timestamp, 'isoformat') else timestamp
+    
     def _calculate_severity(self, deviation: float, std_dev: float) -> str:
         """Calcule la sévérité basée sur la déviation."""
         if deviation > 3 * std_dev:
@@ -409,20 +494,20 @@ class DetectAnomaliesUseCase:
         else:
             return "low"
     
-    def _create_anomaly_alert(self, metric_id: int, anomaly: Dict[str, Any]) -> bool:
+    def _create_anomaly_alert(self, metric_id: int, anomaly: Dict[str, Any], metric: Any = None) -> bool:
         """Crée une alerte pour une anomalie détectée."""
         try:
-            metric = self.metrics_repository.get_by_id(metric_id)
+            metric = metric or self.metrics_repository.get_by_id(metric_id)
             if not metric:
                 return False
             
             alert_data = {
-                "title": f"Anomalie détectée: {metric.name}",
+                "title": f"Anomalie détectée: {metric['name']}",
                 "description": f"Valeur anormale {anomaly['value']} détectée par {anomaly['algorithm']}",
                 "severity": anomaly["severity"],
                 "source_type": "anomaly_detection",
                 "source_id": metric_id,
-                "device_id": metric.device_id,
+                "device_id": metric["device_id"],
                 "details": anomaly
             }
             
@@ -18,6 +18,7 @@ from ..domain.interfaces.repositories import (
 )
 from ..domain.services import (
     MetricCollectionService,
+    MetricCollectionPipeline,
     AlertingService
 )
 
@@ -68,10 +69,30 @@ class CollectMetricsUseCase:
                 "timestamp": datetime.now().isoformat()
             }
     
+    def _run_pipeline(self, metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Collecte les métriques via le pipeline concurrent et vérifie les seuils."""
+        pipeline = MetricCollectionPipeline(self.collection_service, self.metric_value_repository)
+        collection = pipeline.run(metrics)
+        
+        metrics_by_id = {metric.get('id'): metric for metric in metrics}
+        errors = []
+        threshold_start = datetime.now()
+        for result in collection['results']:
+            if result['success']:
+                # Vérifier les seuils d'alerte
+                self._check_thresholds(metrics_by_id.get(result['device_metric_id'], {}), result['value'])
+            else:
+                error_msg = f"Erreur métrique {result.get('device_metric_id')}: {result.get('error')}"
+                errors.append(error_msg)
+                logger.error(error_msg)
+        collection['timings']['thresholds'] = round((datetime.now() - threshold_start).total_seconds(), 4)
+        collection['errors'] = errors
+        return collection
+    
     def _collect_device_metrics(self, device_id: int) -> Dict[str, Any]:
         """Collecte les métriques pour un équipement spécifique."""
         try:
-            metrics = self.device_metric_repository.list_by_device(device_id)
+            metrics = self.device_metric_repository.get_collection_configs(device_id=device_id)
             
             if not metrics:
                 return {
@@ -81,35 +102,16 @@ class CollectMetricsUseCase:
                     "collected": 0
                 }
             
-            collected = 0
-            errors = []
-            
-            for metric in metrics:
-                try:
-                    value = self.collection_service.collect_metric(metric)
-                    if value is not None:
-                        self.metric_value_repository.save({
-                            'device_metric_id': metric.get('id'),
-                            'value': value,
-                            'timestamp': datetime.now()
-                        })
-                        collected += 1
-                        
-                        # Vérifier les seuils d'alerte
-                        self._check_thresholds(metric, value)
-                        
-                except Exception as e:
-                    error_msg = f"Erreur métrique {metric.get('id')}: {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(error_msg)
+            collection = self._run_pipeline(metrics)
             
             return {
                 "success": True,
                 "message": f"Collecte terminée pour l'équipement {device_id}",
                 "device_id": device_id,
-                "collected": collected,
+                "collected": collection['collected'],
                 "total": len(metrics),
-                "errors": errors,
+                "errors": collection['errors'],
+                "timings": collection['timings'],
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -126,48 +128,22 @@ class CollectMetricsUseCase:
         """Collecte les métriques pour tous les équipements actifs."""
         try:
             # Récupérer toutes les métriques actives de tous les équipements
-            metrics = self.device_metric_repository.list_all()
-            
-            collected = 0
-            errors = []
-            devices_count = 0
-            
-            devices = {}
-            for metric in metrics:
-                device_id = metric.get('device_id')
-                if device_id not in devices:
-                    devices[device_id] = []
-                devices[device_id].append(metric)
+            load_start = datetime.now()
+            metrics = self.device_metric_repository.get_collection_configs()
+            load_time = (datetime.now() - load_start).total_seconds()
             
-            devices_count = len(devices)
-            
-            for device_id, device_metrics in devices.items():
-                for metric in device_metrics:
-                    try:
-                        value = self.collection_service.collect_metric(metric)
-                        if value is not None:
-                            self.metric_value_repository.save({
-                                'device_metric_id': metric.get('id'),
-                                'value': value,
-                                'timestamp': datetime.now()
-                            })
-                            collected += 1
-                            
-                            # Vérifier les seuils d'alerte
-                            self._check_thresholds(metric, value)
-                            
-                    except Exception as e:
-                        error_msg = f"Erreur métrique {metric.get('id')}: {str(e)}"
-                        errors.append(error_msg)
-                        logger.error(error_msg)
+            collection = self._run_pipeline(metrics)
+            collection['timings']['load'] = round(load_time, 4)
             
             return {
                 "success": True,
                 "message": "Collecte globale terminée",
-                "devices_processed": devices_count,
-                "collected": collected,
+                "devices_processed": collection['devices'],
+                "collected": collection['collected'],
                 "total": len(metrics),
-                "errors": errors,
+                "batches": collection['batches'],
+                "errors": collection['errors'],
+                "timings": collection['timings'],
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -468,8 +444,11 @@ class CleanupMetricsUseCase:
         """
         Exécute le nettoyage des anciennes données.
         
+        Les valeurs brutes sont conservées `retention_days` jours ; les
+        agrégats 1m/1h/1d suivent leur propre rétention, plus longue.
+        
         Args:
-            retention_days: Nombre de jours de rétention
+            retention_days: Nombre de jours de rétention des valeurs brutes
             
         Returns:
             Résultat du nettoyage
@@ -477,25 +456,15 @@ class CleanupMetricsUseCase:
         try:
             cutoff_date = datetime.now() - timedelta(days=retention_days)
             
-            # Compter les enregistrements à supprimer
-            count_to_delete = self.metric_value_repository.count_before_date(cutoff_date)
-            
-            if count_to_delete == 0:
-                return {
-                    "success": True,
-                    "message": "Aucune donnée ancienne trouvée",
-                    "deleted_count": 0,
-                    "cutoff_date": cutoff_date.isoformat(),
-                    "timestamp": datetime.now().isoformat()
-                }
-            
-            # Supprimer les anciennes données
-            deleted_count = self.metric_value_repository.delete_before_date(cutoff_date)
+            # Une requête DELETE par résolution, sans comptage préalable
+            deleted = self.metric_value_repository.apply_retention({'raw': retention_days})
+            deleted_count = sum(deleted.values())
             
             return {
                 "success": True,
                 "message": f"Nettoyage terminé: {deleted_count} enregistrements supprimés",
                 "deleted_count": deleted_count,
+                "deleted_by_resolution": deleted,
                 "cutoff_date": cutoff_date.isoformat(),
                 "retention_days": retention_days,
                 "timestamp": datetime.now().isoformat()
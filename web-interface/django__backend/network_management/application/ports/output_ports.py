@@ -501,6 +501,32 @@ class TopologyPersistencePort(ABC):
         pass
 
 
+class TopologySnapshotPort(ABC):
+    """
+    Interface pour l'instantané de topologie mis en cache.
+
+    L'instantané contient l'ensemble des équipements et connexions sous
+    forme sérialisable ({'nodes': [...], 'edges': [...], 'metadata': {...}}).
+    """
+
+    @abstractmethod
+    def get_snapshot(self) -> Dict[str, Any]:
+        """
+        Récupère l'instantané courant, en le construisant si nécessaire.
+
+        Returns:
+            Instantané de la topologie
+        """
+        pass
+
+    @abstractmethod
+    def invalidate(self) -> None:
+        """
+        Invalide l'instantané courant.
+        """
+        pass
+
+
 class AlertPersistencePort(ABC):
     """
     Interface pour la persistance des alertes.
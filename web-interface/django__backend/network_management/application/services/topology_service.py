@@ -13,6 +13,7 @@ from ...domain.interfaces import (
 )
 from ...domain.entities import NetworkDeviceEntity, NetworkInterfaceEntity, ConnectionEntity, TopologyEntity
 from ..ports.input_ports import NetworkTopologyUseCases
+from ..ports.output_ports import TopologySnapshotPort
 from ...domain.exceptions import ResourceNotFoundException, ValidationException
 
 
@@ -29,7 +30,8 @@ class TopologyService(NetworkTopologyUseCases):
         device_repository: NetworkDeviceRepository,
         interface_repository: NetworkInterfaceRepository,
         connection_repository: NetworkConnectionRepository,
-        topology_repository: NetworkTopologyRepository
+        topology_repository: NetworkTopologyRepository,
+        snapshot_port: Optional[TopologySnapshotPort] = None
     ):
         """
         Initialise une nouvelle instance de TopologyService.
@@ -39,11 +41,19 @@ class TopologyService(NetworkTopologyUseCases):
             interface_repository (NetworkInterfaceRepository): Le repository d'interfaces à utiliser.
             connection_repository (NetworkConnectionRepository): Le repository de connexions à utiliser.
             topology_repository (NetworkTopologyRepository): Le repository de topologies à utiliser.
+            snapshot_port (TopologySnapshotPort, optional): L'instantané de topologie mis en cache,
+                utilisé pour générer les graphes sans parcourir les connexions une à une
+                (instantané partagé du module par défaut).
         """
+        if snapshot_port is None:
+            from ...infrastructure.adapters.topology_snapshot import topology_snapshot_builder
+            snapshot_port = topology_snapshot_builder
+
         self._device_repository = device_repository
         self._interface_repository = interface_repository
         self._connection_repository = connection_repository
         self._topology_repository = topology_repository
+        self._snapshot_port = snapshot_port
     
     def get_topology(self, topology_id: int) -> TopologyEntity:
         """
@@ -244,45 +254,44 @@ class TopologyService(NetworkTopologyUseCases):
         if not topology:
             raise ResourceNotFoundException("Topology", str(topology_id))
         
-        # Récupérer les connexions
-        connections = self._connection_repository.get_by_topology_id(topology_id)
+        return self._graph_from_snapshot(topology)
+    
+    def _graph_from_snapshot(self, topology: TopologyEntity) -> Dict[str, Any]:
+        """
+        Génère le graphe d'une topologie à partir de l'instantané mis en cache.
+        
+        Args:
+            topology (TopologyEntity): La topologie dont on veut le graphe.
+            
+        Returns:
+            Dict[str, Any]: Un dictionnaire contenant le graphe généré.
+        """
+        snapshot = self._snapshot_port.get_snapshot()
+        device_ids = {str(device.id) for device in topology.devices if device.id is not None}
+        
+        nodes = [
+            {
+                "id": int(node["id"]),
+                "name": node["name"],
+                "type": node["type"]
+            }
+            for node in snapshot["nodes"]
+            if node["id"] in device_ids
+        ]
+        links = [
+            {
+                "source": int(edge["source"]),
+                "target": int(edge["target"]),
+                "source_interface": edge["interface_source"],
+                "target_interface": edge["interface_target"],
+                "connection_type": edge["type"]
+            }
+            for edge in snapshot["edges"]
+            if edge["source"] in device_ids and edge["target"] in device_ids
+        ]
         
-        # Créer le graphe (implémentation simple sans networkx)
-        devices = {}
-        links = []
-
-        # Collecter les équipements et connexions
-        for connection in connections:
-            source_device = connection.source_interface.device
-            target_device = connection.target_interface.device
-
-            # Ajouter les équipements
-            if source_device.id not in devices:
-                devices[source_device.id] = {
-                    "id": source_device.id,
-                    "name": source_device.name,
-                    "type": source_device.device_type
-                }
-
-            if target_device.id not in devices:
-                devices[target_device.id] = {
-                    "id": target_device.id,
-                    "name": target_device.name,
-                    "type": target_device.device_type
-                }
-
-            # Ajouter la connexion
-            links.append({
-                "source": source_device.id,
-                "target": target_device.id,
-                "source_interface": connection.source_interface.name,
-                "target_interface": connection.target_interface.name,
-                "connection_type": connection.connection_type
-            })
-
-        # Retourner le résultat
         return {
-            "nodes": list(devices.values()),
+            "nodes": nodes,
             "links": links
         }
     
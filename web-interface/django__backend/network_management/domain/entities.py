@@ -11,6 +11,8 @@ from datetime import datetime
 from enum import Enum
 from typing import Dict, List, Optional, Set, Union, Any
 
+from .topology_graph import TopologyGraph
+
 
 class DeviceType(Enum):
     """Types d'équipements réseau supportés."""
@@ -734,134 +736,48 @@ class TopologyEntity:
                 return True
         return False
     
-    def calculate_path(self, source_device_id: int, target_device_id: int) -> List[List[int]]:
+    def build_graph(self) -> TopologyGraph:
+        """
+        Construit le graphe indexé de la topologie.
+        
+        Returns:
+            Graphe de topologie (adjacence CSR, coût des liens)
         """
-        Calcule tous les chemins possibles entre deux équipements.
+        return TopologyGraph.from_topology(self)
+    
+    def calculate_path(self, source_device_id: int, target_device_id: int,
+                       max_paths: int = 10) -> List[List[int]]:
+        """
+        Calcule les chemins entre deux équipements.
+        
+        Les chemins sans boucle sont retournés par coût croissant (latence,
+        ou débit à défaut), dans la limite de `max_paths`.
         
         Args:
             source_device_id: ID de l'équipement source
             target_device_id: ID de l'équipement cible
+            max_paths: Nombre maximal de chemins
             
         Returns:
             Liste des chemins possibles (liste d'IDs d'équipements)
-            
-        Raises:
-            TopologyException: Si le calcul échoue
-        """
-        # Créer un graphe des connexions
-        graph = {}
-        
-        # Ajouter tous les équipements
-        for device in self.devices:
-            if device.id:
-                graph[device.id] = []
-        
-        # Ajouter les connexions
-        for connection in self.connections:
-            # Trouver les équipements correspondants
-            source_device_id = None
-            target_device_id = None
-            
-            for device in self.devices:
-                for interface in device.interfaces:
-                    if interface.id == connection.source_interface_id:
-                        source_device_id = device.id
-                    if interface.id == connection.target_interface_id:
-                        target_device_id = device.id
-            
-            if source_device_id and target_device_id:
-                if source_device_id in graph:
-                    graph[source_device_id].append(target_device_id)
-                if target_device_id in graph:
-                    graph[target_device_id].append(source_device_id)
-        
-        # Recherche en profondeur pour trouver tous les chemins
-        def find_paths(graph, start, end, path=None):
-            if path is None:
-                path = []
-            
-            path = path + [start]
-            
-            if start == end:
-                return [path]
-            
-            if start not in graph:
-                return []
-            
-            paths = []
-            
-            for node in graph[start]:
-                if node not in path:
-                    new_paths = find_paths(graph, node, end, path)
-                    for new_path in new_paths:
-                        paths.append(new_path)
-            
-            return paths
+        """
+        graph = self.build_graph()
+        if source_device_id not in graph or target_device_id not in graph:
+            return []
         
-        return find_paths(graph, source_device_id, target_device_id)
+        return [path for _, path in graph.k_shortest_paths(source_device_id, target_device_id, max_paths)]
     
     def detect_loops(self) -> List[List[int]]:
         """
         Détecte les boucles dans la topologie.
         
+        Chaque lien redondant (hors arbre couvrant) forme une boucle : la
+        liste retournée est une base des cycles de la topologie.
+        
         Returns:
-            Liste des boucles détectées (liste de chemins)
+            Liste des boucles détectées (chemins fermés)
         """
-        # Créer un graphe des connexions
-        graph = {}
-        
-        # Ajouter tous les équipements
-        for device in self.devices:
-            if device.id:
-                graph[device.id] = []
-        
-        # Ajouter les connexions
-        for connection in self.connections:
-            # Trouver les équipements correspondants
-            source_device_id = None
-            target_device_id = None
-            
-            for device in self.devices:
-                for interface in device.interfaces:
-                    if interface.id == connection.source_interface_id:
-                        source_device_id = device.id
-                    if interface.id == connection.target_interface_id:
-                        target_device_id = device.id
-            
-            if source_device_id and target_device_id:
-                if source_device_id in graph:
-                    graph[source_device_id].append(target_device_id)
-                if target_device_id in graph:
-                    graph[target_device_id].append(source_device_id)
-        
-        # Détection de cycles par DFS
-        loops = []
-        visited = set()
-        
-        def detect_cycle(node, parent, path, visited_in_path):
-            visited.add(node)
-            visited_in_path.add(node)
-            path.append(node)
-            
-            for neighbor in graph.get(node, []):
-                if neighbor == parent:
-                    continue
-                
-                if neighbor in visited_in_path:
-                    # Cycle détecté
-                    cycle_start = path.index(neighbor)
-                    loops.append(path[cycle_start:] + [neighbor])
-                elif neighbor not in visited:
-                    detect_cycle(neighbor, node, path, visited_in_path)
-            
-            path.pop()
-            visited_in_path.remove(node)
-        
-        for node in graph:
-            if node not in visited:
-                detect_cycle(node, None, [], set())
-        
-        return loops
+        return self.build_graph().cycle_basis()
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -0,0 +1,545 @@
+"""
+Moteur de graphe de topologie réseau.
+
+Le graphe est construit une seule fois à partir des équipements et des
+connexions : les identifiants d'équipements sont remplacés par des indices
+entiers et l'adjacence est stockée au format CSR (tableaux de décalages,
+de voisins et d'arêtes). Les algorithmes opèrent sur ces tableaux :
+
+- plus court chemin pondéré par le coût des liens (Dijkstra) ;
+- k plus courts chemins sans boucle (Yen) ;
+- base de cycles (boucles) à partir d'un arbre couvrant ;
+- points d'articulation et ponts (Tarjan, itératif) ;
+- rayon d'impact de la panne d'un ensemble d'équipements.
+"""
+
+import heapq
+from array import array
+from collections import deque
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .exceptions import NetworkDeviceNotFoundException
+
+
+# Bande passante de référence (Mbit/s) pour le coût dérivé du débit d'un lien
+REFERENCE_BANDWIDTH = 100000.0
+
+INFINITY = float('inf')
+
+
+def link_cost(cost: Optional[float] = None, latency: Optional[float] = None,
+              bandwidth: Optional[float] = None) -> float:
+    """
+    Coût d'un lien : coût explicite, sinon latence, sinon coût dérivé du
+    débit (référence / débit), sinon 1.
+    """
+    if cost is not None:
+        return float(cost)
+    if latency is not None:
+        return float(latency)
+    if bandwidth:
+        return max(REFERENCE_BANDWIDTH / float(bandwidth), 1.0)
+    return 1.0
+
+
+class TopologyGraph:
+    """
+    Graphe non orienté de la topologie à adjacence CSR.
+
+    Les équipements sont désignés par leur identifiant d'origine dans
+    l'interface publique ; les arêtes parallèles sont conservées.
+    """
+
+    def __init__(self, node_ids: Iterable[Hashable],
+                 edges: Iterable[Tuple[Hashable, Hashable, float, Any]]):
+        """
+        Construit le graphe.
+
+        Args:
+            node_ids: Identifiants des équipements
+            edges: Liens (source, cible, coût, clé) ; les liens dont une
+                extrémité est inconnue sont ignorés
+        """
+        self.node_ids: List[Hashable] = []
+        self.index: Dict[Hashable, int] = {}
+        for node_id in node_ids:
+            if node_id not in self.index:
+                self.index[node_id] = len(self.node_ids)
+                self.node_ids.append(node_id)
+
+        self.edge_keys: List[Any] = []
+        self.edge_source = array('l')
+        self.edge_target = array('l')
+        self.edge_cost = array('d')
+        for source, target, cost, key in edges:
+            u = self.index.get(source)
+            v = self.index.get(target)
+            if u is None or v is None:
+                continue
+            self.edge_source.append(u)
+            self.edge_target.append(v)
+            self.edge_cost.append(cost)
+            self.edge_keys.append(key)
+
+        # Adjacence CSR : les voisins du nœud u sont neighbors[offsets[u]:offsets[u + 1]]
+        node_count = len(self.node_ids)
+        degrees = [0] * (node_count + 1)
+        for u, v in zip(self.edge_source, self.edge_target):
+            if u != v:
+                degrees[u + 1] += 1
+                degrees[v + 1] += 1
+        for u in range(node_count):
+            degrees[u + 1] += degrees[u]
+        self.offsets = array('l', degrees)
+
+        fill = list(degrees[:-1])
+        self.neighbors = array('l', [0]) * degrees[-1]
+        self.neighbor_edges = array('l', [0]) * degrees[-1]
+        for edge, (u, v) in enumerate(zip(self.edge_source, self.edge_target)):
+            if u == v:
+                continue
+            self.neighbors[fill[u]] = v
+            self.neighbor_edges[fill[u]] = edge
+            fill[u] += 1
+            self.neighbors[fill[v]] = u
+            self.neighbor_edges[fill[v]] = edge
+            fill[v] += 1
+
+        self._pair_costs: Optional[Dict[Tuple[int, int], float]] = None
+
+    @classmethod
+    def from_topology(cls, topology) -> 'TopologyGraph':
+        """
+        Construit le graphe d'une TopologyEntity.
+
+        L'index interface → équipement est construit en un passage sur les
+        interfaces des équipements.
+        """
+        device_ids = [device.id for device in topology.devices if device.id]
+        interface_device = {}
+        for device in topology.devices:
+            if not device.id:
+                continue
+            for interface in device.interfaces:
+                if interface.id is not None:
+                    interface_device[interface.id] = device.id
+
+        edges = []
+        for connection in topology.connections:
+            source = interface_device.get(connection.source_interface_id)
+            target = interface_device.get(connection.target_interface_id)
+            if source is None or target is None:
+                continue
+            edges.append((
+                source,
+                target,
+                link_cost(connection.metrics.get('cost'), connection.latency, connection.bandwidth),
+                connection.id
+            ))
+        return cls(device_ids, edges)
+
+    @classmethod
+    def from_topology_data(cls, data: Dict[str, Any]) -> 'TopologyGraph':
+        """
+        Construit le graphe à partir d'une topologie sérialisée
+        ({'nodes': [{'id'}], 'edges': [{'id', 'source', 'target'}]}).
+        """
+        node_ids = [node['id'] for node in data.get('nodes', [])]
+        edges = [
+            (
+                edge.get('source'),
+                edge.get('target'),
+                link_cost(edge.get('cost'), edge.get('latency'), edge.get('bandwidth')),
+                edge.get('id')
+            )
+            for edge in data.get('edges', [])
+        ]
+        return cls(node_ids, edges)
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def __contains__(self, node_id: Hashable) -> bool:
+        return node_id in self.index
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.edge_keys)
+
+    def degree(self, node_id: Hashable) -> int:
+        """Nombre de liens d'un équipement (hors boucles locales)."""
+        u, = self._indices(node_id)
+        return self.offsets[u + 1] - self.offsets[u]
+
+    def neighbors_of(self, node_id: Hashable) -> List[Hashable]:
+        """Équipements voisins."""
+        u, = self._indices(node_id)
+        return [self.node_ids[v] for v in self.neighbors[self.offsets[u]:self.offsets[u + 1]]]
+
+    # ------------------------------------------------------------------
+    # Chemins
+    # ------------------------------------------------------------------
+
+    def shortest_path(self, source: Hashable, target: Hashable) -> Tuple[float, List[Hashable]]:
+        """
+        Plus court chemin pondéré entre deux équipements.
+
+        Returns:
+            (coût, chemin) ; (inf, []) si les équipements ne sont pas reliés
+        """
+        s, t = self._indices(source, target)
+        cost, path = self._dijkstra(s, t)
+        return cost, [self.node_ids[u] for u in path]
+
+    def k_shortest_paths(self, source: Hashable, target: Hashable,
+                         k: int) -> List[Tuple[float, List[Hashable]]]:
+        """
+        Les k plus courts chemins sans boucle (algorithme de Yen), par coût croissant.
+
+        Returns:
+            Liste de (coût, chemin)
+        """
+        s, t = self._indices(source, target)
+        if k <= 0:
+            return []
+        cost, path = self._dijkstra(s, t)
+        if not path:
+            return []
+
+        # Distances exactes vers la cible dans le graphe complet : heuristique
+        # admissible (les exclusions ne font qu'allonger les chemins) qui guide
+        # les recherches de déviation (A*)
+        to_target = self._distances(t)
+
+        found = [(cost, path)]
+        seen = {tuple(path)}
+        candidates: List[Tuple[float, List[int]]] = []
+
+        while len(found) < k:
+            _, previous = found[-1]
+            root_cost = 0.0
+            for i in range(len(previous) - 1):
+                spur = previous[i]
+                root = previous[:i + 1]
+
+                # Liens déjà empruntés depuis ce préfixe et nœuds du préfixe exclus
+                blocked_pairs = set()
+                for _, other in found:
+                    if len(other) > i + 1 and other[:i + 1] == root:
+                        blocked_pairs.add((spur, other[i + 1]))
+                blocked_nodes = set(root[:-1])
+
+                spur_cost, spur_path = self._dijkstra(spur, t, blocked_nodes, blocked_pairs, to_target)
+                if spur_path:
+                    candidate = root[:-1] + spur_path
+                    key = tuple(candidate)
+                    if key not in seen:
+                        seen.add(key)
+                        heapq.heappush(candidates, (root_cost + spur_cost, candidate))
+
+                root_cost += self._pair_cost(previous[i], previous[i + 1])
+
+            if not candidates:
+                break
+            found.append(heapq.heappop(candidates))
+
+        return [(cost, [self.node_ids[u] for u in path]) for cost, path in found]
+
+    def path_cost(self, path: Sequence[Hashable]) -> float:
+        """Coût d'un chemin (lien le moins coûteux entre deux équipements consécutifs)."""
+        indices = [self.index[node_id] for node_id in path]
+        return sum(self._pair_cost(u, v) for u, v in zip(indices, indices[1:]))
+
+    def path_links(self, path: Sequence[Hashable]) -> List[Any]:
+        """Clés des liens (les moins coûteux) empruntés par un chemin."""
+        links = []
+        indices = [self.index[node_id] for node_id in path]
+        for u, v in zip(indices, indices[1:]):
+            best_edge, best_cost = None, INFINITY
+            for position in range(self.offsets[u], self.offsets[u + 1]):
+                edge = self.neighbor_edges[position]
+                if self.neighbors[position] == v and self.edge_cost[edge] < best_cost:
+                    best_edge, best_cost = edge, self.edge_cost[edge]
+            links.append(self.edge_keys[best_edge] if best_edge is not None else None)
+        return links
+
+    def _dijkstra(self, source: int, target: int, blocked_nodes: Optional[Set[int]] = None,
+                  blocked_pairs: Optional[Set[Tuple[int, int]]] = None,
+                  heuristic: Optional[List[float]] = None) -> Tuple[float, List[int]]:
+        """
+        Dijkstra sur indices, avec nœuds et paires de nœuds exclus.
+
+        Avec une heuristique (borne inférieure de la distance à la cible),
+        la recherche devient un A* ; à priorité égale, le nœud le plus
+        éloigné de la source est exploré en premier.
+        """
+        if source == target:
+            return 0.0, [source]
+        offsets, neighbors, neighbor_edges, edge_cost = (
+            self.offsets, self.neighbors, self.neighbor_edges, self.edge_cost
+        )
+        distances = {source: 0.0}
+        previous = {}
+        done = set()
+        heap = [(heuristic[source] if heuristic else 0.0, 0.0, source)]
+        while heap:
+            _, negative_distance, u = heapq.heappop(heap)
+            if u in done:
+                continue
+            if u == target:
+                break
+            done.add(u)
+            distance = -negative_distance
+            for position in range(offsets[u], offsets[u + 1]):
+                v = neighbors[position]
+                if v in done or (blocked_nodes and v in blocked_nodes):
+                    continue
+                if blocked_pairs and (u, v) in blocked_pairs:
+                    continue
+                candidate = distance + edge_cost[neighbor_edges[position]]
+                if candidate < distances.get(v, INFINITY):
+                    priority = candidate
+                    if heuristic is not None:
+                        if heuristic[v] == INFINITY:
+                            continue
+                        priority += heuristic[v]
+                    distances[v] = candidate
+                    previous[v] = u
+                    heapq.heappush(heap, (priority, -candidate, v))
+        else:
+            return INFINITY, []
+
+        path = [target]
+        while path[-1] != source:
+            path.append(previous[path[-1]])
+        path.reverse()
+        return distances[target], path
+
+    def _distances(self, source: int) -> List[float]:
+        """Distances de tous les nœuds à `source` (Dijkstra complet)."""
+        offsets, neighbors, neighbor_edges, edge_cost = (
+            self.offsets, self.neighbors, self.neighbor_edges, self.edge_cost
+        )
+        distances = [INFINITY] * len(self.node_ids)
+        distances[source] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            distance, u = heapq.heappop(heap)
+            if distance > distances[u]:
+                continue
+            for position in range(offsets[u], offsets[u + 1]):
+                v = neighbors[position]
+                candidate = distance + edge_cost[neighbor_edges[position]]
+                if candidate < distances[v]:
+                    distances[v] = candidate
+                    heapq.heappush(heap, (candidate, v))
+        return distances
+
+    def _pair_cost(self, u: int, v: int) -> float:
+        if self._pair_costs is None:
+            pair_costs = {}
+            for a, b, cost in zip(self.edge_source, self.edge_target, self.edge_cost):
+                for key in ((a, b), (b, a)):
+                    if cost < pair_costs.get(key, INFINITY):
+                        pair_costs[key] = cost
+            self._pair_costs = pair_costs
+        return self._pair_costs[(u, v)]
+
+    # ------------------------------------------------------------------
+    # Boucles et points critiques
+    # ------------------------------------------------------------------
+
+    def cycle_basis(self) -> List[List[Hashable]]:
+        """
+        Base de cycles du graphe : un cycle fondamental par lien hors de
+        l'arbre couvrant (parcours en largeur, cycles courts).
+
+        Returns:
+            Cycles fermés ([a, b, c, a]) ; une boucle locale donne [a, a]
+        """
+        node_count = len(self.node_ids)
+        parent = [-1] * node_count
+        parent_edge = [-1] * node_count
+        depth = [-1] * node_count
+        offsets, neighbors, neighbor_edges = self.offsets, self.neighbors, self.neighbor_edges
+
+        for root in range(node_count):
+            if depth[root] != -1:
+                continue
+            depth[root] = 0
+            queue = deque([root])
+            while queue:
+                u = queue.popleft()
+                for position in range(offsets[u], offsets[u + 1]):
+                    v = neighbors[position]
+                    if depth[v] == -1:
+                        depth[v] = depth[u] + 1
+                        parent[v] = u
+                        parent_edge[v] = neighbor_edges[position]
+                        queue.append(v)
+
+        tree_edges = set(parent_edge)
+        cycles = []
+        for edge, (u, v) in enumerate(zip(self.edge_source, self.edge_target)):
+            if u == v:
+                cycles.append([self.node_ids[u], self.node_ids[u]])
+                continue
+            if edge in tree_edges:
+                continue
+            # Remonter les deux extrémités jusqu'à leur ancêtre commun
+            left, right = [u], [v]
+            a, b = u, v
+            while depth[a] > depth[b]:
+                a = parent[a]
+                left.append(a)
+            while depth[b] > depth[a]:
+                b = parent[b]
+                right.append(b)
+            while a != b:
+                a, b = parent[a], parent[b]
+                left.append(a)
+                right.append(b)
+            cycle = left + right[-2::-1] + [u]
+            cycles.append([self.node_ids[w] for w in cycle])
+        return cycles
+
+    def critical_elements(self) -> Tuple[List[Hashable], List[Any]]:
+        """
+        Points d'articulation et ponts (algorithme de Tarjan itératif).
+
+        Les liens parallèles ne sont pas des ponts.
+
+        Returns:
+            (équipements dont la panne déconnecte le réseau, clés des liens critiques)
+        """
+        node_count = len(self.node_ids)
+        discovery = [-1] * node_count
+        low = [0] * node_count
+        articulation = [False] * node_count
+        bridges = []
+        offsets, neighbors, neighbor_edges = self.offsets, self.neighbors, self.neighbor_edges
+        counter = 0
+
+        for root in range(node_count):
+            if discovery[root] != -1:
+                continue
+            discovery[root] = low[root] = counter
+            counter += 1
+            root_children = 0
+            # Pile : (nœud, lien d'arrivée, position courante dans l'adjacence)
+            stack = [(root, -1, offsets[root])]
+            while stack:
+                u, in_edge, position = stack[-1]
+                if position < offsets[u + 1]:
+                    stack[-1] = (u, in_edge, position + 1)
+                    v = neighbors[position]
+                    edge = neighbor_edges[position]
+                    if edge == in_edge:
+                        continue
+                    if discovery[v] == -1:
+                        discovery[v] = low[v] = counter
+                        counter += 1
+                        if u == root:
+                            root_children += 1
+                        stack.append((v, edge, offsets[v]))
+                    elif discovery[v] < low[u]:
+                        low[u] = discovery[v]
+                    continue
+
+                stack.pop()
+                if not stack:
+                    continue
+                parent = stack[-1][0]
+                if low[u] < low[parent]:
+                    low[parent] = low[u]
+                if low[u] > discovery[parent]:
+                    bridges.append(self.edge_keys[in_edge])
+                if parent != root and low[u] >= discovery[parent]:
+                    articulation[parent] = True
+
+            if root_children > 1:
+                articulation[root] = True
+
+        points = [self.node_ids[u] for u in range(node_count) if articulation[u]]
+        return points, bridges
+
+    def articulation_points(self) -> List[Hashable]:
+        """Équipements dont la panne déconnecte une partie du réseau."""
+        return self.critical_elements()[0]
+
+    def bridges(self) -> List[Any]:
+        """Clés des liens dont la coupure déconnecte une partie du réseau."""
+        return self.critical_elements()[1]
+
+    # ------------------------------------------------------------------
+    # Rayon d'impact
+    # ------------------------------------------------------------------
+
+    def components(self, excluded: Iterable[Hashable] = ()) -> List[List[Hashable]]:
+        """Composantes connexes, hors équipements exclus, de la plus grande à la plus petite."""
+        node_count = len(self.node_ids)
+        seen = bytearray(node_count)
+        for node_id in excluded:
+            u = self.index.get(node_id)
+            if u is not None:
+                seen[u] = 1
+
+        offsets, neighbors = self.offsets, self.neighbors
+        components = []
+        for start in range(node_count):
+            if seen[start]:
+                continue
+            seen[start] = 1
+            component = [start]
+            queue = deque(component)
+            while queue:
+                u = queue.popleft()
+                for position in range(offsets[u], offsets[u + 1]):
+                    v = neighbors[position]
+                    if not seen[v]:
+                        seen[v] = 1
+                        component.append(v)
+                        queue.append(v)
+            components.append([self.node_ids[u] for u in component])
+        components.sort(key=len, reverse=True)
+        return components
+
+    def blast_radius(self, failed: Iterable[Hashable],
+                     roots: Optional[Iterable[Hashable]] = None) -> Dict[str, Any]:
+        """
+        Équipements isolés par la panne d'un ensemble d'équipements.
+
+        Un équipement est isolé s'il n'est plus relié à aucune racine (par
+        défaut : la plus grande composante restante).
+
+        Returns:
+            failed, isolated (identifiants) et nombre de composantes restantes
+        """
+        failed = [node_id for node_id in failed if node_id in self.index]
+        failed_set = set(failed)
+        components = self.components(failed_set)
+        root_set = set(roots or ()) - failed_set
+
+        if root_set:
+            connected = [component for component in components if root_set.intersection(component)]
+        else:
+            connected = components[:1]
+        kept = {node_id for component in connected for node_id in component}
+
+        isolated = [
+            node_id for component in components for node_id in component
+            if node_id not in kept
+        ]
+        return {
+            'failed': failed,
+            'isolated': isolated,
+            'components': len(components)
+        }
+
+    def _indices(self, *node_ids: Hashable) -> List[int]:
+        indices = []
+        for node_id in node_ids:
+            if node_id not in self.index:
+                raise NetworkDeviceNotFoundException(str(node_id))
+            indices.append(self.index[node_id])
+        return indices
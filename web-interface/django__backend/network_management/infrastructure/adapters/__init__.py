@@ -9,10 +9,12 @@ from .django_device_repository import DjangoDeviceRepository
 from .django_interface_repository import DjangoInterfaceRepository
 from .django_configuration_repository import DjangoConfigurationRepository
 from .pysnmp_client_adapter import PySnmpClientAdapter
+from .topology_snapshot import TopologySnapshotBuilder
 
 __all__ = [
     'DjangoDeviceRepository',
     'DjangoInterfaceRepository',
     'DjangoConfigurationRepository',
     'PySnmpClientAdapter',
+    'TopologySnapshotBuilder',
 ] 
\ No newline at end of file
@@ -0,0 +1,252 @@
+"""
+Instantané de topologie mis en cache.
+
+Ce module construit la carte complète du réseau (équipements, interfaces,
+connexions) en trois requêtes ensemblistes, la sérialise (msgpack, ou JSON
+à défaut) et la conserve dans le cache sous une clé versionnée. Les signaux
+de sauvegarde et de suppression invalident l'instantané en changeant de
+génération : une carte volumineuse est ainsi servie par une seule lecture
+du cache au lieu de plusieurs requêtes ORM par lien.
+"""
+
+import json
+import logging
+import uuid
+from typing import Any, Dict, Iterable, Optional
+
+from django.core.cache import cache as default_cache
+from django.utils import timezone
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+from ...application.ports.output_ports import TopologySnapshotPort
+from ..models import NetworkConnection, NetworkDevice, NetworkInterface
+
+logger = logging.getLogger(__name__)
+
+
+# Version du format de l'instantané (à incrémenter si sa structure change)
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_CACHE_PREFIX = "network_management:topology_snapshot"
+SNAPSHOT_GENERATION_KEY = f"{SNAPSHOT_CACHE_PREFIX}:generation"
+# L'instantané est invalidé par les signaux ; la durée de vie borne seulement
+# la rétention d'une génération abandonnée
+SNAPSHOT_CACHE_TTL = 60 * 60 * 6
+
+# Champs lus pour chaque modèle
+DEVICE_FIELDS = (
+    'id', 'name', 'hostname', 'ip_address', 'device_type', 'vendor', 'model',
+    'location', 'is_active', 'is_virtual'
+)
+INTERFACE_FIELDS = ('id', 'device_id', 'name', 'status', 'speed')
+CONNECTION_FIELDS = (
+    'id', 'source_device_id', 'source_interface_id', 'target_device_id',
+    'target_interface_id', 'connection_type', 'status'
+)
+
+
+def _dumps(snapshot: Dict[str, Any]) -> bytes:
+    if MSGPACK_AVAILABLE:
+        return msgpack.packb(snapshot, use_bin_type=True)
+    return json.dumps(snapshot, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(payload: bytes) -> Dict[str, Any]:
+    if MSGPACK_AVAILABLE:
+        return msgpack.unpackb(payload, raw=False)
+    return json.loads(payload)
+
+
+def filter_snapshot(snapshot: Dict[str, Any], device_ids: Optional[Iterable[Any]] = None,
+                    device_type: Optional[str] = None,
+                    location: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Restreint un instantané à un sous-ensemble d'équipements.
+
+    Seules les connexions dont les deux extrémités sont conservées sont
+    retenues. L'instantané d'origine n'est pas modifié.
+
+    Args:
+        snapshot: Instantané de topologie
+        device_ids: Identifiants des équipements à conserver (optionnel)
+        device_type: Type d'équipement (optionnel)
+        location: Emplacement / zone (optionnel)
+
+    Returns:
+        Instantané filtré
+    """
+    if device_ids is None and not device_type and not location:
+        return snapshot
+
+    wanted = {str(device_id) for device_id in device_ids} if device_ids is not None else None
+    nodes = [
+        node for node in snapshot['nodes']
+        if (wanted is None or node['id'] in wanted)
+        and (not device_type or node['type'] == device_type)
+        and (not location or node['location'] == location)
+    ]
+    kept = {node['id'] for node in nodes}
+    edges = [edge for edge in snapshot['edges'] if edge['source'] in kept and edge['target'] in kept]
+
+    return {
+        **snapshot,
+        'nodes': nodes,
+        'edges': edges,
+        'metadata': {**snapshot['metadata'], 'node_count': len(nodes), 'edge_count': len(edges)}
+    }
+
+
+class TopologySnapshotBuilder(TopologySnapshotPort):
+    """
+    Construit et met en cache l'instantané de la topologie.
+
+    La clé de l'instantané inclut le format de sérialisation et la version du
+    format ; l'instantané y est rangé avec le jeton de génération sous lequel
+    il a été construit. Invalider revient à tirer un nouveau jeton, ce qui ne
+    nécessite ni suppression par motif ni verrou. Un instantané construit
+    pendant une invalidation porte l'ancienne génération et n'est donc jamais
+    servi.
+    """
+
+    def __init__(self, cache=None, timeout: int = SNAPSHOT_CACHE_TTL):
+        """
+        Initialise le constructeur d'instantanés.
+
+        Args:
+            cache: Backend de cache Django (cache par défaut si None)
+            timeout: Durée de vie d'un instantané en cache (secondes)
+        """
+        self.cache = cache if cache is not None else default_cache
+        self.timeout = timeout
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """
+        Récupère l'instantané courant depuis le cache, ou le construit.
+
+        La génération courante et l'instantané sont lus en un seul aller-retour
+        (`get_many`) ; l'instantané n'est servi que si la génération sous
+        laquelle il a été construit est toujours la génération courante.
+
+        Returns:
+            Instantané de la topologie
+        """
+        key = self._snapshot_key()
+        values = self.cache.get_many([SNAPSHOT_GENERATION_KEY, key])
+        generation = values.get(SNAPSHOT_GENERATION_KEY)
+
+        cached = values.get(key)
+        if generation is not None and cached is not None:
+            try:
+                cached_generation, payload = cached
+                if cached_generation == generation:
+                    return _loads(payload)
+            except Exception as e:
+                logger.warning(f"Instantané de topologie illisible, reconstruction: {e}")
+
+        if generation is None:
+            generation = self._create_generation()
+        snapshot = self.build(generation)
+        self.cache.set(key, (generation, _dumps(snapshot)), self.timeout)
+        return snapshot
+
+    def invalidate(self) -> None:
+        """Invalide l'instantané courant en changeant de génération."""
+        self.cache.set(SNAPSHOT_GENERATION_KEY, uuid.uuid4().hex, None)
+
+    def build(self, generation: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Construit l'instantané en trois requêtes (équipements, interfaces,
+        connexions), sans instancier de modèles.
+
+        Args:
+            generation: Jeton de génération enregistré dans les métadonnées
+
+        Returns:
+            Instantané de la topologie
+        """
+        interfaces = {
+            interface['id']: interface
+            for interface in NetworkInterface.objects.values(*INTERFACE_FIELDS)
+        }
+        interface_counts: Dict[int, int] = {}
+        for interface in interfaces.values():
+            device_id = interface['device_id']
+            interface_counts[device_id] = interface_counts.get(device_id, 0) + 1
+
+        nodes = [
+            {
+                'id': str(device['id']),
+                'name': device['name'],
+                'label': device['name'],
+                'hostname': device['hostname'],
+                'type': device['device_type'],
+                'status': 'active' if device['is_active'] else 'inactive',
+                'ip_address': device['ip_address'],
+                'vendor': device['vendor'],
+                'model': device['model'],
+                'location': device['location'],
+                'is_virtual': device['is_virtual'],
+                'interface_count': interface_counts.get(device['id'], 0)
+            }
+            for device in NetworkDevice.objects.values(*DEVICE_FIELDS)
+        ]
+
+        edges = []
+        for connection in NetworkConnection.objects.values(*CONNECTION_FIELDS):
+            source_interface = interfaces.get(connection['source_interface_id'], {})
+            target_interface = interfaces.get(connection['target_interface_id'], {})
+            speeds = [
+                speed for speed in (source_interface.get('speed'), target_interface.get('speed'))
+                if speed
+            ]
+            edges.append({
+                'id': str(connection['id']),
+                'source': str(connection['source_device_id']),
+                'target': str(connection['target_device_id']),
+                'interface_source': source_interface.get('name'),
+                'interface_target': target_interface.get('name'),
+                'type': connection['connection_type'],
+                'status': connection['status'],
+                # Débit du lien en Mbit/s (le plus lent des deux ports)
+                'bandwidth': min(speeds) / 1_000_000 if speeds else None
+            })
+
+        return {
+            'version': SNAPSHOT_FORMAT_VERSION,
+            'nodes': nodes,
+            'edges': edges,
+            'metadata': {
+                'generation': generation,
+                'generated_at': timezone.now().isoformat(),
+                'node_count': len(nodes),
+                'edge_count': len(edges)
+            }
+        }
+
+    def _create_generation(self) -> str:
+        generation = uuid.uuid4().hex
+        if not self.cache.add(SNAPSHOT_GENERATION_KEY, generation, None):
+            generation = self.cache.get(SNAPSHOT_GENERATION_KEY) or generation
+        return generation
+
+    @staticmethod
+    def _snapshot_key() -> str:
+        codec = 'msgpack' if MSGPACK_AVAILABLE else 'json'
+        return f"{SNAPSHOT_CACHE_PREFIX}:{codec}:v{SNAPSHOT_FORMAT_VERSION}"
+
+
+topology_snapshot_builder = TopologySnapshotBuilder()
+
+
+def get_topology_snapshot() -> Dict[str, Any]:
+    """Instantané courant de la topologie (une lecture du cache en régime établi)."""
+    return topology_snapshot_builder.get_snapshot()
+
+
+def invalidate_topology_snapshot() -> None:
+    """Invalide l'instantané courant de la topologie."""
+    topology_snapshot_builder.invalidate()
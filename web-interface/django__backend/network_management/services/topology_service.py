@@ -13,6 +13,7 @@ from django.db import transaction
 from django.core.cache import cache
 from django.utils import timezone
 
+from api_clients.network.gns3_async_client import AsyncGNS3Client
 from ..models import NetworkDevice, NetworkInterface, NetworkTopology
 from gns3_integration.infrastructure.gns3_detection_service import get_gns3_server_status
 
@@ -30,11 +31,17 @@ class NetworkTopologyService:
     - API unifiée pour tous les modules
     """
     
-    def __init__(self):
-        """Initialise le service de topologie."""
+    def __init__(self, gns3_client: Optional[AsyncGNS3Client] = None):
+        """
+        Initialise le service de topologie.
+        
+        Args:
+            gns3_client: Client GNS3 asynchrone (créé à la première synchronisation si None)
+        """
         self.cache_timeout = 300  # 5 minutes
         self.discovery_cache_key = "network_topology_discovery"
         self.gns3_sync_key = "gns3_topology_sync"
+        self.gns3_client = gns3_client
         
     async def sync_with_gns3(self, force_sync: bool = False) -> Dict[str, Any]:
         """
@@ -89,66 +96,48 @@ class NetworkTopologyService:
     async def _sync_from_gns3_server(self, sync_result: Dict[str, Any]) -> Dict[str, Any]:
         """Synchronise depuis le serveur GNS3 réel."""
         try:
-            import requests
+            if self.gns3_client is None:
+                self.gns3_client = AsyncGNS3Client(timeout=10)
             
-            # Récupérer les projets GNS3
-            projects_response = requests.get("http://localhost:3080/v2/projects", timeout=10)
+            # Projets, nœuds et liens récupérés en parallèle sur des connexions persistantes
+            projects = await self.gns3_client.get_topology()
             
-            if projects_response.status_code == 200:
-                projects = projects_response.json()
+            for project in projects:
+                project_id = project['project_id']
+                project_name = project['name']
                 
-                for project in projects:
-                    project_id = project['project_id']
-                    project_name = project['name']
-                    
-                    # Récupérer les nœuds du projet
-                    nodes_response = requests.get(
-                        f"http://localhost:3080/v2/projects/{project_id}/nodes",
-                        timeout=10
+                # Créer/Mettre à jour la topologie
+                topology, created = NetworkTopology.objects.get_or_create(
+                    name=f"GNS3-{project_name}",
+                    defaults={
+                        'description': f"Topologie importée de GNS3 - Projet: {project_name}",
+                        'topology_type': 'gns3_imported',
+                        'is_active': True,
+                        'gns3_project_id': project_id
+                    }
+                )
+                
+                if not created:
+                    topology.last_sync = timezone.now()
+                    topology.save()
+                
+                sync_result['topologies_synced'] += 1
+                
+                # Synchroniser les nœuds comme équipements
+                for node in project['nodes']:
+                    device_result = await self._sync_gns3_node_to_device(
+                        node, project_id, topology
                     )
                     
-                    if nodes_response.status_code == 200:
-                        nodes = nodes_response.json()
-                        
-                        # Créer/Mettre à jour la topologie
-                        topology, created = NetworkTopology.objects.get_or_create(
-                            name=f"GNS3-{project_name}",
-                            defaults={
-                                'description': f"Topologie importée de GNS3 - Projet: {project_name}",
-                                'topology_type': 'gns3_imported',
-                                'is_active': True,
-                                'gns3_project_id': project_id
-                            }
-                        )
-                        
-                        if not created:
-                            topology.last_sync = timezone.now()
-                            topology.save()
-                        
-                        sync_result['topologies_synced'] += 1
-                        
-                        # Synchroniser les nœuds comme équipements
-                        for node in nodes:
-                            device_result = await self._sync_gns3_node_to_device(
-                                node, project_id, topology
-                            )
-                            
-                            if device_result['success']:
-                                sync_result['devices_synced'] += 1
-                                sync_result['interfaces_synced'] += device_result['interfaces_count']
-                            else:
-                                sync_result['errors'].extend(device_result['errors'])
-                        
-                        # Récupérer les liens du projet
-                        links_response = requests.get(
-                            f"http://localhost:3080/v2/projects/{project_id}/links",
-                            timeout=10
-                        )
-                        
-                        if links_response.status_code == 200:
-                            links = links_response.json()
-                            await self._sync_gns3_links(links, topology)
-                            
+                    if device_result['success']:
+                        sync_result['devices_synced'] += 1
+                        sync_result['interfaces_synced'] += device_result['interfaces_count']
+                    else:
+                        sync_result['errors'].extend(device_result['errors'])
+                
+                if project['links']:
+                    await self._sync_gns3_links(project['links'], topology)
+                    
         except Exception as e:
             sync_result['errors'].append(f"Erreur synchronisation serveur GNS3: {e}")
             
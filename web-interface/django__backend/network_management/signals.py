@@ -6,16 +6,40 @@ des actions automatiques lors de certains événements.
 """
 
 import logging
+from django.db import transaction
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .infrastructure.models import NetworkDevice, NetworkInterface, NetworkConnection
+from .infrastructure.adapters.topology_snapshot import (
+    CONNECTION_FIELDS, DEVICE_FIELDS, INTERFACE_FIELDS, invalidate_topology_snapshot
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _field_name(field):
+    """Nom d'un champ sans le suffixe `_id` des clés étrangères."""
+    return field[:-3] if field.endswith('_id') else field
+
+
+def _invalidate_topology_snapshot(update_fields=None, snapshot_fields=()):
+    """
+    Invalide l'instantané de topologie après validation de la transaction.
+
+    Une sauvegarde partielle (`update_fields`) qui ne touche aucun champ de
+    l'instantané ne l'invalide pas.
+    """
+    if update_fields and not (
+        {_field_name(field) for field in snapshot_fields} & {_field_name(field) for field in update_fields}
+    ):
+        return
+    transaction.on_commit(invalidate_topology_snapshot)
+
+
 @receiver(post_save, sender=NetworkDevice)
 def device_saved(sender, instance, created, **kwargs):
     """Signal déclenché lors de la sauvegarde d'un équipement réseau."""
+    _invalidate_topology_snapshot(kwargs.get('update_fields'), DEVICE_FIELDS)
     if created:
         logger.info(f"✅ Nouvel équipement réseau créé: {instance.name} ({instance.device_type})")
         # Actions à effectuer lors de la création d'un nouvel équipement
@@ -29,12 +53,14 @@ def device_saved(sender, instance, created, **kwargs):
 def device_deleted(sender, instance, **kwargs):
     """Signal déclenché lors de la suppression d'un équipement réseau."""
     logger.warning(f"🗑️ Équipement réseau supprimé: {instance.name}")
+    _invalidate_topology_snapshot()
     # Actions de nettoyage : supprimer les interfaces, connexions, alertes associées
 
 
 @receiver(post_save, sender=NetworkInterface)
 def interface_saved(sender, instance, created, **kwargs):
     """Signal déclenché lors de la sauvegarde d'une interface réseau."""
+    _invalidate_topology_snapshot(kwargs.get('update_fields'), INTERFACE_FIELDS)
     if created:
         logger.info(f"✅ Nouvelle interface créée: {instance.name} sur {instance.device.name}")
     else:
@@ -44,6 +70,20 @@ def interface_saved(sender, instance, created, **kwargs):
 @receiver(post_save, sender=NetworkConnection)
 def connection_saved(sender, instance, created, **kwargs):
     """Signal déclenché lors de la sauvegarde d'une connexion réseau."""
+    _invalidate_topology_snapshot(kwargs.get('update_fields'), CONNECTION_FIELDS)
     if created:
         logger.info(f"🔗 Nouvelle connexion créée: {instance.source_interface} <-> {instance.target_interface}")
-        # Actions possibles : mise à jour de la topologie, recalcul des chemins, etc. 
\ No newline at end of file
+        # Actions possibles : mise à jour de la topologie, recalcul des chemins, etc.
+
+
+@receiver(post_delete, sender=NetworkInterface)
+def interface_deleted(sender, instance, **kwargs):
+    """Signal déclenché lors de la suppression d'une interface réseau."""
+    _invalidate_topology_snapshot()
+
+
+@receiver(post_delete, sender=NetworkConnection)
+def connection_deleted(sender, instance, **kwargs):
+    """Signal déclenché lors de la suppression d'une connexion réseau."""
+    logger.info(f"✂️ Connexion supprimée: {instance.source_interface_id} <-> {instance.target_interface_id}")
+    _invalidate_topology_snapshot()
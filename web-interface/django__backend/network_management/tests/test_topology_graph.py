@@ -0,0 +1,241 @@
+"""
+Tests du moteur de graphe de topologie.
+"""
+
+import heapq
+import itertools
+import random
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ..domain.entities import (
+    ConnectionEntity, DeviceIdentityEntity, DeviceType, InterfaceType,
+    NetworkDeviceEntity, NetworkInterfaceEntity, TopologyEntity
+)
+from ..domain import topology_graph
+from ..domain.exceptions import NetworkDeviceNotFoundException
+from ..domain.topology_graph import TopologyGraph
+
+
+def _graph(edges, nodes=None, costs=None):
+    nodes = nodes if nodes is not None else sorted({n for edge in edges for n in edge})
+    return TopologyGraph(nodes, [
+        (u, v, (costs or {}).get((u, v), 1.0), f'{u}-{v}') for u, v in edges
+    ])
+
+
+def _simple_paths(graph, source, target):
+    """Référence : énumération de tous les chemins simples."""
+    adjacency = {node: set(graph.neighbors_of(node)) for node in graph.node_ids}
+    paths = []
+
+    def walk(path):
+        if path[-1] == target:
+            paths.append(list(path))
+            return
+        for neighbor in adjacency[path[-1]]:
+            if neighbor not in path:
+                path.append(neighbor)
+                walk(path)
+                path.pop()
+
+    walk([source])
+    return paths
+
+
+def _random_graph(rng, nodes, edges):
+    pairs = set()
+    while len(pairs) < edges:
+        u, v = rng.sample(range(nodes), 2)
+        pairs.add((min(u, v), max(u, v)))
+    costs = {pair: float(rng.randint(1, 5)) for pair in pairs}
+    return _graph(sorted(pairs), nodes=list(range(nodes)), costs=costs)
+
+
+def _grid(width, height):
+    edges = []
+    for x in range(width):
+        for y in range(height):
+            node = x * height + y
+            if x + 1 < width:
+                edges.append((node, node + height))
+            if y + 1 < height:
+                edges.append((node, node + 1))
+    return _graph(edges, nodes=list(range(width * height)))
+
+
+def _leaf_spine(spines, leaves, hosts_per_leaf):
+    edges = []
+    for leaf in range(leaves):
+        leaf_id = f'leaf{leaf}'
+        edges.extend((f'spine{spine}', leaf_id) for spine in range(spines))
+        edges.extend((leaf_id, f'host{leaf}-{host}') for host in range(hosts_per_leaf))
+    return _graph(edges)
+
+
+class TopologyGraphTest(unittest.TestCase):
+    """Tests des algorithmes du graphe."""
+
+    def test_k_shortest_paths_match_enumeration(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            graph = _random_graph(rng, 9, 16)
+            source, target = rng.sample(range(9), 2)
+            expected = sorted(graph.path_cost(path) for path in _simple_paths(graph, source, target))
+
+            found = graph.k_shortest_paths(source, target, 6)
+
+            self.assertEqual([cost for cost, _ in found], expected[:6])
+            self.assertEqual(len({tuple(path) for _, path in found}), len(found))
+            for cost, path in found:
+                self.assertEqual((path[0], path[-1]), (source, target))
+                self.assertAlmostEqual(graph.path_cost(path), cost)
+
+    def test_shortest_path_uses_link_costs(self):
+        graph = _graph([('a', 'b'), ('b', 'd'), ('a', 'c'), ('c', 'd')], costs={('a', 'b'): 10.0})
+
+        self.assertEqual(graph.shortest_path('a', 'd'), (2.0, ['a', 'c', 'd']))
+        self.assertEqual(graph.path_links(['a', 'c', 'd']), ['a-c', 'c-d'])
+
+    def test_unreachable_and_unknown_devices(self):
+        graph = _graph([('a', 'b')], nodes=['a', 'b', 'c'])
+
+        self.assertEqual(graph.k_shortest_paths('a', 'c', 3), [])
+        with self.assertRaises(NetworkDeviceNotFoundException):
+            graph.shortest_path('a', 'z')
+
+    def test_cycle_basis(self):
+        rng = random.Random(1)
+        graph = _random_graph(rng, 30, 45)
+
+        cycles = graph.cycle_basis()
+
+        components = len(graph.components())
+        self.assertEqual(len(cycles), graph.edge_count - len(graph) + components)
+        adjacency = {node: set(graph.neighbors_of(node)) for node in graph.node_ids}
+        for cycle in cycles:
+            self.assertEqual(cycle[0], cycle[-1])
+            self.assertEqual(len(set(cycle[:-1])), len(cycle) - 1)
+            for u, v in zip(cycle, cycle[1:]):
+                self.assertIn(v, adjacency[u])
+
+    def test_critical_elements_match_brute_force(self):
+        rng = random.Random(2)
+        for _ in range(10):
+            graph = _random_graph(rng, 15, 18)
+            components = len(graph.components())
+
+            points, bridges = graph.critical_elements()
+
+            expected_points = [
+                node for node in graph.node_ids
+                if len(graph.components([node])) > components
+            ]
+            expected_bridges = []
+            for key in graph.edge_keys:
+                others = [
+                    (graph.node_ids[a], graph.node_ids[b], 1.0, k)
+                    for a, b, k in zip(graph.edge_source, graph.edge_target, graph.edge_keys) if k != key
+                ]
+                if len(TopologyGraph(graph.node_ids, others).components()) > components:
+                    expected_bridges.append(key)
+            self.assertEqual(sorted(points), expected_points)
+            self.assertEqual(sorted(bridges), sorted(expected_bridges))
+
+    def test_parallel_links_are_not_bridges(self):
+        graph = TopologyGraph(['a', 'b', 'c'], [('a', 'b', 1.0, 1), ('a', 'b', 1.0, 2), ('b', 'c', 1.0, 3)])
+
+        self.assertEqual(graph.critical_elements(), (['b'], [3]))
+        self.assertEqual(graph.cycle_basis(), [['a', 'b', 'a']])
+
+    def test_blast_radius(self):
+        graph = _leaf_spine(2, 3, 2)
+
+        self.assertEqual(graph.blast_radius(['spine0'])['isolated'], [])
+        self.assertEqual(sorted(graph.blast_radius(['leaf1'])['isolated']), ['host1-0', 'host1-1'])
+        radius = graph.blast_radius(['spine0', 'spine1'], roots=['leaf0'])
+        self.assertEqual(len(radius['isolated']), 6)
+
+
+class TopologyEntityPathTest(unittest.TestCase):
+    """Tests des chemins et boucles d'une TopologyEntity."""
+
+    def _topology(self, links):
+        topology = TopologyEntity(name='lab')
+        interfaces = itertools.count(1)
+        devices = {}
+        for device_id in sorted({d for link in links for d in link}):
+            device = NetworkDeviceEntity(
+                identity=DeviceIdentityEntity(
+                    name=f'r{device_id}', ip_address=f'10.0.0.{device_id}', device_type=DeviceType.ROUTER
+                ),
+                id=device_id
+            )
+            devices[device_id] = device
+            topology.add_device(device)
+        for number, (source, target) in enumerate(links, start=1):
+            ends = []
+            for device_id in (source, target):
+                interface = NetworkInterfaceEntity(
+                    name=f'eth{number}', interface_type=InterfaceType.ETHERNET, id=next(interfaces)
+                )
+                devices[device_id].add_interface(interface)
+                ends.append(interface.id)
+            topology.add_connection(ConnectionEntity(ends[0], ends[1], id=number))
+        return topology
+
+    def test_calculate_path_and_detect_loops(self):
+        topology = self._topology([(1, 2), (2, 3), (1, 4), (4, 3), (3, 5)])
+
+        paths = topology.calculate_path(1, 5)
+
+        self.assertEqual(sorted(paths), [[1, 2, 3, 5], [1, 4, 3, 5]])
+        self.assertEqual(topology.calculate_path(1, 5, max_paths=1)[0][-1], 5)
+        self.assertEqual(topology.calculate_path(1, 99), [])
+        loops = topology.detect_loops()
+        self.assertEqual(len(loops), 1)
+        self.assertEqual(sorted(loops[0][:-1]), [1, 2, 3, 4])
+
+
+class TopologyGraphPerformanceTest(unittest.TestCase):
+    """Benchmarks sur des fabrics synthétiques de 10 000 équipements."""
+
+    def _k_shortest_paths(self, graph, source, target, k):
+        """k plus courts chemins et nombre de nœuds extraits des tas."""
+        heappop = MagicMock(side_effect=heapq.heappop)
+        counting_heapq = SimpleNamespace(heappush=heapq.heappush, heappop=heappop)
+        with patch.object(topology_graph, 'heapq', counting_heapq):
+            paths = graph.k_shortest_paths(source, target, k)
+        return paths, heappop.call_count
+
+    @pytest.mark.performance
+    def test_ten_thousand_node_grid(self):
+        """Maillage 100 x 100 : 5 plus courts chemins guidés par A*, boucles et éléments critiques."""
+        graph = _grid(100, 100)
+        paths, popped = self._k_shortest_paths(graph, 0, 9999, 5)
+        cycles = graph.cycle_basis()
+        points, bridges = graph.critical_elements()
+
+        self.assertEqual([cost for cost, _ in paths], [198.0] * 5)
+        # Sans heuristique, chacune des ~1 000 déviations parcourrait tout le maillage
+        self.assertLess(popped, 20 * len(graph))
+        self.assertEqual(len(cycles), 99 * 99)
+        self.assertEqual((points, bridges), ([], []))
+
+    @pytest.mark.performance
+    def test_ten_thousand_node_leaf_spine(self):
+        """Leaf-spine (16 spines, 400 leaves, 24 hôtes par leaf) : chemins, éléments critiques, impact."""
+        graph = _leaf_spine(16, 400, 24)
+        paths, popped = self._k_shortest_paths(graph, 'host0-0', 'host399-23', 10)
+        points, bridges = graph.critical_elements()
+        radius = graph.blast_radius(['leaf7'])
+
+        self.assertEqual(len(graph), 16 + 400 + 400 * 24)
+        self.assertEqual(len(paths), 10)
+        self.assertLess(popped, 20 * len(graph))
+        self.assertEqual(len(points), 400)
+        self.assertEqual(len(bridges), 400 * 24)
+        self.assertEqual(len(radius['isolated']), 24)
@@ -0,0 +1,228 @@
+"""
+Tests de l'instantané de topologie mis en cache.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ..application.services.topology_service import TopologyService
+from ..domain.entities import TopologyEntity
+from ..infrastructure.adapters import topology_snapshot
+from ..infrastructure.adapters.topology_snapshot import TopologySnapshotBuilder, filter_snapshot
+
+
+class _DictCache:
+    """Cache minimal en mémoire (sous-ensemble de l'API du cache Django)."""
+
+    def __init__(self):
+        self.data = {}
+        self.reads = 0
+
+    def get(self, key, default=None):
+        self.reads += 1
+        return self.data.get(key, default)
+
+    def get_many(self, keys):
+        self.reads += 1
+        return {key: self.data[key] for key in keys if key in self.data}
+
+    def set(self, key, value, timeout=None):
+        self.data[key] = value
+
+    def add(self, key, value, timeout=None):
+        if key in self.data:
+            return False
+        self.data[key] = value
+        return True
+
+
+DEVICES = [
+    {'id': 1, 'name': 'core', 'hostname': 'core', 'ip_address': '10.0.0.1', 'device_type': 'router',
+     'vendor': 'cisco', 'model': '', 'location': 'dc1', 'is_active': True, 'is_virtual': False},
+    {'id': 2, 'name': 'access', 'hostname': 'access', 'ip_address': '10.0.0.2', 'device_type': 'switch',
+     'vendor': 'cisco', 'model': '', 'location': 'dc1', 'is_active': True, 'is_virtual': False},
+    {'id': 3, 'name': 'edge', 'hostname': 'edge', 'ip_address': '10.0.0.3', 'device_type': 'router',
+     'vendor': 'juniper', 'model': '', 'location': 'dc2', 'is_active': False, 'is_virtual': False},
+]
+INTERFACES = [
+    {'id': 10, 'device_id': 1, 'name': 'Gi0/0', 'status': 'up', 'speed': 10_000_000_000},
+    {'id': 11, 'device_id': 1, 'name': 'Gi0/1', 'status': 'up', 'speed': 1_000_000_000},
+    {'id': 20, 'device_id': 2, 'name': 'Gi1/0', 'status': 'up', 'speed': 1_000_000_000},
+    {'id': 30, 'device_id': 3, 'name': 'ge-0/0/0', 'status': 'up', 'speed': None},
+]
+CONNECTIONS = [
+    {'id': 100, 'source_device_id': 1, 'source_interface_id': 11, 'target_device_id': 2,
+     'target_interface_id': 20, 'connection_type': 'ethernet', 'status': 'up'},
+    {'id': 101, 'source_device_id': 1, 'source_interface_id': 10, 'target_device_id': 3,
+     'target_interface_id': 30, 'connection_type': 'ethernet', 'status': 'up'},
+]
+
+
+def _model(rows):
+    model = MagicMock()
+    model.objects.values.return_value = rows
+    return model
+
+
+class TopologySnapshotBuilderTest(unittest.TestCase):
+    """Tests de construction et de mise en cache de l'instantané."""
+
+    def setUp(self):
+        self.models = {
+            'NetworkDevice': _model(DEVICES),
+            'NetworkInterface': _model(INTERFACES),
+            'NetworkConnection': _model(CONNECTIONS),
+        }
+        patcher = patch.multiple(topology_snapshot, **self.models)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = _DictCache()
+        self.builder = TopologySnapshotBuilder(cache=self.cache)
+
+    def _query_count(self):
+        return sum(model.objects.values.call_count for model in self.models.values())
+
+    def test_build_uses_three_set_based_queries(self):
+        snapshot = self.builder.build()
+
+        self.assertEqual(self._query_count(), 3)
+        self.assertEqual([node['id'] for node in snapshot['nodes']], ['1', '2', '3'])
+        self.assertEqual(snapshot['nodes'][0]['interface_count'], 2)
+        self.assertEqual(snapshot['nodes'][2]['status'], 'inactive')
+        self.assertEqual(snapshot['edges'][0], {
+            'id': '100', 'source': '1', 'target': '2',
+            'interface_source': 'Gi0/1', 'interface_target': 'Gi1/0',
+            'type': 'ethernet', 'status': 'up', 'bandwidth': 1000.0
+        })
+        self.assertEqual(snapshot['edges'][1]['bandwidth'], 10000.0)
+
+    def test_snapshot_is_served_from_cache(self):
+        first = self.builder.get_snapshot()
+        second = self.builder.get_snapshot()
+
+        self.assertEqual(self._query_count(), 3)
+        self.assertEqual(first, second)
+        self.assertEqual(second['version'], topology_snapshot.SNAPSHOT_FORMAT_VERSION)
+
+    def test_cached_read_is_one_round_trip(self):
+        self.builder.get_snapshot()
+        self.cache.reads = 0
+
+        self.builder.get_snapshot()
+
+        self.assertEqual(self.cache.reads, 1)
+
+    def test_invalidate_forces_rebuild(self):
+        first = self.builder.get_snapshot()
+        self.builder.invalidate()
+        second = self.builder.get_snapshot()
+
+        self.assertEqual(self._query_count(), 6)
+        self.assertNotEqual(first['metadata']['generation'], second['metadata']['generation'])
+
+    def test_unreadable_payload_is_rebuilt(self):
+        self.builder.get_snapshot()
+        for key, value in list(self.cache.data.items()):
+            if key != topology_snapshot.SNAPSHOT_GENERATION_KEY:
+                self.cache.data[key] = (value[0], b'\xff\x00 corrupted')
+
+        snapshot = self.builder.get_snapshot()
+
+        self.assertEqual(len(snapshot['nodes']), 3)
+        self.assertEqual(self._query_count(), 6)
+
+
+class SnapshotInvalidationSignalTest(unittest.TestCase):
+    """Tests du filtrage des sauvegardes partielles par les signaux."""
+
+    def setUp(self):
+        from .. import signals
+        self.signals = signals
+        patcher = patch.object(signals, 'transaction')
+        self.transaction = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_foreign_key_update_fields_invalidate(self):
+        for update_fields in (['source_device_id'], ['source_device'], ['status']):
+            self.transaction.on_commit.reset_mock()
+            self.signals._invalidate_topology_snapshot(update_fields, topology_snapshot.CONNECTION_FIELDS)
+            self.transaction.on_commit.assert_called_once()
+
+    def test_unrelated_update_fields_do_not_invalidate(self):
+        self.signals._invalidate_topology_snapshot(['last_seen'], topology_snapshot.DEVICE_FIELDS)
+
+        self.transaction.on_commit.assert_not_called()
+
+
+class _TopologyService(TopologyService):
+    """Service concret : les cas d'usage non implémentés ne sont pas testés ici."""
+
+    def get_path_between_devices(self, source_id, target_id):
+        raise NotImplementedError
+
+    def get_device_neighbors(self, device_id):
+        raise NotImplementedError
+
+    def update_topology_layout(self, layout_data):
+        raise NotImplementedError
+
+
+class TopologyServiceSnapshotTest(unittest.TestCase):
+    """Le service de topologie génère ses graphes depuis l'instantané partagé."""
+
+    def test_graph_uses_shared_snapshot_by_default(self):
+        builder = TopologySnapshotBuilder(cache=_DictCache())
+        with patch.multiple(
+            topology_snapshot,
+            NetworkDevice=_model(DEVICES),
+            NetworkInterface=_model(INTERFACES),
+            NetworkConnection=_model(CONNECTIONS),
+            topology_snapshot_builder=builder
+        ):
+            topology_repository = MagicMock()
+            topology_repository.get_by_id.return_value = TopologyEntity(
+                name='dc1', devices=[MagicMock(id=1), MagicMock(id=2)], id=5
+            )
+            connection_repository = MagicMock()
+            service = _TopologyService(MagicMock(), MagicMock(), connection_repository, topology_repository)
+
+            graph = service.generate_graph(5)
+
+        self.assertIs(service._snapshot_port, builder)
+        self.assertEqual([node['id'] for node in graph['nodes']], [1, 2])
+        self.assertEqual(graph['links'][0]['source_interface'], 'Gi0/1')
+        connection_repository.get_by_topology_id.assert_not_called()
+
+
+class FilterSnapshotTest(unittest.TestCase):
+    """Tests du filtrage d'un instantané."""
+
+    def setUp(self):
+        with patch.multiple(
+            topology_snapshot,
+            NetworkDevice=_model(DEVICES),
+            NetworkInterface=_model(INTERFACES),
+            NetworkConnection=_model(CONNECTIONS)
+        ):
+            self.snapshot = TopologySnapshotBuilder(cache=_DictCache()).build()
+
+    def test_no_filter_returns_snapshot(self):
+        self.assertIs(filter_snapshot(self.snapshot), self.snapshot)
+
+    def test_edges_require_both_endpoints(self):
+        filtered = filter_snapshot(self.snapshot, device_type='router')
+
+        self.assertEqual([node['id'] for node in filtered['nodes']], ['1', '3'])
+        self.assertEqual([edge['id'] for edge in filtered['edges']], ['101'])
+        self.assertEqual(filtered['metadata']['node_count'], 2)
+        self.assertEqual(len(self.snapshot['nodes']), 3)
+
+    def test_device_ids_and_location(self):
+        filtered = filter_snapshot(self.snapshot, device_ids=[1, 2, 3], location='dc1')
+
+        self.assertEqual([node['id'] for node in filtered['nodes']], ['1', '2'])
+        self.assertEqual([edge['id'] for edge in filtered['edges']], ['100'])
+
+
+if __name__ == '__main__':
+    unittest.main()
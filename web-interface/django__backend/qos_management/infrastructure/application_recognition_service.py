@@ -9,11 +9,11 @@ import re
 import logging
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
-from datetime import datetime, timedelta
 from collections import defaultdict
-import hashlib
 
 from ..domain.interfaces import TrafficClassificationService
+from .flow_table import FlowTable, TrafficFlow
+from .signature_matcher import SignatureMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -34,28 +34,20 @@ class ApplicationSignature:
 
 
 @dataclass
-class TrafficFlow:
+class FlowClassificationState:
     """
-    Représentation d'un flux de trafic pour l'analyse.
-    """
-    flow_id: str
-    source_ip: str
-    destination_ip: str
-    source_port: int
-    destination_port: int
-    protocol: str
-    start_time: datetime
-    last_seen: datetime
-    packet_count: int = 0
-    byte_count: int = 0
-    payload_samples: List[bytes] = None
-    headers: Dict[str, str] = None
+    Résultats de classification mis en cache pour un flux (5-tuple).
     
-    def __post_init__(self):
-        if self.payload_samples is None:
-            self.payload_samples = []
-        if self.headers is None:
-            self.headers = {}
+    Les classifications par port, payload et headers ne dépendent que des
+    ports, des échantillons et des headers du flux : elles ne sont recalculées
+    que pour les nouveaux échantillons de payload.
+    """
+    port_result: Dict[str, Any]
+    header_result: Dict[str, Any]
+    signature_matches: List[int]
+    samples_scanned: int = 0
+    payload_result: Optional[Dict[str, Any]] = None
+    last_classification: Optional[Dict[str, Any]] = None
 
 
 class ApplicationRecognitionService(TrafficClassificationService):
@@ -63,11 +55,15 @@ class ApplicationRecognitionService(TrafficClassificationService):
     Service de reconnaissance d'applications avec DPI et analyse comportementale.
     """
     
-    def __init__(self):
+    # Nombre maximal d'échantillons de payload conservés par flux
+    MAX_PAYLOAD_SAMPLES = 10
+    
+    def __init__(self, max_flows: int = 1000000, flow_idle_timeout: float = 1800.0):
         self.application_signatures = self._load_application_signatures()
-        self.active_flows = {}
+        self.signature_matcher = SignatureMatcher(self.application_signatures)
+        # Table bornée des flux actifs ; l'état de classification est porté par le flux
+        self.active_flows = FlowTable(max_flows=max_flows, idle_timeout=flow_idle_timeout)
         self.behavioral_models = self._initialize_behavioral_models()
-        self.classification_cache = {}
     
     def classify_traffic(self, traffic_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -83,20 +79,19 @@ class ApplicationRecognitionService(TrafficClassificationService):
             # Créer ou mettre à jour le flux
             flow = self._get_or_create_flow(traffic_data)
             
-            # Analyser le flux avec différentes méthodes
+            # Analyser le flux avec différentes méthodes (port, payload et
+            # headers sont repris du cache du flux)
+            state = self._get_flow_state(flow)
             classification_results = {
-                'port_based': self._classify_by_port(flow),
-                'payload_based': self._classify_by_payload(flow),
+                'port_based': state.port_result,
+                'payload_based': self._classify_by_payload(flow, state),
                 'behavioral_based': self._classify_by_behavior(flow),
-                'header_based': self._classify_by_headers(flow)
+                'header_based': state.header_result
             }
             
             # Fusionner les résultats et calculer la confiance
             final_classification = self._merge_classifications(classification_results)
-            
-            # Mettre en cache le résultat
-            cache_key = self._generate_cache_key(flow)
-            self.classification_cache[cache_key] = final_classification
+            state.last_classification = final_classification
             
             return final_classification
             
@@ -324,72 +319,46 @@ class ApplicationRecognitionService(TrafficClassificationService):
         Returns:
             Objet TrafficFlow
         """
-        # Générer un ID de flux unique
-        flow_id = self._generate_flow_id(traffic_data)
+        flow, created = self.active_flows.touch(
+            traffic_data.get('source_ip', ''),
+            traffic_data.get('source_port', 0),
+            traffic_data.get('destination_ip', ''),
+            traffic_data.get('destination_port', 0),
+            traffic_data.get('protocol', '')
+        )
+        flow.packet_count += 1
+        flow.byte_count += traffic_data.get('packet_size', 0)
         
-        if flow_id in self.active_flows:
-            # Mettre à jour le flux existant
-            flow = self.active_flows[flow_id]
-            flow.last_seen = datetime.now()
-            flow.packet_count += 1
-            flow.byte_count += traffic_data.get('packet_size', 0)
-            
-            # Ajouter l'échantillon de payload si disponible
-            payload = traffic_data.get('payload')
-            if payload and len(flow.payload_samples) < 10:  # Limiter les échantillons
-                flow.payload_samples.append(payload[:200])  # Premiers 200 bytes
-                
-        else:
-            # Créer un nouveau flux
-            now = datetime.now()
-            flow = TrafficFlow(
-                flow_id=flow_id,
-                source_ip=traffic_data.get('source_ip', ''),
-                destination_ip=traffic_data.get('destination_ip', ''),
-                source_port=traffic_data.get('source_port', 0),
-                destination_port=traffic_data.get('destination_port', 0),
-                protocol=traffic_data.get('protocol', ''),
-                start_time=now,
-                last_seen=now,
-                packet_count=1,
-                byte_count=traffic_data.get('packet_size', 0)
-            )
-            
-            # Ajouter le payload initial
-            payload = traffic_data.get('payload')
-            if payload:
-                flow.payload_samples.append(payload[:200])
-            
-            # Ajouter les headers
-            headers = traffic_data.get('headers', {})
+        # Ajouter l'échantillon de payload si disponible (premiers 200 bytes)
+        payload = traffic_data.get('payload')
+        if payload:
+            flow.add_payload_sample(payload[:200], self.MAX_PAYLOAD_SAMPLES)
+        
+        # Ajouter les headers du premier paquet
+        if created:
+            headers = traffic_data.get('headers')
             if headers:
-                flow.headers.update(headers)
-            
-            self.active_flows[flow_id] = flow
+                flow.headers = dict(headers)
         
         return flow
     
-    def _generate_flow_id(self, traffic_data: Dict[str, Any]) -> str:
+    def _get_flow_state(self, flow: TrafficFlow) -> FlowClassificationState:
         """
-        Génère un ID unique pour un flux.
+        Récupère (ou crée) l'état de classification d'un flux.
         
         Args:
-            traffic_data: Données de trafic
+            flow: Flux de trafic
             
         Returns:
-            ID de flux unique
+            État de classification du flux
         """
-        # Créer une clé basée sur les 5-tuples
-        key_parts = [
-            traffic_data.get('source_ip', ''),
-            str(traffic_data.get('source_port', 0)),
-            traffic_data.get('destination_ip', ''),
-            str(traffic_data.get('destination_port', 0)),
-            traffic_data.get('protocol', '')
-        ]
-        
-        key_string = '_'.join(key_parts)
-        return hashlib.md5(key_string.encode()).hexdigest()[:16]
+        if flow.classification is None:
+            flow.classification = FlowClassificationState(
+                port_result=self._classify_by_port(flow),
+                header_result=self._classify_by_headers(flow),
+                signature_matches=[0] * len(self.signature_matcher.signatures)
+            )
+        return flow.classification
     
     def _classify_by_port(self, flow: TrafficFlow) -> Dict[str, Any]:
         """
@@ -401,15 +370,14 @@ class ApplicationRecognitionService(TrafficClassificationService):
         Returns:
             Résultat de classification
         """
-        for app_name, signature in self.application_signatures.items():
-            if (flow.destination_port in signature.ports or 
-                flow.source_port in signature.ports):
-                return {
-                    'application': signature.app_name,
-                    'category': signature.category,
-                    'confidence': 0.6,  # Confiance modérée pour classification par port
-                    'method': 'port_based'
-                }
+        signature = self.signature_matcher.signature_for_ports(flow.destination_port, flow.source_port)
+        if signature is not None:
+            return {
+                'application': signature.app_name,
+                'category': signature.category,
+                'confidence': 0.6,  # Confiance modérée pour classification par port
+                'method': 'port_based'
+            }
         
         return {
             'application': 'unknown',
@@ -418,68 +386,51 @@ class ApplicationRecognitionService(TrafficClassificationService):
             'method': 'port_based'
         }
     
-    def _classify_by_payload(self, flow: TrafficFlow) -> Dict[str, Any]:
+    def _classify_by_payload(self, flow: TrafficFlow,
+                             state: Optional[FlowClassificationState] = None) -> Dict[str, Any]:
         """
         Classification basée sur l'analyse du payload (DPI).
         
+        Les échantillons sont analysés sur octets par l'automate compilé ; avec
+        un état de flux, seuls les échantillons nouveaux sont analysés.
+        
         Args:
             flow: Flux de trafic à analyser
+            state: État de classification du flux (cache)
             
         Returns:
             Résultat de classification
         """
-        if not flow.payload_samples:
-            return {
-                'application': 'unknown',
-                'category': 'unclassified',
-                'confidence': 0.0,
-                'method': 'payload_based'
-            }
+        if state is not None:
+            if state.payload_result is not None and state.samples_scanned == len(flow.payload_samples):
+                return state.payload_result
+            counts = self.signature_matcher.count_matches(
+                flow.payload_samples[state.samples_scanned:], state.signature_matches
+            )
+            state.samples_scanned = len(flow.payload_samples)
+        else:
+            counts = self.signature_matcher.count_matches(flow.payload_samples)
         
-        best_match = None
-        best_confidence = 0.0
-        
-        for app_name, signature in self.application_signatures.items():
-            confidence = 0.0
-            matches = 0
-            
-            # Analyser chaque échantillon de payload
-            for payload_sample in flow.payload_samples:
-                if isinstance(payload_sample, bytes):
-                    payload_str = payload_sample.decode('utf-8', errors='ignore')
-                else:
-                    payload_str = str(payload_sample)
-                
-                # Vérifier les patterns de payload
-                for pattern in signature.payload_patterns:
-                    try:
-                        if re.search(pattern, payload_str, re.IGNORECASE):
-                            matches += 1
-                    except re.error:
-                        continue
-            
-            # Calculer la confiance basée sur le nombre de matches
-            if matches > 0:
-                confidence = min(0.9, matches / len(signature.payload_patterns))
-                
-                if confidence > best_confidence:
-                    best_confidence = confidence
-                    best_match = signature
+        best_match, best_confidence = self.signature_matcher.best_signature(counts)
         
         if best_match and best_confidence >= best_match.confidence_threshold:
-            return {
+            result = {
                 'application': best_match.app_name,
                 'category': best_match.category,
                 'confidence': best_confidence,
                 'method': 'payload_based'
             }
+        else:
+            result = {
+                'application': 'unknown',
+                'category': 'unclassified',
+                'confidence': 0.0,
+                'method': 'payload_based'
+            }
         
-        return {
-            'application': 'unknown',
-            'category': 'unclassified',
-            'confidence': 0.0,
-            'method': 'payload_based'
-        }
+        if state is not None:
+            state.payload_result = result
+        return result
     
     def _classify_by_headers(self, flow: TrafficFlow) -> Dict[str, Any]:
         """
@@ -586,7 +537,7 @@ class ApplicationRecognitionService(TrafficClassificationService):
         Returns:
             Caractéristiques comportementales
         """
-        duration = (flow.last_seen - flow.start_time).total_seconds()
+        duration = flow.duration
         
         characteristics = {
             'duration': duration,
@@ -655,7 +606,7 @@ class ApplicationRecognitionService(TrafficClassificationService):
         """
         # Heuristique simple: si le flux dure plus de 5 secondes et a plus de 10 paquets,
         # on assume qu'il y a eu des échanges bidirectionnels
-        duration = (flow.last_seen - flow.start_time).total_seconds()
+        duration = flow.duration
         return duration > 5 and flow.packet_count > 10
     
     def _merge_classifications(self, results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
@@ -720,18 +671,6 @@ class ApplicationRecognitionService(TrafficClassificationService):
             'all_candidates': final_scores
         }
     
-    def _generate_cache_key(self, flow: TrafficFlow) -> str:
-        """
-        Génère une clé de cache pour un flux.
-        
-        Args:
-            flow: Flux de trafic
-            
-        Returns:
-            Clé de cache
-        """
-        return f"{flow.flow_id}_{flow.packet_count}"
-    
     def _get_qos_templates(self) -> Dict[str, Dict[str, Any]]:
         """
         Retourne les templates de politiques QoS pour différentes applications.
@@ -848,16 +787,20 @@ class ApplicationRecognitionService(TrafficClassificationService):
         """
         Nettoie les anciens flux pour libérer la mémoire.
         
+        Les flux inactifs sont déjà expirés au fil des insertions ; cette
+        méthode force l'expiration de tous les flux plus anciens que l'âge donné.
+        
         Args:
             max_age_minutes: Âge maximum des flux en minutes
         """
-        cutoff_time = datetime.now() - timedelta(minutes=max_age_minutes)
-        old_flows = [
-            flow_id for flow_id, flow in self.active_flows.items()
-            if flow.last_seen < cutoff_time
-        ]
-        
-        for flow_id in old_flows:
-            del self.active_flows[flow_id]
+        removed = self.active_flows.expire(max_age_minutes * 60)
+        logger.info(f"Nettoyage: {removed} anciens flux supprimés")
+    
+    def get_flow_table_statistics(self) -> Dict[str, Any]:
+        """
+        Statistiques de la table des flux actifs.
         
-        logger.info(f"Nettoyage: {len(old_flows)} anciens flux supprimés") 
\ No newline at end of file
+        Returns:
+            Occupation, évictions, expirations et taux de succès
+        """
+        return self.active_flows.get_statistics()
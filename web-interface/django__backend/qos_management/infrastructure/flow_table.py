@@ -0,0 +1,225 @@
+"""
+Table des flux actifs bornée, conçue pour la densité mémoire.
+
+Chaque flux est un enregistrement à `__slots__` indexé par un hachage entier
+de son 5-tuple ; les horodatages sont des lectures d'horloge monotone (float)
+et les échantillons de payload et headers ne sont alloués qu'à la première
+valeur. La table est maintenue dans l'ordre LRU : chaque insertion expire
+quelques flux inactifs en tête de table (coût amorti constant) et évince le
+moins récemment vu lorsque la capacité est atteinte.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# Valeurs partagées par les flux sans payload ni headers (non modifiables)
+EMPTY_SAMPLES: Tuple[bytes, ...] = ()
+EMPTY_HEADERS = MappingProxyType({})
+
+
+def flow_key(source_ip: str, source_port: int, destination_ip: str,
+             destination_port: int, protocol: str) -> int:
+    """Hachage entier du 5-tuple d'un flux."""
+    return hash((source_ip, source_port, destination_ip, destination_port, protocol))
+
+
+class TrafficFlow:
+    """
+    Représentation d'un flux de trafic pour l'analyse.
+
+    `start_time` et `last_seen` sont des lectures de l'horloge monotone
+    (secondes) ; `classification` porte l'état de classification du flux.
+    """
+
+    __slots__ = (
+        'flow_id', 'source_ip', 'destination_ip', 'source_port', 'destination_port',
+        'protocol', 'start_time', 'last_seen', 'packet_count', 'byte_count',
+        'payload_samples', 'headers', 'classification'
+    )
+
+    def __init__(self, flow_id: int, source_ip: str, destination_ip: str,
+                 source_port: int, destination_port: int, protocol: str,
+                 start_time: float, last_seen: float, packet_count: int = 0,
+                 byte_count: int = 0, payload_samples=None, headers=None):
+        self.flow_id = flow_id
+        self.source_ip = source_ip
+        self.destination_ip = destination_ip
+        self.source_port = source_port
+        self.destination_port = destination_port
+        self.protocol = protocol
+        self.start_time = start_time
+        self.last_seen = last_seen
+        self.packet_count = packet_count
+        self.byte_count = byte_count
+        self.payload_samples = list(payload_samples) if payload_samples else EMPTY_SAMPLES
+        self.headers = dict(headers) if headers else EMPTY_HEADERS
+        self.classification = None
+
+    @property
+    def duration(self) -> float:
+        """Durée du flux en secondes."""
+        return self.last_seen - self.start_time
+
+    def matches(self, source_ip: str, source_port: int, destination_ip: str,
+                destination_port: int, protocol: str) -> bool:
+        """Vrai si le flux correspond au 5-tuple (détection des collisions de hachage)."""
+        return (
+            self.source_port == source_port and self.destination_port == destination_port
+            and self.source_ip == source_ip and self.destination_ip == destination_ip
+            and self.protocol == protocol
+        )
+
+    def add_payload_sample(self, sample: bytes, max_samples: int) -> None:
+        """Ajoute un échantillon de payload dans la limite de `max_samples`."""
+        if not self.payload_samples:
+            self.payload_samples = [sample]
+        elif len(self.payload_samples) < max_samples:
+            self.payload_samples.append(sample)
+
+    def __repr__(self) -> str:
+        return (
+            f"TrafficFlow({self.source_ip}:{self.source_port} -> "
+            f"{self.destination_ip}:{self.destination_port}/{self.protocol}, "
+            f"packets={self.packet_count})"
+        )
+
+
+class FlowTable:
+    """
+    Table LRU des flux actifs avec expiration par inactivité.
+
+    Les accès sont protégés par un verrou : la table peut être alimentée par
+    plusieurs threads de capture.
+    """
+
+    # Nombre maximal de flux expirés examinés à chaque insertion
+    EXPIRE_BATCH = 4
+
+    def __init__(self, max_flows: int = 1000000, idle_timeout: float = 1800.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialise la table.
+
+        Args:
+            max_flows: Nombre maximal de flux conservés
+            idle_timeout: Durée d'inactivité (secondes) au-delà de laquelle un flux expire
+            clock: Horloge monotone (secondes)
+        """
+        self.max_flows = max_flows
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self._flows: "OrderedDict[int, TrafficFlow]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'collisions': 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._flows)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._flows
+
+    def __iter__(self):
+        return iter(list(self._flows))
+
+    def get(self, key: int) -> Optional[TrafficFlow]:
+        """Flux associé à une clé, sans le marquer comme vu."""
+        return self._flows.get(key)
+
+    def values(self):
+        """Flux de la table, du moins au plus récemment vu."""
+        with self._lock:
+            return list(self._flows.values())
+
+    def touch(self, source_ip: str, source_port: int, destination_ip: str,
+              destination_port: int, protocol: str) -> Tuple[TrafficFlow, bool]:
+        """
+        Récupère le flux d'un 5-tuple en le marquant comme vu, ou le crée.
+
+        Returns:
+            (flux, True si le flux vient d'être créé)
+        """
+        key = flow_key(source_ip, source_port, destination_ip, destination_port, protocol)
+        now = self.clock()
+        with self._lock:
+            flow = self._flows.get(key)
+            if flow is not None:
+                if flow.matches(source_ip, source_port, destination_ip, destination_port, protocol):
+                    flow.last_seen = now
+                    self._flows.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return flow, False
+                # Collision de hachage : le nouveau flux remplace l'ancien
+                self.stats['collisions'] += 1
+                del self._flows[key]
+
+            self.stats['misses'] += 1
+            self._expire(now, self.EXPIRE_BATCH)
+            while len(self._flows) >= self.max_flows:
+                self._flows.popitem(last=False)
+                self.stats['evictions'] += 1
+
+            flow = TrafficFlow(
+                flow_id=key,
+                source_ip=source_ip,
+                destination_ip=destination_ip,
+                source_port=source_port,
+                destination_port=destination_port,
+                protocol=protocol,
+                start_time=now,
+                last_seen=now
+            )
+            self._flows[key] = flow
+            return flow, True
+
+    def expire(self, idle_timeout: Optional[float] = None) -> int:
+        """
+        Retire tous les flux inactifs depuis plus de `idle_timeout` secondes.
+
+        Returns:
+            Nombre de flux retirés
+        """
+        with self._lock:
+            return self._expire(self.clock(), None, idle_timeout)
+
+    def clear(self) -> None:
+        """Vide la table."""
+        with self._lock:
+            self._flows.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Occupation, évictions et taux de succès de la table."""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'occupancy': len(self._flows),
+                'capacity': self.max_flows,
+                'fill_ratio': len(self._flows) / self.max_flows if self.max_flows else 0.0,
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0
+            }
+
+    def _expire(self, now: float, limit: Optional[int],
+                idle_timeout: Optional[float] = None) -> int:
+        """Retire au plus `limit` flux expirés en tête de table (tous si None)."""
+        cutoff = now - (self.idle_timeout if idle_timeout is None else idle_timeout)
+        expired = 0
+        flows = self._flows
+        while flows and (limit is None or expired < limit):
+            key, oldest = next(iter(flows.items()))
+            if oldest.last_seen >= cutoff:
+                break
+            del flows[key]
+            expired += 1
+        self.stats['expirations'] += expired
+        return expired
@@ -0,0 +1,174 @@
+"""
+Correspondance compilée des signatures d'applications.
+
+Toutes les signatures sont compilées une seule fois :
+
+- un index port → signature remplace le parcours linéaire des signatures ;
+- chaque motif de payload est compilé en expression régulière sur octets, et
+  le littéral le plus long qu'il impose sert de filtre : les littéraux
+  distincts sont recherchés (recherche d'octets native) dans le payload mis
+  en minuscules une seule fois, puis seuls les motifs dont le littéral est
+  présent sont évalués ; un motif réduit à son littéral n'est pas réévalué.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+
+FLAGS = re.IGNORECASE | re.DOTALL
+
+
+def _to_bytes(payload) -> bytes:
+    """Convertit un échantillon de payload en octets."""
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        return bytes(payload)
+    return str(payload).encode('utf-8', errors='ignore')
+
+
+def _parse(pattern: bytes):
+    try:
+        return sre_parse.parse(pattern, FLAGS)
+    except re.error:
+        return None
+
+
+def is_literal(pattern: bytes) -> bool:
+    """Vrai si le motif n'est composé que de caractères littéraux."""
+    parsed = _parse(pattern)
+    return bool(parsed) and all(op is sre_parse.LITERAL for op, _ in parsed)
+
+
+def required_literal(pattern: bytes) -> Optional[bytes]:
+    """
+    Plus long littéral présent dans toute correspondance du motif.
+
+    Seules les séquences de caractères littéraux du niveau supérieur du motif
+    sont considérées ; None si le motif n'en impose aucun.
+    """
+    parsed = _parse(pattern)
+    if parsed is None:
+        return None
+
+    best = b''
+    current = bytearray()
+    for op, value in parsed:
+        if op is sre_parse.LITERAL:
+            current.append(value)
+            continue
+        if len(current) > len(best):
+            best = bytes(current)
+        current = bytearray()
+    if len(current) > len(best):
+        best = bytes(current)
+    return best.lower() or None
+
+
+class SignatureMatcher:
+    """
+    Automate de correspondance compilé pour un ensemble de signatures.
+
+    Les signatures sont identifiées par leur position dans l'ordre du
+    dictionnaire fourni, ce qui préserve l'ordre de priorité d'origine.
+    """
+
+    def __init__(self, signatures: Dict[str, object]):
+        self.signatures = list(signatures.values())
+        self.pattern_counts = [len(signature.payload_patterns) for signature in self.signatures]
+
+        # Index port → première signature (par ordre de priorité) utilisant ce port
+        self.port_index: Dict[int, int] = {}
+        for position, signature in enumerate(self.signatures):
+            for port in signature.ports:
+                self.port_index.setdefault(port, position)
+
+        # Motifs compilés : (position de la signature, expression)
+        self.patterns: List[Tuple[int, re.Pattern]] = []
+        literal_patterns: Dict[bytes, List[int]] = {}
+        self.unfiltered: List[int] = []
+        self._literal_only = set()
+        for position, signature in enumerate(self.signatures):
+            for pattern in signature.payload_patterns:
+                source = pattern.encode('latin-1', errors='ignore')
+                try:
+                    compiled = re.compile(source, FLAGS)
+                except re.error:
+                    continue
+                index = len(self.patterns)
+                self.patterns.append((position, compiled))
+                literal = required_literal(source)
+                if literal is None:
+                    self.unfiltered.append(index)
+                    continue
+                literal_patterns.setdefault(literal, []).append(index)
+                if is_literal(source):
+                    self._literal_only.add(index)
+
+        # Littéraux du plus long au plus court avec les motifs qu'ils filtrent
+        self._literals: List[Tuple[bytes, Tuple[int, ...]]] = [
+            (literal, tuple(literal_patterns[literal]))
+            for literal in sorted(literal_patterns, key=len, reverse=True)
+        ]
+
+    def signature_for_ports(self, *ports: int) -> Optional[object]:
+        """Signature prioritaire utilisant l'un des ports, ou None."""
+        best = None
+        for port in ports:
+            position = self.port_index.get(port)
+            if position is not None and (best is None or position < best):
+                best = position
+        return self.signatures[best] if best is not None else None
+
+    def matching_patterns(self, payload) -> List[int]:
+        """Indices des motifs présents dans un échantillon de payload."""
+        # Les motifs sont insensibles à la casse : la recherche sur le payload
+        # en minuscules est équivalente et permet la recherche native des littéraux
+        data = _to_bytes(payload).lower()
+        found = [index for index in self.unfiltered if self.patterns[index][1].search(data)]
+        for literal, indices in self._literals:
+            if literal not in data:
+                continue
+            for index in indices:
+                if index in self._literal_only or self.patterns[index][1].search(data):
+                    found.append(index)
+        found.sort()
+        return found
+
+    def count_matches(self, payloads: Iterable, counts: Optional[List[int]] = None) -> List[int]:
+        """
+        Ajoute aux compteurs par signature le nombre de motifs trouvés dans
+        chaque échantillon.
+
+        Args:
+            payloads: Échantillons de payload (octets ou texte)
+            counts: Compteurs existants à compléter (modifiés sur place)
+
+        Returns:
+            Nombre de correspondances par position de signature
+        """
+        if counts is None:
+            counts = [0] * len(self.signatures)
+        for payload in payloads:
+            for index in self.matching_patterns(payload):
+                counts[self.patterns[index][0]] += 1
+        return counts
+
+    def best_signature(self, counts: Sequence[int]) -> Tuple[Optional[object], float]:
+        """
+        Signature la mieux reconnue à partir des compteurs de correspondances.
+
+        La confiance vaut min(0.9, correspondances / nombre de motifs) ; en cas
+        d'égalité, la première signature l'emporte.
+        """
+        best, best_confidence = None, 0.0
+        for position, matches in enumerate(counts):
+            if matches <= 0:
+                continue
+            confidence = min(0.9, matches / self.pattern_counts[position])
+            if confidence > best_confidence:
+                best, best_confidence = self.signatures[position], confidence
+        return best, best_confidence
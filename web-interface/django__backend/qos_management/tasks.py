@@ -7,9 +7,13 @@ de la Qualité de Service (QoS) basée sur le trafic réseau réel.
 
 import logging
 import json
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+from requests.adapters import HTTPAdapter
 
 from celery import shared_task
 from django.utils import timezone
@@ -19,6 +23,16 @@ from django.db.models import Avg, Max, Count
 
 logger = logging.getLogger(__name__)
 
+# Délai global de collecte des statistiques et délai de connexion (secondes)
+TRAFFIC_STATS_DEADLINE = 30
+TRAFFIC_CONTROL_CONNECT_TIMEOUT = 3
+
+# Nombre maximal de requêtes simultanées vers le service traffic-control
+TRAFFIC_STATS_MAX_WORKERS = 8
+
+_traffic_control_session = None
+_traffic_control_session_lock = threading.Lock()
+
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
 def collect_traffic_statistics(self):
@@ -34,59 +48,36 @@ def collect_traffic_statistics(self):
         # URL du service Traffic Control
         traffic_control_url = getattr(settings, 'TRAFFIC_CONTROL_URL', 'http://nms-traffic-control:8003')
         
-        # Vérifier la santé du service
-        health_response = requests.get(f"{traffic_control_url}/health", timeout=10)
-        if health_response.status_code != 200:
-            raise Exception(f"Service traffic-control indisponible: {health_response.status_code}")
-        
-        # Récupérer les interfaces disponibles
-        interfaces_response = requests.get(f"{traffic_control_url}/api/interfaces", timeout=10)
-        if interfaces_response.status_code != 200:
-            raise Exception(f"Erreur récupération interfaces: {interfaces_response.status_code}")
-        
-        interfaces_data = interfaces_response.json()
-        interfaces = interfaces_data.get('interfaces', [])
+        # Statistiques de toutes les interfaces en une requête (repli : une
+        # requête par interface en parallèle), bornées par un délai global
+        deadline = time.monotonic() + getattr(settings, 'TRAFFIC_STATS_DEADLINE', TRAFFIC_STATS_DEADLINE)
+        interfaces, collected_stats = _fetch_traffic_statistics(traffic_control_url, deadline)
         
         if not interfaces:
             logger.warning("⚠️ Aucune interface réseau détectée")
             return {"status": "warning", "message": "Aucune interface disponible"}
         
-        # Collecter les statistiques pour chaque interface
-        collected_stats = {}
+        # Analyser les statistiques de chaque interface
         congested_interfaces = []
         optimization_recommendations = []
         
-        for interface in interfaces:
+        for interface, stats in collected_stats.items():
             try:
-                # Récupérer les stats de l'interface
-                stats_response = requests.get(
-                    f"{traffic_control_url}/api/stats/{interface}", 
-                    timeout=10
-                )
+                performance_analysis = _analyze_interface_performance(interface, stats)
                 
-                if stats_response.status_code == 200:
-                    stats = stats_response.json()
-                    collected_stats[interface] = stats
-                    
-                    # Analyser les performances
-                    performance_analysis = _analyze_interface_performance(interface, stats)
-                    
-                    if performance_analysis['congested']:
-                        congested_interfaces.append({
-                            'interface': interface,
-                            'congestion_level': performance_analysis['congestion_level'],
-                            'current_usage': performance_analysis['current_usage'],
-                            'recommended_action': performance_analysis['recommended_action']
-                        })
-                    
-                    if performance_analysis['recommendations']:
-                        optimization_recommendations.extend(performance_analysis['recommendations'])
-                        
-                else:
-                    logger.warning(f"⚠️ Erreur stats interface {interface}: {stats_response.status_code}")
+                if performance_analysis['congested']:
+                    congested_interfaces.append({
+                        'interface': interface,
+                        'congestion_level': performance_analysis['congestion_level'],
+                        'current_usage': performance_analysis['current_usage'],
+                        'recommended_action': performance_analysis['recommended_action']
+                    })
+                
+                if performance_analysis['recommendations']:
+                    optimization_recommendations.extend(performance_analysis['recommendations'])
                     
             except Exception as e:
-                logger.error(f"❌ Erreur collecte interface {interface}: {e}")
+                logger.error(f"❌ Erreur analyse interface {interface}: {e}")
                 continue
         
         # Sauvegarder dans le cache pour accès temps réel
@@ -441,6 +432,91 @@ def cleanup_qos_data():
 
 # Fonctions utilitaires
 
+def _get_traffic_control_session() -> requests.Session:
+    """Session HTTP partagée (connexions persistantes) vers le service traffic-control."""
+    global _traffic_control_session
+    if _traffic_control_session is None:
+        with _traffic_control_session_lock:
+            if _traffic_control_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=TRAFFIC_STATS_MAX_WORKERS)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _traffic_control_session = session
+    return _traffic_control_session
+
+
+def _request_timeout(deadline: float, read_timeout: float = 10) -> Tuple[float, float]:
+    """Délais (connexion, lecture) d'une requête, bornés par le délai global."""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("Délai de collecte des statistiques dépassé")
+    return (min(TRAFFIC_CONTROL_CONNECT_TIMEOUT, remaining), min(read_timeout, remaining))
+
+
+def _fetch_traffic_statistics(traffic_control_url: str, deadline: float) -> Tuple[List[str], Dict[str, Dict]]:
+    """
+    Récupère les statistiques de toutes les interfaces du service traffic-control.
+    
+    L'endpoint groupé /api/stats est utilisé en priorité ; si le service ne le
+    fournit pas, les interfaces sont listées puis interrogées en parallèle.
+    
+    Returns:
+        (interfaces, statistiques par interface)
+    """
+    session = _get_traffic_control_session()
+    
+    response = session.get(f"{traffic_control_url}/api/stats", timeout=_request_timeout(deadline))
+    if response.status_code == 200:
+        all_stats = response.json()
+        return list(all_stats), all_stats
+    logger.warning(f"⚠️ Endpoint groupé indisponible ({response.status_code}), collecte par interface")
+    
+    interfaces_response = session.get(f"{traffic_control_url}/api/interfaces", timeout=_request_timeout(deadline))
+    if interfaces_response.status_code != 200:
+        raise Exception(f"Erreur récupération interfaces: {interfaces_response.status_code}")
+    interfaces = interfaces_response.json().get('interfaces', [])
+    
+    return interfaces, _fetch_interface_stats_concurrently(session, traffic_control_url, interfaces, deadline)
+
+
+def _fetch_interface_stats_concurrently(session: requests.Session, traffic_control_url: str,
+                                        interfaces: List[str], deadline: float) -> Dict[str, Dict]:
+    """Interroge /api/stats/<interface> en parallèle ; les interfaces hors délai sont ignorées."""
+    def fetch(interface):
+        response = session.get(
+            f"{traffic_control_url}/api/stats/{interface}",
+            timeout=_request_timeout(deadline)
+        )
+        if response.status_code != 200:
+            raise Exception(f"HTTP {response.status_code}")
+        return response.json()
+    
+    collected_stats = {}
+    if not interfaces:
+        return collected_stats
+    
+    executor = ThreadPoolExecutor(max_workers=min(TRAFFIC_STATS_MAX_WORKERS, len(interfaces)))
+    try:
+        futures = {executor.submit(fetch, interface): interface for interface in interfaces}
+        done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        
+        for future in done:
+            interface = futures[future]
+            try:
+                collected_stats[interface] = future.result()
+            except Exception as e:
+                logger.error(f"❌ Erreur collecte interface {interface}: {e}")
+        
+        for future in not_done:
+            future.cancel()
+            logger.warning(f"⚠️ Statistiques de {futures[future]} hors délai")
+    finally:
+        executor.shutdown(wait=False)
+    
+    return collected_stats
+
+
 def _analyze_interface_performance(interface: str, stats: Dict) -> Dict[str, Any]:
     """Analyse les performances d'une interface et détecte la congestion."""
     try:
@@ -503,7 +579,7 @@ def _apply_bandwidth_policy(interface: str, bandwidth: str) -> bool:
     try:
         traffic_control_url = getattr(settings, 'TRAFFIC_CONTROL_URL', 'http://nms-traffic-control:8003')
         
-        response = requests.post(f"{traffic_control_url}/api/qos", json={
+        response = _get_traffic_control_session().post(f"{traffic_control_url}/api/qos", json={
             'interface': interface,
             'bandwidth': bandwidth,
             'priority': 1
@@ -0,0 +1,130 @@
+"""
+Tests unitaires pour la table des flux actifs.
+"""
+import tracemalloc
+
+import pytest
+
+from qos_management.infrastructure import flow_table
+from qos_management.infrastructure.application_recognition_service import ApplicationRecognitionService
+from qos_management.infrastructure.flow_table import FlowTable
+
+pytestmark = [pytest.mark.qos, pytest.mark.unit]
+
+
+class FakeClock:
+    """Horloge monotone contrôlée par le test."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _touch(table, source_port, source_ip='10.0.0.1'):
+    return table.touch(source_ip, source_port, '10.0.0.2', 443, 'tcp')
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestFlowTable:
+    """Tests de la table LRU avec expiration."""
+
+    def test_hit_returns_same_flow(self, clock):
+        table = FlowTable(clock=clock)
+
+        flow, created = _touch(table, 40000)
+        clock.now += 5
+        again, created_again = _touch(table, 40000)
+
+        assert created and not created_again
+        assert again is flow
+        assert flow.duration == 5
+        stats = table.get_statistics()
+        assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+
+    def test_least_recently_seen_flow_is_evicted(self, clock):
+        table = FlowTable(max_flows=3, clock=clock)
+        for port in (1, 2, 3):
+            _touch(table, port)
+        _touch(table, 1)
+
+        _touch(table, 4)
+
+        assert sorted(flow.source_port for flow in table.values()) == [1, 3, 4]
+        assert table.get_statistics()['evictions'] == 1
+
+    def test_idle_flows_expire_on_insert(self, clock):
+        table = FlowTable(idle_timeout=60, clock=clock)
+        for port in range(6):
+            _touch(table, port)
+        clock.now += 61
+
+        _touch(table, 100)
+
+        # Expiration amortie : un nombre borné de flux par insertion
+        assert len(table) == 6 - FlowTable.EXPIRE_BATCH + 1
+        assert table.expire() == 2
+        assert [flow.source_port for flow in table.values()] == [100]
+        assert table.get_statistics()['expirations'] == 6
+
+    def test_hash_collision_replaces_flow(self, clock, monkeypatch):
+        monkeypatch.setattr(flow_table, 'flow_key', lambda *five_tuple: 42)
+        table = FlowTable(clock=clock)
+
+        first, _ = _touch(table, 1)
+        second, created = _touch(table, 2)
+
+        assert created and second is not first
+        assert table.get(42) is second
+        assert table.get_statistics()['collisions'] == 1
+
+    def test_payload_samples_are_bounded(self, clock):
+        flow, _ = _touch(FlowTable(clock=clock), 1)
+        assert flow.payload_samples == ()
+
+        for i in range(5):
+            flow.add_payload_sample(bytes([i]), max_samples=3)
+
+        assert flow.payload_samples == [b'\x00', b'\x01', b'\x02']
+
+
+class TestServiceFlowTable:
+    """Tests de l'intégration au service de reconnaissance."""
+
+    def test_cleanup_old_flows(self, clock):
+        service = ApplicationRecognitionService()
+        service.active_flows.clock = clock
+        for port in range(3):
+            service.classify_traffic({'source_ip': '10.0.0.1', 'source_port': port, 'protocol': 'udp'})
+        clock.now += 3600
+
+        service.cleanup_old_flows(max_age_minutes=30)
+
+        assert service.get_flow_table_statistics()['occupancy'] == 0
+
+
+class TestFlowTablePerformance:
+    """Benchmark de l'empreinte mémoire de la table."""
+
+    @pytest.mark.performance
+    def test_memory_per_flow(self):
+        """Moins de 512 octets par flux (hors chaînes d'adresses IP)."""
+        addresses = [f'10.0.{i}.{j}' for i in range(256) for j in range(256)]
+        table = FlowTable()
+        count = 200000
+
+        tracemalloc.start()
+        try:
+            for i in range(count):
+                table.touch(addresses[i % len(addresses)], 1024 + i // len(addresses), '192.168.1.1', 443, 'tcp')
+            used = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+        assert len(table) == count
+        assert used / count < 512
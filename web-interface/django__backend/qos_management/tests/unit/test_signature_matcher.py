@@ -0,0 +1,164 @@
+"""
+Tests unitaires pour la correspondance compilée des signatures d'applications.
+"""
+import re
+
+import pytest
+
+from qos_management.infrastructure.application_recognition_service import (
+    ApplicationRecognitionService,
+    ApplicationSignature
+)
+from qos_management.infrastructure.signature_matcher import SignatureMatcher, required_literal
+
+pytestmark = [pytest.mark.qos, pytest.mark.unit]
+
+
+PAYLOADS = [
+    b"GET /index.html HTTP/1.1\r\nHost: example.com\r\nContent-Type: text/html\r\n",
+    b"INVITE sip:bob@example.com SIP/2.0\r\nVia: SIP/2.0/UDP pc33\r\n",
+    b"\x16\x03\x01\x02\x00\x01\x00\x01\xfc\x03\x03",
+    b"\x80\x00\x12\x34\x00\x00\x00\x01\x00\x00\x00\x02payload",
+    b"EHLO mail.example.com\r\nMAIL FROM:<alice@example.com>\r\n",
+    b"\x00\x01\x02\x03 random binary data without signature",
+]
+
+
+def _reference_counts(service, payload):
+    """Référence : évaluation de chaque motif de chaque signature."""
+    text = payload.decode('latin-1')
+    return [
+        sum(1 for pattern in signature.payload_patterns if re.search(pattern, text, re.IGNORECASE | re.DOTALL))
+        for signature in service.application_signatures.values()
+    ]
+
+
+def _signature(name, ports, patterns):
+    return ApplicationSignature(
+        app_name=name,
+        category='test',
+        ports=ports,
+        protocols=['tcp'],
+        payload_patterns=patterns,
+        headers={},
+        behavioral_patterns={},
+        confidence_threshold=0.1
+    )
+
+
+@pytest.fixture
+def service():
+    return ApplicationRecognitionService(max_flows=3)
+
+
+def _packet(source_port=40000, payload=b'', destination_port=443):
+    return {
+        'source_ip': '10.0.0.1',
+        'destination_ip': '10.0.0.2',
+        'source_port': source_port,
+        'destination_port': destination_port,
+        'protocol': 'tcp',
+        'packet_size': 100,
+        'payload': payload
+    }
+
+
+class TestSignatureMatcher:
+    """Tests de l'automate de correspondance."""
+
+    def test_required_literal(self):
+        assert required_literal(rb'HTTP/1\.[01]') == b'http/1.'
+        assert required_literal(rb'Content-Type: video/') == b'content-type: video/'
+        assert required_literal(rb'[a-z]+') is None
+
+    def test_matches_reference_search(self, service):
+        matcher = service.signature_matcher
+        for payload in PAYLOADS:
+            assert matcher.count_matches([payload]) == _reference_counts(service, payload)
+
+    def test_overlapping_literals_are_all_found(self):
+        matcher = SignatureMatcher({
+            'a': _signature('a', [], ['abcd']),
+            'b': _signature('b', [], ['bcde']),
+            'c': _signature('c', [], [r'ab.d']),
+        })
+
+        assert matcher.count_matches([b'xxABCDExx']) == [1, 1, 1]
+
+    def test_port_index_keeps_signature_priority(self):
+        matcher = SignatureMatcher({
+            'first': _signature('first', [8080], []),
+            'second': _signature('second', [8080, 9000], []),
+        })
+
+        assert matcher.signature_for_ports(8080).app_name == 'first'
+        assert matcher.signature_for_ports(9000, 8080).app_name == 'first'
+        assert matcher.signature_for_ports(9000).app_name == 'second'
+        assert matcher.signature_for_ports(1234) is None
+
+
+class TestFlowClassificationCache:
+    """Tests du cache de classification par flux."""
+
+    def test_only_new_samples_are_scanned(self, service):
+        scanned = []
+        count_matches = service.signature_matcher.count_matches
+        service.signature_matcher.count_matches = lambda payloads, counts=None: (
+            scanned.append(len(list(payloads))) or count_matches([], counts)
+        )
+
+        service.classify_traffic(_packet(payload=PAYLOADS[0]))
+        service.classify_traffic(_packet())
+        service.classify_traffic(_packet(payload=PAYLOADS[0]))
+
+        assert scanned == [1, 1]
+
+    def test_payload_classification_is_cached(self, service):
+        payload = PAYLOADS[0] + b"HTTP/1.1 200 OK\r\n"
+        flow = service._get_or_create_flow(_packet(payload=payload, destination_port=12345))
+        state = service._get_flow_state(flow)
+
+        result = service._classify_by_payload(flow, state)
+
+        assert result['application'] == 'HTTP'
+        assert result['confidence'] == 0.75
+        assert service._classify_by_payload(flow, state) is result
+
+    def test_state_is_dropped_with_evicted_flow(self, service):
+        for port in range(10):
+            service.classify_traffic(_packet(source_port=40000 + port))
+
+        flows = service.active_flows.values()
+        assert len(flows) == 3
+        assert [flow.source_port for flow in flows] == [40007, 40008, 40009]
+        assert all(flow.classification is not None for flow in flows)
+
+
+class TestSignatureMatcherPerformance:
+    """Benchmark de l'analyse des payloads."""
+
+    @pytest.mark.performance
+    def test_payload_scan_runs_few_regexes(self, service):
+        """50 000 échantillons de 200 octets : seuls les motifs dont le littéral est présent sont évalués."""
+        matcher = service.signature_matcher
+        searches = []
+
+        class CountingPattern:
+            def __init__(self, pattern):
+                self.pattern = pattern
+
+            def search(self, data):
+                searches.append(self.pattern)
+                return self.pattern.search(data)
+
+        matcher.patterns = [(position, CountingPattern(pattern)) for position, pattern in matcher.patterns]
+        payloads = [(payload * 8)[:200] for payload in PAYLOADS]
+        count = 50000
+
+        matches = 0
+        for i in range(count):
+            matches += sum(matcher.count_matches([payloads[i % len(payloads)]]))
+
+        # Évaluation naïve : chaque motif sur chaque échantillon
+        assert len(searches) <= matches
+        assert len(searches) < count * len(matcher.patterns) // 10
@@ -0,0 +1,90 @@
+"""
+Tests unitaires pour la collecte des statistiques du service traffic-control.
+"""
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from qos_management import tasks
+
+pytestmark = [pytest.mark.qos, pytest.mark.unit]
+
+BASE_URL = 'http://traffic-control:8003'
+
+
+def _response(status_code, payload=None):
+    response = MagicMock(status_code=status_code)
+    response.json.return_value = payload
+    return response
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    with patch.object(tasks, '_get_traffic_control_session', return_value=session):
+        yield session
+
+
+class TestFetchTrafficStatistics:
+    """Tests de la collecte groupée et du repli par interface."""
+
+    def test_batch_endpoint_returns_all_interfaces(self, session):
+        stats = {'eth0': {'traffic_info': 'Sent 10 bytes'}, 'eth1': {'traffic_info': 'Sent 0 bytes'}}
+        session.get.return_value = _response(200, stats)
+
+        interfaces, collected = tasks._fetch_traffic_statistics(BASE_URL, time.monotonic() + 30)
+
+        assert interfaces == ['eth0', 'eth1']
+        assert collected == stats
+        session.get.assert_called_once()
+        assert session.get.call_args.args == (f'{BASE_URL}/api/stats',)
+
+    def test_fallback_fetches_interfaces_concurrently(self, session):
+        started = threading.Barrier(3, timeout=5)
+
+        def get(url, timeout):
+            if url.endswith('/api/stats'):
+                return _response(404)
+            if url.endswith('/api/interfaces'):
+                return _response(200, {'interfaces': ['eth0', 'eth1', 'eth2']})
+            # Les trois requêtes doivent être en cours simultanément
+            started.wait()
+            return _response(200, {'interface': url.rsplit('/', 1)[1]})
+
+        session.get.side_effect = get
+
+        interfaces, collected = tasks._fetch_traffic_statistics(BASE_URL, time.monotonic() + 30)
+
+        assert interfaces == ['eth0', 'eth1', 'eth2']
+        assert sorted(collected) == ['eth0', 'eth1', 'eth2']
+
+    def test_slow_interface_does_not_exceed_deadline(self, session):
+        release = threading.Event()
+
+        def get(url, timeout):
+            if url.endswith('/slow'):
+                release.wait()
+            return _response(200, {})
+
+        session.get.side_effect = get
+
+        try:
+            with patch.object(tasks, 'wait', wraps=tasks.wait) as wait:
+                collected = tasks._fetch_interface_stats_concurrently(
+                    session, BASE_URL, ['eth0', 'slow'], time.monotonic() + 0.2
+                )
+
+            # Retour alors que l'interface lente reste bloquée jusqu'au finally
+            assert list(collected) == ['eth0']
+            assert 0 < wait.call_args.kwargs['timeout'] <= 0.2
+        finally:
+            release.set()
+
+    def test_timeout_is_bounded_by_deadline(self):
+        connect, read = tasks._request_timeout(time.monotonic() + 1)
+
+        assert connect <= 1 and read <= 1
+        with pytest.raises(TimeoutError):
+            tasks._request_timeout(time.monotonic() - 1)
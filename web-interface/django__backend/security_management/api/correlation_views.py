@@ -12,7 +12,6 @@ import json
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
-from collections import defaultdict
 
 from django.conf import settings
 from django.utils import timezone
@@ -26,13 +25,15 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.pagination import PageNumberPagination
 
-from ..models import SecurityAlertModel, AuditLogModel, CorrelationRuleModel
+from ..models import AuditLogModel, CorrelationRuleModel
 from ..domain.services import SecurityCorrelationEngine, SecurityEvent
+from ..domain.event_correlation import StreamingEventCorrelator
 from ..domain.entities import CorrelationRule, CorrelationRuleMatch
 from ..infrastructure.repositories import (
     DjangoSecurityAlertRepository, DjangoCorrelationRuleRepository,
     DjangoCorrelationRuleMatchRepository
 )
+from ..infrastructure.event_journal import shared_event_correlator
 from .serializers import SecurityAlertSerializer
 
 logger = logging.getLogger(__name__)
@@ -116,7 +117,7 @@ class EventCorrelationAPIView(APIView):
             
             # Récupérer ou utiliser les événements fournis
             if 'events' in request.data:
-                # Utiliser les événements fournis
+                # Corréler les événements fournis dans un corrélateur dédié
                 events_data = request.data['events']
                 security_events = []
                 for event_data in events_data:
@@ -131,23 +132,24 @@ class EventCorrelationAPIView(APIView):
                         raw_data=event_data.get('raw_data', {})
                     )
                     security_events.append(event)
+                correlator = StreamingEventCorrelator(max_gap=max_time_gap)
+                correlator.add_many(security_events)
+                since = None
             else:
-                # Récupérer les événements récents de la base de données
-                alerts = SecurityAlertModel.objects.filter(
-                    created_at__gte=start_time
-                ).order_by('-created_at')
-                
-                security_events = []
-                for alert in alerts:
-                    event = SecurityEvent(
-                        event_type='alert',
-                        source_ip=alert.source_ip,
-                        destination_ip=alert.destination_ip,
-                        timestamp=alert.created_at,
-                        severity=alert.severity,
-                        raw_data=alert.alert_data or {}
+                # Les paires plus espacées que l'écart du corrélateur partagé
+                # n'ont jamais été émises
+                engine_gap = shared_event_correlator.correlator.max_gap
+                if max_time_gap > engine_gap:
+                    return Response(
+                        {'error': f'max_time_gap ne peut pas dépasser {engine_gap} secondes'},
+                        status=status.HTTP_400_BAD_REQUEST
                     )
-                    security_events.append(event)
+                # Interroger le corrélateur partagé, rattrapé sur le journal des
+                # événements publiés par les autres processus et, pour la période
+                # antérieure au journal, sur les alertes enregistrées en base
+                correlator = shared_event_correlator.sync(since=start_time)
+                since = start_time
+                security_events = correlator.events(since)
             
             # Récupérer les règles de corrélation
             correlation_rules = []
@@ -177,7 +179,8 @@ class EventCorrelationAPIView(APIView):
             
             # Effectuer la corrélation
             correlation_results = self._perform_correlation_analysis(
-                security_events,
+                correlator,
+                since,
                 correlation_rules,
                 correlation_type,
                 max_time_gap,
@@ -338,117 +341,43 @@ class EventCorrelationAPIView(APIView):
     
     def _perform_correlation_analysis(
         self,
-        events: List[SecurityEvent],
+        correlator: StreamingEventCorrelator,
+        since: Optional[datetime],
         rules: List[CorrelationRule],
         correlation_type: str,
         max_time_gap: int,
         min_score: float
     ) -> List[Dict[str, Any]]:
-        """Effectue l'analyse de corrélation sur les événements."""
+        """
+        Effectue l'analyse de corrélation sur l'état du corrélateur.
+        
+        Les corrélations temporelles sont re-notées pour `max_time_gap`, qui
+        ne dépasse pas l'écart maximal du corrélateur.
+        """
         correlations = []
         
+        def temporal_correlations():
+            return correlator.temporal_correlations(since, max_gap=max_time_gap)
+        
         if correlation_type == 'temporal':
-            correlations.extend(self._temporal_correlation(events, max_time_gap))
+            correlations.extend(temporal_correlations())
         elif correlation_type == 'spatial':
-            correlations.extend(self._spatial_correlation(events))
+            correlations.extend(correlator.spatial_correlations(since))
         elif correlation_type == 'pattern':
-            correlations.extend(self._pattern_correlation(events, rules))
+            correlations.extend(self._pattern_correlation(correlator.events(since), rules))
         elif correlation_type == 'behavioral':
-            correlations.extend(self._behavioral_correlation(events))
+            correlations.extend(self._behavioral_correlation(correlator, since))
         else:
             # Analyse complète avec tous les types
-            correlations.extend(self._temporal_correlation(events, max_time_gap))
-            correlations.extend(self._spatial_correlation(events))
-            correlations.extend(self._pattern_correlation(events, rules))
+            correlations.extend(temporal_correlations())
+            correlations.extend(correlator.spatial_correlations(since))
+            correlations.extend(self._pattern_correlation(correlator.events(since), rules))
         
         # Filtrer par score minimum
         filtered_correlations = [c for c in correlations if c.get('score', 0) >= min_score]
         
         return filtered_correlations
     
-    def _temporal_correlation(self, events: List[SecurityEvent], max_gap: int) -> List[Dict[str, Any]]:
-        """Corrélation basée sur la proximité temporelle."""
-        correlations = []
-        
-        # Trier les événements par timestamp
-        sorted_events = sorted(events, key=lambda e: e.timestamp)
-        
-        for i, event1 in enumerate(sorted_events):
-            for j, event2 in enumerate(sorted_events[i+1:], i+1):
-                time_diff = (event2.timestamp - event1.timestamp).total_seconds()
-                
-                if time_diff > max_gap:
-                    break  # Les événements suivants seront encore plus éloignés
-                
-                # Calculer le score de corrélation temporelle
-                score = max(0.0, 1.0 - (time_diff / max_gap))
-                
-                # Bonus si même source ou destination IP
-                if event1.source_ip == event2.source_ip:
-                    score += 0.2
-                if event1.destination_ip == event2.destination_ip:
-                    score += 0.1
-                
-                score = min(1.0, score)
-                
-                if score > 0.5:  # Seuil minimum pour considérer une corrélation
-                    correlations.append({
-                        'type': 'temporal',
-                        'event_ids': [event1.event_id, event2.event_id],
-                        'score': score,
-                        'time_gap_seconds': time_diff,
-                        'description': f'Événements corrélés temporellement (écart: {time_diff:.0f}s)',
-                        'details': {
-                            'event1': {
-                                'timestamp': event1.timestamp.isoformat(),
-                                'source_ip': event1.source_ip,
-                                'type': event1.event_type
-                            },
-                            'event2': {
-                                'timestamp': event2.timestamp.isoformat(),
-                                'source_ip': event2.source_ip,
-                                'type': event2.event_type
-                            }
-                        }
-                    })
-        
-        return correlations
-    
-    def _spatial_correlation(self, events: List[SecurityEvent]) -> List[Dict[str, Any]]:
-        """Corrélation basée sur la proximité géographique/réseau."""
-        correlations = []
-        
-        # Grouper les événements par IP source
-        events_by_source = defaultdict(list)
-        for event in events:
-            if event.source_ip:
-                events_by_source[event.source_ip].append(event)
-        
-        # Chercher des patterns par IP
-        for source_ip, ip_events in events_by_source.items():
-            if len(ip_events) > 1:
-                # Calculer le score basé sur le nombre d'événements et leur diversité
-                event_types = set(e.event_type for e in ip_events)
-                score = min(1.0, len(ip_events) / 10.0 + len(event_types) / 5.0)
-                
-                if score > 0.6:
-                    correlations.append({
-                        'type': 'spatial',
-                        'event_ids': [e.event_id for e in ip_events],
-                        'score': score,
-                        'source_ip': source_ip,
-                        'event_count': len(ip_events),
-                        'description': f'Activité corrélée depuis {source_ip} ({len(ip_events)} événements)',
-                        'details': {
-                            'source_ip': source_ip,
-                            'event_types': list(event_types),
-                            'time_span': (max(e.timestamp for e in ip_events) - 
-                                        min(e.timestamp for e in ip_events)).total_seconds()
-                        }
-                    })
-        
-        return correlations
-    
     def _pattern_correlation(
         self, 
         events: List[SecurityEvent], 
@@ -493,28 +422,24 @@ class EventCorrelationAPIView(APIView):
         
         return correlations
     
-    def _behavioral_correlation(self, events: List[SecurityEvent]) -> List[Dict[str, Any]]:
+    def _behavioral_correlation(
+        self,
+        correlator: StreamingEventCorrelator,
+        since: Optional[datetime]
+    ) -> List[Dict[str, Any]]:
         """Corrélation basée sur l'analyse comportementale."""
         correlations = []
         
         # Analyser les patterns de comportement suspects
         # Exemple: escalade de privilèges, reconnaissance, exfiltration
         
-        # Grouper par source IP et analyser la séquence d'événements
-        events_by_source = defaultdict(list)
-        for event in events:
-            if event.source_ip:
-                events_by_source[event.source_ip].append(event)
-        
-        for source_ip, ip_events in events_by_source.items():
+        # Séquences d'événements par IP source, déjà triées par le corrélateur
+        for source_ip, ip_events in correlator.grouped('source_ip', since).items():
             if len(ip_events) < 3:  # Besoin d'au moins 3 événements pour un pattern comportemental
                 continue
             
-            # Trier par timestamp
-            sorted_events = sorted(ip_events, key=lambda e: e.timestamp)
-            
             # Détecter des patterns comportementaux spécifiques
-            behavioral_patterns = self._detect_behavioral_patterns(sorted_events)
+            behavioral_patterns = self._detect_behavioral_patterns(ip_events)
             
             for pattern in behavioral_patterns:
                 correlations.append({
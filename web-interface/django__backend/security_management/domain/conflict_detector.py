@@ -8,25 +8,34 @@ en utilisant les services Docker pour la validation.
 
 import re
 import json
+import time
 import uuid
 import ipaddress
 import logging
 import requests
+from functools import lru_cache
 from typing import Dict, Any, List, Set, Tuple, Optional
 from abc import ABC, abstractmethod
 
 from .interfaces import ConflictDetector, RuleConflict, DockerServiceConnector
+from .firewall_rule_index import FirewallRuleIndex
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=65536)
+def _ip_network(value: str):
+    """ip_network mis en cache : les mêmes préfixes reviennent dans de nombreuses paires."""
+    return ipaddress.ip_network(value, strict=False)
+
+
 class DockerServiceBase(DockerServiceConnector):
     """
     Classe de base pour les connecteurs aux services Docker.
     """
     
-    def __init__(self, service_name: str, base_url: str, timeout: int = 30):
+    def __init__(self, service_name: str, base_url: str, timeout: int = 30, health_cache_ttl: float = 30.0):
         """
         Initialise le connecteur au service Docker.
         
@@ -34,23 +43,38 @@ class DockerServiceBase(DockerServiceConnector):
             service_name: Nom du service Docker
             base_url: URL de base du service
             timeout: Timeout pour les requêtes HTTP
+            health_cache_ttl: Durée (secondes) de mise en cache du test de santé
         """
         self.service_name = service_name
         self.base_url = base_url
         self.timeout = timeout
+        self.health_cache_ttl = health_cache_ttl
         self._session = requests.Session()
+        self._health: Optional[Tuple[float, bool]] = None
     
     def test_connection(self) -> bool:
-        """Teste la connexion au service Docker."""
+        """
+        Teste la connexion au service Docker.
+        
+        Le résultat est conservé `health_cache_ttl` secondes pour ne pas
+        sonder le service à chaque règle analysée.
+        """
+        now = time.monotonic()
+        if self._health is not None and now - self._health[0] < self.health_cache_ttl:
+            return self._health[1]
+        
         try:
             response = self._session.get(
                 f"{self.base_url}/health",
                 timeout=self.timeout
             )
-            return response.status_code == 200
+            available = response.status_code == 200
         except Exception as e:
             logger.warning(f"Connexion au service {self.service_name} échouée: {str(e)}")
-            return False
+            available = False
+        
+        self._health = (now, available)
+        return available
     
     def get_service_status(self) -> Dict[str, Any]:
         """Récupère le statut du service Docker."""
@@ -176,29 +200,63 @@ class FirewallRuleConflictDetector(BaseConflictDetector):
             existing_info = self._parse_iptables_rule(existing_content)
             if not existing_info:
                 continue
+            
+            conflict = self._check_pair(rule_info, existing_info, rule_id, existing_id)
+            if conflict:
+                conflicts.append(conflict)
                 
-            # Vérifier les différents types de conflits
-            shadow_conflict = self._check_shadow_conflict(rule_info, existing_info, rule_id, existing_id)
-            if shadow_conflict:
-                conflicts.append(shadow_conflict)
-                continue  # Si on a détecté un conflit de masquage, ne pas vérifier les autres types
-                
-            redundant_conflict = self._check_redundant_conflict(rule_info, existing_info, rule_id, existing_id)
-            if redundant_conflict:
-                conflicts.append(redundant_conflict)
-                continue
-                
-            correlation_conflict = self._check_correlation_conflict(rule_info, existing_info, rule_id, existing_id)
-            if correlation_conflict:
-                conflicts.append(correlation_conflict)
+        return conflicts
+    
+    def analyze_ruleset(self, rules: List[Dict[str, Any]]) -> List[RuleConflict]:
+        """
+        Analyse un ensemble de règles pour détecter tous les conflits.
+        
+        Chaque règle est analysée une seule fois, puis les préfixes et plages
+        de ports sont indexés : seules les paires qui se chevauchent sur
+        toutes les dimensions sont vérifiées. Le résultat est identique à la
+        comparaison de chaque règle avec toutes les autres.
+        """
+        infos = [
+            self._parse_iptables_rule(rule.get("content", "")) if rule.get("content") else None
+            for rule in rules
+        ]
+        
+        # Valider une seule fois chaque contenu distinct si le service répond
+        if self.traffic_service.test_connection():
+            for content in dict.fromkeys(rule.get("content") for rule, info in zip(rules, infos) if info):
+                validation_result = self._validate_rule_via_docker(content)
+                if not validation_result.get("valid", True):
+                    logger.warning(f"Règle firewall non valide: {validation_result.get('error', 'Erreur inconnue')}")
+        
+        index = FirewallRuleIndex(infos)
+        conflicts = []
+        for position, rule in enumerate(rules):
+            rule_info = infos[position]
+            if rule_info is None:
                 continue
-                
-            generalization_conflict = self._check_generalization_conflict(rule_info, existing_info, rule_id, existing_id)
-            if generalization_conflict:
-                conflicts.append(generalization_conflict)
-                
+            rule_id = rule.get("id", 0)
+            for other in index.candidates(position):
+                conflict = self._check_pair(rule_info, infos[other], rule_id, rules[other].get("id", 0))
+                if conflict:
+                    conflicts.append(conflict)
+        
         return conflicts
     
+    def _check_pair(self, rule_info: Dict[str, Any], existing_info: Dict[str, Any],
+                    rule_id: int, existing_id: int) -> Optional[RuleConflict]:
+        """
+        Vérifie les types de conflit d'une paire, du plus grave au moins grave.
+        
+        Le premier conflit trouvé est retourné (masquage, redondance,
+        corrélation puis généralisation).
+        """
+        return (
+            self._check_shadow_conflict(rule_info, existing_info, rule_id, existing_id)
+            or self._check_redundant_conflict(rule_info, existing_info, rule_id, existing_id)
+            or self._check_correlation_conflict(rule_info, existing_info, rule_id, existing_id)
+            or self._check_generalization_conflict(rule_info, existing_info, rule_id, existing_id)
+        )
+    
     def _validate_rule_via_docker(self, rule_content: str) -> Dict[str, Any]:
         """
         Valide une règle firewall via le service Docker Traffic Control.
@@ -502,14 +560,14 @@ class FirewallRuleConflictDetector(BaseConflictDetector):
                 return True
                 
             # Convertir en objets réseau
-            network1 = ipaddress.ip_network(ip1, strict=False)
-            network2 = ipaddress.ip_network(ip2, strict=False)
+            network1 = _ip_network(ip1)
+            network2 = _ip_network(ip2)
             
             # Vérifier si le premier réseau est un sous-ensemble du second
             return network1.subnet_of(network2)
             
-        except ValueError:
-            # En cas d'erreur de format, supposer qu'il n'y a pas de sous-ensemble
+        except (ValueError, TypeError):
+            # Format invalide ou versions IP différentes : pas de sous-ensemble
             return False
             
     def _is_ip_overlap(self, ip1: str, ip2: str) -> bool:
@@ -524,8 +582,8 @@ class FirewallRuleConflictDetector(BaseConflictDetector):
                 return True
                 
             # Convertir en objets réseau
-            network1 = ipaddress.ip_network(ip1, strict=False)
-            network2 = ipaddress.ip_network(ip2, strict=False)
+            network1 = _ip_network(ip1)
+            network2 = _ip_network(ip2)
             
             # Vérifier si les réseaux se chevauchent
             return network1.overlaps(network2)
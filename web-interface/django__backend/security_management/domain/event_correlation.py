@@ -0,0 +1,352 @@
+"""
+Corrélation d'événements de sécurité en flux continu.
+
+Le corrélateur conserve les événements récents dans des fenêtres temporelles
+bornées, indexées par IP source, IP destination et type d'événement. Les
+corrélations temporelles sont émises à l'arrivée de chaque événement en ne
+parcourant que les événements voisins (même source, même destination, puis
+fenêtre globale), avec un nombre maximal de partenaires par événement : une
+rafale d'événements reste linéaire au lieu de produire toutes les paires.
+
+Les corrélations spatiales et comportementales sont calculées à la demande à
+partir des fenêtres déjà regroupées par IP source.
+"""
+
+import bisect
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .services import SecurityEvent
+
+logger = logging.getLogger(__name__)
+
+
+# Dimensions d'indexation des fenêtres
+CORRELATION_KEYS = ('source_ip', 'destination_ip', 'event_type')
+
+# Score minimal pour qu'une paire d'événements soit considérée corrélée
+TEMPORAL_SCORE_THRESHOLD = 0.5
+
+
+class StreamingEventCorrelator:
+    """
+    Corrélateur d'événements à fenêtres glissantes bornées.
+
+    Toutes les opérations sont protégées par un verrou : le corrélateur peut
+    être alimenté par plusieurs threads et interrogé par les vues API.
+    """
+
+    def __init__(self, window_seconds: int = 86400, max_gap: int = 300,
+                 max_events: int = 100000, max_events_per_key: int = 1000,
+                 max_partners: int = 10, max_correlations: int = 100000):
+        """
+        Initialise le corrélateur.
+
+        Args:
+            window_seconds: Durée de conservation des événements
+            max_gap: Écart maximal (secondes) entre deux événements corrélés
+            max_events: Nombre maximal d'événements conservés
+            max_events_per_key: Nombre maximal d'événements par IP ou type
+            max_partners: Nombre maximal de corrélations temporelles par événement
+            max_correlations: Nombre maximal de corrélations temporelles conservées
+        """
+        self.window_seconds = window_seconds
+        self.max_gap = max_gap
+        self.max_events = max_events
+        self.max_events_per_key = max_events_per_key
+        self.max_partners = max_partners
+
+        # Entrées (horodatage, événement, horodatage ISO calculé une seule fois)
+        self._events: Deque[Tuple[float, SecurityEvent, str]] = deque()
+        self._windows: Dict[Tuple[str, Any], Deque[Tuple[float, SecurityEvent, str]]] = {}
+        self._correlations: Deque[Tuple[float, Dict[str, Any]]] = deque(maxlen=max_correlations)
+        self._latest = float('-inf')
+        self._lock = threading.RLock()
+
+        self.stats = {
+            'events_processed': 0,
+            'events_evicted': 0,
+            'correlations_emitted': 0
+        }
+
+    def add(self, event: SecurityEvent) -> List[Dict[str, Any]]:
+        """
+        Ajoute un événement et retourne les corrélations temporelles qu'il crée.
+        """
+        entry = (event.timestamp.timestamp(), event, event.timestamp.isoformat())
+        timestamp = entry[0]
+        with self._lock:
+            correlations = self._correlate(entry)
+
+            self._insert(self._events, entry)
+            for name in CORRELATION_KEYS:
+                value = getattr(event, name)
+                if value is None:
+                    continue
+                window = self._windows.get((name, value))
+                if window is None:
+                    window = self._windows[(name, value)] = deque(maxlen=self.max_events_per_key)
+                self._insert(window, entry)
+
+            for correlation in correlations:
+                self._correlations.append((timestamp, correlation))
+
+            self._latest = max(self._latest, timestamp)
+            self._evict()
+
+            self.stats['events_processed'] += 1
+            self.stats['correlations_emitted'] += len(correlations)
+            return correlations
+
+    def add_many(self, events: Iterable[SecurityEvent]) -> List[Dict[str, Any]]:
+        """Ajoute des événements dans l'ordre chronologique."""
+        correlations = []
+        for event in sorted(events, key=lambda e: e.timestamp.timestamp()):
+            correlations.extend(self.add(event))
+        return correlations
+
+    def events(self, since: Optional[datetime] = None) -> List[SecurityEvent]:
+        """Événements de la fenêtre, triés par horodatage."""
+        since_ts = self._since(since)
+        with self._lock:
+            selected = [item for item in self._events if item[0] >= since_ts]
+        selected.sort(key=lambda item: item[0])
+        return [item[1] for item in selected]
+
+    def grouped(self, key: str, since: Optional[datetime] = None) -> Dict[Any, List[SecurityEvent]]:
+        """
+        Événements de la fenêtre regroupés par IP source, IP destination ou type.
+
+        Chaque groupe est trié par horodatage et limité à `max_events_per_key`
+        événements.
+        """
+        since_ts = self._since(since)
+        groups = {}
+        with self._lock:
+            for (name, value), window in self._windows.items():
+                if name != key:
+                    continue
+                selected = sorted(
+                    (item for item in window if item[0] >= since_ts),
+                    key=lambda item: item[0]
+                )
+                if selected:
+                    groups[value] = [item[1] for item in selected]
+        return groups
+
+    def temporal_correlations(self, since: Optional[datetime] = None,
+                              max_gap: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Corrélations temporelles émises depuis `since`.
+
+        Avec `max_gap`, les paires sont re-notées pour cet écart maximal et
+        celles qui n'atteignent plus le seuil sont écartées.
+
+        Raises:
+            ValueError: Si `max_gap` dépasse l'écart du corrélateur (les paires
+                plus espacées n'ont jamais été émises)
+        """
+        if max_gap is not None and max_gap > self.max_gap:
+            raise ValueError(f"Écart maximal {max_gap}s supérieur à celui du corrélateur ({self.max_gap}s)")
+        since_ts = self._since(since)
+        with self._lock:
+            selected = [correlation for ts, correlation in self._correlations if ts >= since_ts]
+        if max_gap is None or max_gap == self.max_gap:
+            return selected
+
+        rescored = []
+        for correlation in selected:
+            time_diff = correlation['time_gap_seconds']
+            if time_diff > max_gap:
+                continue
+            event1, event2 = correlation['details']['event1'], correlation['details']['event2']
+            score = self._score(time_diff, max_gap, event1['source_ip'] == event2['source_ip'],
+                                event1['destination_ip'] == event2['destination_ip'])
+            if score > TEMPORAL_SCORE_THRESHOLD:
+                rescored.append({**correlation, 'score': score})
+        return rescored
+
+    def spatial_correlations(self, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Activité corrélée par IP source sur la fenêtre."""
+        correlations = []
+        for source_ip, ip_events in self.grouped('source_ip', since).items():
+            if len(ip_events) < 2:
+                continue
+            event_types = set(e.event_type for e in ip_events)
+            score = min(1.0, len(ip_events) / 10.0 + len(event_types) / 5.0)
+            if score <= 0.6:
+                continue
+            correlations.append({
+                'type': 'spatial',
+                'event_ids': [e.event_id for e in ip_events],
+                'score': score,
+                'source_ip': source_ip,
+                'event_count': len(ip_events),
+                'description': f'Activité corrélée depuis {source_ip} ({len(ip_events)} événements)',
+                'details': {
+                    'source_ip': source_ip,
+                    'event_types': list(event_types),
+                    'time_span': (ip_events[-1].timestamp - ip_events[0].timestamp).total_seconds()
+                }
+            })
+        return correlations
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Statistiques du corrélateur."""
+        with self._lock:
+            return {
+                **self.stats,
+                'events_in_window': len(self._events),
+                'indexed_keys': len(self._windows),
+                'correlations_in_window': len(self._correlations)
+            }
+
+    def clear(self) -> None:
+        """Vide toutes les fenêtres."""
+        with self._lock:
+            self._events.clear()
+            self._windows.clear()
+            self._correlations.clear()
+            self._latest = float('-inf')
+
+    @staticmethod
+    def _insert(window: Deque[Tuple[float, SecurityEvent, str]], entry: Tuple[float, SecurityEvent, str]) -> None:
+        """
+        Insère une entrée en conservant la fenêtre triée par horodatage.
+
+        Les événements arrivent presque toujours dans l'ordre (ajout en fin) ;
+        un événement plus ancien, relu du journal d'un autre processus, est
+        inséré à sa place.
+        """
+        timestamp = entry[0]
+        if not window or window[-1][0] <= timestamp:
+            window.append(entry)
+            return
+        if window.maxlen is not None and len(window) == window.maxlen:
+            if timestamp < window[0][0]:
+                # Plus ancien que toute une fenêtre pleine : il en sortirait aussitôt
+                return
+            window.popleft()
+        bisect.insort(window, entry, key=lambda item: item[0])
+
+    def _correlate(self, entry: Tuple[float, SecurityEvent, str]) -> List[Dict[str, Any]]:
+        """
+        Cherche les partenaires temporels d'un nouvel événement.
+
+        Les fenêtres sont parcourues du plus récent au plus ancien et le
+        parcours s'arrête dès que l'écart ne permet plus d'atteindre le seuil
+        de score : chaque événement parcouru produit une corrélation.
+        """
+        timestamp, event, _ = entry
+        # Écart maximal selon les bonus (même source +0.2, même destination +0.1)
+        candidates = [
+            (self._windows.get(('source_ip', event.source_ip)), 0.8),
+            (self._windows.get(('destination_ip', event.destination_ip)), 0.7),
+            (self._events, 1.0 - TEMPORAL_SCORE_THRESHOLD)
+        ]
+        correlations = []
+        seen = set()
+        for window, reach in candidates:
+            if not window:
+                continue
+            limit = self.max_gap * reach
+            for other_entry in reversed(window):
+                other_ts, other, _ = other_entry
+                if other_ts < timestamp - limit:
+                    break
+                if id(other) in seen or abs(timestamp - other_ts) > limit:
+                    continue
+                seen.add(id(other))
+                correlation = self._temporal_pair(other_entry, entry)
+                if correlation:
+                    correlations.append(correlation)
+                    if len(correlations) >= self.max_partners:
+                        return correlations
+        return correlations
+
+    def _temporal_pair(self, first: Tuple[float, SecurityEvent, str],
+                       second: Tuple[float, SecurityEvent, str]) -> Optional[Dict[str, Any]]:
+        """Corrélation temporelle entre deux entrées, ou None sous le seuil."""
+        if first[0] > second[0]:
+            first, second = second, first
+        (other_ts, other, other_iso), (timestamp, event, event_iso) = first, second
+        time_diff = timestamp - other_ts
+
+        score = self._score(time_diff, self.max_gap, other.source_ip == event.source_ip,
+                            other.destination_ip == event.destination_ip)
+        if score <= TEMPORAL_SCORE_THRESHOLD:
+            return None
+
+        return {
+            'type': 'temporal',
+            'event_ids': [other.event_id, event.event_id],
+            'score': score,
+            'time_gap_seconds': time_diff,
+            'description': f'Événements corrélés temporellement (écart: {time_diff:.0f}s)',
+            'details': {
+                'event1': {
+                    'timestamp': other_iso,
+                    'source_ip': other.source_ip,
+                    'destination_ip': other.destination_ip,
+                    'type': other.event_type
+                },
+                'event2': {
+                    'timestamp': event_iso,
+                    'source_ip': event.source_ip,
+                    'destination_ip': event.destination_ip,
+                    'type': event.event_type
+                }
+            }
+        }
+
+    @staticmethod
+    def _score(time_diff: float, max_gap: float, same_source: bool, same_destination: bool) -> float:
+        """Score d'une paire : proximité temporelle, plus bonus même source (+0.2) et destination (+0.1)."""
+        score = max(0.0, 1.0 - (time_diff / max_gap))
+        if same_source:
+            score += 0.2
+        if same_destination:
+            score += 0.1
+        return min(1.0, score)
+
+    def _evict(self) -> None:
+        """Retire les événements sortis de la fenêtre ou en surnombre."""
+        horizon = self._latest - self.window_seconds
+        while self._events and (self._events[0][0] < horizon or len(self._events) > self.max_events):
+            _, event, _ = self._events.popleft()
+            for name in CORRELATION_KEYS:
+                key = (name, getattr(event, name))
+                window = self._windows.get(key)
+                if window and window[0][1] is event:
+                    window.popleft()
+                if window is not None and not window:
+                    del self._windows[key]
+            self.stats['events_evicted'] += 1
+        while self._correlations and self._correlations[0][0] < horizon:
+            self._correlations.popleft()
+
+    @staticmethod
+    def _since(since: Optional[datetime]) -> float:
+        return since.timestamp() if since is not None else float('-inf')
+
+
+_correlator = None
+_correlator_lock = threading.Lock()
+
+
+def get_event_correlator() -> StreamingEventCorrelator:
+    """
+    Corrélateur du processus.
+
+    L'état est propre au processus : il est alimenté et synchronisé entre
+    processus par le journal de `infrastructure.event_journal`.
+    """
+    global _correlator
+    if _correlator is None:
+        with _correlator_lock:
+            if _correlator is None:
+                _correlator = StreamingEventCorrelator()
+    return _correlator
@@ -0,0 +1,294 @@
+"""
+Index des règles de pare-feu pour l'analyse de conflits.
+
+Chaque règle iptables est normalisée une seule fois (préfixes IP et plages de
+ports convertis en intervalles d'entiers), puis indexée par chaîne :
+
+- les préfixes source/destination dans un index de préfixes : deux préfixes
+  CIDR se chevauchent si et seulement si l'un contient l'autre, ce qui
+  revient à chercher les ancêtres (au plus 33 ou 129 longueurs) et les
+  descendants (recherche dichotomique) du préfixe interrogé ;
+- les plages de ports dans un arbre d'intervalles statique.
+
+L'index ne renvoie que les paires de règles susceptibles de se chevaucher sur
+toutes les dimensions ; les vérifications exactes (masquage, redondance,
+corrélation, généralisation) ne s'appliquent qu'à ces candidats.
+"""
+
+import bisect
+import ipaddress
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Valeurs qui chevauchent toute autre valeur de la même dimension
+UNIVERSAL_ADDRESSES = frozenset({'any', '0.0.0.0/0'})
+UNIVERSAL_PORTS = frozenset({'any'})
+
+DIMENSIONS = ('source', 'destination', 'source_port', 'destination_port')
+
+
+@lru_cache(maxsize=65536)
+def parse_network(value: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Convertit une adresse ou un préfixe en (version, début, longueur).
+
+    Returns:
+        None si la valeur n'est pas une adresse IP valide
+    """
+    try:
+        network = ipaddress.ip_network(value, strict=False)
+    except ValueError:
+        return None
+    return network.version, int(network.network_address), network.prefixlen
+
+
+@lru_cache(maxsize=65536)
+def parse_ports(value: str) -> Optional[Tuple[int, int]]:
+    """
+    Convertit un port ou une plage « début:fin » en intervalle ordonné.
+
+    Returns:
+        None si la valeur n'est pas un port valide
+    """
+    try:
+        if ':' in value:
+            start, end = value.split(':')[:2]
+            start, end = int(start), int(end)
+        else:
+            start = end = int(value)
+    except ValueError:
+        return None
+    return min(start, end), max(start, end)
+
+
+class PrefixIndex:
+    """Index de préfixes CIDR (IPv4 et IPv6)."""
+
+    def __init__(self):
+        self._exact: Dict[Tuple[int, int, int], List[int]] = {}
+        self._lengths: Dict[int, Set[int]] = {}
+        self._sorted: Dict[int, List[Tuple[int, int]]] = {}
+        self._pending: Dict[int, List[Tuple[int, int]]] = {}
+
+    def add(self, network: Tuple[int, int, int], item: int) -> None:
+        version, start, length = network
+        self._exact.setdefault(network, []).append(item)
+        self._lengths.setdefault(version, set()).add(length)
+        self._pending.setdefault(version, []).append((start, item))
+
+    def _sorted_starts(self, version: int) -> List[Tuple[int, int]]:
+        if version in self._pending:
+            entries = self._sorted.get(version, []) + self._pending.pop(version)
+            entries.sort()
+            self._sorted[version] = entries
+        return self._sorted.get(version, [])
+
+    def overlapping(self, network: Tuple[int, int, int]) -> Set[int]:
+        """Éléments dont le préfixe contient le préfixe donné ou y est contenu."""
+        version, start, length = network
+        bits = 32 if version == 4 else 128
+        result: Set[int] = set()
+
+        # Ancêtres (et préfixe identique), parmi les longueurs présentes
+        for ancestor_length in self._lengths.get(version, ()):
+            if ancestor_length > length:
+                continue
+            shift = bits - ancestor_length
+            ancestor = (version, (start >> shift) << shift, ancestor_length)
+            result.update(self._exact.get(ancestor, ()))
+
+        # Descendants : préfixes plus longs dont le début tombe dans la plage
+        entries = self._sorted_starts(version)
+        end = start + (1 << (bits - length)) - 1
+        position = bisect.bisect_left(entries, (start, -1))
+        while position < len(entries) and entries[position][0] <= end:
+            result.add(entries[position][1])
+            position += 1
+        return result
+
+
+class IntervalIndex:
+    """
+    Arbre d'intervalles statique.
+
+    Les intervalles sont triés par début ; un arbre implicite sur ce tableau
+    stocke la fin maximale de chaque sous-arbre pour élaguer les recherches.
+    """
+
+    def __init__(self):
+        self._intervals: List[Tuple[int, int, int]] = []
+        self._max_end: List[int] = []
+        self._dirty = False
+
+    def add(self, interval: Tuple[int, int], item: int) -> None:
+        self._intervals.append((interval[0], interval[1], item))
+        self._dirty = True
+
+    def _build(self) -> None:
+        self._intervals.sort()
+        self._max_end = [0] * len(self._intervals)
+
+        def build(low: int, high: int) -> int:
+            if low > high:
+                return -1
+            middle = (low + high) // 2
+            max_end = self._intervals[middle][1]
+            for child in (build(low, middle - 1), build(middle + 1, high)):
+                if child >= 0:
+                    max_end = max(max_end, child)
+            self._max_end[middle] = max_end
+            return max_end
+
+        build(0, len(self._intervals) - 1)
+        self._dirty = False
+
+    def overlapping(self, interval: Tuple[int, int]) -> Set[int]:
+        """Éléments dont l'intervalle chevauche l'intervalle donné."""
+        if self._dirty:
+            self._build()
+        start, end = interval
+        result: Set[int] = set()
+        stack = [(0, len(self._intervals) - 1)]
+        while stack:
+            low, high = stack.pop()
+            if low > high:
+                continue
+            middle = (low + high) // 2
+            if self._max_end[middle] < start:
+                continue
+            stack.append((low, middle - 1))
+            node_start, node_end, item = self._intervals[middle]
+            if node_start <= end:
+                if node_end >= start:
+                    result.add(item)
+                stack.append((middle + 1, high))
+        return result
+
+
+def _normalise(name: str, value: Optional[str]):
+    """
+    Forme normalisée d'une dimension : None si non contrainte, sinon
+    (type, début, fin) où le type vaut 4/6 (préfixe IP), 0 (ports) ou 'raw'
+    (valeur non analysable, comparée telle quelle).
+    """
+    if name in ('source', 'destination'):
+        if value is None or value in UNIVERSAL_ADDRESSES:
+            return None
+        network = parse_network(value)
+        if network is None:
+            return ('raw', value, value)
+        version, start, length = network
+        return (version, start, start + (1 << ((32 if version == 4 else 128) - length)) - 1)
+    if value is None or value in UNIVERSAL_PORTS:
+        return None
+    ports = parse_ports(value)
+    return ('raw', value, value) if ports is None else (0, ports[0], ports[1])
+
+
+class _Group:
+    """Règles d'une chaîne contraintes sur les mêmes dimensions."""
+
+    def __init__(self, constrained: Tuple[str, ...]):
+        self.constrained = constrained
+        self.members: List[int] = []
+        self.indexes = {
+            name: PrefixIndex() if name in ('source', 'destination') else IntervalIndex()
+            for name in constrained
+        }
+        self.raw: Dict[str, Dict[str, List[int]]] = {name: {} for name in constrained}
+
+    def add(self, position: int, info: Dict, normalised: Dict) -> None:
+        self.members.append(position)
+        for name in self.constrained:
+            value = normalised[name]
+            if value[0] == 'raw':
+                self.raw[name].setdefault(value[1], []).append(position)
+            elif name in ('source', 'destination'):
+                self.indexes[name].add(parse_network(info[name]), position)
+            else:
+                self.indexes[name].add((value[1], value[2]), position)
+
+    def query(self, name: str, info: Dict, value) -> Iterable[int]:
+        if value[0] == 'raw':
+            return self.raw[name].get(value[1], ())
+        if name in ('source', 'destination'):
+            return self.indexes[name].overlapping(parse_network(info[name]))
+        return self.indexes[name].overlapping((value[1], value[2]))
+
+
+# Ordre de préférence des dimensions pour interroger un groupe (la plus sélective d'abord)
+QUERY_ORDER = ('destination', 'destination_port', 'source', 'source_port')
+
+
+class FirewallRuleIndex:
+    """
+    Index des règles de pare-feu analysées par `_parse_iptables_rule`.
+
+    Deux règles sont candidates si elles partagent la chaîne, ont un
+    protocole compatible et se chevauchent (ou n'ont pas de contrainte) sur
+    chaque dimension adresse/port. Les règles d'une chaîne sont regroupées
+    selon les dimensions qu'elles contraignent ; chaque groupe est interrogé
+    sur une dimension commune indexée, les autres sont filtrées par
+    comparaison d'entiers.
+    """
+
+    def __init__(self, rule_infos: List[Optional[Dict]]):
+        self._infos = rule_infos
+        self._normalised: List[Optional[Dict]] = []
+        self._groups: Dict[Optional[str], Dict[Tuple[str, ...], _Group]] = {}
+
+        for position, info in enumerate(rule_infos):
+            if info is None:
+                self._normalised.append(None)
+                continue
+            normalised = {name: _normalise(name, info[name]) for name in QUERY_ORDER}
+            self._normalised.append(normalised)
+            constrained = tuple(name for name in QUERY_ORDER if normalised[name] is not None)
+            groups = self._groups.setdefault(info['chain'], {})
+            group = groups.get(constrained)
+            if group is None:
+                group = groups[constrained] = _Group(constrained)
+            group.add(position, info, normalised)
+
+    def candidates(self, position: int) -> List[int]:
+        """
+        Positions des règles pouvant entrer en conflit avec la règle donnée.
+
+        Returns:
+            Positions triées, la règle elle-même exclue
+        """
+        info = self._infos[position]
+        if info is None:
+            return []
+        normalised = self._normalised[position]
+        protocol = info['protocol']
+        infos = self._infos
+        all_normalised = self._normalised
+        result: List[int] = []
+
+        for group in self._groups[info['chain']].values():
+            shared = [name for name in group.constrained if normalised[name] is not None]
+            if shared:
+                members = group.query(shared[0], info, normalised[shared[0]])
+                checks = [(name, normalised[name]) for name in shared[1:]]
+            else:
+                members = group.members
+                checks = []
+
+            for other in members:
+                if other == position:
+                    continue
+                other_protocol = infos[other]['protocol']
+                if protocol and other_protocol and protocol != other_protocol:
+                    continue
+                other_normalised = all_normalised[other]
+                for name, value in checks:
+                    other_value = other_normalised[name]
+                    if not (value[0] == other_value[0] and value[1] <= other_value[2] and other_value[1] <= value[2]):
+                        break
+                else:
+                    result.append(other)
+
+        result.sort()
+        return result
@@ -0,0 +1,217 @@
+"""
+Journal partagé des événements de sécurité corrélés.
+
+Le corrélateur en flux (`StreamingEventCorrelator`) vit en mémoire, dans
+chaque processus. Pour que les vues API interrogent l'état alimenté par
+`process_security_event`, quel que soit le processus qui a reçu
+l'événement (worker Celery ou autre worker HTTP), chaque événement est
+publié dans le cache Django sous sa propre clé `<préfixe>:<n>`, où n est
+tiré d'un compteur par `incr`, atomique.
+
+Avant une lecture, un processus rattrape le journal : il lit le compteur,
+puis les seuls événements publiés depuis sa dernière synchronisation, en
+un `get_many`, et les ajoute à son corrélateur. Une requête ne relit donc
+que les nouveaux événements, jamais toute la fenêtre.
+
+Un numéro tiré mais dont l'événement n'est pas encore écrit au moment de
+la synchronisation est ignoré : la corrélation est une aide à l'analyse,
+pas un registre.
+
+Le journal ne couvre que les événements publiés depuis sa création (date
+conservée à côté du compteur). Après un redémarrage ou un cache vidé, la
+partie de la fenêtre demandée antérieure au journal est reconstruite une
+seule fois depuis les alertes enregistrées en base.
+"""
+
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from django.core.cache import cache as default_cache
+from django.utils import timezone
+
+from ..domain.event_correlation import StreamingEventCorrelator, get_event_correlator
+from ..domain.services import SecurityEvent
+from .models import SecurityAlertModel
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_CACHE_PREFIX = "security_management:event_journal"
+
+
+def _encode(event: SecurityEvent) -> Dict[str, Any]:
+    return {
+        'event_id': event.event_id,
+        'event_type': event.event_type,
+        'source_ip': event.source_ip,
+        'destination_ip': event.destination_ip,
+        'timestamp': event.timestamp.isoformat(),
+        'severity': event.severity,
+        'raw_data': event.raw_data,
+        'metadata': event.metadata
+    }
+
+
+def _decode(data: Dict[str, Any]) -> SecurityEvent:
+    return SecurityEvent(**{**data, 'timestamp': datetime.fromisoformat(data['timestamp'])})
+
+
+def _alert_event(alert: SecurityAlertModel) -> SecurityEvent:
+    return SecurityEvent(
+        event_id=f"alert-{alert.id}",
+        event_type='alert',
+        source_ip=alert.source_ip,
+        destination_ip=alert.destination_ip,
+        timestamp=alert.detection_time,
+        severity=alert.severity,
+        raw_data=alert.raw_data or {}
+    )
+
+
+class SharedEventCorrelator:
+    """
+    Corrélateur du processus, synchronisé sur le journal partagé.
+
+    Les événements publiés par ce processus sont ajoutés immédiatement au
+    corrélateur local (leurs corrélations temporelles sont retournées à
+    l'appelant) et ne sont pas relus lors de la synchronisation.
+    """
+
+    def __init__(self, correlator: Optional[StreamingEventCorrelator] = None, backend=None,
+                 prefix: str = JOURNAL_CACHE_PREFIX, max_catch_up: int = 10000):
+        """
+        Initialise le corrélateur partagé.
+
+        Args:
+            correlator: Corrélateur local (corrélateur du processus si None)
+            backend: Backend de cache Django (cache par défaut si None)
+            prefix: Préfixe des clés du journal
+            max_catch_up: Nombre maximal d'événements relus par synchronisation
+        """
+        self.correlator = correlator if correlator is not None else get_event_correlator()
+        self.backend = backend
+        self.prefix = prefix
+        self.max_catch_up = max_catch_up
+        # Les événements ne sont utiles que pendant la fenêtre du corrélateur
+        self.ttl = self.correlator.window_seconds
+
+        self._synced: Optional[int] = None
+        self._published: Set[int] = set()
+        # Période [début, fin) déjà reconstruite depuis les alertes en base
+        self._backfilled: Optional[Tuple[datetime, datetime]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return self.backend if self.backend is not None else default_cache
+
+    @property
+    def counter_key(self) -> str:
+        return f"{self.prefix}:count"
+
+    @property
+    def started_key(self) -> str:
+        return f"{self.prefix}:started"
+
+    def event_key(self, sequence: int) -> str:
+        return f"{self.prefix}:{sequence}"
+
+    def publish(self, event: SecurityEvent) -> List[Dict[str, Any]]:
+        """
+        Publie un événement dans le journal et l'ajoute au corrélateur local.
+
+        Returns:
+            Corrélations temporelles créées par l'événement
+        """
+        # Numéro tiré sous le verrou : une synchronisation concurrente ne
+        # peut pas relire un événement déjà ajouté localement
+        with self._lock:
+            try:
+                sequence = self.cache.incr(self.counter_key)
+            except ValueError:
+                # Premier événement (ou compteur évincé du cache) : le journal
+                # ne couvre que les événements publiés à partir de maintenant
+                self.cache.set(self.started_key, timezone.now().isoformat(), None)
+                self.cache.add(self.counter_key, 0, None)
+                sequence = self.cache.incr(self.counter_key)
+            self._published.add(sequence)
+        self.cache.set(self.event_key(sequence), _encode(event), self.ttl)
+
+        with self._lock:
+            return self.correlator.add(event)
+
+    def sync(self, since: Optional[datetime] = None) -> StreamingEventCorrelator:
+        """
+        Ajoute au corrélateur local les événements publiés par les autres
+        processus depuis la dernière synchronisation.
+
+        Args:
+            since: Début de la période interrogée ; la partie antérieure au
+                journal est reconstruite depuis les alertes en base
+
+        Returns:
+            Corrélateur local à jour
+        """
+        with self._lock:
+            latest = self.cache.get(self.counter_key) or 0
+            if self._synced is not None and latest < self._synced:
+                # Compteur perdu (cache vidé) : le journal repart de zéro
+                self._synced = 0
+                self._published.clear()
+
+            first = max(self._synced or 0, latest - self.max_catch_up)
+            sequences = [sequence for sequence in range(first + 1, latest + 1)
+                         if sequence not in self._published]
+            found = self.cache.get_many([self.event_key(sequence) for sequence in sequences]) if sequences else {}
+
+            events = []
+            for data in found.values():
+                try:
+                    events.append(_decode(data))
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.warning(f"Événement du journal de corrélation illisible: {e}")
+            self.correlator.add_many(events)
+
+            self._published = {sequence for sequence in self._published if sequence > latest}
+            self._synced = latest
+
+            if since is not None:
+                # Journal vide ou absent : il ne couvre encore aucun événement
+                started = self.cache.get(self.started_key) if latest else None
+                self._backfill(since, datetime.fromisoformat(started) if started else timezone.now())
+            return self.correlator
+
+    def _backfill(self, since: datetime, until: datetime):
+        """
+        Ajoute au corrélateur les alertes enregistrées entre `since` et
+        `until` qui n'ont pas déjà été reconstruites.
+        """
+        if self._backfilled is None:
+            covered = (since, until)
+            periods = [covered]
+        else:
+            # La période reconstruite reste d'un seul tenant
+            start, end = self._backfilled
+            covered = (min(since, start), max(until, end))
+            periods = [(covered[0], start), (end, covered[1])]
+        periods = [(start, end) for start, end in periods if start < end]
+        if not periods:
+            return
+
+        events = []
+        for start, end in periods:
+            alerts = SecurityAlertModel.objects.filter(
+                detection_time__gte=start, detection_time__lt=end
+            ).order_by('-detection_time')[:self.max_catch_up]
+            events.extend(_alert_event(alert) for alert in alerts)
+        self.correlator.add_many(events)
+        self._backfilled = covered
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Statistiques du corrélateur local et position dans le journal."""
+        return {**self.correlator.get_statistics(), 'journal_sequence': self._synced}
+
+
+# Instance partagée
+shared_event_correlator = SharedEventCorrelator()
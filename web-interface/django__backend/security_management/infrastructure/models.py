@@ -64,6 +64,10 @@ class SecurityAlertModel(models.Model):
         verbose_name = "Alerte de sécurité"
         verbose_name_plural = "Alertes de sécurité"
         ordering = ["-detection_time"]
+        indexes = [
+            # Pagination par curseur du flux d'alertes unifié
+            models.Index(fields=["detection_time", "id"], name="security_alert_feed_idx"),
+        ]
     
     def __str__(self):
         return f"{self.title} ({self.severity})"
@@ -556,6 +560,22 @@ class SuricataAlert(models.Model):
         self.save(update_fields=['auto_report_triggered', 'auto_report_session_id'])
 
 
+
+class IngestionCheckpoint(models.Model):
+    """Position persistée (high-water mark) d'une source d'ingestion d'alertes."""
+    
+    source = models.CharField(max_length=100, unique=True)
+    high_water_mark = models.DateTimeField(null=True, blank=True)
+    alerts_ingested = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Point de reprise d'ingestion"
+        verbose_name_plural = "Points de reprise d'ingestion"
+    
+    def __str__(self):
+        return f"{self.source} @ {self.high_water_mark}"
+
 class SecurityEvent(models.Model):
     """Modèle pour stocker les événements de sécurité génériques avec corrélation."""
     
@@ -54,6 +54,7 @@ from .docker_integration import (
     SuricataDockerAdapter, Fail2BanDockerAdapter, 
     TrafficControlDockerAdapter, ServiceHealthCheck
 )
+from .event_journal import shared_event_correlator
 
 logger = logging.getLogger(__name__)
 
@@ -696,6 +697,9 @@ class UnifiedSecurityService:
         
         self.anomaly_service = AnomalyDetectionService()
         
+        # Corrélateur en flux, partagé avec EventCorrelationAPIView par le journal
+        self.event_correlator = shared_event_correlator
+        
         # Cache pour les performances
         self.cache_timeout = 300  # 5 minutes
         
@@ -806,6 +810,9 @@ class UnifiedSecurityService:
             )
             security_event.add_enrichment('gns3_context', gns3_context)
             
+            # Corrélations temporelles émises à l'arrivée de l'événement
+            temporal_correlations = self.event_correlator.publish(security_event)
+            
             # Traiter avec le moteur de corrélation
             enriched_event, generated_alerts = self.correlation_engine.process_event(
                 security_event.to_dict()
@@ -840,7 +847,8 @@ class UnifiedSecurityService:
                 'correlation_results': {
                     'alerts_generated': len(generated_alerts),
                     'alert_ids': saved_alerts,
-                    'correlation_score': enriched_event.correlation_info.get('score', 0.0)
+                    'correlation_score': enriched_event.correlation_info.get('score', 0.0),
+                    'temporal_correlations': len(temporal_correlations)
                 },
                 'anomaly_results': {
                     'anomalies_detected': len(anomalies),
@@ -1280,6 +1288,7 @@ class UnifiedSecurityService:
             return {
                 'docker_services': docker_metrics.get('aggregated_metrics', {}),
                 'correlation_engine': correlation_stats,
+                'event_correlator': self.event_correlator.get_statistics(),
                 'database_performance': {
                     'total_alerts': SecurityAlertModel.objects.count(),
                     'total_rules': SecurityRuleModel.objects.count(),
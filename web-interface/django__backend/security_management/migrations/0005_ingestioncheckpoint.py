@@ -0,0 +1,35 @@
+# Generated by Django 4.2.23 on 2026-10-16 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("security_management", "0004_autoreportalert_suricataalert_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngestionCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source", models.CharField(max_length=100, unique=True)),
+                ("high_water_mark", models.DateTimeField(blank=True, null=True)),
+                ("alerts_ingested", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Point de reprise d'ingestion",
+                "verbose_name_plural": "Points de reprise d'ingestion",
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.23 on 2026-10-16 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("security_management", "0005_ingestioncheckpoint"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="securityalertmodel",
+            index=models.Index(
+                fields=["detection_time", "id"], name="security_alert_feed_idx"
+            ),
+        ),
+    ]
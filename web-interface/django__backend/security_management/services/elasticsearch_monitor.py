@@ -8,7 +8,7 @@ les nouvelles alertes de sécurité et déclencher les rapports.
 import logging
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 
 from django.conf import settings
 from django.utils import timezone
@@ -90,58 +90,7 @@ class ElasticsearchMonitor:
                 body=query
             )
             
-            alerts = []
-            for hit in response['hits']['hits']:
-                source = hit['_source']
-                
-                # Enrichir l'alerte avec des métadonnées
-                alert_data = {
-                    '_id': hit['_id'],
-                    '_index': hit['_index'],
-                    '@timestamp': source.get('@timestamp'),
-                    'event_type': source.get('event_type', 'alert'),
-                    'alert': source.get('alert', {}),
-                    'src_ip': source.get('src_ip', ''),
-                    'dest_ip': source.get('dest_ip', ''),
-                    'src_port': source.get('src_port', 0),
-                    'dest_port': source.get('dest_port', 0),
-                    'proto': source.get('proto', ''),
-                    'flow': source.get('flow', {}),
-                    'packet_info': source.get('packet_info', {}),
-                    'host': source.get('host', {}),
-                    'raw_source': source
-                }
-                
-                # Déterminer la sévérité
-                alert_info = source.get('alert', {})
-                severity_num = alert_info.get('severity', 3)
-                
-                # Mapping sévérité numérique vers texte
-                severity_map = {
-                    1: 'critical',
-                    2: 'high', 
-                    3: 'medium',
-                    4: 'low'
-                }
-                alert_data['severity'] = severity_map.get(severity_num, 'medium')
-                
-                # Enrichir avec signature et catégorie
-                alert_data['signature'] = alert_info.get('signature', 'Unknown Alert')
-                alert_data['category'] = alert_info.get('category', 'Unknown')
-                alert_data['gid'] = alert_info.get('gid', 0)
-                alert_data['sid'] = alert_info.get('sid', 0)
-                alert_data['rev'] = alert_info.get('rev', 0)
-                
-                # Identifier les alertes critiques
-                critical_signatures = [
-                    'malware', 'trojan', 'exploit', 'shellcode', 
-                    'backdoor', 'botnet', 'ransomware', 'apt'
-                ]
-                
-                if any(keyword in alert_data['signature'].lower() for keyword in critical_signatures):
-                    alert_data['severity'] = 'critical'
-                
-                alerts.append(alert_data)
+            alerts = [self._format_alert(hit) for hit in response['hits']['hits']]
             
             logger.info(f"📥 {len(alerts)} nouvelles alertes récupérées depuis {since_time}")
             return alerts
@@ -153,6 +102,117 @@ class ElasticsearchMonitor:
             logger.error(f"❌ Erreur récupération alertes Elasticsearch: {e}")
             return []
     
+    def iter_alerts_since(self, since_time: datetime, batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Parcourt toutes les alertes depuis un timestamp, par lots chronologiques.
+        
+        Contrairement à get_new_alerts_since, le nombre d'alertes n'est pas
+        plafonné : les pages sont lues par ordre croissant de @timestamp avec
+        un point-in-time et search_after, ce qui garantit un ordre stable
+        même pour des alertes de même horodatage.
+        
+        Args:
+            since_time: Timestamp (inclus) depuis lequel récupérer les alertes
+            batch_size: Nombre d'alertes par lot
+            
+        Yields:
+            Lots d'alertes au format de get_new_alerts_since
+        """
+        if not self.es_client:
+            logger.warning("⚠️ Client Elasticsearch non disponible")
+            return
+        
+        pit_id = self.es_client.open_point_in_time(
+            index=self.suricata_index_pattern, keep_alive="2m"
+        )['id']
+        try:
+            query = {
+                "bool": {
+                    "must": [{"range": {"@timestamp": {"gte": since_time.isoformat()}}}],
+                    "filter": [
+                        {"exists": {"field": "alert"}},
+                        {"term": {"event_type": "alert"}}
+                    ]
+                }
+            }
+            search_after = None
+            while True:
+                response = self.es_client.search(
+                    query=query,
+                    sort=[{"@timestamp": {"order": "asc"}}],
+                    size=batch_size,
+                    pit={"id": pit_id, "keep_alive": "2m"},
+                    search_after=search_after
+                )
+                hits = response['hits']['hits']
+                if not hits:
+                    break
+                
+                pit_id = response.get('pit_id', pit_id)
+                search_after = hits[-1]['sort']
+                yield [self._format_alert(hit) for hit in hits]
+                
+                if len(hits) < batch_size:
+                    break
+        finally:
+            try:
+                self.es_client.close_point_in_time(id=pit_id)
+            except Exception as e:
+                logger.debug(f"Fermeture du point-in-time échouée: {e}")
+    
+    def _format_alert(self, hit: Dict[str, Any]) -> Dict[str, Any]:
+        """Convertit un document Elasticsearch en alerte enrichie."""
+        source = hit['_source']
+        
+        # Enrichir l'alerte avec des métadonnées
+        alert_data = {
+            '_id': hit['_id'],
+            '_index': hit['_index'],
+            '@timestamp': source.get('@timestamp'),
+            'event_type': source.get('event_type', 'alert'),
+            'alert': source.get('alert', {}),
+            'src_ip': source.get('src_ip', ''),
+            'dest_ip': source.get('dest_ip', ''),
+            'src_port': source.get('src_port', 0),
+            'dest_port': source.get('dest_port', 0),
+            'proto': source.get('proto', ''),
+            'flow': source.get('flow', {}),
+            'packet_info': source.get('packet_info', {}),
+            'host': source.get('host', {}),
+            'raw_source': source
+        }
+        
+        # Déterminer la sévérité
+        alert_info = source.get('alert', {})
+        severity_num = alert_info.get('severity', 3)
+        
+        # Mapping sévérité numérique vers texte
+        severity_map = {
+            1: 'critical',
+            2: 'high', 
+            3: 'medium',
+            4: 'low'
+        }
+        alert_data['severity'] = severity_map.get(severity_num, 'medium')
+        
+        # Enrichir avec signature et catégorie
+        alert_data['signature'] = alert_info.get('signature', 'Unknown Alert')
+        alert_data['category'] = alert_info.get('category', 'Unknown')
+        alert_data['gid'] = alert_info.get('gid', 0)
+        alert_data['sid'] = alert_info.get('sid', 0)
+        alert_data['rev'] = alert_info.get('rev', 0)
+        
+        # Identifier les alertes critiques
+        critical_signatures = [
+            'malware', 'trojan', 'exploit', 'shellcode', 
+            'backdoor', 'botnet', 'ransomware', 'apt'
+        ]
+        
+        if any(keyword in alert_data['signature'].lower() for keyword in critical_signatures):
+            alert_data['severity'] = 'critical'
+        
+        return alert_data
+    
     def get_alert_statistics(self, time_range_hours: int = 24) -> Dict[str, Any]:
         """
         Récupère les statistiques des alertes sur une période donnée.
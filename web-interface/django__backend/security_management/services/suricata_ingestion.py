@@ -0,0 +1,181 @@
+"""
+Ingestion par lots des alertes Suricata.
+
+Les alertes lues depuis Elasticsearch sont dédupliquées en mémoire par
+`alert_id`, insérées par `bulk_create(ignore_conflicts=True)` en blocs, puis
+signalées une seule fois par lot. La position de lecture est persistée en
+base (IngestionCheckpoint) : une exécution interrompue reprend au dernier lot
+validé, et la relecture des alertes déjà présentes est sans effet.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Dict, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import IngestionCheckpoint, SuricataAlert
+from ..signals import suricata_alerts_ingested
+
+logger = logging.getLogger(__name__)
+
+
+SEVERITY_NAMES = {1: 'critical', 2: 'high', 3: 'medium', 4: 'low'}
+
+
+class SuricataAlertIngestor:
+    """
+    Ingère les alertes Suricata d'Elasticsearch dans SuricataAlert.
+    """
+
+    CHECKPOINT_SOURCE = 'suricata'
+
+    def __init__(self, monitor=None, batch_size: int = 5000, chunk_size: int = 1000,
+                 initial_lookback: timedelta = timedelta(minutes=5)):
+        """
+        Initialise l'ingesteur.
+
+        Args:
+            monitor: Source des alertes (ElasticsearchMonitor par défaut)
+            batch_size: Nombre d'alertes lues par page Elasticsearch
+            chunk_size: Nombre d'alertes par bulk_create
+            initial_lookback: Période relue lorsqu'aucun point de reprise n'existe
+        """
+        if monitor is None:
+            from .elasticsearch_monitor import ElasticsearchMonitor
+            monitor = ElasticsearchMonitor()
+        self.monitor = monitor
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.initial_lookback = initial_lookback
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Ingère toutes les alertes postérieures au point de reprise.
+
+        Returns:
+            Compteurs de l'exécution et nouveau point de reprise
+        """
+        checkpoint, _ = IngestionCheckpoint.objects.get_or_create(source=self.CHECKPOINT_SOURCE)
+        since = checkpoint.high_water_mark or timezone.now() - self.initial_lookback
+
+        totals = {'total_alerts': 0, 'alerts_processed': 0, 'duplicates': 0, 'invalid': 0, 'batches': 0}
+        for alerts in self.monitor.iter_alerts_since(since, batch_size=self.batch_size):
+            result = self.ingest_batch(alerts, checkpoint)
+            for key in ('total_alerts', 'alerts_processed', 'duplicates', 'invalid'):
+                totals[key] += result[key]
+            totals['batches'] += 1
+
+        totals['high_water_mark'] = (
+            checkpoint.high_water_mark.isoformat() if checkpoint.high_water_mark else None
+        )
+        return totals
+
+    def ingest_batch(self, alerts: List[Dict[str, Any]],
+                     checkpoint: Optional[IngestionCheckpoint] = None) -> Dict[str, Any]:
+        """
+        Ingère un lot d'alertes et avance le point de reprise dans la même transaction.
+
+        Args:
+            alerts: Alertes au format d'ElasticsearchMonitor
+            checkpoint: Point de reprise à avancer jusqu'à l'alerte la plus récente
+
+        Returns:
+            Compteurs du lot (total_alerts, alerts_processed, duplicates, invalid)
+        """
+        instances = {}
+        invalid = 0
+        latest = None
+        for alert_data in alerts:
+            instance = self._build_alert(alert_data)
+            if instance is None:
+                invalid += 1
+                continue
+            instances.setdefault(instance.alert_id, instance)
+            if latest is None or instance.timestamp > latest:
+                latest = instance.timestamp
+
+        created = []
+        with transaction.atomic():
+            pending = list(instances.values())
+            for start in range(0, len(pending), self.chunk_size):
+                created.extend(self._insert_chunk(pending[start:start + self.chunk_size]))
+
+            if checkpoint is not None and latest is not None:
+                if checkpoint.high_water_mark is None or latest > checkpoint.high_water_mark:
+                    checkpoint.high_water_mark = latest
+                checkpoint.alerts_ingested += len(created)
+                checkpoint.save(update_fields=['high_water_mark', 'alerts_ingested', 'updated_at'])
+
+        if created:
+            severity_counts = {}
+            for alert in created:
+                name = SEVERITY_NAMES.get(alert.severity, 'unknown')
+                severity_counts[name] = severity_counts.get(name, 0) + 1
+            suricata_alerts_ingested.send(
+                sender=SuricataAlert,
+                alerts=created,
+                severity_counts=severity_counts
+            )
+
+        return {
+            'total_alerts': len(alerts),
+            'alerts_processed': len(created),
+            'duplicates': len(alerts) - invalid - len(created),
+            'invalid': invalid
+        }
+
+    def _insert_chunk(self, chunk: List[SuricataAlert]) -> List[SuricataAlert]:
+        """
+        Insère un bloc d'alertes et retourne celles qui n'existaient pas.
+
+        Les identifiants déjà présents sont lus en une requête ; les conflits
+        restants (exécution concurrente) sont ignorés par la base.
+        """
+        existing = set(
+            SuricataAlert.objects.filter(
+                alert_id__in=[alert.alert_id for alert in chunk]
+            ).values_list('alert_id', flat=True)
+        )
+        new_alerts = [alert for alert in chunk if alert.alert_id not in existing]
+        if new_alerts:
+            SuricataAlert.objects.bulk_create(new_alerts, ignore_conflicts=True)
+        return new_alerts
+
+    def _build_alert(self, alert_data: Dict[str, Any]) -> Optional[SuricataAlert]:
+        """Construit une SuricataAlert non enregistrée, ou None si l'alerte est inexploitable."""
+        alert_id = alert_data.get('alert_id', alert_data.get('_id'))
+        timestamp = self._parse_timestamp(alert_data.get('@timestamp'))
+        if not alert_id or timestamp is None:
+            return None
+
+        alert_info = alert_data.get('alert', {})
+        return SuricataAlert(
+            alert_id=alert_id,
+            signature=alert_info.get('signature', ''),
+            category=alert_info.get('category', ''),
+            severity=alert_info.get('severity', 1),
+            source_ip=alert_data.get('src_ip', ''),
+            destination_ip=alert_data.get('dest_ip', ''),
+            source_port=alert_data.get('src_port', 0),
+            destination_port=alert_data.get('dest_port', 0),
+            protocol=alert_data.get('proto', ''),
+            timestamp=timestamp,
+            raw_data=alert_data
+        )
+
+    def _parse_timestamp(self, value: Any) -> Optional[datetime]:
+        """Convertit l'horodatage Elasticsearch en datetime."""
+        if isinstance(value, datetime):
+            return value if timezone.is_aware(value) else timezone.make_aware(value, dt_timezone.utc)
+        if not value:
+            return None
+        try:
+            parsed = parse_datetime(value)
+        except ValueError:
+            return None
+        if parsed is not None and timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed, dt_timezone.utc)
+        return parsed
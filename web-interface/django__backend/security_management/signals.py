@@ -14,6 +14,7 @@ from django.conf import settings
 security_alert_detected = Signal()  # Émis quand une nouvelle alerte de sécurité est détectée
 security_rule_triggered = Signal()  # Émis quand une règle de sécurité est déclenchée
 security_threat_detected = Signal()  # Émis quand une menace potentielle est détectée
+suricata_alerts_ingested = Signal()  # Émis une fois par lot d'alertes Suricata ingérées
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +58,32 @@ def handle_security_alert(sender, **kwargs):
             logger.error(f"Erreur lors de l'envoi de l'email d'alerte: {e}")
 
 
+
+@receiver(suricata_alerts_ingested)
+def handle_suricata_alerts_ingested(sender, **kwargs):
+    """
+    Gestionnaire pour le signal suricata_alerts_ingested.
+    
+    Ce gestionnaire est appelé une fois par lot d'alertes Suricata ingérées,
+    avec un résumé du lot plutôt qu'un signal par alerte.
+    
+    Args:
+        sender: L'émetteur du signal
+        **kwargs: Arguments supplémentaires, notamment 'alerts' (nouvelles alertes
+                 du lot) et 'severity_counts' (nombre d'alertes par sévérité)
+    """
+    alerts = kwargs.get('alerts', [])
+    severity_counts = kwargs.get('severity_counts', {})
+    
+    if not alerts:
+        return
+    
+    logger.info(f"{len(alerts)} nouvelles alertes Suricata ingérées (sévérités: {severity_counts})")
+    
+    critical_count = severity_counts.get('critical', 0) + severity_counts.get('high', 0)
+    if critical_count:
+        logger.warning(f"{critical_count} alertes Suricata critiques ou élevées dans le lot")
+
 @receiver(security_rule_triggered)
 def handle_security_rule_trigger(sender, **kwargs):
     """
@@ -7,6 +7,7 @@ des alertes de sécurité et le déclenchement des rapports.
 
 import logging
 import json
+import uuid
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 
@@ -202,66 +203,34 @@ def fetch_suricata_alerts():
     Récupère les alertes Suricata depuis Elasticsearch.
     
     Cette tâche est exécutée toutes les 5 minutes pour synchroniser
-    les alertes Suricata avec la base de données Django.
+    les alertes Suricata avec la base de données Django. Les alertes sont
+    ingérées par lots depuis le point de reprise persisté ; une exécution
+    encore en cours empêche la suivante de démarrer.
     """
+    lock_key = "suricata_ingestion_lock"
+    lock_token = uuid.uuid4().hex
+    if not cache.add(lock_key, lock_token, timeout=600):
+        logger.info("⏭️ Ingestion Suricata déjà en cours, exécution ignorée")
+        return {
+            "status": "skipped",
+            "reason": "ingestion_in_progress"
+        }
+    
     try:
         logger.info("📥 Récupération des alertes Suricata")
         
-        from .services.suricata_client import SuricataClient
-        
-        suricata_client = SuricataClient()
-        
-        # Récupérer les alertes depuis le dernier fetch
-        last_fetch_key = "suricata_last_fetch"
-        last_fetch_time = cache.get(last_fetch_key, timezone.now() - timedelta(minutes=5))
-        
-        alerts = suricata_client.get_alerts_since(last_fetch_time)
-        
-        alerts_processed = 0
-        for alert_data in alerts:
-            try:
-                # Créer ou mettre à jour l'alerte en DB
-                from .models import SuricataAlert
-                
-                alert, created = SuricataAlert.objects.get_or_create(
-                    alert_id=alert_data.get('alert_id', alert_data.get('_id')),
-                    defaults={
-                        'signature': alert_data.get('alert', {}).get('signature', ''),
-                        'category': alert_data.get('alert', {}).get('category', ''),
-                        'severity': alert_data.get('alert', {}).get('severity', 1),
-                        'source_ip': alert_data.get('src_ip', ''),
-                        'destination_ip': alert_data.get('dest_ip', ''),
-                        'source_port': alert_data.get('src_port', 0),
-                        'destination_port': alert_data.get('dest_port', 0),
-                        'protocol': alert_data.get('proto', ''),
-                        'timestamp': alert_data.get('@timestamp'),
-                        'raw_data': alert_data
-                    }
-                )
-                
-                if created:
-                    alerts_processed += 1
-                    
-                    # Déclencher signal pour nouvelle alerte
-                    from .signals import security_alert_detected
-                    security_alert_detected.send(
-                        sender=SuricataAlert,
-                        alert=alert
-                    )
-                    
-            except Exception as e:
-                logger.error(f"Erreur traitement alerte Suricata: {e}")
-                continue
+        from .services.suricata_ingestion import SuricataAlertIngestor
         
-        # Mettre à jour timestamp
-        cache.set(last_fetch_key, timezone.now(), timeout=3600)
+        result = SuricataAlertIngestor().run()
         
-        logger.info(f"✅ {alerts_processed} nouvelles alertes Suricata traitées")
+        logger.info(
+            f"✅ {result['alerts_processed']} nouvelles alertes Suricata traitées "
+            f"({result['total_alerts']} lues, {result['duplicates']} doublons)"
+        )
         
         return {
             "status": "success",
-            "alerts_processed": alerts_processed,
-            "total_alerts": len(alerts)
+            **result
         }
         
     except Exception as e:
@@ -270,6 +239,10 @@ def fetch_suricata_alerts():
             "status": "error",
             "error": str(e)
         }
+    finally:
+        # Une exécution plus longue que le bail ne libère pas le verrou de la suivante
+        if cache.get(lock_key) == lock_token:
+            cache.delete(lock_key)
 
 
 @shared_task
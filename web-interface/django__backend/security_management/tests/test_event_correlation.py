@@ -0,0 +1,280 @@
+"""
+Tests du corrélateur d'événements en flux continu.
+"""
+
+import random
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+
+from ..domain.event_correlation import StreamingEventCorrelator
+from ..domain.services import SecurityEvent
+from ..infrastructure.event_journal import SharedEventCorrelator
+from ..models import SecurityAlertModel
+
+
+START = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def _event(seconds, source_ip='10.0.0.1', destination_ip='192.168.1.1', event_type='alert', severity='medium'):
+    return SecurityEvent(
+        event_type=event_type,
+        source_ip=source_ip,
+        destination_ip=destination_ip,
+        timestamp=START + timedelta(seconds=seconds),
+        severity=severity
+    )
+
+
+def _pairwise_temporal(events, max_gap):
+    """Référence : comparaison de toutes les paires d'événements."""
+    pairs = {}
+    for i, event1 in enumerate(events):
+        for event2 in events[i + 1:]:
+            time_diff = (event2.timestamp - event1.timestamp).total_seconds()
+            if time_diff > max_gap:
+                break
+            score = max(0.0, 1.0 - time_diff / max_gap)
+            if event1.source_ip == event2.source_ip:
+                score += 0.2
+            if event1.destination_ip == event2.destination_ip:
+                score += 0.1
+            score = min(1.0, score)
+            if score > 0.5:
+                pairs[(event1.event_id, event2.event_id)] = score
+    return pairs
+
+
+class StreamingEventCorrelatorTest(unittest.TestCase):
+    """Tests du corrélateur à fenêtres glissantes."""
+
+    def test_temporal_matches_pairwise_reference(self):
+        rng = random.Random(0)
+        events = []
+        for _ in range(300):
+            events.append(_event(
+                rng.uniform(0, 3600),
+                source_ip=f'10.0.0.{rng.randint(1, 5)}',
+                destination_ip=f'192.168.1.{rng.randint(1, 3)}'
+            ))
+        events.sort(key=lambda e: e.timestamp)
+        correlator = StreamingEventCorrelator(max_gap=300, max_partners=10000)
+
+        emitted = correlator.add_many(events)
+
+        expected = _pairwise_temporal(events, 300)
+        self.assertEqual(
+            {tuple(c['event_ids']): c['score'] for c in emitted},
+            pytest.approx(expected)
+        )
+
+    def test_correlations_are_emitted_on_arrival(self):
+        correlator = StreamingEventCorrelator(max_gap=300)
+
+        self.assertEqual(correlator.add(_event(0)), [])
+        correlations = correlator.add(_event(30))
+
+        self.assertEqual(len(correlations), 1)
+        self.assertEqual(correlations[0]['time_gap_seconds'], 30)
+        self.assertEqual(correlator.temporal_correlations(), correlations)
+
+    def test_temporal_correlations_rescored_for_requested_gap(self):
+        correlator = StreamingEventCorrelator(max_gap=300)
+        correlator.add(_event(0))
+        correlator.add(_event(60, source_ip='10.0.0.2'))
+        correlator.add(_event(100))
+
+        rescored = correlator.temporal_correlations(max_gap=120)
+
+        # La paire à 100 s (même source) tombe sous le seuil : 1 - 100/120 + 0.3
+        self.assertEqual(
+            sorted((c['time_gap_seconds'], c['score']) for c in rescored),
+            pytest.approx([(40, 1 - 40 / 120 + 0.1), (60, 1 - 60 / 120 + 0.1)])
+        )
+        self.assertEqual(len(correlator.temporal_correlations(max_gap=300)), 3)
+        with self.assertRaises(ValueError):
+            correlator.temporal_correlations(max_gap=600)
+
+    def test_partners_per_event_are_bounded(self):
+        correlator = StreamingEventCorrelator(max_gap=300, max_partners=5)
+
+        emitted = [correlator.add(_event(i)) for i in range(50)]
+
+        self.assertTrue(all(len(correlations) <= 5 for correlations in emitted))
+        self.assertEqual(len(emitted[-1]), 5)
+
+    def test_old_events_are_evicted(self):
+        correlator = StreamingEventCorrelator(window_seconds=600)
+        correlator.add(_event(0, source_ip='10.0.0.9'))
+        correlator.add(_event(1000))
+
+        self.assertEqual(len(correlator.events()), 1)
+        self.assertNotIn('10.0.0.9', correlator.grouped('source_ip'))
+        self.assertEqual(correlator.get_statistics()['events_evicted'], 1)
+
+    def test_spatial_and_grouped_queries(self):
+        correlator = StreamingEventCorrelator()
+        for i, event_type in enumerate(['scan', 'probe', 'exploit']):
+            correlator.add(_event(i * 60, event_type=event_type))
+        correlator.add(_event(200, source_ip='10.0.0.2'))
+
+        spatial = correlator.spatial_correlations()
+        self.assertEqual([c['source_ip'] for c in spatial], ['10.0.0.1'])
+        self.assertEqual(spatial[0]['details']['time_span'], 120)
+
+        recent = correlator.grouped('source_ip', since=START + timedelta(seconds=100))
+        self.assertEqual(len(recent['10.0.0.1']), 1)
+
+
+class _CountingCache(LocMemCache):
+    """LocMemCache comptant les lectures groupées."""
+
+    def __init__(self, name):
+        super().__init__(name, {})
+        self.get_many_calls = 0
+
+    def get_many(self, keys, version=None):
+        self.get_many_calls += 1
+        return super().get_many(keys, version=version)
+
+
+class SharedEventCorrelatorTest(unittest.TestCase):
+    """Tests du corrélateur partagé entre processus par le journal."""
+
+    def setUp(self):
+        self.cache = _CountingCache('event-journal-test')
+        self.cache.clear()
+        self.addCleanup(self.cache.clear)
+        # Deux processus : le worker qui reçoit les événements et un worker HTTP
+        self.worker = SharedEventCorrelator(StreamingEventCorrelator(max_gap=300), backend=self.cache)
+        self.api = SharedEventCorrelator(StreamingEventCorrelator(max_gap=300), backend=self.cache)
+
+    def test_api_process_sees_published_events(self):
+        self.assertEqual(self.worker.publish(_event(0)), [])
+        self.assertEqual(len(self.worker.publish(_event(30))), 1)
+
+        correlator = self.api.sync()
+
+        self.assertEqual([e.event_id for e in correlator.events()],
+                         [e.event_id for e in self.worker.correlator.events()])
+        self.assertEqual(correlator.temporal_correlations(), self.worker.correlator.temporal_correlations())
+
+    def test_sync_reads_only_new_events(self):
+        for i in range(3):
+            self.worker.publish(_event(i))
+        self.api.sync()
+        self.worker.publish(_event(10))
+        self.cache.get_many_calls = 0
+
+        self.api.sync()
+        self.api.sync()
+
+        self.assertEqual(self.cache.get_many_calls, 1)
+        self.assertEqual(self.api.correlator.get_statistics()['events_processed'], 4)
+
+    def test_publish_after_syncing_older_events(self):
+        api_event = _event(300)
+        self.api.publish(api_event)
+        # Événement plus ancien reçu par un autre processus
+        self.worker.publish(_event(0))
+        self.api.sync()
+
+        new_event = _event(320)
+        correlations = self.api.publish(new_event)
+
+        self.assertEqual([c['event_ids'] for c in correlations], [[api_event.event_id, new_event.event_id]])
+        self.assertEqual([e.timestamp for e in self.api.correlator.events()],
+                         [START + timedelta(seconds=s) for s in (0, 300, 320)])
+
+    def test_own_events_are_not_added_twice(self):
+        self.worker.publish(_event(0))
+        self.api.publish(_event(5, source_ip='10.0.0.2'))
+
+        self.worker.sync()
+        self.api.sync()
+
+        self.assertEqual(self.worker.correlator.get_statistics()['events_processed'], 2)
+        self.assertEqual(self.api.correlator.get_statistics()['events_processed'], 2)
+
+
+class SharedEventCorrelatorBackfillTest(TestCase):
+    """Tests de la reconstruction depuis la base quand le journal est vide."""
+
+    def setUp(self):
+        self.cache = _CountingCache('event-journal-backfill-test')
+        self.cache.clear()
+        self.addCleanup(self.cache.clear)
+        # Processus redémarré, cache vidé : journal et corrélateur vides
+        self.api = SharedEventCorrelator(StreamingEventCorrelator(max_gap=300), backend=self.cache)
+        for seconds in (0, 30):
+            SecurityAlertModel.objects.create(
+                title='Scan de ports',
+                source_ip='10.0.0.1',
+                destination_ip='192.168.1.1',
+                detection_time=START + timedelta(seconds=seconds),
+                severity='high'
+            )
+
+    def test_stored_alerts_are_correlated_with_an_empty_journal(self):
+        correlator = self.api.sync(since=START - timedelta(hours=1))
+
+        self.assertEqual([e.timestamp for e in correlator.events()],
+                         [START, START + timedelta(seconds=30)])
+        correlations = correlator.temporal_correlations(START - timedelta(hours=1))
+        self.assertEqual(len(correlations), 1)
+        self.assertEqual(correlations[0]['time_gap_seconds'], 30)
+
+    def test_stored_alerts_are_loaded_once(self):
+        self.api.sync(since=START - timedelta(hours=1))
+        self.api.sync(since=START - timedelta(hours=1))
+
+        self.assertEqual(self.api.correlator.get_statistics()['events_processed'], 2)
+
+    def test_published_events_are_not_read_back_from_the_database(self):
+        # Le journal démarre avec cet événement : les alertes antérieures
+        # viennent de la base, les suivantes du journal
+        self.api.publish(_event(60))
+        SecurityAlertModel.objects.create(
+            title='Alerte publiée', detection_time=START + timedelta(days=365), severity='low'
+        )
+
+        correlator = self.api.sync(since=START - timedelta(hours=1))
+
+        self.assertEqual([e.timestamp for e in correlator.events()],
+                         [START + timedelta(seconds=s) for s in (0, 30, 60)])
+
+
+class StreamingEventCorrelatorPerformanceTest(unittest.TestCase):
+    """Benchmark d'une rafale d'alertes Suricata."""
+
+    @pytest.mark.performance
+    def test_burst_scores_a_bounded_number_of_pairs(self):
+        """20 000 événements en 2 minutes, tous à portée : au plus `max_partners` paires notées par événement."""
+        rng = random.Random(0)
+        events = [
+            _event(
+                i * 0.006,
+                source_ip=f'10.0.{rng.randint(0, 3)}.{rng.randint(1, 254)}',
+                destination_ip=f'192.168.1.{rng.randint(1, 10)}',
+                event_type=rng.choice(['scan', 'probe', 'alert'])
+            )
+            for i in range(20000)
+        ]
+        correlator = StreamingEventCorrelator()
+        scored = []
+        temporal_pair = correlator._temporal_pair
+        correlator._temporal_pair = lambda *entries: scored.append(1) or temporal_pair(*entries)
+
+        per_event = []
+        for event in events:
+            before = len(scored)
+            correlator.add(event)
+            per_event.append(len(scored) - before)
+
+        # Toutes les paires : 20 000 × 19 999 / 2 ≈ 2 × 10^8
+        self.assertLessEqual(max(per_event), correlator.max_partners)
+        self.assertEqual(per_event[-1], correlator.max_partners)
+        self.assertLessEqual(len(scored), 20000 * correlator.max_partners)
@@ -0,0 +1,149 @@
+"""
+Tests de l'index des règles de pare-feu et de l'analyse de conflits indexée.
+"""
+
+import random
+import unittest
+from unittest.mock import patch
+
+import pytest
+
+from ..domain.conflict_detector import BaseConflictDetector, FirewallRuleConflictDetector
+from ..domain.firewall_rule_index import FirewallRuleIndex, IntervalIndex, PrefixIndex, parse_network
+
+
+def _random_ruleset(size, seed):
+    """Règles mêlant préfixes imbriqués, plages de ports et valeurs non analysables."""
+    rng = random.Random(seed)
+    rules = []
+    for rule_id in range(size):
+        parts = ['iptables', '-A', rng.choice(['INPUT', 'FORWARD'])]
+        if rng.random() < 0.7:
+            parts += ['-p', rng.choice(['tcp', 'udp'])]
+        if rng.random() < 0.6:
+            parts += ['-s', rng.choice([
+                'any', '0.0.0.0/0', 'invalid', 'fe80::/64', '::/0',
+                f'10.{rng.randint(0, 3)}.{rng.randint(0, 3)}.0/{rng.choice([8, 16, 24, 32])}',
+            ])]
+        if rng.random() < 0.6:
+            parts += ['-d', rng.choice([
+                'any', '192.168.0.0/16',
+                f'192.168.{rng.randint(0, 3)}.{rng.randint(0, 255)}',
+                f'192.168.{rng.randint(0, 3)}.0/24',
+            ])]
+        if rng.random() < 0.4:
+            parts += ['--sport', rng.choice(['any', '1024:65535', '80:', 'x', str(rng.randint(1, 100))])]
+        if rng.random() < 0.7:
+            port = rng.randint(1, 200)
+            parts += ['--dport', rng.choice([str(port), f'{port}:{port + rng.randint(0, 50)}', 'any'])]
+        parts += ['-j', rng.choice(['ACCEPT', 'DROP'])]
+        rules.append({'id': rule_id, 'content': ' '.join(parts)})
+    return rules
+
+
+def _conflict_keys(conflicts):
+    return [(c.rule1_id, c.rule2_id, c.conflict_type) for c in conflicts]
+
+
+class PrefixIndexTest(unittest.TestCase):
+    """Tests de l'index de préfixes."""
+
+    def test_ancestors_and_descendants(self):
+        index = PrefixIndex()
+        for item, prefix in enumerate(['10.0.0.0/8', '10.1.0.0/16', '10.1.2.0/24', '10.2.0.0/16', '::/0']):
+            index.add(parse_network(prefix), item)
+
+        self.assertEqual(index.overlapping(parse_network('10.1.0.0/16')), {0, 1, 2})
+        self.assertEqual(index.overlapping(parse_network('10.1.2.3')), {0, 1, 2})
+        self.assertEqual(index.overlapping(parse_network('11.0.0.0/8')), set())
+        self.assertEqual(index.overlapping(parse_network('2001:db8::/32')), {4})
+
+
+class IntervalIndexTest(unittest.TestCase):
+    """Tests de l'arbre d'intervalles."""
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(0)
+        intervals = []
+        for _ in range(500):
+            start = rng.randint(0, 65535)
+            intervals.append((start, min(65535, start + rng.choice([0, 0, 10, 1000]))))
+        index = IntervalIndex()
+        for item, interval in enumerate(intervals):
+            index.add(interval, item)
+
+        for _ in range(200):
+            start = rng.randint(0, 65535)
+            query = (start, start + rng.randint(0, 500))
+            expected = {
+                item for item, (low, high) in enumerate(intervals)
+                if low <= query[1] and query[0] <= high
+            }
+            self.assertEqual(index.overlapping(query), expected)
+
+
+class IndexedConflictAnalysisTest(unittest.TestCase):
+    """L'analyse indexée doit produire les mêmes conflits que la comparaison exhaustive."""
+
+    def setUp(self):
+        self.detector = FirewallRuleConflictDetector()
+        patcher = patch.object(self.detector.traffic_service, 'test_connection', return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_same_conflicts_as_pairwise_scan(self):
+        for seed in range(10):
+            rules = _random_ruleset(120, seed)
+            indexed = _conflict_keys(self.detector.analyze_ruleset(rules))
+            pairwise = _conflict_keys(BaseConflictDetector.analyze_ruleset(self.detector, rules))
+            self.assertEqual(indexed, pairwise, f"seed={seed}")
+
+    def test_candidates_exclude_other_chains_and_protocols(self):
+        rules = [
+            'iptables -A INPUT -p tcp -d 10.0.0.1 --dport 22 -j ACCEPT',
+            'iptables -A INPUT -p tcp -d 10.0.0.0/24 -j DROP',
+            'iptables -A INPUT -p udp -d 10.0.0.1 --dport 22 -j DROP',
+            'iptables -A OUTPUT -p tcp -d 10.0.0.1 --dport 22 -j DROP',
+            'iptables -A INPUT -p tcp -d 10.0.1.1 --dport 22 -j DROP',
+        ]
+        infos = [self.detector._parse_iptables_rule(rule) for rule in rules]
+        index = FirewallRuleIndex(infos)
+
+        self.assertEqual(index.candidates(0), [1])
+
+    def test_health_probe_runs_once_per_ruleset(self):
+        rules = _random_ruleset(50, 0)
+        self.detector.analyze_ruleset(rules)
+
+        self.assertEqual(self.detector.traffic_service.test_connection.call_count, 1)
+
+
+class FirewallRuleIndexPerformanceTest(unittest.TestCase):
+    """Benchmark de l'analyse de jeux de règles synthétiques."""
+
+    @pytest.mark.performance
+    def test_twenty_thousand_rules(self):
+        """20 000 règles : seules les paires candidates de l'index sont vérifiées."""
+        rng = random.Random(0)
+        rules = []
+        for rule_id in range(20000):
+            rules.append({'id': rule_id, 'content': (
+                f"iptables -A {rng.choice(['INPUT', 'OUTPUT', 'FORWARD'])} -p {rng.choice(['tcp', 'udp'])} "
+                f"-s 10.{rng.randrange(256)}.{rng.randrange(256)}.0/24 "
+                f"-d 172.16.{rng.randrange(256)}.{rng.randrange(256)} "
+                f"--dport {rng.randrange(1, 65536)} -j {rng.choice(['ACCEPT', 'DROP'])}"
+            )})
+        # Quelques règles générales qui chevauchent de nombreuses autres
+        rules += [
+            {'id': 20000, 'content': 'iptables -A INPUT -p tcp -s 10.0.0.0/8 --dport 1:1024 -j DROP'},
+            {'id': 20001, 'content': 'iptables -A FORWARD -d 172.16.0.0/16 -j ACCEPT'},
+        ]
+        detector = FirewallRuleConflictDetector()
+
+        with patch.object(detector.traffic_service, 'test_connection', return_value=False), \
+                patch.object(detector, '_check_pair', wraps=detector._check_pair) as check_pair:
+            conflicts = detector.analyze_ruleset(rules)
+
+        self.assertTrue(conflicts)
+        # Comparaison exhaustive : 20 002 × 20 001 ≈ 4 × 10^8 paires
+        self.assertLess(check_pair.call_count, 2 * len(rules))
@@ -0,0 +1,229 @@
+"""
+Tests de l'ingestion par lots des alertes Suricata.
+"""
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from django.core.cache.backends.locmem import LocMemCache
+
+from .. import tasks
+from ..models import SuricataAlert
+from ..services import elasticsearch_monitor, suricata_ingestion
+from ..services.elasticsearch_monitor import ElasticsearchMonitor
+from ..services.suricata_ingestion import SuricataAlertIngestor
+
+
+START = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+class FakeElasticsearch:
+    """Stand-in d'Elasticsearch : point-in-time et pagination search_after."""
+
+    def __init__(self, documents):
+        # Ordre de tri d'Elasticsearch : @timestamp puis ordre d'indexation
+        self.documents = sorted(enumerate(documents), key=lambda item: (item[1]['@timestamp'], item[0]))
+        self.searches = 0
+        self.open_pits = set()
+
+    def ping(self):
+        return True
+
+    def open_point_in_time(self, index, keep_alive):
+        pit_id = f"pit-{len(self.open_pits)}"
+        self.open_pits.add(pit_id)
+        return {'id': pit_id}
+
+    def close_point_in_time(self, id):
+        self.open_pits.discard(id)
+
+    def search(self, query, sort, size, pit, search_after=None):
+        self.searches += 1
+        since = query['bool']['must'][0]['range']['@timestamp']['gte']
+        hits = []
+        for position, document in self.documents:
+            sort_values = [document['@timestamp'], position]
+            if document['@timestamp'] < since:
+                continue
+            if search_after is not None and sort_values <= search_after:
+                continue
+            hits.append({
+                '_id': document['_id'],
+                '_index': 'suricata-2026.03.01',
+                '_source': document,
+                'sort': sort_values
+            })
+            if len(hits) == size:
+                break
+        return {'pit_id': pit['id'], 'hits': {'hits': hits}}
+
+
+def _document(number, seconds=None, severity=2):
+    timestamp = START + timedelta(seconds=number if seconds is None else seconds)
+    return {
+        '_id': f'alert-{number}',
+        '@timestamp': timestamp.isoformat(),
+        'event_type': 'alert',
+        'alert': {'signature': 'ET SCAN Nmap', 'category': 'Attempted Recon', 'severity': severity},
+        'src_ip': '10.0.0.1',
+        'dest_ip': '192.168.1.1',
+        'src_port': 4444,
+        'dest_port': 80,
+        'proto': 'TCP'
+    }
+
+
+def _monitor(documents):
+    fake = FakeElasticsearch(documents)
+    with patch.object(elasticsearch_monitor, 'Elasticsearch', return_value=fake):
+        monitor = ElasticsearchMonitor()
+    return monitor, fake
+
+
+class IterAlertsSinceTest(unittest.TestCase):
+    """Tests de la lecture paginée d'Elasticsearch."""
+
+    def test_pages_through_every_alert_in_order(self):
+        # Plusieurs alertes de même horodatage de part et d'autre des pages
+        documents = [_document(number, seconds=number // 3) for number in range(25)]
+        monitor, fake = _monitor(documents)
+
+        batches = list(monitor.iter_alerts_since(START, batch_size=10))
+
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        self.assertEqual(
+            [alert['_id'] for batch in batches for alert in batch],
+            [f'alert-{number}' for number in range(25)]
+        )
+        self.assertEqual(fake.open_pits, set())
+
+
+class SuricataAlertIngestorTest(unittest.TestCase):
+    """Tests de l'ingestion idempotente."""
+
+    def setUp(self):
+        self.objects = MagicMock()
+        self.objects.filter.return_value.values_list.return_value = []
+        for target, attribute, value in (
+            (SuricataAlert, 'objects', self.objects),
+            (suricata_ingestion, 'transaction', MagicMock()),
+            (suricata_ingestion, 'suricata_alerts_ingested', MagicMock()),
+        ):
+            patcher = patch.object(target, attribute, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.signal = suricata_ingestion.suricata_alerts_ingested
+
+    def _ingestor(self, documents=(), chunk_size=1000):
+        monitor, _ = _monitor(list(documents))
+        return SuricataAlertIngestor(monitor=monitor, chunk_size=chunk_size)
+
+    def test_batch_is_deduplicated_and_chunked(self):
+        alerts = [_document(number % 5) for number in range(12)]
+        self.objects.filter.return_value.values_list.return_value = ['alert-0']
+
+        result = self._ingestor(chunk_size=2).ingest_batch(alerts)
+
+        self.assertEqual(result['alerts_processed'], 4)
+        self.assertEqual(result['duplicates'], 8)
+        self.assertEqual(self.objects.bulk_create.call_count, 3)
+        for call in self.objects.bulk_create.call_args_list:
+            self.assertEqual(call.kwargs, {'ignore_conflicts': True})
+        self.signal.send.assert_called_once()
+        self.assertEqual(len(self.signal.send.call_args.kwargs['alerts']), 4)
+        self.assertEqual(self.signal.send.call_args.kwargs['severity_counts'], {'high': 4})
+
+    def test_checkpoint_advances_to_latest_alert(self):
+        checkpoint = SimpleNamespace(high_water_mark=None, alerts_ingested=0, save=MagicMock())
+        alerts = [_document(30), _document(10), {'_id': 'no-timestamp'}]
+
+        result = self._ingestor().ingest_batch(alerts, checkpoint)
+
+        self.assertEqual(result['invalid'], 1)
+        self.assertEqual(checkpoint.high_water_mark, START + timedelta(seconds=30))
+        self.assertEqual(checkpoint.alerts_ingested, 2)
+        checkpoint.save.assert_called_once()
+
+    def test_run_resumes_from_checkpoint(self):
+        checkpoint = SimpleNamespace(
+            high_water_mark=START + timedelta(seconds=50), alerts_ingested=0, save=MagicMock()
+        )
+        ingestor = self._ingestor(_document(n) for n in range(100))
+
+        with patch.object(suricata_ingestion.IngestionCheckpoint, 'objects') as checkpoints:
+            checkpoints.get_or_create.return_value = (checkpoint, False)
+            result = ingestor.run()
+
+        self.assertEqual(result['total_alerts'], 50)
+        self.assertEqual(checkpoint.high_water_mark, START + timedelta(seconds=99))
+
+
+class FetchSuricataAlertsLockTest(unittest.TestCase):
+    """Tests du verrou de la tâche d'ingestion."""
+
+    def setUp(self):
+        # Le stockage de LocMemCache est partagé entre instances de même nom
+        self.cache = LocMemCache('suricata-lock-test', {})
+        self.cache.clear()
+        self.addCleanup(self.cache.clear)
+        patcher = patch.object(tasks, 'cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, ingest):
+        with patch.object(suricata_ingestion.SuricataAlertIngestor, '__init__', return_value=None), \
+                patch.object(suricata_ingestion.SuricataAlertIngestor, 'run', side_effect=ingest):
+            return tasks.fetch_suricata_alerts()
+
+    def test_concurrent_run_is_skipped(self):
+        self.cache.add('suricata_ingestion_lock', 'other-run')
+
+        self.assertEqual(self._run(lambda: {})['status'], 'skipped')
+
+    def test_expired_lock_of_next_run_is_kept(self):
+        def slow_ingest():
+            # Le bail a expiré et l'exécution suivante a pris le verrou
+            self.cache.set('suricata_ingestion_lock', 'next-run')
+            return {'total_alerts': 0, 'alerts_processed': 0, 'duplicates': 0}
+
+        self._run(slow_ingest)
+
+        self.assertEqual(self.cache.get('suricata_ingestion_lock'), 'next-run')
+
+    def test_lock_is_released_after_run(self):
+        self._run(lambda: {'total_alerts': 0, 'alerts_processed': 0, 'duplicates': 0})
+
+        self.assertIsNone(self.cache.get('suricata_ingestion_lock'))
+
+
+class SuricataIngestionPerformanceTest(unittest.TestCase):
+    """Rafale d'ingestion depuis le stand-in Elasticsearch."""
+
+    @pytest.mark.performance
+    def test_fifty_thousand_alert_burst(self):
+        """50 000 alertes ingérées en 50 bulk_create, une recherche de doublons par bloc."""
+        documents = [_document(number, seconds=number / 100) for number in range(50000)]
+        monitor, fake = _monitor(documents)
+        ingestor = SuricataAlertIngestor(monitor=monitor, batch_size=5000, chunk_size=1000)
+        checkpoint = SimpleNamespace(high_water_mark=START, alerts_ingested=0, save=MagicMock())
+
+        with patch.object(SuricataAlert, 'objects') as objects, \
+                patch.object(suricata_ingestion, 'transaction'), \
+                patch.object(suricata_ingestion, 'suricata_alerts_ingested') as signal, \
+                patch.object(suricata_ingestion.IngestionCheckpoint, 'objects') as checkpoints:
+            objects.filter.return_value.values_list.return_value = []
+            checkpoints.get_or_create.return_value = (checkpoint, False)
+
+            result = ingestor.run()
+
+        self.assertEqual(result['alerts_processed'], 50000)
+        self.assertEqual(objects.bulk_create.call_count, 50)
+        self.assertEqual(objects.filter.call_count, 50)
+        self.assertEqual(signal.send.call_count, 10)
+        # Dix pages pleines puis une page vide
+        self.assertEqual(fake.searches, 11)
+        self.assertEqual(fake.open_pits, set())